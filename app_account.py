@@ -3,6 +3,7 @@ import aws_cdk as cdk
 from importlib import import_module
 
 from src.account.stacks.account_common_stack import DataZoneConnectorsAccountCommonStack
+from src.account.stacks.account_connector_runtime_stack import DataZoneConnectorsAccountConnectorRuntimeStack
 
 from src.producer.stacks.producer_common_stack import DataZoneConnectorsProducerCommonStack
 from src.producer.stacks.producer_workflows_stack import ProducerWorkflowsStack
@@ -67,6 +68,25 @@ account_common_constructs = {
     **dz_conn_p_common_stack.outputs
 }
 
+# ---------------- Connector Runtime Stack ------------------------
+if ACCOUNT_PROPS['connector_runtime']['enabled']:
+    dz_conn_a_connector_runtime_stack = DataZoneConnectorsAccountConnectorRuntimeStack(
+        scope= app,
+        construct_id = "dz-conn-a-connector-runtime-stack",
+        account_props = ACCOUNT_PROPS,
+        consumer_workflows_props = CONSUMER_WORKFLOW_PROPS,
+        common_constructs = account_common_constructs,
+        env = env,
+        description= "Guidance for Connecting Data Products with Amazon DataZone - Account Connector Runtime Stack - (SO9317)"
+    )
+
+    dz_conn_a_connector_runtime_stack.node.add_dependency(dz_conn_p_common_stack)
+
+    account_common_constructs = {
+        **account_common_constructs,
+        **dz_conn_a_connector_runtime_stack.outputs
+    }
+
 dz_conn_p_workflows_stack = ProducerWorkflowsStack(
     scope= app,
     construct_id = "dz-conn-p-workflows-stack",
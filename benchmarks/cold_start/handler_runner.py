@@ -0,0 +1,104 @@
+""" Script to simulate a single cold start of a lambda handler in a fresh interpreter. Meant to be run by run_benchmarks.py with '-X importtime'.
+It stubs AWS clients (and source database drivers, if any) according to the handler fixture, imports the handler module (init phase) and invokes it once
+(first invocation) with the fixture event, printing a result line with both wall times, the AWS API calls made and the invocation status.
+Handler module import is wrapped with markers on stderr so that its '-X importtime' rows can be told apart from the ones of this script.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import contextlib
+
+from stubs import BotocoreClientStubber, SourceDriverStubber
+
+# Constant: Represents the prefix of the stdout line with the result of the run
+RESULT_LINE_PREFIX = '##COLD_START_RESULT##'
+
+# Constant: Represents the markers written to stderr around the import of the handler module
+IMPORT_BEGIN_MARKER = '##HANDLER_IMPORT_BEGIN##'
+IMPORT_END_MARKER = '##HANDLER_IMPORT_END##'
+
+# Constant: Represents the default lambda timeout used by the fake lambda context
+DEFAULT_TIMEOUT_IN_SECONDS = 60
+
+
+class LambdaContext:
+    """ Class to represent a minimal lambda context passed to handlers on invocation"""
+
+    def __init__(self, function_name, timeout_in_seconds):
+        self.function_name = function_name
+        self.function_version = '$LATEST'
+        self.memory_limit_in_mb = '128'
+        self.aws_request_id = 'cold-start-benchmark'
+        self.deadline = time.time() + timeout_in_seconds
+
+    def get_remaining_time_in_millis(self):
+        return int(max(self.deadline - time.time(), 0) * 1000)
+
+
+def main():
+    """ Function to run a cold start of a lambda handler, printing its result line"""
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--handler-path', required=True, help='Path of the lambda handler file')
+    parser.add_argument('--layer-path', required=True, help='Path of the common layer python folder')
+    parser.add_argument('--fixture-path', required=True, help='Path of the handler fixture file')
+    args = parser.parse_args()
+
+    with open(args.fixture_path) as fixture_file:
+        fixture = json.load(fixture_file)
+
+    botocore_client_stubber = BotocoreClientStubber(fixture.get('responses', {}))
+    botocore_client_stubber.install()
+
+    source_driver_stubber = SourceDriverStubber(fixture.get('source_drivers', []))
+    source_driver_stubber.install()
+
+    handler_dir_path, handler_file_name = os.path.split(os.path.abspath(args.handler_path))
+    handler_module_name = os.path.splitext(handler_file_name)[0]
+    sys.path[:0] = [handler_dir_path, os.path.abspath(args.layer_path)]
+
+    handler_output = io.StringIO()
+    result = {'handler': handler_module_name}
+
+    # Init phase: import of the handler module, including module level clients
+    sys.stderr.write(f'{IMPORT_BEGIN_MARKER}\n')
+    sys.stderr.flush()
+    init_start = time.perf_counter()
+    with contextlib.redirect_stdout(handler_output):
+        handler_module = importlib.import_module(handler_module_name)
+    result['init_ms'] = (time.perf_counter() - init_start) * 1000
+    sys.stderr.write(f'{IMPORT_END_MARKER}\n')
+    sys.stderr.flush()
+
+    init_calls = dict(botocore_client_stubber.calls)
+
+    # First invocation with fixture event
+    context = LambdaContext(handler_module_name, fixture.get('timeout_in_seconds', DEFAULT_TIMEOUT_IN_SECONDS))
+    invocation_start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(handler_output):
+            handler_module.handler(fixture['event'], context)
+        result['status'] = 'ok'
+    except Exception as error:
+        result['status'] = 'error'
+        result['error'] = f'{type(error).__name__}: {error}'
+    result['first_invocation_ms'] = (time.perf_counter() - invocation_start) * 1000
+
+    result['init_api_calls'] = init_calls
+    result['invocation_api_calls'] = {
+        operation_key: calls - init_calls.get(operation_key, 0)
+        for operation_key, calls in botocore_client_stubber.calls.items()
+        if calls - init_calls.get(operation_key, 0) > 0
+    }
+    result['stubbed_missing_drivers'] = source_driver_stubber.missing_driver_names
+
+    print(f'{RESULT_LINE_PREFIX}{json.dumps(result)}')
+
+
+if __name__ == '__main__':
+    main()
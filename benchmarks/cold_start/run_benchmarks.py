@@ -0,0 +1,273 @@
+""" Cold start benchmark of all lambda handlers of the solution. Runs offline: AWS clients and source database drivers are stubbed.
+For each handler found under src/<area>/code/lambda it will run several cold starts, each one in a fresh interpreter with '-X importtime', and measure:
+    import_ms: Time spent importing dependencies of the handler (stdlib and third party modules, i.e. boto3), from '-X importtime' self times
+    init_ms: Wall time of the init phase, meaning the import of the handler module including module level code (i.e. client creation)
+    first_invocation_ms: Wall time of the first invocation of the handler with the event of its fixture
+Median of each metric is compared with the budgets checked in budgets.json, flagging handlers over budget (beyond tolerance) and handlers whose
+first invocation failed (i.e. fixture out of date). Exits with code 1 if any handler was flagged.
+
+Usage (from repository root, with an interpreter that has the lambda runtime dependencies installed, i.e. boto3):
+    python benchmarks/cold_start/run_benchmarks.py [--handlers <NAME> ...] [--runs <RUNS>] [--python <INTERPRETER>] [--update-budgets]
+"""
+
+import os
+import sys
+import json
+import glob
+import math
+import argparse
+import statistics
+import subprocess
+
+# Constant: Represents the path of the folder containing this benchmark
+BENCHMARK_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# Constant: Represents the path of the repository root
+REPOSITORY_PATH = os.path.abspath(os.path.join(BENCHMARK_PATH, '..', '..'))
+
+# Constant: Represents the glob pattern of lambda handler files, each one named as its folder
+HANDLERS_GLOB_PATTERN = os.path.join(REPOSITORY_PATH, 'src', '*', 'code', 'lambda', '*', '*.py')
+
+# Constant: Represents the path of the common layer python folder
+LAYER_PATH = os.path.join(REPOSITORY_PATH, 'src', 'common', 'code', 'layer', 'python')
+
+# Constant: Represents the paths of the handler runner, fixtures folder and budgets file
+HANDLER_RUNNER_PATH = os.path.join(BENCHMARK_PATH, 'handler_runner.py')
+FIXTURES_PATH = os.path.join(BENCHMARK_PATH, 'fixtures')
+BUDGETS_PATH = os.path.join(BENCHMARK_PATH, 'budgets.json')
+
+# Constant: Represents the measured metrics, all of them in milliseconds
+METRICS = ['import_ms', 'init_ms', 'first_invocation_ms']
+
+# Constant: Represents the prefix of modules that belong to the solution (handler modules are added per run)
+SOLUTION_MODULE_PREFIXES = ['dz_conn_common']
+
+# Constant: Represents the environment variables set on every run so that no real credentials, region or metadata endpoints are used
+BASE_ENVIRONMENT = {
+    'AWS_ACCESS_KEY_ID': 'benchmark',
+    'AWS_SECRET_ACCESS_KEY': 'benchmark',
+    'AWS_SESSION_TOKEN': 'benchmark',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_REGION': 'us-east-1',
+    'AWS_EC2_METADATA_DISABLED': 'true',
+    'PYTHONDONTWRITEBYTECODE': '1'
+}
+
+# Constant: Represents the markers and prefixes shared with the handler runner
+RESULT_LINE_PREFIX = '##COLD_START_RESULT##'
+IMPORT_BEGIN_MARKER = '##HANDLER_IMPORT_BEGIN##'
+IMPORT_END_MARKER = '##HANDLER_IMPORT_END##'
+IMPORT_TIME_LINE_PREFIX = 'import time:'
+
+
+def main():
+    """ Function to run the cold start benchmark, print a report and exit with code 1 if any handler was flagged"""
+
+    parser = argparse.ArgumentParser(description='Cold start benchmark of lambda handlers')
+    parser.add_argument('--handlers', nargs='*', help='Names of the handlers to benchmark. All if not specified.')
+    parser.add_argument('--runs', type=int, default=5, help='Number of cold starts per handler. Median is reported.')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter used to run handlers. Must have lambda runtime dependencies installed.')
+    parser.add_argument('--top-imports', type=int, default=5, help='Number of slowest imported modules reported per handler')
+    parser.add_argument('--output', help='Path of a JSON file where full results will be written')
+    parser.add_argument('--update-budgets', action='store_true', help='Write measured medians as budgets of the benchmarked handlers')
+    args = parser.parse_args()
+
+    handler_paths = get_handler_paths(args.handlers)
+    budgets = read_budgets()
+
+    results = {}
+    for handler_name, handler_path in handler_paths.items():
+        results[handler_name] = benchmark_handler(handler_name, handler_path, args.python, args.runs, args.top_imports)
+
+    flags = get_flags(results, budgets)
+    print_report(results, budgets, flags)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'results': results, 'flags': flags}, output_file, indent=2)
+
+    if args.update_budgets:
+        write_budgets(budgets, results, args.python)
+        print(f'\nBudgets updated in {BUDGETS_PATH}')
+        return 0
+
+    return 1 if flags else 0
+
+
+def get_handler_paths(handler_names):
+    """ Complementary function to get the paths of the handlers to benchmark, keyed by handler name"""
+
+    handler_paths = {}
+    for handler_path in sorted(glob.glob(HANDLERS_GLOB_PATTERN)):
+        handler_name = os.path.splitext(os.path.basename(handler_path))[0]
+        if handler_name != os.path.basename(os.path.dirname(handler_path)): continue
+        if handler_names and handler_name not in handler_names: continue
+        handler_paths[handler_name] = handler_path
+
+    unknown_handler_names = set(handler_names or []) - set(handler_paths)
+    if unknown_handler_names: raise Exception(f'Unknown handlers: {sorted(unknown_handler_names)}')
+
+    return handler_paths
+
+
+def benchmark_handler(handler_name, handler_path, python, runs, top_imports):
+    """ Complementary function to run several cold starts of a handler and aggregate their metrics (median)"""
+
+    fixture_path = os.path.join(FIXTURES_PATH, f'{handler_name}.json')
+    if not os.path.exists(fixture_path):
+        return {'status': 'error', 'error': f'Missing fixture {os.path.relpath(fixture_path, REPOSITORY_PATH)}'}
+
+    with open(fixture_path) as fixture_file:
+        fixture_environment = json.load(fixture_file).get('environment', {})
+
+    run_results = [run_cold_start(handler_name, handler_path, fixture_path, fixture_environment, python) for run in range(runs)]
+
+    failed_run_results = [run_result for run_result in run_results if run_result['status'] != 'ok']
+    if failed_run_results: return failed_run_results[0]
+
+    handler_result = {metric: statistics.median(run_result[metric] for run_result in run_results) for metric in METRICS}
+
+    median_run_result = sorted(run_results, key=lambda run_result: run_result['init_ms'])[len(run_results) // 2]
+    handler_result.update({
+        'status': 'ok',
+        'top_imports': median_run_result['imports'][:top_imports],
+        'init_api_calls': median_run_result['init_api_calls'],
+        'invocation_api_calls': median_run_result['invocation_api_calls'],
+        'stubbed_missing_drivers': median_run_result['stubbed_missing_drivers']
+    })
+
+    return handler_result
+
+
+def run_cold_start(handler_name, handler_path, fixture_path, fixture_environment, python):
+    """ Complementary function to run a single cold start of a handler in a fresh interpreter and parse its result and import times"""
+
+    process = subprocess.run(
+        [python, '-X', 'importtime', HANDLER_RUNNER_PATH, '--handler-path', handler_path, '--layer-path', LAYER_PATH, '--fixture-path', fixture_path],
+        cwd= BENCHMARK_PATH,
+        env= {**os.environ, **BASE_ENVIRONMENT, **fixture_environment},
+        capture_output= True,
+        text= True
+    )
+
+    result_lines = [line for line in process.stdout.splitlines() if line.startswith(RESULT_LINE_PREFIX)]
+    if process.returncode != 0 or not result_lines:
+        return {'status': 'error', 'error': (process.stderr.strip().splitlines() or ['No result'])[-1]}
+
+    run_result = json.loads(result_lines[-1][len(RESULT_LINE_PREFIX):])
+    imports = get_handler_imports(process.stderr, [handler_name] + SOLUTION_MODULE_PREFIXES)
+
+    run_result['import_ms'] = sum(self_ms for module_name, self_ms in imports)
+    run_result['imports'] = imports
+    return run_result
+
+
+def get_handler_imports(stderr, solution_module_prefixes):
+    """ Complementary function to parse '-X importtime' rows written while importing the handler module, returning (module, self time in ms)
+    of non solution modules, slowest first"""
+
+    imports = []
+    handler_import = False
+    for line in stderr.splitlines():
+        if line == IMPORT_BEGIN_MARKER: handler_import = True
+        elif line == IMPORT_END_MARKER: break
+        elif handler_import and line.startswith(IMPORT_TIME_LINE_PREFIX):
+            self_us, cumulative_us, module_name = line[len(IMPORT_TIME_LINE_PREFIX):].split('|')
+            if not self_us.strip().isdigit(): continue
+
+            module_name = module_name.strip()
+            if any(module_name == prefix or module_name.startswith(f'{prefix}.') for prefix in solution_module_prefixes): continue
+
+            imports.append((module_name, int(self_us) / 1000))
+
+    return sorted(imports, key=lambda module_import: module_import[1], reverse=True)
+
+
+def read_budgets():
+    """ Complementary function to read checked in budgets"""
+
+    with open(BUDGETS_PATH) as budgets_file:
+        return json.load(budgets_file)
+
+
+def write_budgets(budgets, results, python):
+    """ Complementary function to write measured medians (rounded up) as budgets of the benchmarked handlers, along with the reference environment"""
+
+    for handler_name, handler_result in results.items():
+        if handler_result['status'] != 'ok': continue
+        budgets['handlers'][handler_name] = {metric: math.ceil(handler_result[metric]) for metric in METRICS}
+
+    budgets['handlers'] = dict(sorted(budgets['handlers'].items()))
+    budgets['reference_environment'] = get_reference_environment(python)
+
+    with open(BUDGETS_PATH, 'w') as budgets_file:
+        json.dump(budgets, budgets_file, indent=4)
+        budgets_file.write('\n')
+
+
+def get_reference_environment(python):
+    """ Complementary function to get python and boto3 versions of the interpreter used to run handlers"""
+
+    process = subprocess.run(
+        [python, '-c', "import json, platform, importlib.metadata as m; print(json.dumps({'python': platform.python_version(), 'boto3': m.version('boto3'), 'botocore': m.version('botocore')}))"],
+        capture_output= True,
+        text= True,
+        check= True
+    )
+
+    return json.loads(process.stdout)
+
+
+def get_flags(results, budgets):
+    """ Complementary function to get flags (failures and regressions over budget plus tolerance) of benchmarked handlers. A metric is flagged only
+    when over its budget by both the relative and the absolute tolerance, so that noise on metrics of a few milliseconds is not flagged"""
+
+    tolerance = 1 + budgets['tolerance_percentage'] / 100
+    tolerance_ms = budgets['tolerance_ms']
+
+    flags = []
+    for handler_name, handler_result in results.items():
+        if handler_result['status'] != 'ok':
+            flags.append({'handler': handler_name, 'reason': f"failed: {handler_result['error']}"})
+            continue
+
+        handler_budget = budgets['handlers'].get(handler_name)
+        if not handler_budget:
+            flags.append({'handler': handler_name, 'reason': 'no budget'})
+            continue
+
+        for metric in METRICS:
+            if handler_result[metric] > max(handler_budget[metric] * tolerance, handler_budget[metric] + tolerance_ms):
+                flags.append({'handler': handler_name, 'reason': f'{metric} {handler_result[metric]:.1f} over budget {handler_budget[metric]}'})
+
+    return flags
+
+
+def print_report(results, budgets, flags):
+    """ Complementary function to print a table with measured medians against budgets, slowest imports and flags"""
+
+    print(f"{'handler':<52} {'import_ms':>18} {'init_ms':>18} {'first_invocation_ms':>20}")
+    for handler_name, handler_result in results.items():
+        if handler_result['status'] != 'ok':
+            print(f"{handler_name:<52} {'failed':>18}")
+            continue
+
+        handler_budget = budgets['handlers'].get(handler_name, {})
+        columns = [f"{handler_result[metric]:.1f} / {handler_budget.get(metric, '-')}" for metric in METRICS]
+        print(f'{handler_name:<52} {columns[0]:>18} {columns[1]:>18} {columns[2]:>20}')
+
+        top_imports = ', '.join(f'{module_name} {self_ms:.1f}' for module_name, self_ms in handler_result['top_imports'])
+        print(f"{'':<4}slowest imports (ms): {top_imports}")
+
+        if handler_result['stubbed_missing_drivers']:
+            print(f"{'':<4}drivers not installed (import not measured): {', '.join(handler_result['stubbed_missing_drivers'])}")
+
+    print(f"\nBudget tolerance: {budgets['tolerance_percentage']}% and {budgets['tolerance_ms']} ms - Reference environment: {budgets.get('reference_environment', {})}")
+    for flag in flags:
+        print(f"FLAG {flag['handler']}: {flag['reason']}")
+
+    if not flags: print('All handlers within budget')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import io
+import sys
+import json
+import copy
+import datetime
+import importlib.abc
+import importlib.util
+
+# Constant: Represents the fixture key that makes a stubbed operation raise a botocore ClientError instead of returning a response
+ERROR_RESPONSE_KEY = '__error__'
+
+# Constant: Represents the names of pagination token members left out of generated responses so that paginators stop after the first page
+PAGINATION_TOKEN_MEMBERS = ['NextToken', 'nextToken', 'Marker', 'NextMarker', 'NextContinuationToken', 'ContinuationToken']
+
+# Constant: Represents the maximum depth of nested structures generated from an operation output shape
+MAX_GENERATED_SHAPE_DEPTH = 6
+
+# Constant: Represents placeholder values of scalar members in generated responses
+GENERATED_SCALAR_VALUES = {
+    'string': 'stub',
+    'integer': 0,
+    'long': 0,
+    'float': 0.0,
+    'double': 0.0,
+    'boolean': False,
+    'blob': b''
+}
+
+
+class PostImportPatcher(importlib.abc.MetaPathFinder):
+    """ Class to patch modules right after they are imported, without importing them beforehand so that their import time is still measured
+    as part of the handler. Subclasses define the module names to be hooked and how each of them is patched.
+    """
+
+    module_names = []
+
+    def install(self):
+        """ Function to start hooking imports. Must be called before any of the hooked modules is imported"""
+
+        imported_module_names = [module_name for module_name in self.module_names if module_name in sys.modules]
+        if imported_module_names: raise Exception(f'Modules {imported_module_names} were imported before installing {type(self).__name__}')
+
+        sys.meta_path.insert(0, self)
+
+    def find_spec(self, fullname, path, target=None):
+        """ Function to hook the import of a module and patch it once executed"""
+
+        if fullname not in self.module_names: return None
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'): continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None: continue
+
+            original_exec_module = spec.loader.exec_module
+
+            def exec_module(module):
+                original_exec_module(module)
+                self.patch_module(module)
+
+            spec.loader.exec_module = exec_module
+            return spec
+
+        return self.get_missing_module_spec(fullname)
+
+    def get_missing_module_spec(self, fullname):
+        """ Function to get the spec of a hooked module that is not installed. By default it is left missing (import fails)"""
+
+        return None
+
+    def patch_module(self, module):
+        """ Function to patch a hooked module once executed"""
+
+        raise NotImplementedError
+
+
+class BotocoreClientStubber(PostImportPatcher):
+    """ Class to stub every AWS API call made through botocore clients. It waits for botocore.client module to be imported and registers, on every
+    client created, a 'before-call' handler returning canned responses (same mechanism as botocore Stubber). Parameter validation, serialization and
+    endpoint resolution still run as on a real call, only request signing and sending are skipped so that calls never reach the network.
+    """
+
+    module_names = ['botocore.client']
+
+    def __init__(self, responses):
+        """ Class Constructor.
+
+        Parameters
+        ----------
+        responses: dict - Dict with canned responses keyed by '<service name>.<OperationName>' (i.e. 'dynamodb.GetItem'). Each value is either a response dict
+            or a list of response dicts returned in order (last one repeated). Responses with an '__error__' key (dict with Code and Message) raise a ClientError.
+            Operations without a canned response return a response generated from their output shape.
+        """
+
+        self.responses = responses
+        self.calls = {}
+
+    def patch_module(self, client_module):
+        """ Function to register the stubbed response handler on every botocore client once created"""
+
+        stubber = self
+        original_init = client_module.BaseClient.__init__
+
+        def init(client, *args, **kwargs):
+            original_init(client, *args, **kwargs)
+            client.meta.events.register_first('before-call.*.*', stubber.get_response)
+
+        client_module.BaseClient.__init__ = init
+
+    def get_response(self, model, **kwargs):
+        """ Function to get the canned (or generated) response of an operation as (http response, parsed response). Error responses are raised by botocore
+        as modeled exceptions"""
+
+        from botocore.awsrequest import AWSResponse
+
+        operation_key = f'{model.service_model.service_name}.{model.name}'
+        call_index = self.calls.get(operation_key, 0)
+        self.calls[operation_key] = call_index + 1
+
+        if operation_key not in self.responses:
+            return AWSResponse(None, 200, {}, None), generate_response(model.output_shape)
+
+        response = self.responses[operation_key]
+        if isinstance(response, list): response = response[min(call_index, len(response) - 1)]
+        response = copy.deepcopy(response)
+
+        if ERROR_RESPONSE_KEY in response:
+            return AWSResponse(None, 400, {}, None), {'Error': response[ERROR_RESPONSE_KEY], 'ResponseMetadata': {'HTTPStatusCode': 400}}
+
+        if 'Body' in response: response['Body'] = get_streaming_body(response['Body'])
+        return AWSResponse(None, 200, {}, None), response
+
+
+class SourceDriverStubber(PostImportPatcher, importlib.abc.Loader):
+    """ Class to stub connections to source databases. Drivers that are installed are still imported (so that their import time is measured) but their
+    connect function is replaced, drivers that are not installed are replaced by a module with just a connect function.
+    Stubbed connections accept any statement and return no rows.
+    """
+
+    def __init__(self, driver_names):
+        """ Class Constructor.
+
+        Parameters
+        ----------
+        driver_names: list - Names of the driver modules to be stubbed (i.e. 'pg8000')
+        """
+
+        self.module_names = driver_names
+        self.missing_driver_names = []
+
+    def get_missing_module_spec(self, fullname):
+        """ Function to get the spec of an empty module for a driver that is not installed"""
+
+        self.missing_driver_names.append(fullname)
+        return importlib.util.spec_from_loader(fullname, loader=self)
+
+    def exec_module(self, driver_module):
+        """ Function to build the module of a driver that is not installed"""
+
+        self.patch_module(driver_module)
+
+    def patch_module(self, driver_module):
+        """ Function to replace the connect function of a driver"""
+
+        driver_module.connect = lambda *args, **kwargs: StubConnection()
+
+
+class StubCursor:
+    """ Class to represent a DB-API cursor of a stubbed source database connection"""
+
+    def __enter__(self): return self
+
+    def __exit__(self, *args): self.close()
+
+    def execute(self, *args, **kwargs): return None
+
+    def fetchall(self): return []
+
+    def close(self): return None
+
+
+class StubConnection:
+    """ Class to represent a DB-API connection to a stubbed source database"""
+
+    def cursor(self): return StubCursor()
+
+    def commit(self): return None
+
+    def rollback(self): return None
+
+    def close(self): return None
+
+
+def generate_response(shape, depth=0):
+    """ Function to generate a placeholder response from a botocore output shape, with all structure members populated, empty lists and maps,
+    first enum value for enum strings and no pagination tokens"""
+
+    if shape is None: return {}
+
+    if shape.type_name == 'structure':
+        if depth >= MAX_GENERATED_SHAPE_DEPTH: return {}
+        return {
+            member_name: generate_response(member_shape, depth + 1)
+            for member_name, member_shape in shape.members.items()
+            if member_name not in PAGINATION_TOKEN_MEMBERS and not member_shape.serialization.get('eventstream')
+        }
+
+    if shape.type_name == 'list': return []
+    if shape.type_name == 'map': return {}
+    if shape.type_name == 'timestamp': return datetime.datetime.now(datetime.timezone.utc)
+    if shape.type_name == 'string' and shape.enum: return shape.enum[0]
+
+    return GENERATED_SCALAR_VALUES.get(shape.type_name)
+
+
+def get_streaming_body(body):
+    """ Complementary function to wrap a fixture body (string or JSON value) into a botocore streaming body, as returned by operations like s3 GetObject"""
+
+    from botocore.response import StreamingBody
+
+    body_bytes = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+    return StreamingBody(io.BytesIO(body_bytes), len(body_bytes))
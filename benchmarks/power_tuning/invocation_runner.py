@@ -0,0 +1,94 @@
+""" Script to simulate the init phase and several invocations of a lambda handler in a fresh interpreter. Meant to be run by run_power_tuning.py.
+It stubs AWS clients (and source database drivers, if any) with the ones of the cold start benchmark according to the handler fixture, imports the handler
+module (init phase) and invokes it several times with the fixture event, printing a result line with CPU and wall times and the AWS API calls of each phase.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import contextlib
+
+# Constant: Represents the path of the cold start benchmark folder, whose stubs and lambda context are reused
+COLD_START_BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cold_start')
+
+sys.path.insert(0, COLD_START_BENCHMARK_PATH)
+
+from stubs import BotocoreClientStubber, SourceDriverStubber
+from handler_runner import LambdaContext, DEFAULT_TIMEOUT_IN_SECONDS
+
+# Constant: Represents the prefix of the stdout line with the result of the run
+RESULT_LINE_PREFIX = '##POWER_TUNING_RESULT##'
+
+
+def main():
+    """ Function to run the init phase and invocations of a lambda handler, printing its result line"""
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--handler-path', required=True, help='Path of the lambda handler file')
+    parser.add_argument('--layer-path', required=True, help='Path of the common layer python folder')
+    parser.add_argument('--fixture-path', required=True, help='Path of the handler fixture file')
+    parser.add_argument('--invocations', type=int, required=True, help='Number of invocations after init phase')
+    args = parser.parse_args()
+
+    with open(args.fixture_path) as fixture_file:
+        fixture = json.load(fixture_file)
+
+    botocore_client_stubber = BotocoreClientStubber(fixture.get('responses', {}))
+    botocore_client_stubber.install()
+
+    source_driver_stubber = SourceDriverStubber(fixture.get('source_drivers', []))
+    source_driver_stubber.install()
+
+    handler_dir_path, handler_file_name = os.path.split(os.path.abspath(args.handler_path))
+    handler_module_name = os.path.splitext(handler_file_name)[0]
+    sys.path[:0] = [handler_dir_path, os.path.abspath(args.layer_path)]
+
+    handler_output = io.StringIO()
+    result = {'handler': handler_module_name, 'status': 'ok', 'invocations': []}
+
+    # Init phase: import of the handler module, including module level clients
+    with measure_phase(botocore_client_stubber) as init_phase:
+        with contextlib.redirect_stdout(handler_output):
+            handler_module = importlib.import_module(handler_module_name)
+    result['init'] = init_phase
+
+    # Invocations with fixture event, first one included
+    timeout_in_seconds = fixture.get('timeout_in_seconds', DEFAULT_TIMEOUT_IN_SECONDS)
+    for invocation in range(args.invocations):
+        context = LambdaContext(handler_module_name, timeout_in_seconds)
+        try:
+            with measure_phase(botocore_client_stubber) as invocation_phase:
+                with contextlib.redirect_stdout(handler_output):
+                    handler_module.handler(fixture['event'], context)
+        except Exception as error:
+            result['status'] = 'error'
+            result['error'] = f'{type(error).__name__}: {error}'
+            break
+
+        result['invocations'].append(invocation_phase)
+
+    print(f'{RESULT_LINE_PREFIX}{json.dumps(result)}')
+
+
+@contextlib.contextmanager
+def measure_phase(botocore_client_stubber):
+    """ Complementary function to measure wall and CPU time (all threads of the process) of a phase along with the number of AWS API calls made during it.
+    Stubbed calls are reset first, so that each invocation gets fixture responses from the first one. Yields the dict where measures are set once the phase completes"""
+
+    phase = {}
+    botocore_client_stubber.calls.clear()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    yield phase
+
+    phase['wall_ms'] = (time.perf_counter() - wall_start) * 1000
+    phase['cpu_ms'] = (time.process_time() - cpu_start) * 1000
+    phase['api_calls'] = sum(botocore_client_stubber.calls.values())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+""" Power tuning benchmark of all lambda handlers of the solution. Runs offline with the stubs and fixtures of the cold start benchmark.
+For each handler found under src/<area>/code/lambda it will run the init phase and several invocations, each run in a fresh interpreter, measuring CPU time,
+wall time and AWS API calls. Measures are then projected to each memory size, given that lambda allocates CPU in proportion to memory (a full vCPU at 1769 MB):
+    warm_duration_ms / cold_start_duration_ms: CPU time scaled to the CPU share of the memory size, plus time not spent on CPU, plus a fixed latency per AWS API call
+    duration_ms: Warm and cold start (init phase and first invocation) durations blended by the expected share of cold starts
+    cost: Billed duration (1 ms granularity, init phase included) times memory, at arm64 and x86_64 prices, plus request price
+Recommended memory size is the cheapest one among those whose blended duration is within the speed tolerance of the fastest one.
+Exits with code 1 if any handler failed.
+
+Usage (from repository root, with an interpreter that has the lambda runtime dependencies installed, i.e. boto3):
+    python benchmarks/power_tuning/run_power_tuning.py [--handlers <NAME> ...] [--memory-sizes <MB> ...] [--runs <RUNS>] [--invocations <INVOCATIONS>]
+        [--api-latency-ms <MS>] [--cpu-scale <SCALE>] [--cold-start-percentage <PERCENTAGE>] [--speed-tolerance-percentage <PERCENTAGE>] [--python <INTERPRETER>] [--output <PATH>]
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+import statistics
+import subprocess
+
+# Constant: Represents the path of the folder containing this benchmark
+BENCHMARK_PATH = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(BENCHMARK_PATH, '..', 'cold_start'))
+
+from run_benchmarks import REPOSITORY_PATH, LAYER_PATH, FIXTURES_PATH, BASE_ENVIRONMENT, get_handler_paths
+
+# Constant: Represents the path of the invocation runner
+INVOCATION_RUNNER_PATH = os.path.join(BENCHMARK_PATH, 'invocation_runner.py')
+
+# Constant: Represents the prefix of the stdout line with the result of a run, shared with the invocation runner
+RESULT_LINE_PREFIX = '##POWER_TUNING_RESULT##'
+
+# Constant: Represents the default memory sizes (MB) the handlers are projected to
+DEFAULT_MEMORY_SIZES = [128, 256, 512, 1024, 1769, 3008]
+
+# Constant: Represents the memory size (MB) at which a lambda function gets a full vCPU. Single threaded python code does not run faster above it
+FULL_VCPU_MEMORY_SIZE = 1769
+
+# Constant: Represents lambda prices (us-east-1) in USD per GB-second of each architecture and per request
+PRICE_PER_GB_SECOND = {
+    'arm64': 0.0000133334,
+    'x86_64': 0.0000166667
+}
+PRICE_PER_REQUEST = 0.0000002
+
+# Constant: Represents the default latency in milliseconds added for each AWS API call (stubbed calls return immediately)
+DEFAULT_API_LATENCY_MS = 15
+
+# Constant: Represents the default percentage of invocations expected to be cold starts. Subscription events tend to arrive in bursts served by warm environments,
+# raise it for functions invoked sporadically (i.e. environment lifecycle ones)
+DEFAULT_COLD_START_PERCENTAGE = 2
+
+# Constant: Represents the default percentage over the fastest blended duration within which the cheapest memory size is recommended
+DEFAULT_SPEED_TOLERANCE_PERCENTAGE = 20
+
+# Constant: Represents the prefix of lambda function keys (sizing profiles in account / governance configuration) of each area
+AREA_FUNCTION_KEY_PREFIXES = {
+    'account': 'a',
+    'producer': 'p',
+    'consumer': 'c',
+    'governance': 'g'
+}
+
+# Constant: Represents the lambda function keys of handlers deployed as several functions
+HANDLER_FUNCTION_KEYS = {
+    'run_subscription_workflow': ['g_run_subscription_grant_workflow', 'g_run_subscription_revoke_workflow']
+}
+
+# Constant: Represents the architecture recommended for handlers connecting to source databases, whose driver layers include native libraries built for x86_64
+SOURCE_DRIVERS_ARCHITECTURE = 'x86_64'
+
+
+def main():
+    """ Function to run the power tuning benchmark, print a report with the recommended sizing of each lambda function and exit with code 1 if any handler failed"""
+
+    parser = argparse.ArgumentParser(description='Power tuning benchmark of lambda handlers')
+    parser.add_argument('--handlers', nargs='*', help='Names of the handlers to benchmark. All if not specified.')
+    parser.add_argument('--memory-sizes', nargs='*', type=int, default=DEFAULT_MEMORY_SIZES, help='Memory sizes (MB) to project handlers to')
+    parser.add_argument('--runs', type=int, default=3, help='Number of runs (fresh interpreters) per handler. Median is reported.')
+    parser.add_argument('--invocations', type=int, default=10, help='Number of invocations per run, first one included')
+    parser.add_argument('--api-latency-ms', type=float, default=DEFAULT_API_LATENCY_MS, help='Latency in milliseconds added for each AWS API call')
+    parser.add_argument('--cpu-scale', type=float, default=1.0, help='Ratio of a lambda vCPU time to a local CPU time, i.e. 1.5 if lambda runs handlers 1.5 times slower than this machine at full vCPU')
+    parser.add_argument('--cold-start-percentage', type=float, default=DEFAULT_COLD_START_PERCENTAGE, help='Percentage of invocations expected to be cold starts')
+    parser.add_argument('--speed-tolerance-percentage', type=float, default=DEFAULT_SPEED_TOLERANCE_PERCENTAGE, help='Percentage over the fastest blended duration within which the cheapest memory size is recommended')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter used to run handlers. Must have lambda runtime dependencies installed.')
+    parser.add_argument('--output', help='Path of a JSON file where full results will be written')
+    args = parser.parse_args()
+
+    handler_paths = get_handler_paths(args.handlers)
+    memory_sizes = sorted(set(args.memory_sizes))
+
+    results = {}
+    for handler_name, handler_path in handler_paths.items():
+        handler_result = benchmark_handler(handler_name, handler_path, args.python, args.runs, args.invocations)
+        if handler_result['status'] == 'ok':
+            handler_result.update(tune_handler(handler_result, memory_sizes, args.api_latency_ms, args.cpu_scale, args.cold_start_percentage, args.speed_tolerance_percentage))
+        results[handler_name] = handler_result
+
+    print_report(results, args)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+    return 1 if any(handler_result['status'] != 'ok' for handler_result in results.values()) else 0
+
+
+def benchmark_handler(handler_name, handler_path, python, runs, invocations):
+    """ Complementary function to run a handler several times and aggregate the measures of its init phase, first invocation and warm invocations (median)"""
+
+    fixture_path = os.path.join(FIXTURES_PATH, f'{handler_name}.json')
+    if not os.path.exists(fixture_path):
+        return {'status': 'error', 'error': f'Missing fixture {os.path.relpath(fixture_path, REPOSITORY_PATH)}'}
+
+    with open(fixture_path) as fixture_file:
+        fixture = json.load(fixture_file)
+
+    run_results = [run_handler(handler_path, fixture_path, fixture.get('environment', {}), python, invocations) for run in range(runs)]
+
+    failed_run_results = [run_result for run_result in run_results if run_result['status'] != 'ok']
+    if failed_run_results: return failed_run_results[0]
+
+    warm_invocations = [invocation for run_result in run_results for invocation in run_result['invocations'][1:]]
+
+    return {
+        'status': 'ok',
+        'handler_path': os.path.relpath(handler_path, REPOSITORY_PATH),
+        'source_drivers': fixture.get('source_drivers', []),
+        'init': get_median_phase([run_result['init'] for run_result in run_results]),
+        'first_invocation': get_median_phase([run_result['invocations'][0] for run_result in run_results]),
+        'warm_invocation': get_median_phase(warm_invocations or [run_result['invocations'][0] for run_result in run_results])
+    }
+
+
+def run_handler(handler_path, fixture_path, fixture_environment, python, invocations):
+    """ Complementary function to run the init phase and invocations of a handler in a fresh interpreter and parse its result"""
+
+    process = subprocess.run(
+        [python, INVOCATION_RUNNER_PATH, '--handler-path', handler_path, '--layer-path', LAYER_PATH, '--fixture-path', fixture_path, '--invocations', str(invocations)],
+        cwd= BENCHMARK_PATH,
+        env= {**os.environ, **BASE_ENVIRONMENT, **fixture_environment},
+        capture_output= True,
+        text= True
+    )
+
+    result_lines = [line for line in process.stdout.splitlines() if line.startswith(RESULT_LINE_PREFIX)]
+    if process.returncode != 0 or not result_lines:
+        return {'status': 'error', 'error': (process.stderr.strip().splitlines() or ['No result'])[-1]}
+
+    return json.loads(result_lines[-1][len(RESULT_LINE_PREFIX):])
+
+
+def get_median_phase(phases):
+    """ Complementary function to get the median of each measure of a list of phases"""
+
+    return {measure: statistics.median(phase[measure] for phase in phases) for measure in ['wall_ms', 'cpu_ms', 'api_calls']}
+
+
+def tune_handler(handler_result, memory_sizes, api_latency_ms, cpu_scale, cold_start_percentage, speed_tolerance_percentage):
+    """ Complementary function to project the measures of a handler to each memory size and get its recommended sizing"""
+
+    architecture = SOURCE_DRIVERS_ARCHITECTURE if handler_result['source_drivers'] else 'arm64'
+
+    projections = []
+    for memory_size in memory_sizes:
+        warm_duration_ms = get_duration_ms(handler_result['warm_invocation'], memory_size, api_latency_ms, cpu_scale)
+        cold_start_duration_ms = sum(get_duration_ms(handler_result[phase], memory_size, api_latency_ms, cpu_scale) for phase in ['init', 'first_invocation'])
+        duration_ms = warm_duration_ms * (1 - cold_start_percentage / 100) + cold_start_duration_ms * cold_start_percentage / 100
+
+        projections.append({
+            'memory_size': memory_size,
+            'warm_duration_ms': warm_duration_ms,
+            'cold_start_duration_ms': cold_start_duration_ms,
+            'duration_ms': duration_ms,
+            'cost_per_million': {
+                cost_architecture: get_invocation_cost(duration_ms, memory_size, cost_architecture) * 1000000
+                for cost_architecture in PRICE_PER_GB_SECOND
+            }
+        })
+
+    fastest_duration_ms = min(projection['duration_ms'] for projection in projections)
+    candidate_projections = [
+        projection for projection in projections
+        if projection['duration_ms'] <= fastest_duration_ms * (1 + speed_tolerance_percentage / 100)
+    ]
+    recommended_projection = min(candidate_projections, key=lambda projection: (projection['cost_per_million'][architecture], projection['memory_size']))
+
+    return {
+        'projections': projections,
+        'recommendation': {
+            'memory_size': recommended_projection['memory_size'],
+            'architecture': architecture
+        }
+    }
+
+
+def get_duration_ms(phase, memory_size, api_latency_ms, cpu_scale):
+    """ Complementary function to project the duration of a phase to a memory size: CPU time is scaled to the CPU share of the memory size
+    (capped at a full vCPU), time not spent on CPU is kept and a fixed latency is added for each AWS API call"""
+
+    cpu_share = min(memory_size / FULL_VCPU_MEMORY_SIZE, 1)
+    off_cpu_ms = max(phase['wall_ms'] - phase['cpu_ms'], 0)
+
+    return phase['cpu_ms'] * cpu_scale / cpu_share + off_cpu_ms + phase['api_calls'] * api_latency_ms
+
+
+def get_invocation_cost(duration_ms, memory_size, architecture):
+    """ Complementary function to get the cost in USD of an invocation, billed per started millisecond"""
+
+    return math.ceil(duration_ms) / 1000 * memory_size / 1024 * PRICE_PER_GB_SECOND[architecture] + PRICE_PER_REQUEST
+
+
+def get_function_keys(handler_name, handler_path):
+    """ Complementary function to get the keys of the lambda functions (sizing profiles in configuration) deployed from a handler"""
+
+    if handler_name in HANDLER_FUNCTION_KEYS: return HANDLER_FUNCTION_KEYS[handler_name]
+
+    area = handler_path.split(os.sep)[1]
+    return [f'{AREA_FUNCTION_KEY_PREFIXES[area]}_{handler_name}']
+
+
+def print_report(results, args):
+    """ Complementary function to print the projections of each handler, marking the recommended memory size, and the recommended sizing profiles"""
+
+    print(f'API call latency: {args.api_latency_ms} ms - CPU scale: {args.cpu_scale} - Cold starts: {args.cold_start_percentage}% - Speed tolerance: {args.speed_tolerance_percentage}%')
+
+    recommended_sizing = {}
+    for handler_name, handler_result in results.items():
+        print(f'\n{handler_name}')
+        if handler_result['status'] != 'ok':
+            print(f"{'':<4}failed: {handler_result['error']}")
+            continue
+
+        warm_invocation = handler_result['warm_invocation']
+        print(f"{'':<4}measured warm invocation: {warm_invocation['cpu_ms']:.1f} ms CPU, {warm_invocation['wall_ms']:.1f} ms wall, {warm_invocation['api_calls']:g} AWS API calls")
+        print(f"{'':<4}{'memory_size':>12} {'warm_ms':>10} {'cold_start_ms':>14} {'blended_ms':>11} {'usd_per_1M_arm64':>17} {'usd_per_1M_x86_64':>18}")
+
+        recommendation = handler_result['recommendation']
+        for projection in handler_result['projections']:
+            marker = '  <- recommended' if projection['memory_size'] == recommendation['memory_size'] else ''
+            print(
+                f"{'':<4}{projection['memory_size']:>12} {projection['warm_duration_ms']:>10.1f} {projection['cold_start_duration_ms']:>14.1f} {projection['duration_ms']:>11.1f} "
+                f"{projection['cost_per_million']['arm64']:>17.2f} {projection['cost_per_million']['x86_64']:>18.2f}{marker}"
+            )
+
+        for function_key in get_function_keys(handler_name, handler_result['handler_path']):
+            recommended_sizing[function_key] = recommendation
+
+    print("\nRecommended sizing ('memory_size' and 'architecture' of 'lambda_functions' in account / governance configuration):")
+    print(json.dumps(recommended_sizing, indent=4))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
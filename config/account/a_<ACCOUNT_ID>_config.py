@@ -1,3 +1,5 @@
+from config.governance.g_config import GOVERNANCE_WORKFLOW_PROPS
+
 # ------------------ Account ------------------------
 """
 ACCOUNT_PROPS dict will be used to consolidate common properties for an account with producer / consumer capabilities.
@@ -13,6 +15,14 @@ The dict structures includes:
         security_groups: list - List of security groups of the vpc
     s3: dict - Dict containing properties for account S3 setup including:
         bucket_name: str - Name of the bucket to be created by solution to store data associated to its use.
+    lambda_functions: dict - Dict containing the sizing profile of each lambda function deployed in the account. Each key (not to be modified) represents a function and value is a dict including:
+        memory_size: int - Memory in MB (128 to 10240) of the function. CPU is allocated in proportion to memory, so functions spending time on CPU may run faster and at the same or lower cost with more memory. Use benchmarks/power_tuning to size it.
+        architecture: str - Instruction set architecture of the function, 'arm64' (lower price per GB-second) or 'x86_64'. Grant / revoke JDBC subscription functions default to 'x86_64' because sqlserver and oracle driver layers include native libraries; switch to 'arm64' only with driver layers built for arm64.
+        timeout_in_seconds: int - Maximum number of seconds an invocation of the function can run.
+        provisioned_concurrency: int - Only for functions of producer / consumer workflows (invoked through their live alias). Number of execution environments kept initialized (and primed), 0 to disable. Provisioned concurrency is billed while enabled. Can not be combined with 'lambda_snap_start' property of the function's workflow.
+    connector_runtime: dict - Dict containing properties for the connector runtime, a single lambda function serving all tasks of producer / consumer workflows (instead of one function per task) so that they share a pool of warm execution environments, AWS clients and caches. Deployed in its own stack including:
+        enabled: bool - If producer / consumer workflows run their tasks on the connector runtime. When enabled, sizing profiles of workflow functions are replaced by 'a_connector_runtime' profile and 'lambda_snap_start' properties of workflows by the one below. The function is allocated in account vpc.
+        lambda_snap_start: bool - If the connector runtime is deployed with SnapStart. Can not be combined with 'provisioned_concurrency' in 'a_connector_runtime' sizing profile.
 """
 ACCOUNT_PROPS = {
     'account_id': '',
@@ -28,6 +38,95 @@ ACCOUNT_PROPS = {
     },
     's3': {
         'bucket_name': 'dz-conn-a-<ACCOUNT_ID>-<REGION>'
+    },
+    'lambda_functions': {
+        'a_update_environment_roles': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 60
+        },
+        'a_clean_environment_roles': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 60
+        },
+        'a_manage_service_portfolio_environment_roles_access': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 120
+        },
+        'a_send_workflow_callback': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30
+        },
+        'p_add_lf_tag_environment_dbs': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 60
+        },
+        'p_invalidate_connection_details_cache': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30
+        },
+        'p_index_crawled_tables': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 300
+        },
+        'p_get_connection_details': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30,
+            'provisioned_concurrency': 0
+        },
+        'p_grant_jdbc_subscription': {
+            'memory_size': 512,
+            'architecture': 'x86_64',
+            'timeout_in_seconds': 60,
+            'provisioned_concurrency': 0
+        },
+        'p_revoke_jdbc_subscription': {
+            'memory_size': 512,
+            'architecture': 'x86_64',
+            'timeout_in_seconds': 60,
+            'provisioned_concurrency': 0
+        },
+        'c_copy_subscription_secret': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30,
+            'provisioned_concurrency': 0
+        },
+        'c_update_subscription_records': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30,
+            'provisioned_concurrency': 0
+        },
+        'c_delete_subscription_secret': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30,
+            'provisioned_concurrency': 0
+        },
+        'c_remove_subscription_records': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30,
+            'provisioned_concurrency': 0
+        },
+        'a_connector_runtime': {
+            'memory_size': 1024,
+            'architecture': 'x86_64',
+            'timeout_in_seconds': 60,
+            'provisioned_concurrency': 0
+        }
+    },
+    'connector_runtime': {
+        'enabled': False,
+        'lambda_snap_start': False
     }
 }
 
@@ -39,6 +138,14 @@ The dict structures includes:
         type_name: str - IAM principal type and name in the format '{PRINCIPAL_TYPE}/{PRINCIPAL_NAME_PATH}'. For example 'role/Admin'.
         lf_tag_permission: bool - If principal should have admin permission on top of the lake formation tag deployed as part of the solution.
         lf_tag_objects_permission: bool - If principal should have admin permission on top of objects tagged with the lake formation tag deployed as part of the solution.
+    p_source_semaphore: dict - Dict containing properties for limiting concurrent subscription grants / revokes running on the same source database (glue connection) including:
+        permits: int - Default maximum number of grants / revokes that can access the same source database at the same time.
+        connection_permits: dict - Dict with maximum number of grants / revokes for specific source databases. Each key is a glue connection name and value is the number of permits (int).
+        lease_expiration_in_seconds: int - Number of seconds after which a permit not released (i.e. lambda function crashed) is available again. Must be greater than timeout of grant / revoke JDBC subscription lambda functions ('lambda_functions' in ACCOUNT_PROPS, connector runtime one if enabled).
+        acquire_timeout_in_seconds: int - Maximum number of seconds to wait for a permit before failing (and retrying later from the workflow). Must be lower than timeout of grant / revoke JDBC subscription lambda functions ('lambda_functions' in ACCOUNT_PROPS, connector runtime one if enabled).
+    p_connection_details_cache: dict - Dict containing properties for caching glue table and connection details resolved when getting subscription connection details, in memory of lambda execution environments and in a DynamoDB table. Entries are invalidated on glue data catalog table changes and on glue connection API calls (connection changes are only notified if a CloudTrail trail records management events in the account), including:
+        expiration_in_seconds: int - Number of seconds a cached entry is valid in DynamoDB table if not invalidated before.
+        memory_expiration_in_seconds: int - Number of seconds a cached entry is kept in memory of an execution environment. Bounds how long an invalidated entry can still be served.
 """
 PRODUCER_PROPS = {
     'p_lakeformation_tag_principals': {
@@ -47,6 +154,16 @@ PRODUCER_PROPS = {
             'lf_tag_permission': False,
             'lf_tag_objects_permission': False
         }
+    },
+    'p_source_semaphore': {
+        'permits': 2,
+        'connection_permits': {},
+        'lease_expiration_in_seconds': 90,
+        'acquire_timeout_in_seconds': 30
+    },
+    'p_connection_details_cache': {
+        'expiration_in_seconds': 86400,
+        'memory_expiration_in_seconds': 60
     }
 }
 
@@ -57,23 +174,31 @@ The dict structures includes a key (not to be modified) per workflow:
         vpc_id: str - Id of the vpc where lambda function connecting to data sources will be allocated
         vpc_private_subnet_ids: list - List of subnet ids of the vpc where lambda function connecting to data sources will be allocated
         vpc_security_group_ids: list - List of security groups of the vpc that will be associated to the lambda function connecting to data sources
+        express_workflow: bool - If workflow is deployed as a synchronous express workflow (lower cost and latency, 5 minutes maximum duration, execution logs on errors only) or as a standard workflow. Not to be modified, derived from 'g_express_sub_workflows' property of the equivalent workflow in governance configuration.
+        lambda_snap_start: bool - If lambda functions of the workflow are deployed with SnapStart, so that their initialization (including priming of clients, drivers and lookups) is snapshotted on deployment and restored on cold starts. Can not be combined with 'provisioned_concurrency' in the sizing profile of the workflow's functions ('lambda_functions' in ACCOUNT_PROPS).
     p_manage_subscription_revoke: dict - Dict containing properties for managing subscription revocations in the producer side including:
         vpc_id: str - Id of the vpc where lambda function connecting to data sources will be allocated
         vpc_private_subnet_ids: list - List of subnet ids of the vpc where lambda function connecting to data sources will be allocated
         vpc_security_group_ids: list - List of security groups of the vpc that will be associated to the lambda function connecting to data sources
         secret_recovery_window_in_days: str - Number of days (min '7') to use as retention window when scheduling deletion of secrets
+        express_workflow: bool - If workflow is deployed as a synchronous express workflow (lower cost and latency, 5 minutes maximum duration, execution logs on errors only) or as a standard workflow. Not to be modified, derived from 'g_express_sub_workflows' property of the equivalent workflow in governance configuration.
+        lambda_snap_start: bool - If lambda functions of the workflow are deployed with SnapStart, so that their initialization (including priming of clients, drivers and lookups) is snapshotted on deployment and restored on cold starts. Can not be combined with 'provisioned_concurrency' in the sizing profile of the workflow's functions ('lambda_functions' in ACCOUNT_PROPS).
 """
 PRODUCER_WORKFLOW_PROPS = {
     'p_manage_subscription_grant': {
         'vpc_id': ACCOUNT_PROPS['vpc']['vpc_id'],
         'vpc_private_subnet_ids': ACCOUNT_PROPS['vpc']['private_subnets'],
-        'vpc_security_group_ids': ACCOUNT_PROPS['vpc']['security_groups']
+        'vpc_security_group_ids': ACCOUNT_PROPS['vpc']['security_groups'],
+        'express_workflow': GOVERNANCE_WORKFLOW_PROPS['g_manage_subscription_grant']['g_express_sub_workflows'],
+        'lambda_snap_start': False
     },
     'p_manage_subscription_revoke': {
         'vpc_id': ACCOUNT_PROPS['vpc']['vpc_id'],
         'vpc_private_subnet_ids': ACCOUNT_PROPS['vpc']['private_subnets'],
         'vpc_security_group_ids': ACCOUNT_PROPS['vpc']['security_groups'],
-        'secret_recovery_window_in_days': '7'
+        'secret_recovery_window_in_days': '7',
+        'express_workflow': GOVERNANCE_WORKFLOW_PROPS['g_manage_subscription_revoke']['g_express_sub_workflows'],
+        'lambda_snap_start': False
     }
 }
 
@@ -113,14 +238,23 @@ PRODUCER_SERVICE_PORTFOLIO_PROPS = {
 """
 CONSUMER_WORKFLOW_PROPS dict will be used to consolidate consumer workflow properties for an account.
 The dict structures includes a key (not to be modified) per workflow:
-    c_manage_subscription_grant: dict - Dict containing properties for managing subscription grants in the consumer side. Reserved for future use (Leave as empty dict).
+    c_manage_subscription_grant: dict - Dict containing properties for managing subscription grants in the consumer side including:
+        express_workflow: bool - If workflow is deployed as a synchronous express workflow (lower cost and latency, 5 minutes maximum duration, execution logs on errors only) or as a standard workflow. Not to be modified, derived from 'g_express_sub_workflows' property of the equivalent workflow in governance configuration.
+        lambda_snap_start: bool - If lambda functions of the workflow are deployed with SnapStart, so that their initialization (including priming of clients, drivers and lookups) is snapshotted on deployment and restored on cold starts. Can not be combined with 'provisioned_concurrency' in the sizing profile of the workflow's functions ('lambda_functions' in ACCOUNT_PROPS).
     c_manage_subscription_revoke: dict - Dict containing properties for managing subscriptions revocations in the consumer side including:
         secret_recovery_window_in_days: str - Number of days (min '7') to use as retention window when scheduling deletion of secrets
+        express_workflow: bool - If workflow is deployed as a synchronous express workflow (lower cost and latency, 5 minutes maximum duration, execution logs on errors only) or as a standard workflow. Not to be modified, derived from 'g_express_sub_workflows' property of the equivalent workflow in governance configuration.
+        lambda_snap_start: bool - If lambda functions of the workflow are deployed with SnapStart, so that their initialization (including priming of clients, drivers and lookups) is snapshotted on deployment and restored on cold starts. Can not be combined with 'provisioned_concurrency' in the sizing profile of the workflow's functions ('lambda_functions' in ACCOUNT_PROPS).
 """
 CONSUMER_WORKFLOW_PROPS = {
-    'c_manage_subscription_grant': { },
+    'c_manage_subscription_grant': {
+        'express_workflow': GOVERNANCE_WORKFLOW_PROPS['g_manage_subscription_grant']['g_express_sub_workflows'],
+        'lambda_snap_start': False
+    },
     'c_manage_subscription_revoke': { 
-        'secret_recovery_window_in_days': '7'
+        'secret_recovery_window_in_days': '7',
+        'express_workflow': GOVERNANCE_WORKFLOW_PROPS['g_manage_subscription_revoke']['g_express_sub_workflows'],
+        'lambda_snap_start': False
     }
 }
 
@@ -7,11 +7,23 @@ This dict is intended to BE LEFT UNMODIFIED. The dict structure includes:
         a_account_numbers: list - List containing ids of all accounts with producer / consumer capabilities
         a_common_glue_role_name: str - Name to be used in all accounts' role for glue resources
         a_common_lambda_role_name: str - Name to be used in all accounts' role for lambda functions
+        a_common_stepfunctions_role_name: str - Name to be used in all accounts' role for state machines (step functions)
         a_cross_account_assume_role_name: str - Name to be used in all accounts' role that can be assumed by governance account for cross-account access
+        a_idempotency_table_name: str - Name to be used in all accounts' DynamoDB table that will store idempotency records (locks and results) of subscription grant / revoke lambda functions
         a_update_environment_roles_lambda_name: str - Name to be used in all accounts' lambda function that will update new DataZone environment roles on creation
         a_clean_environment_roles_lambda_name: str - Name to be used in all accounts' lambda function that will clean DataZone environment roles on deletion
+        a_connector_runtime_lambda_name: str - Name to be used in all accounts' lambda function that will serve tasks of producer / consumer workflows when connector runtime is enabled
+        a_send_workflow_callback_lambda_name: str - Name to be used in all accounts' lambda function that will report producer / consumer sub-workflows completion (task token callbacks) to governance state machines, on governance region
+        a_metrics_namespace: str - Namespace of the CloudWatch metrics (phase duration and failures) emitted by solution's lambda functions in all accounts, including governance account. Must match METRICS_NAMESPACE default in dz_conn_common.metrics
     producer: dict - Dict containing global variables for account's producer capability related resources, including:
         p_add_lf_tag_environment_dbs_lambda_name: str - Name to be used in all accounts' lambda function that will tag new DataZone environments' databases in glue catalog with LakeFormation solutions tag
+        p_get_connection_details_lambda_name: str - Name to be used in all accounts' lambda function that will retrieve glue connection details of a subscribed asset (when connector runtime is not enabled). Invoked by governance account to prefetch them when listings are published
+        p_source_semaphore_table_name: str - Name to be used in all accounts' DynamoDB table that will store leases limiting concurrent access (grants / revokes) to the same source database
+        p_connection_details_cache_table_name: str - Name to be used in all accounts' DynamoDB table that will cache glue table and connection details resolved when getting subscription connection details
+        p_invalidate_connection_details_cache_lambda_name: str - Name to be used in all accounts' lambda function that will invalidate connection details cache entries on glue data catalog changes
+        p_connection_index_table_name: str - Name to be used in all accounts' DynamoDB table that will index connection details of glue tables written by solution's crawlers, keyed by glue table ARN
+        p_index_crawled_tables_lambda_name: str - Name to be used in all accounts' lambda function that will index glue tables in connection index table when a solution's crawler completes
+        p_connection_index_crawler_tag_key: str - Key of the tag identifying crawlers (created by solution's glue connection with crawlers products) whose tables are indexed in connection index table
         p_manage_subscription_grant_state_machine_name: str - Name to be used in all accounts' state machine that will orchestrate subscription grant tasks on the producer side
         p_manage_subscription_revoke_state_machine_name: str - Name to be used in all accounts' state machine that will orchestrate subscription revoke tasks on the producer side
     consumer: dict - Dict containing global variables for account's consumer capability related resources, including:
@@ -19,26 +31,48 @@ This dict is intended to BE LEFT UNMODIFIED. The dict structure includes:
         c_manage_subscription_revoke_state_machine_name: str - Name to be used in all accounts' state machine that will orchestrate subscription revoke tasks on the consumer side
     governance: dict - Dict containing global variables for governance account related resources, including:
         g_account_number: str- Account id of the governance account
+        g_region: str- Region of the governance account
+        g_dynamodb_table_regions: list - List of regions where governance DynamoDB tables are available, including governance account region and replica regions if global tables are enabled
         g_common_stepfunctions_role_name: str - Name of the role for state machines (step functions) in governance account
-        g_cross_account_assume_role: str - Name of the role in governance account that can be assumed by accounts with producer / consumer capabilities for cross-account access
+        g_cross_account_callback_role_name: str - Name of the role in governance account that can be assumed by accounts' send workflow callback lambda functions to report sub-workflow completion (task token callbacks) to governance state machines
         g_p_source_subscriptions_table_name: str - Name of the DynamoDB table in governance account that will store metadata for producer source connection subscriptions details
         g_c_asset_subscriptions_table_name: str - Name of the DynamoDB table in governance account that will store metadata for consumer asset subscriptions details
         g_c_secrets_mapping_table_name: str - Name of the DynamoDB table in governance account that will store metadata for consumer secrets mapping details
+        g_subscription_events_queue_name: str - Name of the SQS FIFO queue in governance account that will buffer DataZone subscription events (in order) before starting subscription workflows
+        g_subscription_events_message_group_id: str - Message group id of DataZone subscription events (grant and revoke) sent to the subscription events queue. Shared by all events so that they are consumed in order
+        g_subscription_grant_workflows_queue_name: str - Name of the SQS FIFO queue (grant lane) in governance account that will run subscription grant workflows in order per (consumer environment, asset)
+        g_subscription_revoke_workflows_queue_name: str - Name of the SQS FIFO queue (revoke lane) in governance account that will run subscription revoke workflows in order per (consumer environment, asset)
+        g_subscription_workflow_messages_table_name: str - Name of the DynamoDB table in governance account that will store the queued message (lane and receipt handle) of each running subscription workflow, released when the workflow finishes
+        g_producer_account_permits_table_name: str - Name of the DynamoDB table in governance account that will store permits limiting running subscription grant workflows per producer account
+        g_listing_details_cache_table_name: str - Name of the DynamoDB table in governance account that will cache listing details, prefetched when listings are published
 
         g_manage_subscription_grant_state_machine_name: str - Name to be used in governance account state machine that will orchestrate the complete subscription grant
         g_manage_subscription_revoke_state_machine_name: str - Name to be used in governance account state machine that will orchestrate the complete subscription revoke
+        g_manage_subscription_bulk_state_machine_name: str - Name to be used in governance account state machine that will orchestrate subscription grants / revokes listed in a bulk manifest
 """
 GLOBAL_VARIABLES = {
     'account': {
         'a_account_numbers': GOVERNANCE_PROPS['a_account_numbers'],
         'a_common_glue_role_name': 'dz_conn_a_common_glue_role',
         'a_common_lambda_role_name': 'dz_conn_a_common_lambda_role',
+        'a_common_stepfunctions_role_name': 'dz_conn_a_common_stepfunctions_role',
         'a_cross_account_assume_role_name': 'dz_conn_a_cross_account_assume_role',
+        'a_idempotency_table_name': 'dz_conn_a_idempotency',
         'a_update_environment_roles_lambda_name': 'dz_conn_a_update_environment_roles',
-        'a_clean_environment_roles_lambda_name': 'dz_conn_a_clean_environment_roles'
+        'a_clean_environment_roles_lambda_name': 'dz_conn_a_clean_environment_roles',
+        'a_connector_runtime_lambda_name': 'dz_conn_a_connector_runtime',
+        'a_send_workflow_callback_lambda_name': 'dz_conn_a_send_workflow_callback',
+        'a_metrics_namespace': 'DataZoneConnectors'
     },
     'producer': {
         'p_add_lf_tag_environment_dbs_lambda_name': 'dz_conn_p_add_lf_tag_environment_dbs',
+        'p_get_connection_details_lambda_name': 'dz_conn_p_get_connection_details',
+        'p_source_semaphore_table_name': 'dz_conn_p_source_semaphore',
+        'p_connection_details_cache_table_name': 'dz_conn_p_connection_details_cache',
+        'p_invalidate_connection_details_cache_lambda_name': 'dz_conn_p_invalidate_connection_details_cache',
+        'p_connection_index_table_name': 'dz_conn_p_connection_index',
+        'p_index_crawled_tables_lambda_name': 'dz_conn_p_index_crawled_tables',
+        'p_connection_index_crawler_tag_key': 'dz_conn_p_connection_index',
 
         'p_manage_subscription_grant_state_machine_name': 'dz_conn_p_manage_subscription_grant',
         'p_manage_subscription_revoke_state_machine_name': 'dz_conn_p_manage_subscription_revoke'
@@ -49,14 +83,24 @@ GLOBAL_VARIABLES = {
     },
     'governance': {
         'g_account_number': GOVERNANCE_PROPS['account_id'],
+        'g_region': GOVERNANCE_PROPS['region'],
+        'g_dynamodb_table_regions': list(dict.fromkeys([GOVERNANCE_PROPS['region']] + (GOVERNANCE_PROPS['a_account_regions'] if GOVERNANCE_PROPS['dynamodb']['global_tables_enabled'] else []))),
         'g_common_stepfunctions_role_name': 'dz_conn_g_common_stepfunctions_role',
+        'g_cross_account_callback_role_name': 'dz_conn_g_cross_account_callback_role',
         
-        'g_cross_account_assume_role_name': 'dz_conn_g_cross_account_assume_role',
         'g_p_source_subscriptions_table_name': 'dz_conn_g_p_source_subscriptions',
         'g_c_asset_subscriptions_table_name': 'dz_conn_g_c_asset_subscriptions',
         'g_c_secrets_mapping_table_name': 'dz_conn_g_c_secrets_mapping',
+        'g_subscription_events_queue_name': 'dz_conn_g_subscription_events.fifo',
+        'g_subscription_events_message_group_id': 'dz_conn_g_subscription_events',
+        'g_subscription_grant_workflows_queue_name': 'dz_conn_g_subscription_grant_workflows.fifo',
+        'g_subscription_revoke_workflows_queue_name': 'dz_conn_g_subscription_revoke_workflows.fifo',
+        'g_subscription_workflow_messages_table_name': 'dz_conn_g_subscription_workflow_messages',
+        'g_producer_account_permits_table_name': 'dz_conn_g_producer_account_permits',
+        'g_listing_details_cache_table_name': 'dz_conn_g_listing_details_cache',
 
         'g_manage_subscription_grant_state_machine_name': 'dz_conn_g_manage_subscription_grant',
-        'g_manage_subscription_revoke_state_machine_name': 'dz_conn_g_manage_subscription_revoke'
+        'g_manage_subscription_revoke_state_machine_name': 'dz_conn_g_manage_subscription_revoke',
+        'g_manage_subscription_bulk_state_machine_name': 'dz_conn_g_manage_subscription_bulk'
     }
 }
\ No newline at end of file
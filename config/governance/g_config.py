@@ -6,11 +6,118 @@ The dict structures includes:
     account_id: str - Account id
     region: str - Region
     a_account_numbers: list - List containing ids of all accounts with producer / consumer capabilities (governed)
+    a_account_regions: list - List containing regions of all accounts with producer / consumer capabilities (governed)
+    s3: dict - Dict containing properties for governance S3 setup including:
+        bucket_name: str - Name of the bucket to be created by solution to store data associated to its use (i.e. bulk subscription manifests and results).
+    dynamodb: dict - Dict containing properties for governance DynamoDB tables including:
+        global_tables_enabled: bool - If governance DynamoDB tables are deployed as global tables with a replica in each of the regions in a_account_regions (other than governance account region) or not.
+            Producer / consumer lambdas will use the replica in their own region when available, else tables in governance account region.
+    subscription_events: dict - Dict containing properties for the SQS FIFO queue buffering DataZone subscription events (in the order they were received) including:
+        batch_size: int - Maximum number of subscription events to be processed (and coalesced) together, up to 10. Events received while a batch is processed are gathered in the next one. Within a batch, duplicate events are dropped and opposing events (grant / revoke) for the same listing and project cancel out.
+        max_receive_count: int - Number of processing attempts of a subscription event before being sent to the dead letter queue.
+        max_workflow_receive_count: int - Number of deliveries of a queued subscription workflow before being sent to the dead letter queue. Workflows are run in order per (consumer environment, asset) and their message is delivered again as soon as their execution finishes, or every 'running_workflow_check_interval_in_seconds' while it is running, so this should allow for the longest expected execution (including time waiting for a producer account permit), plus the time waiting for a workflow of the same (consumer environment, asset) running in the other lane.
+        running_workflow_check_interval_in_seconds: int - Number of seconds the queued message of a running subscription workflow is kept invisible before its execution is checked again. Messages are released as soon as their execution finishes, so this only applies if the execution status change event is missed. Maximum 43200.
+        grant_max_concurrency: int - Maximum number of subscription grant workflows (grant lane) being started at the same time. Must be 2 or greater.
+        grant_max_concurrency_per_producer_account: int - Maximum number of subscription grant workflows running at the same time for the same producer account, so that a single account cannot take all grant capacity. Grant workflows wait for a free producer account permit before starting their producer / consumer sub-workflows.
+        grant_permit_retry_delay_in_seconds: int - Number of seconds a grant workflow waits before trying again to take a producer account permit, when all permits of the producer account are held.
+        grant_permit_expiration_in_seconds: int - Number of seconds after which a producer account permit not released (i.e. grant workflow never followed until completion) is available again. Should allow for the longest expected grant workflow execution.
+        revoke_reserved_concurrency: int - Lambda concurrency reserved to start subscription revoke workflows (revoke lane), which never wait behind grants. Must be 2 or greater and not lower than 'provisioned_concurrency' of g_run_subscription_revoke_workflow function.
+    listing_details_cache: dict - Dict containing properties for the cache of DataZone listing details (listing metadata and glue table form of the asset), prefetched when listings are published including:
+        expiration_in_seconds: int - Number of seconds a listing revision details will be kept cached. Listing revisions are immutable, so this only bounds the size of the cache.
+    dashboard: dict - Dict containing properties for the CloudWatch dashboard (dz_conn_g_dashboard) showing subscription workflows execution time and time spent per phase of their steps including:
+        enabled: bool - If dashboard is deployed or not. Phase metrics of governed accounts are only shown when they are linked to governance account through CloudWatch cross-account observability.
+        period_in_seconds: int - Period (in seconds) over which dashboard metrics are aggregated.
+    lambda_functions: dict - Dict containing the sizing profile of each lambda function deployed in governance account. Each key (not to be modified) represents a function and value is a dict including:
+        memory_size: int - Memory in MB (128 to 10240) of the function. CPU is allocated in proportion to memory, so functions spending time on CPU may run faster and at the same or lower cost with more memory. Use benchmarks/power_tuning to size it.
+        architecture: str - Instruction set architecture of the function, 'arm64' (lower price per GB-second) or 'x86_64'.
+        timeout_in_seconds: int - Maximum number of seconds an invocation of the function can run. Visibility timeout of the queues consumed by g_start_subscription_workflow and g_run_subscription_*_workflow functions is derived from it.
+        provisioned_concurrency: int - Only for functions run on every subscription event (invoked through their live alias). Number of execution environments kept initialized, 0 to disable. Provisioned concurrency is billed while enabled.
 """
 GOVERNANCE_PROPS = {
     'account_id': '',
     'region': '',
     'a_account_numbers': [],
+    'a_account_regions': [],
+    's3': {
+        'bucket_name': 'dz-conn-g-<ACCOUNT_ID>-<REGION>'
+    },
+    'dynamodb': {
+        'global_tables_enabled': False
+    },
+    'subscription_events': {
+        'batch_size': 10,
+        'max_receive_count': 5,
+        'max_workflow_receive_count': 100,
+        'running_workflow_check_interval_in_seconds': 900,
+        'grant_max_concurrency': 10,
+        'grant_max_concurrency_per_producer_account': 3,
+        'grant_permit_expiration_in_seconds': 7500,
+        'grant_permit_retry_delay_in_seconds': 30,
+        'revoke_reserved_concurrency': 5
+    },
+    'listing_details_cache': {
+        'expiration_in_seconds': 604800
+    },
+    'dashboard': {
+        'enabled': True,
+        'period_in_seconds': 300
+    },
+    'lambda_functions': {
+        'g_get_environment_details': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30
+        },
+        'g_get_subscription_details': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30,
+            'provisioned_concurrency': 0
+        },
+        'g_prefetch_listing_details': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30
+        },
+        'g_start_subscription_workflow': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 60,
+            'provisioned_concurrency': 0
+        },
+        'g_run_subscription_grant_workflow': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 60,
+            'provisioned_concurrency': 0
+        },
+        'g_run_subscription_revoke_workflow': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 60,
+            'provisioned_concurrency': 0
+        },
+        'g_acquire_producer_account_permit': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30
+        },
+        'g_complete_subscription_workflow': {
+            'memory_size': 1024,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 30
+        },
+        'g_prepare_bulk_subscription_manifest': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 300
+        },
+        'g_write_bulk_subscription_results': {
+            'memory_size': 512,
+            'architecture': 'arm64',
+            'timeout_in_seconds': 300
+        }
+    }
 }
 
 """
@@ -22,8 +129,19 @@ The dict structures includes a key (not to be modified) per workflow:
         g_eventbridge_rule_enabled: bool - If workflow is enabled or not, meaning will execute on event or not.
     g_manage_subscription_grant: dict - Dict containing properties for managing when a new subscription is granted including:
         g_eventbridge_rule_enabled: bool - If workflow is enabled or not, meaning will execute on event or not.
+        g_callback_timeout_in_seconds: int - Maximum number of seconds to wait for each producer / consumer sub-workflow to report its completion (task token callback) before failing the workflow.
+        g_express_sub_workflows: bool - If producer / consumer sub-workflows are deployed as express workflows and will be called synchronously (startSyncExecution) instead of with task token callbacks. 'express_workflow' property of the equivalent workflows in all accounts' configuration is derived from it.
     g_manage_subscription_revoke: dict - Dict containing properties for managing when a subscription is revoked including:
         g_eventbridge_rule_enabled: bool - If workflow is enabled or not, meaning will execute on event or not.
+        g_callback_timeout_in_seconds: int - Maximum number of seconds to wait for each producer / consumer sub-workflow to report its completion (task token callback) before failing the workflow.
+        g_express_sub_workflows: bool - If producer / consumer sub-workflows are deployed as express workflows and will be called synchronously (startSyncExecution) instead of with task token callbacks. 'express_workflow' property of the equivalent workflows in all accounts' configuration is derived from it.
+    g_manage_listing_published: dict - Dict containing properties for managing when an asset is published to the catalog (prefetch of listing and producer connection details) including:
+        g_eventbridge_rule_enabled: bool - If workflow is enabled or not, meaning will execute on event or not.
+    g_manage_subscription_bulk: dict - Dict containing properties for managing subscription grants / revokes listed in a bulk manifest including:
+        g_max_concurrency: int - Maximum number of groups (producer account, Glue database) of manifest items to be run in parallel.
+        g_tolerated_failure_percentage: int - Percentage of groups that can fail (a group fails when any of its items fails) before the bulk workflow stops running the remaining groups.
+        g_group_max_concurrency: int - Maximum number of items of the same group to be run in parallel. Keep low so that producer sources are not accessed by many workflows at the same time.
+        g_item_timeout_in_seconds: int - Maximum number of seconds to wait for the subscription workflow of an item (queued in its grant / revoke lane) to be completed before failing the item. Should allow for the time queued behind other workflows of the same (consumer environment, asset) plus the longest expected execution.
 """
 GOVERNANCE_WORKFLOW_PROPS = {
     'g_manage_environment_active': {        
@@ -33,9 +151,22 @@ GOVERNANCE_WORKFLOW_PROPS = {
         'g_eventbridge_rule_enabled': True
     },
     'g_manage_subscription_grant': {        
-        'g_eventbridge_rule_enabled': True
+        'g_eventbridge_rule_enabled': True,
+        'g_callback_timeout_in_seconds': 3600,
+        'g_express_sub_workflows': False
     },
     'g_manage_subscription_revoke': {        
+        'g_eventbridge_rule_enabled': True,
+        'g_callback_timeout_in_seconds': 3600,
+        'g_express_sub_workflows': False
+    },
+    'g_manage_listing_published': {
         'g_eventbridge_rule_enabled': True
+    },
+    'g_manage_subscription_bulk': {
+        'g_max_concurrency': 20,
+        'g_tolerated_failure_percentage': 10,
+        'g_group_max_concurrency': 1,
+        'g_item_timeout_in_seconds': 86400
     }
 }
\ No newline at end of file
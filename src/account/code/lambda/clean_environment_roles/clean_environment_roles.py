@@ -1,6 +1,6 @@
 import os
 
-import boto3
+from dz_conn_common.clients import get_client
 
 # Constant: Represents the ARN of the solution's IAM policy to attach to environment user roles
 A_ENVIRONMENT_POLICY_ARN = os.getenv('A_ENVIRONMENT_POLICY_ARN')
@@ -14,7 +14,7 @@ DEFAULT_DATAZONE_PERMISSION_BOUNDARY_ARN = 'arn:aws:iam::aws:policy/AmazonDataZo
 # Constant: Represents the arn of the AWS managed policy that allows usage of service catalog and will be removed from environment roles
 SERVICE_CATALOG_POLICY_ARN = 'arn:aws:iam::aws:policy/AWSServiceCatalogEndUserFullAccess'
 
-iam = boto3.client('iam')
+iam = get_client('iam')
 
 def handler(event, context):
     """ Function handler: Function that will clean environment roles by 1/ Replacing permission boundary with default one assigned by Amazon DataZone,
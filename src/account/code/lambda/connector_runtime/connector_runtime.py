@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import importlib
+
+from dz_conn_common.metrics import set_metric_step, set_metric_dimensions
+
+# Constant: Represents the event key with the name of the task to be run
+TASK_KEY = 'Task'
+
+# Constant: Represents the tasks served by the connector runtime. Each key is a task name (name of its handler module) and value is the path of the task handler folder relative to the code root
+A_CONNECTOR_RUNTIME_TASKS = json.loads(os.getenv('A_CONNECTOR_RUNTIME_TASKS', '{}'))
+
+# Constant: Represents the code root, where task handler folders are packaged along with the connector runtime (src folder of the solution)
+CODE_ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+
+
+class UnknownTaskError(Exception):
+    """ Exception raised when an event requests a task not served by the connector runtime."""
+
+
+def import_task_handlers():
+    """ Complementary function to import the handler module of every task served by the connector runtime. Run on init phase, so that module level initialization of tasks
+    (AWS clients, priming of drivers and lookups) is done once per execution environment and shared by invocations of any task"""
+
+    task_handlers = {}
+    for task_name, task_path in A_CONNECTOR_RUNTIME_TASKS.items():
+        sys.path.append(os.path.join(CODE_ROOT_PATH, task_path))
+        task_handlers[task_name] = importlib.import_module(task_name).handler
+
+    return task_handlers
+
+
+task_handlers = import_task_handlers()
+
+def handler(event, context):
+    """ Function handler: Function that will route a producer / consumer workflow task to its handler, so that all tasks of an account are served by a single pool of execution environments.
+    1/ Will read the task name from the event, then 2/ will invoke the task handler with the rest of the event and return its result (errors raised by the task handler are raised as is).
+
+    Parameters
+    ----------
+    event: dict - Input event dict containing:
+        Task: str - Name of the task to be run (i.e. 'get_connection_details'). Must be one of the tasks in A_CONNECTOR_RUNTIME_TASKS
+        Rest of keys: Input event of the task handler
+
+    context: dict - Input context. Passed to the task handler
+
+    Returns
+    -------
+    task_result: dict - Result of the task handler
+    """
+
+    task_name = event.get(TASK_KEY)
+    if task_name not in task_handlers:
+        raise UnknownTaskError(f"Unknown task '{task_name}', must be one of {list(task_handlers)}")
+
+    task_event = {key: value for key, value in event.items() if key != TASK_KEY}
+
+    # Metrics of the invocation are emitted under the task name, with dimensions of previous tasks cleared
+    set_metric_step(task_name)
+    set_metric_dimensions()
+
+    return task_handlers[task_name](task_event, context)
@@ -1,7 +1,7 @@
 import os
 import json
 
-import boto3
+from dz_conn_common.clients import get_client
 
 # Constant: Represents the service portfolio id that will be shared to DataZone project roles
 A_SERVICE_PORTFOLIO_ID = os.getenv('A_SERVICE_PORTFOLIO_ID')
@@ -12,7 +12,7 @@ PHYSICAL_RESOURCE_ID = 'dz-conn-a-project-roles-access'
 # Constant: Represents a pattern string that identifies any DataZone project role.
 PROJECT_ROLES_ARN_PATTERN = 'arn:aws:iam:::role/datazone_usr_*'
 
-servicecatalog = boto3.client('servicecatalog')
+servicecatalog = get_client('servicecatalog')
 
 def handler(event, context):
     """ Function handler: Function that will be triggered by CDK when deploying or deleting account common stack.
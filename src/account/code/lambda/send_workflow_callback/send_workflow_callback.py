@@ -0,0 +1,94 @@
+import os
+import json
+from datetime import datetime, timezone, timedelta
+
+import boto3
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client, get_client_config, CLIENT_MAX_POOL_CONNECTIONS
+
+# Constant: Represents the region of the governance account. Task tokens can only be reported to the region of the state machine that issued them
+G_REGION = os.getenv('G_REGION')
+
+# Constant: Represents the seconds before expiration of assumed role credentials from which they are renewed
+CREDENTIALS_RENEWAL_MARGIN_IN_SECONDS = 300
+
+sts = None
+
+# Dict with a step functions client (on governance region) and its credentials expiration for each assumed callback role
+callback_clients = {}
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
+
+    global sts
+    sts = get_client('sts')
+    callback_clients.clear()
+
+
+create_clients()
+
+def handler(event, context):
+    """ Function handler: Function that will report the completion of a producer / consumer sub-workflow to the governance state machine waiting for it (task token callback).
+    1/ Will assume the governance callback role, then 2/ will send task success (with workflow output) or task failure (with error details) on governance region,
+    since step functions service integrations can only call the region of the sub-workflow state machine.
+
+    Parameters
+    ----------
+    event: dict - Input event dict containing:
+        TaskToken: str - Task token of the governance state machine task waiting for the sub-workflow
+        CallbackRoleArn: str - Arn of the governance role allowed to report task token callbacks
+        Output: dict - Optional. Output of the sub-workflow. Reported as task success when there are no error details
+        Error: str - Optional. Error of the failed sub-workflow. Reported as task failure along with its cause
+        Cause: str - Optional. Cause of the failed sub-workflow
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    response: dict - Dict with response details including:
+        callback_status: str - Status reported to the governance state machine, 'SUCCEEDED' or 'FAILED'
+    """
+
+    stepfunctions = get_callback_client(event['CallbackRoleArn'])
+
+    if 'Error' in event:
+        stepfunctions.send_task_failure(taskToken=event['TaskToken'], error=event['Error'], cause=event['Cause'])
+        callback_status = 'FAILED'
+    else:
+        stepfunctions.send_task_success(taskToken=event['TaskToken'], output=json.dumps(event['Output']))
+        callback_status = 'SUCCEEDED'
+
+    response = {
+        'callback_status': callback_status
+    }
+
+    return response
+
+
+def get_callback_client(callback_role_arn):
+    """ Complementary function to get a step functions client on governance region with credentials of the callback role. Credentials are reused until close to expiration"""
+
+    callback_client = callback_clients.get(callback_role_arn)
+    renewal_time = datetime.now(timezone.utc) + timedelta(seconds=CREDENTIALS_RENEWAL_MARGIN_IN_SECONDS)
+
+    if callback_client is None or callback_client['expiration'] <= renewal_time:
+        credentials = sts.assume_role(RoleArn=callback_role_arn, RoleSessionName='dz_conn_a_send_workflow_callback')['Credentials']
+
+        callback_client = {
+            'client': boto3.client(
+                'stepfunctions',
+                region_name= G_REGION,
+                aws_access_key_id= credentials['AccessKeyId'],
+                aws_secret_access_key= credentials['SecretAccessKey'],
+                aws_session_token= credentials['SessionToken'],
+                config= get_client_config(CLIENT_MAX_POOL_CONNECTIONS)
+            ),
+            'expiration': credentials['Expiration']
+        }
+
+        callback_clients[callback_role_arn] = callback_client
+
+    return callback_client['client']
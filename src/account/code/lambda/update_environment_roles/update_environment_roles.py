@@ -1,7 +1,7 @@
 import os
 import json
 
-import boto3
+from dz_conn_common.clients import get_client
 
 # Constant: Represents the ARN of the solution's IAM policy to attach to environment user roles
 A_ENVIRONMENT_POLICY_ARN = os.getenv('A_ENVIRONMENT_POLICY_ARN')
@@ -18,7 +18,7 @@ A_ACCOUNT_ID = os.getenv('A_ACCOUNT_ID')
 # Constant: Represents the arn of the AWS managed policy that allows usage of service catalog and will be added to environment roles
 SERVICE_CATALOG_POLICY_ARN = 'arn:aws:iam::aws:policy/AWSServiceCatalogEndUserFullAccess'
 
-iam = boto3.client('iam')
+iam = get_client('iam')
 
 def handler(event, context):
     """ Function handler: Function that will update environment roles by 1/ Replacing default permission boundary with a custom more permissive one,
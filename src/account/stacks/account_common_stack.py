@@ -1,4 +1,5 @@
 from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.lambda_sizing import get_architecture
 
 import json
 from os import path;
@@ -11,6 +12,7 @@ from aws_cdk import (
     custom_resources,
     RemovalPolicy,
     aws_kms as kms,
+    aws_dynamodb as dynamodb,
     aws_iam as iam,
     aws_lambda as lambda_,
     aws_servicecatalog as servicecatalog,
@@ -49,6 +51,20 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             removal_policy= RemovalPolicy.DESTROY
         )
 
+        # ----------------------- DynamoDB ---------------------------
+        a_idempotency_table = dynamodb.Table(
+            scope= self, 
+            id= 'a_idempotency_table',
+            table_name= GLOBAL_VARIABLES['account']['a_idempotency_table_name'],
+            partition_key= dynamodb.Attribute(
+                name= 'idempotency_key', 
+                type= dynamodb.AttributeType.STRING
+            ),
+            time_to_live_attribute= 'expiration',
+            billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy= RemovalPolicy.DESTROY
+        )
+
         # ----------------------- KMS ---------------------------     
         a_common_key_policy = iam.PolicyDocument(
             statements=[
@@ -180,7 +196,13 @@ class DataZoneConnectorsAccountCommonStack(Stack):
 
         # ----------------------- IAM for Lambda & Step Functions ---------------------------
         g_account_number = GLOBAL_VARIABLES['governance']["g_account_number"]
-        g_cross_account_assume_role_name =  GLOBAL_VARIABLES['governance']["g_cross_account_assume_role_name"]
+        
+        # Use governance DynamoDB tables replica in account region when available (global tables), else tables in governance region
+        g_dynamodb_region = region if region in GLOBAL_VARIABLES['governance']["g_dynamodb_table_regions"] else GLOBAL_VARIABLES['governance']["g_region"]
+        
+        g_p_source_subscriptions_table_arn = f"arn:aws:dynamodb:{g_dynamodb_region}:{g_account_number}:table/{GLOBAL_VARIABLES['governance']['g_p_source_subscriptions_table_name']}"
+        g_c_asset_subscriptions_table_arn = f"arn:aws:dynamodb:{g_dynamodb_region}:{g_account_number}:table/{GLOBAL_VARIABLES['governance']['g_c_asset_subscriptions_table_name']}"
+        g_c_secrets_mapping_table_arn = f"arn:aws:dynamodb:{g_dynamodb_region}:{g_account_number}:table/{GLOBAL_VARIABLES['governance']['g_c_secrets_mapping_table_name']}"
         
         a_common_lambda_role = iam.Role(
             scope= self,
@@ -203,7 +225,7 @@ class DataZoneConnectorsAccountCommonStack(Stack):
                     resources=['*']
                 ),
                 iam.PolicyStatement(
-                    actions=['glue:GetDatabase*', 'glue:GetTable*', 'glue:GetConnection*', 'glue:GetCrawler*'],
+                    actions=['glue:GetDatabase*', 'glue:GetTable*', 'glue:GetConnection*', 'glue:GetCrawler*', 'glue:GetTags'],
                     resources=[f'arn:aws:glue:{region}:{account_id}:*']
                 ),
                 iam.PolicyStatement(
@@ -227,13 +249,36 @@ class DataZoneConnectorsAccountCommonStack(Stack):
                     resources=[f'arn:aws:kms:{region}:{account_id}:alias/{a_common_key_alias_name}']
                 ),
                 iam.PolicyStatement(
-                    actions=['sts:AssumeRole'],
-                    resources=[f'arn:aws:iam::{g_account_number}:role/{g_cross_account_assume_role_name}']
+                    actions=['dynamodb:Query', 'dynamodb:GetItem', 'dynamodb:PutItem', 'dynamodb:UpdateItem', 'dynamodb:BatchWriteItem', 'dynamodb:DeleteItem'],
+                    resources=[g_p_source_subscriptions_table_arn, g_c_asset_subscriptions_table_arn, g_c_secrets_mapping_table_arn]
+                ),
+                iam.PolicyStatement(
+                    actions=['dynamodb:GetItem', 'dynamodb:PutItem', 'dynamodb:DeleteItem'],
+                    resources=[a_idempotency_table.table_arn]
+                ),
+                iam.PolicyStatement(
+                    actions=['dynamodb:PutItem', 'dynamodb:DeleteItem'],
+                    resources=[f"arn:aws:dynamodb:{region}:{account_id}:table/{GLOBAL_VARIABLES['producer']['p_source_semaphore_table_name']}"]
+                ),
+                iam.PolicyStatement(
+                    actions=['dynamodb:GetItem', 'dynamodb:PutItem', 'dynamodb:UpdateItem'],
+                    resources=[f"arn:aws:dynamodb:{region}:{account_id}:table/{GLOBAL_VARIABLES['producer']['p_connection_details_cache_table_name']}"]
+                ),
+                iam.PolicyStatement(
+                    actions=['dynamodb:GetItem', 'dynamodb:PutItem', 'dynamodb:DeleteItem', 'dynamodb:Query'],
+                    resources=[
+                        f"arn:aws:dynamodb:{region}:{account_id}:table/{GLOBAL_VARIABLES['producer']['p_connection_index_table_name']}",
+                        f"arn:aws:dynamodb:{region}:{account_id}:table/{GLOBAL_VARIABLES['producer']['p_connection_index_table_name']}/index/*"
+                    ]
                 ),
                 iam.PolicyStatement(
                     actions=['servicecatalog:AssociatePrincipalWithPortfolio', 'servicecatalog:DisassociatePrincipalFromPortfolio'],
                     resources=['*']
                 ),
+                iam.PolicyStatement(
+                    actions=['sts:AssumeRole'],
+                    resources=[f"arn:aws:iam::{g_account_number}:role/{GLOBAL_VARIABLES['governance']['g_cross_account_callback_role_name']}"]
+                ),
                 iam.PolicyStatement(
                     actions=['logs:CreateLogGroup'],
                     resources=[f'arn:aws:logs:{region}:{account_id}:*']
@@ -250,7 +295,7 @@ class DataZoneConnectorsAccountCommonStack(Stack):
         a_common_sf_role = iam.Role(
             scope= self,
             id= 'a_common_sf_role',
-            role_name= 'dz_conn_a_common_stepfunctions_role',
+            role_name= GLOBAL_VARIABLES['account']['a_common_stepfunctions_role_name'],
             assumed_by= iam.ServicePrincipal('states.amazonaws.com')
         )
 
@@ -274,13 +319,28 @@ class DataZoneConnectorsAccountCommonStack(Stack):
                 iam.PolicyStatement(
                     actions=['xray:PutTraceSegments', 'xray:PutTelemetryRecords', 'xray:GetSamplingRules', 'xray:GetSamplingTargets'],
                     resources=[f'arn:aws:xray:{region}:{account_id}:*']
+                ),
+                iam.PolicyStatement(
+                    actions=['secretsmanager:DescribeSecret', 'secretsmanager:DeleteSecret', 'secretsmanager:PutResourcePolicy'],
+                    resources=[f'arn:aws:secretsmanager:{region}:{account_id}:secret:dz-conn-*']
                 )
             ]
         )
 
         a_common_sf_role.add_managed_policy(a_common_sf_policy)
 
+        # ---------------- Lambda Layer ------------------------
+        a_common_layer = lambda_.LayerVersion(
+            scope=self, 
+            id='a_common_layer',
+            layer_version_name='dz_conn_a_common_layer',
+            code=lambda_.Code.from_asset('src/common/code/layer'),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_11, lambda_.Runtime.PYTHON_3_12],
+            compatible_architectures=[lambda_.Architecture.ARM_64, lambda_.Architecture.X86_64]
+        )
+
         # ---------------- Lambda ------------------------
+        a_update_environment_roles_lambda_sizing = account_props['lambda_functions']['a_update_environment_roles']
         a_update_environment_roles_lambda = lambda_.Function(
             scope= self,
             id= 'a_update_environment_roles_lambda',
@@ -288,6 +348,12 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             runtime= lambda_.Runtime.PYTHON_3_11,
             code=lambda_.Code.from_asset(path.join('src/account/code/lambda', "update_environment_roles")),
             handler= "update_environment_roles.handler",
+            memory_size= a_update_environment_roles_lambda_sizing['memory_size'],
+            architecture= get_architecture(a_update_environment_roles_lambda_sizing),
+            timeout= Duration.seconds(a_update_environment_roles_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                a_common_layer
+            ],
             role= a_common_lambda_role,
             environment= {
                 'A_ENVIRONMENT_POLICY_ARN': a_environment_policy.managed_policy_arn,
@@ -297,6 +363,7 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             }
         )
 
+        a_clean_environment_roles_lambda_sizing = account_props['lambda_functions']['a_clean_environment_roles']
         a_clean_environment_roles_lambda = lambda_.Function(
             scope= self,
             id= 'a_clean_environment_roles_lambda',
@@ -304,6 +371,12 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             runtime= lambda_.Runtime.PYTHON_3_11,
             code=lambda_.Code.from_asset(path.join('src/account/code/lambda', "clean_environment_roles")),
             handler= "clean_environment_roles.handler",
+            memory_size= a_clean_environment_roles_lambda_sizing['memory_size'],
+            architecture= get_architecture(a_clean_environment_roles_lambda_sizing),
+            timeout= Duration.seconds(a_clean_environment_roles_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                a_common_layer
+            ],
             role= a_common_lambda_role,
             environment= {
                 'A_ENVIRONMENT_POLICY_ARN': a_environment_policy.managed_policy_arn,
@@ -311,6 +384,27 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             }
         )
 
+        # Task tokens can only be reported to the governance region, so sub-workflows callbacks are sent by a lambda function instead of a service integration
+        a_send_workflow_callback_lambda_sizing = account_props['lambda_functions']['a_send_workflow_callback']
+        a_send_workflow_callback_lambda = lambda_.Function(
+            scope= self,
+            id= 'a_send_workflow_callback_lambda',
+            function_name= GLOBAL_VARIABLES["account"]["a_send_workflow_callback_lambda_name"],
+            runtime= lambda_.Runtime.PYTHON_3_12,
+            code=lambda_.Code.from_asset(path.join('src/account/code/lambda', "send_workflow_callback")),
+            handler= "send_workflow_callback.handler",
+            memory_size= a_send_workflow_callback_lambda_sizing['memory_size'],
+            architecture= get_architecture(a_send_workflow_callback_lambda_sizing),
+            timeout= Duration.seconds(a_send_workflow_callback_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                a_common_layer
+            ],
+            role= a_common_lambda_role,
+            environment= {
+                'G_REGION': GLOBAL_VARIABLES['governance']['g_region']
+            }
+        )
+
         # ----------------------- IAM for Governance Cross-Account Access --------------------------- 
         g_common_stepfunctions_role_name = GLOBAL_VARIABLES['governance']["g_common_stepfunctions_role_name"]
         g_common_stepfunctions_role_arn = f'arn:aws:iam::{g_account_number}:role/{g_common_stepfunctions_role_name}'
@@ -374,6 +468,7 @@ class DataZoneConnectorsAccountCommonStack(Stack):
 
             a_service_portfolio.give_access_to_role(a_access_role)
 
+        a_manage_service_portfolio_environment_roles_access_lambda_sizing = account_props['lambda_functions']['a_manage_service_portfolio_environment_roles_access']
         a_manage_service_portfolio_environment_roles_access_lambda = lambda_.Function(
             scope= self,
             id= 'a_manage_service_portfolio_environment_roles_access_lambda',
@@ -381,6 +476,12 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             runtime= lambda_.Runtime.PYTHON_3_11,
             code=lambda_.Code.from_asset(path.join('src/account/code/lambda', "manage_service_portfolio_environment_roles_access")),
             handler= "manage_service_portfolio_environment_roles_access.handler",
+            memory_size= a_manage_service_portfolio_environment_roles_access_lambda_sizing['memory_size'],
+            architecture= get_architecture(a_manage_service_portfolio_environment_roles_access_lambda_sizing),
+            timeout= Duration.seconds(a_manage_service_portfolio_environment_roles_access_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                a_common_layer
+            ],
             role= a_common_lambda_role,
             environment= {
                 'A_SERVICE_PORTFOLIO_ID': a_service_portfolio.portfolio_id
@@ -405,6 +506,8 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             'a_bucket': a_bucket,
             'a_common_key': a_common_key,
             'a_common_key_alias': a_common_key_alias_name,
+            'a_idempotency_table_name': a_idempotency_table.table_name,
+            'a_common_layer': a_common_layer,
             'a_environment_permission_boundary_policy': a_environment_permission_boundary_policy,
             'a_environment_policy': a_environment_policy,
             'a_common_glue_role': a_common_glue_role,
@@ -412,6 +515,11 @@ class DataZoneConnectorsAccountCommonStack(Stack):
             'a_common_sf_role': a_common_sf_role,
             'a_update_environment_roles_lambda': a_update_environment_roles_lambda,
             'a_clean_environment_roles_lambda': a_clean_environment_roles_lambda,
+            'a_send_workflow_callback_lambda': a_send_workflow_callback_lambda,
             'a_cross_account_assume_role': a_cross_account_assume_role,
-            'a_service_portfolio_arn': a_service_portfolio.portfolio_arn
+            'a_service_portfolio_arn': a_service_portfolio.portfolio_arn,
+            'g_dynamodb_region': g_dynamodb_region,
+            'g_p_source_subscriptions_table_arn': g_p_source_subscriptions_table_arn,
+            'g_c_asset_subscriptions_table_arn': g_c_asset_subscriptions_table_arn,
+            'g_c_secrets_mapping_table_arn': g_c_secrets_mapping_table_arn
         }
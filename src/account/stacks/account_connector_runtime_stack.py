@@ -0,0 +1,163 @@
+from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.lambda_warm_start import get_snap_start_conf, add_live_alias
+from src.common.utils.lambda_sizing import get_architecture
+
+import json
+
+from aws_cdk import (
+    Environment,
+    Stack,
+    Duration,
+    Fn,
+    IgnoreMode,
+    aws_lambda as lambda_,
+    aws_ec2 as ec2
+)
+
+from constructs import Construct
+
+# Constant: Represents the path (relative to src folder) of the connector runtime handler folder
+A_CONNECTOR_RUNTIME_PATH = 'account/code/lambda/connector_runtime'
+
+# Constant: Represents the tasks served by the connector runtime. Each key is a task name (name of its handler module) and value is the path (relative to src folder) of the task handler folder
+A_CONNECTOR_RUNTIME_TASKS = {
+    'get_connection_details': 'producer/code/lambda/get_connection_details',
+    'grant_jdbc_subscription': 'producer/code/lambda/grant_jdbc_subscription',
+    'revoke_jdbc_subscription': 'producer/code/lambda/revoke_jdbc_subscription',
+    'copy_subscription_secret': 'consumer/code/lambda/copy_subscription_secret',
+    'update_subscription_records': 'consumer/code/lambda/update_subscription_records',
+    'remove_subscription_records': 'consumer/code/lambda/remove_subscription_records',
+    'delete_subscription_secret': 'consumer/code/lambda/delete_subscription_secret'
+}
+
+class DataZoneConnectorsAccountConnectorRuntimeStack(Stack):
+    """ Class to represents the stack containing the connector runtime of the account: a single lambda function serving all tasks of producer / consumer workflows,
+    routed by the 'Task' field of their payload, so that they share a pool of warm execution environments, AWS clients and caches. Only deployed when enabled in account configuration.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, account_props: dict, consumer_workflows_props: dict, common_constructs: dict, env: Environment, **kwargs) -> None:
+        """ Class Constructor. Will deploy the connector runtime lambda function (and its live alias) based on properties specified as parameter.
+
+        Parameters
+        ----------
+        account_props : dict
+            dict with common properties for account.
+            For more details check config/account/a_<ACCOUNT_ID>_config.py documentation and examples.
+
+        consumer_workflows_props : dict
+            dict with required properties for all consumer workflows creation.
+            For more details check config/account/a_<ACCOUNT_ID>_config.py documentation and examples.
+
+        common_constructs: dic
+            dict with constructs common to the account. Created in and output of account and producer common stacks.
+
+        env: Environment
+            Environment object with region and account details
+        """
+
+        super().__init__(scope, construct_id, **kwargs)
+        account_id, region = account_props['account_id'], account_props['region']
+
+        # ---------------- VPC ------------------------
+        a_connector_runtime_vpc = ec2.Vpc.from_vpc_attributes(
+            scope= self,
+            id= 'a_connector_runtime_vpc',
+            vpc_id= account_props['vpc']['vpc_id'],
+            availability_zones = Fn.get_azs(),
+            private_subnet_ids = account_props['vpc']['private_subnets']
+        )
+
+        a_connector_runtime_security_groups = []
+
+        for index, a_connector_runtime_security_group_id in enumerate(account_props['vpc']['security_groups']):
+            a_connector_runtime_security_group = ec2.SecurityGroup.from_security_group_id(
+                scope= self,
+                id= f'a_connector_runtime_security_group_{(index + 1):02d}',
+                security_group_id= a_connector_runtime_security_group_id,
+            )
+
+            a_connector_runtime_security_groups.append(a_connector_runtime_security_group)
+
+        # ---------------- Lambda ------------------------
+        p_source_semaphore_props = common_constructs['p_source_semaphore_props']
+        p_connection_details_cache_props = common_constructs['p_connection_details_cache_props']
+
+        a_connector_runtime_props = account_props['connector_runtime']
+        a_connector_runtime_lambda_sizing = account_props['lambda_functions']['a_connector_runtime']
+
+        # Code is the src folder filtered to the connector runtime and task handler folders, so that tasks are packaged with their usual layout
+        a_connector_runtime_lambda = lambda_.Function(
+            scope= self,
+            id= 'a_connector_runtime_lambda',
+            function_name= GLOBAL_VARIABLES['account']['a_connector_runtime_lambda_name'],
+            runtime= lambda_.Runtime.PYTHON_3_12,
+            code=lambda_.Code.from_asset(
+                'src',
+                ignore_mode= IgnoreMode.GIT,
+                exclude= get_code_asset_excludes([A_CONNECTOR_RUNTIME_PATH, *A_CONNECTOR_RUNTIME_TASKS.values()])
+            ),
+            handler= f'{A_CONNECTOR_RUNTIME_PATH}/connector_runtime.handler',
+            memory_size= a_connector_runtime_lambda_sizing['memory_size'],
+            architecture= get_architecture(a_connector_runtime_lambda_sizing),
+            timeout= Duration.seconds(a_connector_runtime_lambda_sizing['timeout_in_seconds']),
+            snap_start= get_snap_start_conf(a_connector_runtime_props, a_connector_runtime_lambda_sizing),
+            layers= [
+                common_constructs['p_pg8000_layer'],
+                common_constructs['p_pymysql_layer'],
+                common_constructs['p_pyodbc_layer'],
+                common_constructs['p_oracledb_layer'],
+                common_constructs['a_common_layer']
+            ],
+            role= common_constructs['a_common_lambda_role'],
+            vpc= a_connector_runtime_vpc,
+            security_groups= a_connector_runtime_security_groups,
+            environment= {
+                'A_CONNECTOR_RUNTIME_TASKS': json.dumps(A_CONNECTOR_RUNTIME_TASKS),
+                'A_IDEMPOTENCY_TABLE_NAME': common_constructs['a_idempotency_table_name'],
+                'A_COMMON_KEY_ALIAS': common_constructs['a_common_key_alias'],
+                'G_DYNAMODB_REGION': common_constructs['g_dynamodb_region'],
+                'G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN': common_constructs['g_p_source_subscriptions_table_arn'],
+                'G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN': common_constructs['g_c_asset_subscriptions_table_arn'],
+                'G_C_SECRETS_MAPPING_TABLE_ARN': common_constructs['g_c_secrets_mapping_table_arn'],
+                'ACCOUNT_ID': account_id,
+                'REGION': region,
+                'P_SOURCE_SEMAPHORE_TABLE_NAME': common_constructs['p_source_semaphore_table_name'],
+                'P_SOURCE_SEMAPHORE_PERMITS': str(p_source_semaphore_props['permits']),
+                'P_SOURCE_SEMAPHORE_CONNECTION_PERMITS': json.dumps(p_source_semaphore_props['connection_permits']),
+                'P_SOURCE_SEMAPHORE_LEASE_EXPIRATION_IN_SECONDS': str(p_source_semaphore_props['lease_expiration_in_seconds']),
+                'P_SOURCE_SEMAPHORE_ACQUIRE_TIMEOUT_IN_SECONDS': str(p_source_semaphore_props['acquire_timeout_in_seconds']),
+                'P_CONNECTION_DETAILS_CACHE_TABLE_NAME': common_constructs['p_connection_details_cache_table_name'],
+                'P_CONNECTION_DETAILS_CACHE_EXPIRATION_IN_SECONDS': str(p_connection_details_cache_props['expiration_in_seconds']),
+                'P_CONNECTION_DETAILS_CACHE_MEMORY_EXPIRATION_IN_SECONDS': str(p_connection_details_cache_props['memory_expiration_in_seconds']),
+                'P_CONNECTION_INDEX_TABLE_NAME': common_constructs['p_connection_index_table_name'],
+                'RECOVERY_WINDOW_IN_DAYS': consumer_workflows_props['c_manage_subscription_revoke']['secret_recovery_window_in_days']
+            }
+        )
+
+        a_connector_runtime_lambda_alias = add_live_alias(
+            scope= self,
+            id= 'a_connector_runtime_lambda_alias',
+            function= a_connector_runtime_lambda,
+            lambda_sizing= a_connector_runtime_lambda_sizing
+        )
+
+        # -------------- Outputs --------------------
+        self.outputs = {
+            'a_connector_runtime_lambda': a_connector_runtime_lambda,
+            'a_connector_runtime_lambda_alias': a_connector_runtime_lambda_alias
+        }
+
+
+def get_code_asset_excludes(included_paths):
+    """ Complementary function to get the exclude patterns (git ignore syntax) of a code asset keeping only the listed folders of its source folder.
+    Each level of a folder path is excluded with its siblings before re-including the next one, given that a folder can not be re-included once its parent is excluded"""
+
+    included_folders = {'/'.join(path.split('/')[:depth]) for path in included_paths for depth in range(1, len(path.split('/')) + 1)}
+    parent_folders = {path.rsplit('/', 1)[0] for path in included_folders if '/' in path}
+
+    excludes = ['/*']
+    for depth in range(1, max(folder.count('/') for folder in included_folders) + 2):
+        excludes += [f'!/{folder}' for folder in sorted(included_folders) if folder.count('/') + 1 == depth]
+        excludes += [f'/{folder}/*' for folder in sorted(parent_folders) if folder.count('/') + 1 == depth]
+
+    return excludes + ['__pycache__']
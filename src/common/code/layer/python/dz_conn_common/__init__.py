@@ -0,0 +1 @@
+""" Common library shared by solution's lambda functions. Deployed as a lambda layer in accounts with producer / consumer capabilities."""
@@ -0,0 +1,79 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+from dz_conn_common.priming import on_restore
+
+# Constant: Represents the seconds to wait for a connection to an AWS endpoint to be established
+CLIENT_CONNECT_TIMEOUT_IN_SECONDS = 3
+
+# Constant: Represents the seconds to wait for an AWS API response once connected. Lower than lambda timeouts so that a hung call is retried instead of timing out the function
+CLIENT_READ_TIMEOUT_IN_SECONDS = 10
+
+# Constant: Represents the retry mode and maximum attempts (including first call) of AWS API calls.
+# Adaptive mode adds client side rate limiting when throttled, shared by all callers of the same (cached) client
+CLIENT_RETRY_MODE = 'adaptive'
+CLIENT_MAX_ATTEMPTS = 5
+
+# Constant: Represents the connection pool size of clients, default and for clients used concurrently from multiple threads
+CLIENT_MAX_POOL_CONNECTIONS = 10
+CLIENT_CONCURRENT_MAX_POOL_CONNECTIONS = 50
+
+# Use regional STS endpoints (lower latency, no dependency on us-east-1) for any credentials resolved through STS
+os.environ.setdefault('AWS_STS_REGIONAL_ENDPOINTS', 'regional')
+
+clients = {}
+clients_lock = threading.Lock()
+
+
+def get_client(service_name, region_name=None, max_pool_connections=CLIENT_MAX_POOL_CONNECTIONS):
+    """ Function to get a tuned AWS client, created once per process and shared by all modules asking for the same service, region and pool size.
+    Clients use adaptive retries, explicit connect / read timeouts and TCP keep-alive, so that pooled connections are reused across invocations.
+
+    Parameters
+    ----------
+    service_name: str - Name of the AWS service (i.e. 'dynamodb')
+    region_name: str - Optional. Region of the service endpoint. Lambda region if not specified.
+    max_pool_connections: int - Optional. Size of the connection pool. Use CLIENT_CONCURRENT_MAX_POOL_CONNECTIONS for clients shared by multiple threads.
+
+    Returns
+    -------
+    client: object - boto3 client of the service. Clients are thread safe.
+    """
+
+    client_key = (service_name, region_name, max_pool_connections)
+
+    with clients_lock:
+        if client_key not in clients:
+            clients[client_key] = boto3.client(
+                service_name,
+                region_name= region_name,
+                config= get_client_config(max_pool_connections)
+            )
+
+        return clients[client_key]
+
+
+def get_client_config(max_pool_connections):
+    """ Complementary function to get the botocore configuration of tuned clients"""
+
+    return Config(
+        connect_timeout= CLIENT_CONNECT_TIMEOUT_IN_SECONDS,
+        read_timeout= CLIENT_READ_TIMEOUT_IN_SECONDS,
+        retries= {
+            'mode': CLIENT_RETRY_MODE,
+            'max_attempts': CLIENT_MAX_ATTEMPTS
+        },
+        max_pool_connections= max_pool_connections,
+        tcp_keepalive= True
+    )
+
+
+@on_restore
+def clear_clients():
+    """ Complementary function to clear cached clients after a SnapStart restore, so that clients created afterwards use refreshed credentials"""
+
+    with clients_lock:
+        clients.clear()
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import threading
+
+from botocore.exceptions import ClientError
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the producer DynamoDB table that will store resolved glue table and connection details
+P_CONNECTION_DETAILS_CACHE_TABLE_NAME = os.getenv('P_CONNECTION_DETAILS_CACHE_TABLE_NAME')
+
+# Constant: Represents the number of seconds a cached entry will be valid in DynamoDB table, if not invalidated before by a glue change event
+P_CONNECTION_DETAILS_CACHE_EXPIRATION_IN_SECONDS = int(os.getenv('P_CONNECTION_DETAILS_CACHE_EXPIRATION_IN_SECONDS', '86400'))
+
+# Constant: Represents the number of seconds a cached entry will be kept in memory of the execution environment. Bounds how long an invalidated entry can still be served
+P_CONNECTION_DETAILS_CACHE_MEMORY_EXPIRATION_IN_SECONDS = int(os.getenv('P_CONNECTION_DETAILS_CACHE_MEMORY_EXPIRATION_IN_SECONDS', '60'))
+
+# Constant: Represents the prefixes of cache keys for glue tables and glue connections
+TABLE_CACHE_KEY_PREFIX = 'table'
+CONNECTION_CACHE_KEY_PREFIX = 'connection'
+
+dynamodb = None
+
+memory_cache = {}
+memory_cache_lock = threading.Lock()
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the module"""
+
+    global dynamodb
+    dynamodb = get_client('dynamodb')
+
+
+create_clients()
+
+
+def get_table_cache_key(database_name, table_name):
+    """ Function to get the cache key of a glue table details"""
+
+    return f'{TABLE_CACHE_KEY_PREFIX}#{database_name}#{table_name}'
+
+
+def get_connection_cache_key(connection_name):
+    """ Function to get the cache key of a glue connection details"""
+
+    return f'{CONNECTION_CACHE_KEY_PREFIX}#{connection_name}'
+
+
+def get_cached_value(cache_key):
+    """ Function to get a cached value, first from memory of the execution environment then from producer cache DynamoDB table (warming memory on hit).
+
+    Parameters
+    ----------
+    cache_key: str - Key of the cached value (i.e. result of get_table_cache_key)
+
+    Returns
+    -------
+    value: dict - Cached value, None if not cached, expired or invalidated
+    """
+
+    now = time.time()
+
+    with memory_cache_lock:
+        memory_entry = memory_cache.get(cache_key)
+        if memory_entry is not None and memory_entry['expiration'] > now:
+            return memory_entry['value']
+
+    if not P_CONNECTION_DETAILS_CACHE_TABLE_NAME: return None
+
+    dynamodb_response = dynamodb.get_item(
+        TableName= P_CONNECTION_DETAILS_CACHE_TABLE_NAME,
+        Key= {'cache_key': {'S': cache_key}}
+    )
+
+    cache_item = dynamodb_response.get('Item')
+    if cache_item is None or 'value' not in cache_item or int(cache_item['expiration']['N']) <= now:
+        return None
+
+    value = json.loads(cache_item['value']['S'])
+    put_memory_value(cache_key, value)
+
+    return value
+
+
+def put_cached_value(cache_key, value, version, resolved_at, persist=True):
+    """ Function to cache a value in memory of the execution environment and in producer cache DynamoDB table.
+    The item is only written if the key was not invalidated nor cached by a later resolution after the value was resolved, so that a resolution
+    racing with a glue change event does not cache outdated details.
+
+    Parameters
+    ----------
+    cache_key: str - Key of the value (i.e. result of get_table_cache_key)
+    value: dict - JSON serializable value to be cached
+    version: str - Version of the glue resource the value was resolved from (i.e. table VersionId), stored for troubleshooting
+    resolved_at: float - Epoch at which resolution of the value started (before calling glue)
+    persist: bool - Optional. If value is also stored in DynamoDB table. Set to False for values that must not be persisted (i.e. holding credentials)
+    """
+
+    put_memory_value(cache_key, value)
+
+    if not persist or not P_CONNECTION_DETAILS_CACHE_TABLE_NAME: return
+
+    try:
+        dynamodb.put_item(
+            TableName= P_CONNECTION_DETAILS_CACHE_TABLE_NAME,
+            Item= {
+                'cache_key': {'S': cache_key},
+                'value': {'S': json.dumps(value)},
+                'version': {'S': str(version)},
+                'resolved_at': {'N': str(resolved_at)},
+                'expiration': {'N': str(int(time.time()) + P_CONNECTION_DETAILS_CACHE_EXPIRATION_IN_SECONDS)}
+            },
+            ConditionExpression= '(attribute_not_exists(invalidated_at) OR invalidated_at < :resolved_at) AND (attribute_not_exists(resolved_at) OR resolved_at <= :resolved_at)',
+            ExpressionAttributeValues= {':resolved_at': {'N': str(resolved_at)}}
+        )
+
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+        print(f'Skipping cache of {cache_key}, invalidated or cached by a later resolution')
+
+
+def invalidate_cached_values(cache_keys):
+    """ Function to invalidate cached values in producer cache DynamoDB table. Invalidated items keep the epoch of invalidation (until they expire),
+    so that resolutions started before it are not cached. Memory of other execution environments is refreshed once their memory entries expire.
+
+    Parameters
+    ----------
+    cache_keys: list - Keys of the values to be invalidated
+    """
+
+    now = time.time()
+
+    for cache_key in cache_keys:
+        with memory_cache_lock:
+            memory_cache.pop(cache_key, None)
+
+        dynamodb.update_item(
+            TableName= P_CONNECTION_DETAILS_CACHE_TABLE_NAME,
+            Key= {'cache_key': {'S': cache_key}},
+            UpdateExpression= 'SET invalidated_at = :now, expiration = :expiration REMOVE #value',
+            ExpressionAttributeNames= {'#value': 'value'},
+            ExpressionAttributeValues= {
+                ':now': {'N': str(now)},
+                ':expiration': {'N': str(int(now) + P_CONNECTION_DETAILS_CACHE_EXPIRATION_IN_SECONDS)}
+            }
+        )
+
+
+def put_memory_value(cache_key, value):
+    """ Complementary function to keep a cached value in memory of the execution environment"""
+
+    with memory_cache_lock:
+        memory_cache[cache_key] = {
+            'value': value,
+            'expiration': time.time() + P_CONNECTION_DETAILS_CACHE_MEMORY_EXPIRATION_IN_SECONDS
+        }
@@ -0,0 +1,107 @@
+import os
+import json
+
+from botocore.exceptions import ClientError
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the producer DynamoDB table that will store connection details of crawled glue tables, keyed by glue table ARN
+P_CONNECTION_INDEX_TABLE_NAME = os.getenv('P_CONNECTION_INDEX_TABLE_NAME')
+
+# Constant: Represents the indexes of the connection index table by crawler name and by connection name (keys only)
+P_CONNECTION_INDEX_CRAWLER_INDEX_NAME = 'crawler_name_index'
+P_CONNECTION_INDEX_CONNECTION_INDEX_NAME = 'connection_name_index'
+
+dynamodb = None
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the module"""
+
+    global dynamodb
+    dynamodb = get_client('dynamodb')
+
+
+create_clients()
+
+
+def get_glue_table_arn(region, account_id, glue_database_name, glue_table_name):
+    """ Function to get the ARN of a glue table, key of the connection index"""
+
+    return f'arn:aws:glue:{region}:{account_id}:table/{glue_database_name}/{glue_table_name}'
+
+
+def get_indexed_connection_details(glue_table_arn):
+    """ Function to get the connection details of a glue table from the connection index.
+
+    Parameters
+    ----------
+    glue_table_arn: str - ARN of the glue table (result of get_glue_table_arn)
+
+    Returns
+    -------
+    connection_details: dict - Connection details indexed when the table was crawled (same structure as get connection details function response),
+    None if table is not indexed or connection index is not configured
+    """
+
+    if not P_CONNECTION_INDEX_TABLE_NAME: return None
+
+    dynamodb_response = dynamodb.get_item(
+        TableName= P_CONNECTION_INDEX_TABLE_NAME,
+        Key= {'glue_table_arn': {'S': glue_table_arn}}
+    )
+
+    index_item = dynamodb_response.get('Item')
+    if index_item is None: return None
+
+    return json.loads(index_item['connection_details']['S'])
+
+
+def get_indexed_glue_table_arns(index_name, index_value):
+    """ Function to get the ARNs of the glue tables indexed for a crawler or a connection.
+
+    Parameters
+    ----------
+    index_name: str - P_CONNECTION_INDEX_CRAWLER_INDEX_NAME or P_CONNECTION_INDEX_CONNECTION_INDEX_NAME
+    index_value: str - Name of the crawler or connection
+
+    Returns
+    -------
+    glue_table_arns: list - ARNs of the indexed glue tables
+    """
+
+    paginator = dynamodb.get_paginator('query')
+    page_iterator = paginator.paginate(
+        TableName= P_CONNECTION_INDEX_TABLE_NAME,
+        IndexName= index_name,
+        KeyConditionExpression= '#index_key = :index_value',
+        ExpressionAttributeNames= {'#index_key': 'crawler_name' if index_name == P_CONNECTION_INDEX_CRAWLER_INDEX_NAME else 'connection_name'},
+        ExpressionAttributeValues= {':index_value': {'S': index_value}}
+    )
+
+    return [index_item['glue_table_arn']['S'] for page in page_iterator for index_item in page['Items']]
+
+
+def delete_indexed_connection_details(glue_table_arns, indexed_before):
+    """ Function to remove glue tables from the connection index, only if they were indexed before the given epoch (i.e. time of the change event
+    removing them), so that tables indexed again after the change are kept.
+
+    Parameters
+    ----------
+    glue_table_arns: list - ARNs of the glue tables
+    indexed_before: float - Epoch before which tables must have been indexed to be removed
+    """
+
+    for glue_table_arn in glue_table_arns:
+        try:
+            dynamodb.delete_item(
+                TableName= P_CONNECTION_INDEX_TABLE_NAME,
+                Key= {'glue_table_arn': {'S': glue_table_arn}},
+                ConditionExpression= 'indexed_at < :indexed_before',
+                ExpressionAttributeValues= {':indexed_before': {'N': str(indexed_before)}}
+            )
+
+        except ClientError as error:
+            if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import math
+import hashlib
+import functools
+
+from botocore.exceptions import ClientError
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the account DynamoDB table that will store idempotency records
+A_IDEMPOTENCY_TABLE_NAME = os.getenv('A_IDEMPOTENCY_TABLE_NAME')
+
+# Constant: Represents the number of seconds a completed idempotency record (and its stored result) will be valid
+IDEMPOTENCY_EXPIRATION_IN_SECONDS = int(os.getenv('IDEMPOTENCY_EXPIRATION_IN_SECONDS', '3600'))
+
+# Constant: Represents the number of seconds an in progress lock will be held when lambda context is not available
+IDEMPOTENCY_DEFAULT_IN_PROGRESS_EXPIRATION_IN_SECONDS = 900
+
+# Constant: Represents the event key with the token identifying the workflow execution that originated the event
+IDEMPOTENCY_TOKEN_KEY = 'IdempotencyToken'
+
+# Constant: Represents the status of idempotency records
+IDEMPOTENCY_STATUS_IN_PROGRESS = 'IN_PROGRESS'
+IDEMPOTENCY_STATUS_COMPLETED = 'COMPLETED'
+
+dynamodb = None
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the module"""
+
+    global dynamodb
+    dynamodb = get_client('dynamodb')
+
+
+create_clients()
+
+
+class IdempotencyInProgressError(Exception):
+    """ Exception raised when an invocation with the same idempotency key is still in progress. Caller is expected to retry later."""
+
+
+def idempotent(key_paths):
+    """ Decorator to make a lambda handler idempotent. Handler result is stored in account idempotency DynamoDB table under a key computed as a hash of
+    handler name, event idempotency token (if present) and values of event fields listed in key_paths.
+    Invocations with an already completed key will return the stored result, invocations with a key in progress will raise IdempotencyInProgressError
+    and failed invocations will release the key so that they can be retried.
+
+    Parameters
+    ----------
+    key_paths: list - List of dot separated paths of event fields identifying the side effects of the handler (i.e. 'SubscriptionDetails.DomainId')
+    """
+
+    def decorator(handler):
+
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            idempotency_key = get_idempotency_key(f'{handler.__module__}.{handler.__name__}', event, key_paths)
+
+            stored_result = lock_idempotency_item(idempotency_key, get_in_progress_expiration(context))
+            if stored_result is not None:
+                print(f'Returning stored result for idempotency key {idempotency_key}')
+                return stored_result
+
+            try:
+                result = handler(event, context)
+            except Exception:
+                delete_idempotency_item(idempotency_key)
+                raise
+
+            complete_idempotency_item(idempotency_key, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def get_idempotency_key(handler_name, event, key_paths):
+    """ Complementary function to compute idempotency key hash of handler name, idempotency token and event fields"""
+
+    idempotency_payload = {
+        'handler': handler_name,
+        'token': event.get(IDEMPOTENCY_TOKEN_KEY),
+        'fields': [get_event_field(event, key_path) for key_path in key_paths]
+    }
+
+    return hashlib.sha256(json.dumps(idempotency_payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def get_event_field(event, key_path):
+    """ Complementary function to get the value of an event field based on its dot separated path, None if not existent"""
+
+    value = event
+    for key in key_path.split('.'):
+        if not isinstance(value, dict) or key not in value: return None
+        value = value[key]
+
+    return value
+
+
+def get_in_progress_expiration(context):
+    """ Complementary function to get the epoch until which an in progress lock will be held, based on lambda remaining time"""
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        return int(time.time()) + math.ceil(context.get_remaining_time_in_millis() / 1000)
+
+    return int(time.time()) + IDEMPOTENCY_DEFAULT_IN_PROGRESS_EXPIRATION_IN_SECONDS
+
+
+def lock_idempotency_item(idempotency_key, in_progress_expiration):
+    """ Complementary function to create an in progress idempotency item. Returns stored result if key was already completed, None if lock was acquired"""
+
+    now = int(time.time())
+
+    try:
+        dynamodb.put_item(
+            TableName= A_IDEMPOTENCY_TABLE_NAME,
+            Item= {
+                'idempotency_key': {'S': idempotency_key},
+                'status': {'S': IDEMPOTENCY_STATUS_IN_PROGRESS},
+                'in_progress_expiration': {'N': str(in_progress_expiration)},
+                'expiration': {'N': str(now + IDEMPOTENCY_EXPIRATION_IN_SECONDS)}
+            },
+            ConditionExpression= 'attribute_not_exists(idempotency_key) OR expiration < :now OR (#status = :in_progress AND in_progress_expiration < :now)',
+            ExpressionAttributeNames= {'#status': 'status'},
+            ExpressionAttributeValues= {
+                ':now': {'N': str(now)},
+                ':in_progress': {'S': IDEMPOTENCY_STATUS_IN_PROGRESS}
+            }
+        )
+        return None
+
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+
+    dynamodb_response = dynamodb.get_item(
+        TableName= A_IDEMPOTENCY_TABLE_NAME,
+        ConsistentRead= True,
+        Key= {'idempotency_key': {'S': idempotency_key}}
+    )
+
+    idempotency_item = dynamodb_response.get('Item')
+    if idempotency_item and idempotency_item['status']['S'] == IDEMPOTENCY_STATUS_COMPLETED:
+        return json.loads(idempotency_item['result']['S'])
+
+    raise IdempotencyInProgressError(f'Invocation with idempotency key {idempotency_key} is already in progress')
+
+
+def complete_idempotency_item(idempotency_key, result):
+    """ Complementary function to mark idempotency item as completed storing handler result"""
+
+    dynamodb.put_item(
+        TableName= A_IDEMPOTENCY_TABLE_NAME,
+        Item= {
+            'idempotency_key': {'S': idempotency_key},
+            'status': {'S': IDEMPOTENCY_STATUS_COMPLETED},
+            'result': {'S': json.dumps(result)},
+            'expiration': {'N': str(int(time.time()) + IDEMPOTENCY_EXPIRATION_IN_SECONDS)}
+        }
+    )
+
+
+def delete_idempotency_item(idempotency_key):
+    """ Complementary function to release idempotency item after a failed invocation so that it can be retried"""
+
+    dynamodb.delete_item(
+        TableName= A_IDEMPOTENCY_TABLE_NAME,
+        Key= {'idempotency_key': {'S': idempotency_key}}
+    )
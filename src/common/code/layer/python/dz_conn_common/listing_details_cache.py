@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import threading
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.metrics import measure_phase, PHASE_DATAZONE_LOOKUP
+
+# Constant: Represents the governance DynamoDB table that will store resolved listing details, keyed by domain, listing and listing revision
+G_LISTING_DETAILS_CACHE_TABLE_NAME = os.getenv('G_LISTING_DETAILS_CACHE_TABLE_NAME')
+
+# Constant: Represents the number of seconds a cached entry will be kept in DynamoDB table. Listing revisions are immutable, so entries are never invalidated
+G_LISTING_DETAILS_CACHE_EXPIRATION_IN_SECONDS = int(os.getenv('G_LISTING_DETAILS_CACHE_EXPIRATION_IN_SECONDS', '604800'))
+
+# Constant: Represents the DataZone asset type of glue tables
+GLUE_TABLE_ASSET_TYPE = 'GlueTableAssetType'
+
+datazone = None
+dynamodb = None
+
+memory_cache = {}
+memory_cache_lock = threading.Lock()
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the module"""
+
+    global datazone, dynamodb
+    datazone = get_client('datazone')
+    dynamodb = get_client('dynamodb')
+
+
+create_clients()
+
+
+def get_listing_cache_key(domain_id, listing_id, listing_revision):
+    """ Function to get the cache key of a listing revision details"""
+
+    return f'{domain_id}#{listing_id}#{listing_revision}'
+
+
+def get_listing_details(domain_id, listing_id, listing_revision):
+    """ Function to get the details of a DataZone listing revision, first from memory of the execution environment then from governance cache DynamoDB table.
+    When not cached, details are resolved from DataZone (listing metadata and glue table form of the asset) and cached.
+
+    Parameters
+    ----------
+    domain_id: str - Id of the Amazon DataZone domain
+    listing_id: str - Id of the Amazon DataZone listing
+    listing_revision: str - Revision of the Amazon DataZone listing
+
+    Returns
+    -------
+    listing_details: dict - Dict with listing details including:
+        ProducerProjectId: str - Id of the Amazon DataZone producer project (owning the asset)
+        ListingDetails: dict - Dict with listing details (Id, Name and Revision of the Amazon DataZone listing).
+        AssetDetails: dict - Dict with data asset details (Type, Id, Revision and, for glue table assets, GlueTableDetails). Same structure as get subscription details function response
+    """
+
+    cache_key = get_listing_cache_key(domain_id, listing_id, listing_revision)
+
+    with memory_cache_lock:
+        listing_details = memory_cache.get(cache_key)
+        if listing_details is not None: return listing_details
+
+    listing_details = get_cached_listing_details(cache_key)
+
+    if listing_details is None:
+        listing_details = resolve_listing_details(domain_id, listing_id, listing_revision)
+        put_cached_listing_details(cache_key, listing_details)
+
+    with memory_cache_lock:
+        memory_cache[cache_key] = listing_details
+
+    return listing_details
+
+
+@measure_phase(PHASE_DATAZONE_LOOKUP)
+def resolve_listing_details(domain_id, listing_id, listing_revision):
+    """ Complementary function to resolve the details of a DataZone listing revision from DataZone, parsing the glue table form of glue table assets"""
+
+    datazone_response = datazone.get_listing(domainIdentifier=domain_id, identifier=listing_id, listingRevision=listing_revision)
+
+    data_asset_details = datazone_response['item']['assetListing']
+    data_asset_type = data_asset_details['assetType']
+
+    listing_details = {
+        'ProducerProjectId': data_asset_details['owningProjectId'],
+        'ListingDetails': {
+            'Id': datazone_response['id'],
+            'Name': datazone_response['name'],
+            'Revision': datazone_response['listingRevision']
+        },
+        'AssetDetails': {
+            'Type': data_asset_type,
+            'Id': data_asset_details['assetId'],
+            'Revision': data_asset_details['assetRevision']
+        }
+    }
+
+    if data_asset_type == GLUE_TABLE_ASSET_TYPE:
+        glue_table_form = json.loads(data_asset_details['forms'])['GlueTableForm']
+
+        listing_details['AssetDetails']['GlueTableDetails'] = {
+            'AccountId': glue_table_form['catalogId'],
+            'Region': glue_table_form['region'],
+            'DatabaseName': glue_table_form['tableArn'].split('/')[1],
+            'TableName': glue_table_form['tableName'],
+            'TableArn': glue_table_form['tableArn'],
+            'SourceClassification': glue_table_form['sourceClassification']
+        }
+
+    return listing_details
+
+
+def get_cached_listing_details(cache_key):
+    """ Complementary function to get listing details from governance cache DynamoDB table. Returns None if not cached, expired or cache is not configured"""
+
+    if not G_LISTING_DETAILS_CACHE_TABLE_NAME: return None
+
+    dynamodb_response = dynamodb.get_item(
+        TableName= G_LISTING_DETAILS_CACHE_TABLE_NAME,
+        Key= {'cache_key': {'S': cache_key}}
+    )
+
+    cache_item = dynamodb_response.get('Item')
+    if cache_item is None or int(cache_item['expiration']['N']) <= time.time():
+        return None
+
+    return json.loads(cache_item['value']['S'])
+
+
+def put_cached_listing_details(cache_key, listing_details):
+    """ Complementary function to cache listing details in governance cache DynamoDB table. Concurrent writes hold the same details, so last writer wins"""
+
+    if not G_LISTING_DETAILS_CACHE_TABLE_NAME: return
+
+    dynamodb.put_item(
+        TableName= G_LISTING_DETAILS_CACHE_TABLE_NAME,
+        Item= {
+            'cache_key': {'S': cache_key},
+            'value': {'S': json.dumps(listing_details)},
+            'expiration': {'N': str(int(time.time()) + G_LISTING_DETAILS_CACHE_EXPIRATION_IN_SECONDS)}
+        }
+    )
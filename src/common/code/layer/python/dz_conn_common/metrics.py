@@ -0,0 +1,115 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Constant: Represents the CloudWatch namespace of the metrics emitted by solution's lambda functions (all accounts)
+METRICS_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'DataZoneConnectors')
+
+# Constant: Represents the phases of handlers being measured
+PHASE_DATAZONE_LOOKUP = 'DataZoneLookup'
+PHASE_SOURCE_CONNECT = 'SourceConnect'
+PHASE_DDL_EXECUTION = 'DDLExecution'
+PHASE_SECRET_CREATION = 'SecretCreation'
+PHASE_DYNAMODB_WRITE = 'DynamoDBWrite'
+PHASE_KMS = 'KMS'
+
+# Constant: Represents the metrics emitted for each measured phase
+PHASE_DURATION_METRIC = {'Name': 'PhaseDuration', 'Unit': 'Milliseconds'}
+PHASE_FAILURES_METRIC = {'Name': 'PhaseFailures', 'Unit': 'Count'}
+
+# Constant: Represents the dimension sets of phase metrics. Every set includes the phase, so that phase times can be broken down by step, engine or producer account
+PHASE_DIMENSION_SETS = [
+    ['Phase'],
+    ['Phase', 'Step'],
+    ['Phase', 'Engine'],
+    ['Phase', 'ProducerAccountId']
+]
+
+# Constant: Represents the value of dimensions not known by the step emitting the metric
+UNKNOWN_DIMENSION_VALUE = 'Unknown'
+
+# Constant: Represents the prefix of solution's lambda function names (dz_conn_ followed by the capability prefix), removed to get the step name (name of the handler module)
+FUNCTION_NAME_PREFIX_PATTERN = r'^dz_conn_[apcg]_'
+
+metric_step = re.sub(FUNCTION_NAME_PREFIX_PATTERN, '', os.getenv('AWS_LAMBDA_FUNCTION_NAME', UNKNOWN_DIMENSION_VALUE))
+metric_dimensions = {}
+metric_output_lock = threading.Lock()
+
+
+def set_metric_step(step):
+    """ Function to set the step (task) of the metrics emitted by the current invocation. Defaults to the name of the function without solution's prefix
+    (i.e. 'grant_jdbc_subscription'), only needed when a function serves multiple steps (connector runtime)
+
+    Parameters
+    ----------
+    step: str - Name of the step (name of the task handler module)
+    """
+
+    global metric_step
+    metric_step = step
+
+
+def set_metric_dimensions(engine=None, producer_account_id=None):
+    """ Function to set the engine and producer account of the metrics emitted by the current invocation. Replaces the dimensions of previous invocations,
+    so it is meant to be called at the start of the handler, once they are known. Dimensions not given are emitted as UNKNOWN_DIMENSION_VALUE.
+
+    Parameters
+    ----------
+    engine: str - Optional. Source database engine (i.e. 'postgresql')
+    producer_account_id: str - Optional. Id of the producer account of the subscribed asset
+    """
+
+    global metric_dimensions
+    metric_dimensions = {'Engine': engine, 'ProducerAccountId': producer_account_id}
+
+
+@contextmanager
+def measure_phase(phase):
+    """ Function to measure the duration of a phase of a handler, emitting it as CloudWatch Embedded Metric Format (EMF) record in function logs along with whether
+    the phase failed (raised). Usable as context manager (with measure_phase(PHASE_KMS): ...) or as decorator of the function running the phase (@measure_phase(PHASE_KMS)).
+    Exceptions raised by the phase are raised as is.
+
+    Parameters
+    ----------
+    phase: str - Name of the phase. One of PHASE_* constants
+    """
+
+    started_at = time.perf_counter()
+    failed = True
+
+    try:
+        yield
+        failed = False
+
+    finally:
+        put_phase_metrics(phase, (time.perf_counter() - started_at) * 1000, failed)
+
+
+def put_phase_metrics(phase, duration_in_milliseconds, failed):
+    """ Complementary function to write the EMF record of a measured phase to function logs, where CloudWatch extracts its metrics. Written in a single call,
+    so that records of phases measured from multiple threads are not interleaved"""
+
+    metric_record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': PHASE_DIMENSION_SETS,
+                'Metrics': [PHASE_DURATION_METRIC, PHASE_FAILURES_METRIC]
+            }]
+        },
+        'Phase': phase,
+        'Step': metric_step,
+        'Engine': metric_dimensions.get('Engine') or UNKNOWN_DIMENSION_VALUE,
+        'ProducerAccountId': metric_dimensions.get('ProducerAccountId') or UNKNOWN_DIMENSION_VALUE,
+        PHASE_DURATION_METRIC['Name']: round(duration_in_milliseconds, 3),
+        PHASE_FAILURES_METRIC['Name']: int(failed)
+    }
+
+    with metric_output_lock:
+        sys.stdout.write(json.dumps(metric_record) + '\n')
+        sys.stdout.flush()
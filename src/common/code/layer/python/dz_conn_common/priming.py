@@ -0,0 +1,56 @@
+import os
+import random
+
+import boto3
+
+try:
+    from snapshot_restore_py import register_after_restore
+except ImportError:
+    register_after_restore = None
+
+# Constant: Represents the lambda initialization types where expensive initialization is run on init phase (priming) instead of on first invocation.
+# 'snap-start' environments are initialized once per published version and snapshotted, 'provisioned-concurrency' ones are initialized ahead of invocations
+PRIMING_INITIALIZATION_TYPES = ['snap-start', 'provisioned-concurrency']
+
+
+def prime(*functions):
+    """ Function to run expensive initialization (i.e. driver imports or lookups of values that will not change) on init phase of execution environments
+    that are snapshotted (SnapStart) or initialized ahead of invocations (provisioned concurrency), so that they are not paid on first invocation.
+    On on-demand environments nothing is run, functions are expected to be called lazily by the handler. A failing function is logged and skipped.
+    Meant to be called at the end of lambda function modules, once all functions are defined.
+
+    Parameters
+    ----------
+    functions: callable - Functions with no parameters to be run
+    """
+
+    if os.getenv('AWS_LAMBDA_INITIALIZATION_TYPE') not in PRIMING_INITIALIZATION_TYPES: return
+
+    for function in functions:
+        try:
+            function()
+        except Exception as error:
+            print(f'Skipping priming of {function.__name__}: {error}')
+
+
+def on_restore(function):
+    """ Decorator to register a function (with no parameters) to be run after an execution environment is restored from a SnapStart snapshot, i.e.
+    to re-create AWS clients with refreshed credentials. Functions are run in registration order. Not run (only registered) outside SnapStart runtimes.
+    """
+
+    if register_after_restore is not None: register_after_restore(function)
+    return function
+
+
+@on_restore
+def reseed_random():
+    """ Complementary function to re-seed random module after restore, so that environments restored from the same snapshot do not generate the same values"""
+
+    random.seed()
+
+
+@on_restore
+def refresh_default_session():
+    """ Complementary function to replace boto3 default session after restore, so that clients created afterwards resolve credentials again"""
+
+    boto3.setup_default_session()
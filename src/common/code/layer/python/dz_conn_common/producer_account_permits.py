@@ -0,0 +1,112 @@
+import os
+import time
+
+from botocore.exceptions import ClientError
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the governance DynamoDB table that will store producer account permits held by running grant workflows
+G_PRODUCER_ACCOUNT_PERMITS_TABLE_NAME = os.getenv('G_PRODUCER_ACCOUNT_PERMITS_TABLE_NAME')
+
+# Constant: Represents the maximum number of grant workflows running at the same time for the same producer account
+G_GRANT_MAX_CONCURRENCY_PER_PRODUCER_ACCOUNT = int(os.getenv('G_GRANT_MAX_CONCURRENCY_PER_PRODUCER_ACCOUNT', '3'))
+
+# Constant: Represents the number of seconds after which a producer account permit not released is available again
+G_GRANT_PERMIT_EXPIRATION_IN_SECONDS = int(os.getenv('G_GRANT_PERMIT_EXPIRATION_IN_SECONDS', '7500'))
+
+dynamodb = None
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the module"""
+
+    global dynamodb
+    dynamodb = get_client('dynamodb')
+
+
+create_clients()
+
+
+def acquire_producer_account_permit(producer_account_id, lease_id):
+    """ Function to take a free (or expired) permit of a producer account for a grant execution, so that a single producer account cannot take all grant capacity.
+    Each permit is a slot item in governance permits DynamoDB table, held through a lease (execution name) that expires if not released.
+    Acquiring is idempotent, a lease already holding a slot of the producer account keeps it instead of taking a new one.
+
+    Parameters
+    ----------
+    producer_account_id: str - Id of the producer account of the subscribed asset. No limit is applied if empty
+    lease_id: str - Id of the lease holding the permit, i.e. name of the grant execution
+
+    Returns
+    -------
+    acquired: bool - True if a permit is held by the lease, False if all permits of the producer account are held by other leases
+    """
+
+    if not producer_account_id: return True
+
+    now = int(time.time())
+    slots = range(G_GRANT_MAX_CONCURRENCY_PER_PRODUCER_ACCOUNT)
+
+    if any(get_permit_lease_id(producer_account_id, slot) == lease_id for slot in slots): return True
+
+    for slot in slots:
+        try:
+            dynamodb.put_item(
+                TableName= G_PRODUCER_ACCOUNT_PERMITS_TABLE_NAME,
+                Item= {
+                    'permit_key': {'S': f'{producer_account_id}#{slot}'},
+                    'lease_id': {'S': lease_id},
+                    'expiration': {'N': str(now + G_GRANT_PERMIT_EXPIRATION_IN_SECONDS)}
+                },
+                ConditionExpression= 'attribute_not_exists(permit_key) OR expiration < :now OR lease_id = :lease_id',
+                ExpressionAttributeValues= {
+                    ':now': {'N': str(now)},
+                    ':lease_id': {'S': lease_id}
+                }
+            )
+            return True
+
+        except ClientError as error:
+            if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+
+    return False
+
+
+def release_producer_account_permit(producer_account_id, lease_id):
+    """ Function to release all permits of a producer account held by a lease, if any. Permits that expired and were taken by another lease are kept.
+
+    Parameters
+    ----------
+    producer_account_id: str - Id of the producer account of the subscribed asset. Nothing is released if empty
+    lease_id: str - Id of the lease holding the permit, i.e. name of the grant execution
+    """
+
+    if not producer_account_id: return
+
+    for slot in range(G_GRANT_MAX_CONCURRENCY_PER_PRODUCER_ACCOUNT):
+        try:
+            dynamodb.delete_item(
+                TableName= G_PRODUCER_ACCOUNT_PERMITS_TABLE_NAME,
+                Key= {'permit_key': {'S': f'{producer_account_id}#{slot}'}},
+                ConditionExpression= 'lease_id = :lease_id',
+                ExpressionAttributeValues= {
+                    ':lease_id': {'S': lease_id}
+                }
+            )
+
+        except ClientError as error:
+            if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+
+
+def get_permit_lease_id(producer_account_id, slot):
+    """ Complementary function to get the id of the lease holding a permit slot of a producer account, None if free"""
+
+    dynamodb_response = dynamodb.get_item(
+        TableName= G_PRODUCER_ACCOUNT_PERMITS_TABLE_NAME,
+        Key= {'permit_key': {'S': f'{producer_account_id}#{slot}'}},
+        ConsistentRead= True
+    )
+
+    return dynamodb_response.get('Item', {}).get('lease_id', {}).get('S')
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+# Constant: Represents the format of datetime values delivered by AWS API once projected (same format used for dates stored by the solution)
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Constant: Represents the separator of keys in field paths
+FIELD_PATH_SEPARATOR = '.'
+
+
+def project(response, fields):
+    """ Function to transform a dict delivered by AWS API into a JSON serializable dict keeping only the listed fields, so that large responses (i.e. Glue tables)
+    are not fully copied nor serialized. Only the values of listed fields are walked, converting datetime values to strings on the way.
+    Fields missing in the response are left out of the projection, so that a missing required field fails where it is read, as it would on the response.
+
+    Parameters
+    ----------
+    response: dict - Dict delivered by AWS API (i.e. boto3 client response)
+    fields: list - Paths of the fields to keep, with keys separated by dots (i.e. 'Table.StorageDescriptor.Location'). Whole value is kept for paths ending on dicts or lists
+
+    Returns
+    -------
+    projection: dict - Dict with the same structure as the response, limited to the listed fields
+    """
+
+    projection = {}
+    for field in fields:
+        *parent_keys, field_key = field.split(FIELD_PATH_SEPARATOR)
+
+        value, projection_value = response, projection
+        for key in parent_keys:
+            value = value.get(key) if isinstance(value, dict) else None
+            if value is None: break
+            projection_value = projection_value.setdefault(key, {})
+
+        else:
+            if isinstance(value, dict) and field_key in value:
+                projection_value[field_key] = to_json_value(value[field_key])
+
+    return projection
+
+
+def to_json_value(value):
+    """ Complementary function to transform a value delivered by AWS API into a JSON serializable one. Walks nested dicts and lists of the value"""
+
+    if isinstance(value, datetime): return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, dict): return {key: to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)): return [to_json_value(item) for item in value]
+
+    return value
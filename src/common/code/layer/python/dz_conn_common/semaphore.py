@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import uuid
+import random
+import contextlib
+
+from botocore.exceptions import ClientError
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the producer DynamoDB table that will store source semaphore leases
+P_SOURCE_SEMAPHORE_TABLE_NAME = os.getenv('P_SOURCE_SEMAPHORE_TABLE_NAME')
+
+# Constant: Represents the default number of permits (concurrent holders) per source connection
+P_SOURCE_SEMAPHORE_PERMITS = int(os.getenv('P_SOURCE_SEMAPHORE_PERMITS', '2'))
+
+# Constant: Represents the number of permits for specific source connections, as a JSON dict with glue connection name as key and permits as value
+P_SOURCE_SEMAPHORE_CONNECTION_PERMITS = json.loads(os.getenv('P_SOURCE_SEMAPHORE_CONNECTION_PERMITS', '{}'))
+
+# Constant: Represents the number of seconds after which a lease not released (i.e. holder crashed or timed out) is considered expired
+P_SOURCE_SEMAPHORE_LEASE_EXPIRATION_IN_SECONDS = int(os.getenv('P_SOURCE_SEMAPHORE_LEASE_EXPIRATION_IN_SECONDS', '90'))
+
+# Constant: Represents the maximum number of seconds to wait for a permit before raising SemaphoreAcquireTimeoutError
+P_SOURCE_SEMAPHORE_ACQUIRE_TIMEOUT_IN_SECONDS = int(os.getenv('P_SOURCE_SEMAPHORE_ACQUIRE_TIMEOUT_IN_SECONDS', '30'))
+
+# Constant: Represents the seconds of lambda remaining time to keep when waiting for a permit, so that the holder has time to run its work
+SEMAPHORE_ACQUIRE_MARGIN_IN_SECONDS = 20
+
+# Constant: Represents the initial and maximum seconds to wait between acquire attempts. Waits grow exponentially with full jitter
+SEMAPHORE_ACQUIRE_BASE_DELAY_IN_SECONDS = 0.5
+SEMAPHORE_ACQUIRE_MAX_DELAY_IN_SECONDS = 5
+
+dynamodb = None
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the module"""
+
+    global dynamodb
+    dynamodb = get_client('dynamodb')
+
+
+create_clients()
+
+
+class SemaphoreAcquireTimeoutError(Exception):
+    """ Exception raised when no permit of a source semaphore could be acquired in time. Caller is expected to retry later."""
+
+
+@contextlib.contextmanager
+def source_semaphore(glue_connection_arn, context=None):
+    """ Context manager to limit the number of concurrent holders accessing the same source database, identified by its glue connection ARN.
+    Each permit is a slot item in producer semaphore DynamoDB table, held through a lease that expires if not released (i.e. holder crashed).
+    Waits (with exponential backoff and jitter) for a free slot up to the acquire timeout and raises SemaphoreAcquireTimeoutError if none is released in time.
+    If semaphore table is not configured, no limit is applied.
+
+    Parameters
+    ----------
+    glue_connection_arn: str - ARN of the glue connection associated to the source database
+    context: dict - Lambda context. Used to stop waiting for a permit before lambda is about to time out
+    """
+
+    if not P_SOURCE_SEMAPHORE_TABLE_NAME:
+        yield None
+        return
+
+    lease = acquire_lease(glue_connection_arn, get_acquire_deadline(context))
+    try:
+        yield lease
+    finally:
+        release_lease(lease)
+
+
+def get_connection_permits(glue_connection_arn):
+    """ Complementary function to get the number of permits of a source connection, using its specific value if configured else the default one"""
+
+    glue_connection_name = glue_connection_arn.split('/')[-1]
+    return int(P_SOURCE_SEMAPHORE_CONNECTION_PERMITS.get(glue_connection_name, P_SOURCE_SEMAPHORE_PERMITS))
+
+
+def get_acquire_deadline(context):
+    """ Complementary function to get the epoch until which a permit will be waited for, based on acquire timeout and lambda remaining time"""
+
+    acquire_deadline = time.time() + P_SOURCE_SEMAPHORE_ACQUIRE_TIMEOUT_IN_SECONDS
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        acquire_deadline = min(acquire_deadline, time.time() + context.get_remaining_time_in_millis() / 1000 - SEMAPHORE_ACQUIRE_MARGIN_IN_SECONDS)
+
+    return acquire_deadline
+
+
+def acquire_lease(glue_connection_arn, acquire_deadline):
+    """ Complementary function to acquire a lease on a free (or expired) slot of a source connection semaphore, waiting until deadline if all slots are held"""
+
+    lease_id = str(uuid.uuid4())
+    slots = list(range(get_connection_permits(glue_connection_arn)))
+
+    attempt = 0
+    while True:
+        random.shuffle(slots)
+        for slot in slots:
+            lease = try_acquire_slot(glue_connection_arn, slot, lease_id)
+            if lease: return lease
+
+        delay = random.uniform(0, min(SEMAPHORE_ACQUIRE_MAX_DELAY_IN_SECONDS, SEMAPHORE_ACQUIRE_BASE_DELAY_IN_SECONDS * (2 ** attempt)))
+        if time.time() + delay > acquire_deadline:
+            raise SemaphoreAcquireTimeoutError(f'No permit available for source connection {glue_connection_arn} ({len(slots)} permits)')
+
+        time.sleep(delay)
+        attempt += 1
+
+
+def try_acquire_slot(glue_connection_arn, slot, lease_id):
+    """ Complementary function to take a semaphore slot if free or expired. Returns lease details if taken, None if held by another lease"""
+
+    now = int(time.time())
+    lease = {
+        'semaphore_key': f'{glue_connection_arn}#{slot}',
+        'lease_id': lease_id
+    }
+
+    try:
+        dynamodb.put_item(
+            TableName= P_SOURCE_SEMAPHORE_TABLE_NAME,
+            Item= {
+                'semaphore_key': {'S': lease['semaphore_key']},
+                'lease_id': {'S': lease_id},
+                'glue_connection_arn': {'S': glue_connection_arn},
+                'expiration': {'N': str(now + P_SOURCE_SEMAPHORE_LEASE_EXPIRATION_IN_SECONDS)}
+            },
+            ConditionExpression= 'attribute_not_exists(semaphore_key) OR expiration < :now',
+            ExpressionAttributeValues= {
+                ':now': {'N': str(now)}
+            }
+        )
+        return lease
+
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+
+    return None
+
+
+def release_lease(lease):
+    """ Complementary function to release a semaphore slot, only if still held by the lease (i.e. it did not expire and was taken by another holder)"""
+
+    try:
+        dynamodb.delete_item(
+            TableName= P_SOURCE_SEMAPHORE_TABLE_NAME,
+            Key= {'semaphore_key': {'S': lease['semaphore_key']}},
+            ConditionExpression= 'lease_id = :lease_id',
+            ExpressionAttributeValues= {
+                ':lease_id': {'S': lease['lease_id']}
+            }
+        )
+
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+        print(f"Lease on {lease['semaphore_key']} expired before being released")
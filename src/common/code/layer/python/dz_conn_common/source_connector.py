@@ -0,0 +1,139 @@
+import json
+import importlib
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.metrics import measure_phase, PHASE_SOURCE_CONNECT
+
+# Constant: Represents the seconds to wait for a connection to source database to be established
+SOURCE_CONNECT_TIMEOUT_IN_SECONDS = 10
+
+# Constant: Represents the ODBC driver (shipped in sqlserver driver layer) used to connect to sqlserver databases
+SQLSERVER_ODBC_DRIVER = 'ODBC Driver 17 for SQL Server'
+
+# Constant: Represents the python driver module to be imported for each supported source database engine
+ENGINE_DRIVER_MODULES = {
+    'postgresql': 'pg8000',
+    'mysql': 'pymysql',
+    'sqlserver': 'pyodbc',
+    'oracle': 'oracledb'
+}
+
+secrets_manager = None
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the module"""
+
+    global secrets_manager
+    secrets_manager = get_client('secretsmanager')
+
+
+create_clients()
+
+
+@measure_phase(PHASE_SOURCE_CONNECT)
+def get_connection(engine, secret_arn, database_name, host=None, port=None):
+    """ Function to get a new DB-API connection to a source database using the credentials stored in the secret of its glue connection.
+    Only the driver of the requested engine is imported (on first use), so that drivers of other engines are never loaded unless primed with import_drivers.
+    Measured as source connect phase (including retrieval of the secret).
+
+    Parameters
+    ----------
+    engine: str - Source database engine. One of 'postgresql', 'mysql', 'sqlserver' or 'oracle'
+    secret_arn: str - ARN of the secret with credentials used by glue connection to connect to source database
+    database_name: str - Name of the database (service name for oracle) to connect to
+    host: str - Optional. Host of the source database. Used only if not included in secret.
+    port: str - Optional. Port of the source database. Used only if not included in secret.
+
+    Returns
+    -------
+    connection: object - DB-API connection to source database. Cursors can be used as context managers.
+    """
+
+    if engine not in ENGINE_DRIVER_MODULES: raise Exception("Unsupported Database Engine")
+
+    secret_value = get_secret_value(secret_arn)
+    connection_details = {
+        'host': secret_value.get('host', host),
+        'port': int(secret_value.get('port', port)),
+        'username': secret_value['username'],
+        'password': secret_value['password'],
+        'database_name': database_name
+    }
+
+    driver = importlib.import_module(ENGINE_DRIVER_MODULES[engine])
+
+    if engine == 'postgresql': return connect_postgresql(driver, connection_details)
+    if engine == 'mysql': return connect_mysql(driver, connection_details)
+    if engine == 'sqlserver': return connect_sqlserver(driver, connection_details)
+    return connect_oracle(driver, connection_details)
+
+
+def import_drivers():
+    """ Function to import the drivers of all supported source database engines ahead of first connection (i.e. when priming execution environment).
+    Drivers not installed (or failing to load their native libraries) are skipped, so that they fail on connection as usual.
+    """
+
+    for engine, driver_module in ENGINE_DRIVER_MODULES.items():
+        try:
+            importlib.import_module(driver_module)
+        except ImportError as error:
+            print(f'Skipping import of {engine} driver {driver_module}: {error}')
+
+
+def get_secret_value(secret_arn):
+    """ Complementary function to get the parsed value of a secret with source database credentials"""
+
+    secrets_manager_response = secrets_manager.get_secret_value(SecretId=secret_arn)
+    return json.loads(secrets_manager_response['SecretString'])
+
+
+def connect_postgresql(driver, connection_details):
+    """ Complementary function to connect to a postgresql database using pg8000 driver"""
+
+    return driver.connect(
+        host= connection_details['host'],
+        port= connection_details['port'],
+        user= connection_details['username'],
+        password= connection_details['password'],
+        database= connection_details['database_name'],
+        timeout= SOURCE_CONNECT_TIMEOUT_IN_SECONDS
+    )
+
+
+def connect_mysql(driver, connection_details):
+    """ Complementary function to connect to a mysql database using pymysql driver"""
+
+    return driver.connect(
+        host= connection_details['host'],
+        port= connection_details['port'],
+        user= connection_details['username'],
+        password= connection_details['password'],
+        database= connection_details['database_name'],
+        connect_timeout= SOURCE_CONNECT_TIMEOUT_IN_SECONDS
+    )
+
+
+def connect_sqlserver(driver, connection_details):
+    """ Complementary function to connect to a sqlserver database using pyodbc driver"""
+
+    escaped_password = connection_details['password'].replace('}', '}}')
+    connection_string = (
+        f"DRIVER={{{SQLSERVER_ODBC_DRIVER}}};SERVER={connection_details['host']},{connection_details['port']};"
+        f"DATABASE={connection_details['database_name']};UID={connection_details['username']};PWD={{{escaped_password}}}"
+    )
+
+    return driver.connect(connection_string, timeout= SOURCE_CONNECT_TIMEOUT_IN_SECONDS)
+
+
+def connect_oracle(driver, connection_details):
+    """ Complementary function to connect to an oracle database using oracledb driver (thin mode)"""
+
+    return driver.connect(
+        user= connection_details['username'],
+        password= connection_details['password'],
+        dsn= f"{connection_details['host']}:{connection_details['port']}/{connection_details['database_name']}",
+        tcp_connect_timeout= SOURCE_CONNECT_TIMEOUT_IN_SECONDS
+    )
@@ -0,0 +1,28 @@
+from aws_cdk import aws_lambda as lambda_
+
+# Constant: Represents the instruction set architectures that can be set on lambda function sizing profiles
+LAMBDA_ARCHITECTURES = {
+    'arm64': lambda_.Architecture.ARM_64,
+    'x86_64': lambda_.Architecture.X86_64
+}
+
+
+def get_architecture(lambda_sizing: dict) -> lambda_.Architecture:
+    """ Function to get the instruction set architecture of a lambda function from its sizing profile.
+
+    Parameters
+    ----------
+    lambda_sizing: dict
+        dict with the sizing profile of the lambda function including 'architecture'.
+        For more details check 'lambda_functions' in config/account/a_<ACCOUNT_ID>_config.py or config/governance/g_config.py documentation and examples.
+
+    Returns
+    -------
+    architecture: Architecture
+        Architecture of the lambda function.
+    """
+
+    if lambda_sizing['architecture'] not in LAMBDA_ARCHITECTURES:
+        raise Exception(f"Unsupported lambda architecture '{lambda_sizing['architecture']}', must be one of {list(LAMBDA_ARCHITECTURES)}")
+
+    return LAMBDA_ARCHITECTURES[lambda_sizing['architecture']]
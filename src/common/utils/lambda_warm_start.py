@@ -0,0 +1,65 @@
+from aws_cdk import aws_lambda as lambda_
+
+from constructs import Construct
+
+# Constant: Represents the name of the alias (pointing to the latest published version) invoked by workflows on their lambda functions
+LAMBDA_LIVE_ALIAS_NAME = 'live'
+
+
+def get_snap_start_conf(workflow_props: dict, lambda_sizing: dict) -> lambda_.SnapStartConf:
+    """ Function to get the SnapStart configuration of a lambda function of a workflow. SnapStart and provisioned concurrency can not be enabled together.
+
+    Parameters
+    ----------
+    workflow_props: dict
+        dict with workflow properties including 'lambda_snap_start'.
+        For more details check config/account/a_<ACCOUNT_ID>_config.py documentation and examples.
+
+    lambda_sizing: dict
+        dict with the sizing profile of the lambda function including 'provisioned_concurrency'.
+        For more details check 'lambda_functions' in config/account/a_<ACCOUNT_ID>_config.py documentation and examples.
+
+    Returns
+    -------
+    snap_start_conf: SnapStartConf
+        SnapStart configuration on published versions if enabled, else None.
+    """
+
+    if workflow_props['lambda_snap_start'] and lambda_sizing['provisioned_concurrency'] > 0:
+        raise Exception('Lambda SnapStart and provisioned concurrency can not be enabled on the same lambda function')
+
+    return lambda_.SnapStartConf.ON_PUBLISHED_VERSIONS if workflow_props['lambda_snap_start'] else None
+
+
+def add_live_alias(scope: Construct, id: str, function: lambda_.Function, lambda_sizing: dict) -> lambda_.Alias:
+    """ Function to publish a new version of a lambda function (on code or configuration changes) and point its live alias to it.
+    Published versions are the ones snapshotted with SnapStart and the live alias is the one holding provisioned concurrency, so callers must invoke the alias.
+
+    Parameters
+    ----------
+    scope: Construct
+        Scope of the alias construct.
+
+    id: str
+        Id of the alias construct.
+
+    function: Function
+        Lambda function to publish.
+
+    lambda_sizing: dict
+        dict with the sizing profile of the lambda function including 'provisioned_concurrency'.
+        For more details check 'lambda_functions' in config/account/a_<ACCOUNT_ID>_config.py or config/governance/g_config.py documentation and examples.
+
+    Returns
+    -------
+    alias: Alias
+        Live alias of the lambda function.
+    """
+
+    return lambda_.Alias(
+        scope= scope,
+        id= id,
+        alias_name= LAMBDA_LIVE_ALIAS_NAME,
+        version= function.current_version,
+        provisioned_concurrent_executions= lambda_sizing['provisioned_concurrency'] or None
+    )
@@ -0,0 +1,178 @@
+import copy
+import json
+
+from aws_cdk import aws_stepfunctions as stepfunctions
+
+# Constant: Represents the resource prefix of lambda invoke task states
+LAMBDA_INVOKE_RESOURCE = 'arn:aws:states:::lambda:invoke'
+
+# Constant: Represents errors raised when an API or lambda function is throttling requests, per task resource prefix. Retried with a longer exponential backoff so that throughput degrades instead of failing.
+# Errors raised inside a lambda function reach the workflow under their Python class name (botocore modeled exceptions are named after their error code), while service integrations prefix them with the service name
+THROTTLING_ERRORS = {
+    LAMBDA_INVOKE_RESOURCE: [
+        'Lambda.TooManyRequestsException',
+        'Lambda.EC2ThrottledException',
+        'ProvisionedThroughputExceededException',
+        'RequestLimitExceeded',
+        'ThrottlingException',
+        'TooManyRequestsException',
+        'RequestThrottled'
+    ],
+    'arn:aws:states:::states:startExecution': [
+        'StepFunctions.ExecutionLimitExceeded'
+    ],
+    'arn:aws:states:::dynamodb:': [
+        'DynamoDB.ProvisionedThroughputExceededException',
+        'DynamoDB.RequestLimitExceededException',
+        'DynamoDB.ThrottlingException'
+    ]
+}
+
+# Constant: Represents transient service errors that are safe to retry on tasks with idempotent side effects, per task resource prefix. Named as in THROTTLING_ERRORS
+TRANSIENT_ERRORS = {
+    LAMBDA_INVOKE_RESOURCE: [
+        'Lambda.ServiceException',
+        'Lambda.AWSLambdaException',
+        'Lambda.SdkClientException',
+        'Lambda.ClientExecutionTimeoutException',
+        'InternalServerError',
+        'InternalServerException',
+        'InternalServiceError',
+        'ServiceUnavailableException',
+        'EndpointConnectionError',
+        'ConnectTimeoutError',
+        'ReadTimeoutError',
+        'ConnectionClosedError',
+        'SubscriptionItemConflictError'
+    ],
+    'arn:aws:states:::aws-sdk:secretsmanager:': [
+        'SecretsManager.InternalServiceErrorException'
+    ],
+    'arn:aws:states:::dynamodb:': [
+        'DynamoDB.InternalServerErrorException'
+    ]
+}
+
+# Constant: Represents errors raised by lambda functions when an invocation with the same idempotency key is still in progress
+IN_PROGRESS_ERRORS = {
+    LAMBDA_INVOKE_RESOURCE: [
+        'IdempotencyInProgressError'
+    ]
+}
+
+# Constant: Represents errors raised by lambda functions when a source database has no free permit (all concurrent sessions allowed are in use)
+SOURCE_BUSY_ERRORS = {
+    LAMBDA_INVOKE_RESOURCE: [
+        'SemaphoreAcquireTimeoutError'
+    ]
+}
+
+# Constant: Represents retry policies (in evaluation order) for each error class. All use exponential backoff with full jitter
+RETRY_POLICIES = {
+    'throttling': {'ErrorEquals': THROTTLING_ERRORS, 'IntervalSeconds': 2, 'MaxAttempts': 6, 'BackoffRate': 2.0, 'MaxDelaySeconds': 60, 'JitterStrategy': 'FULL'},
+    'in_progress': {'ErrorEquals': IN_PROGRESS_ERRORS, 'IntervalSeconds': 5, 'MaxAttempts': 5, 'BackoffRate': 2.0, 'MaxDelaySeconds': 60, 'JitterStrategy': 'FULL'},
+    'source_busy': {'ErrorEquals': SOURCE_BUSY_ERRORS, 'IntervalSeconds': 10, 'MaxAttempts': 8, 'BackoffRate': 1.5, 'MaxDelaySeconds': 120, 'JitterStrategy': 'FULL'},
+    'transient': {'ErrorEquals': TRANSIENT_ERRORS, 'IntervalSeconds': 1, 'MaxAttempts': 3, 'BackoffRate': 2.0, 'MaxDelaySeconds': 20, 'JitterStrategy': 'FULL'}
+}
+
+# Constant: Represents the suffixes of task resources that start sub-workflows. Only throttling is retried on those, so that a sub-workflow is never run twice by the same task
+SUB_WORKFLOW_RESOURCE_SUFFIXES = ('.waitForTaskToken', '.sync', '.sync:2', ':startSyncExecution')
+
+# Constant: Represents default task timeouts in seconds per task resource prefix. Tasks with an explicit timeout in their definition are left untouched
+DEFAULT_TASK_TIMEOUTS_IN_SECONDS = {
+    'arn:aws:states:::lambda:invoke': 300,
+    'arn:aws:states:::aws-sdk:sfn:startSyncExecution': 330,
+    'arn:aws:states:::aws-sdk:': 60,
+    'arn:aws:states:::dynamodb:': 60
+}
+
+# Constant: Represents the payload field with the name of the task to be run by the connector runtime lambda function
+CONNECTOR_RUNTIME_TASK_KEY = 'Task'
+
+
+def get_definition_body(definition_file_path: str, state_policies: dict = None, lambda_tasks: dict = None) -> stepfunctions.DefinitionBody:
+    """ Function to load a state machine definition (ASL) file and apply solution's retry and timeout policies to all of its task states, including tasks nested in Parallel and Map states.
+    Retry (with error classification, exponential backoff and jitter) and TimeoutSeconds are only added to tasks not already declaring them, Retry only if the task resource raises classified errors.
+    Definition substitutions (${...}) are kept as is.
+
+    Parameters
+    ----------
+    definition_file_path: str
+        Path of the state machine definition file.
+
+    state_policies: dict
+        Optional dict with fields to be set on specific task states (i.e. TimeoutSeconds, HeartbeatSeconds). Each key is the name of a task state and value is a dict of fields.
+
+    lambda_tasks: dict
+        Optional dict with connector runtime tasks run by lambda invoke task states. Each key is the name of a task state and value is the name of the task,
+        added to the state payload as 'Task' field so that the connector runtime routes the invocation to the task handler.
+
+    Returns
+    -------
+    definition_body: DefinitionBody
+        Definition body to be used when creating the state machine.
+    """
+
+    with open(definition_file_path) as definition_file:
+        definition = json.load(definition_file)
+
+    apply_task_policies(definition, state_policies or {}, lambda_tasks or {})
+
+    return stepfunctions.DefinitionBody.from_string(json.dumps(definition, indent=4))
+
+
+def apply_task_policies(definition, state_policies, lambda_tasks):
+    """ Complementary function to apply retry and timeout policies (and connector runtime task names) to all task states of a definition, recursing into Parallel branches and Map item processors"""
+
+    for state_name, state in definition['States'].items():
+        if state['Type'] == 'Task':
+            task_retries = get_task_retries(state['Resource'])
+            if task_retries and 'Retry' not in state:
+                state['Retry'] = task_retries
+
+            task_timeout = get_task_timeout(state['Resource'])
+            if task_timeout and 'TimeoutSeconds' not in state and 'TimeoutSecondsPath' not in state:
+                state['TimeoutSeconds'] = task_timeout
+
+            state.update(state_policies.get(state_name, {}))
+
+            if state_name in lambda_tasks:
+                state['Parameters']['Payload'][CONNECTOR_RUNTIME_TASK_KEY] = lambda_tasks[state_name]
+
+        elif state['Type'] == 'Parallel':
+            for branch in state['Branches']:
+                apply_task_policies(branch, state_policies, lambda_tasks)
+
+        elif state['Type'] == 'Map':
+            apply_task_policies(state.get('ItemProcessor', state.get('Iterator')), state_policies, lambda_tasks)
+
+
+def get_task_retries(resource):
+    """ Complementary function to get retriers of a task state based on the errors raised by its resource, empty if none is classified"""
+
+    error_classes = ['throttling'] if resource.endswith(SUB_WORKFLOW_RESOURCE_SUFFIXES) else RETRY_POLICIES
+
+    task_retries = []
+    for error_class in error_classes:
+        task_errors = get_task_errors(RETRY_POLICIES[error_class]['ErrorEquals'], resource)
+        if task_errors: task_retries.append({**copy.deepcopy(RETRY_POLICIES[error_class]), 'ErrorEquals': task_errors})
+
+    return task_retries
+
+
+def get_task_errors(errors, resource):
+    """ Complementary function to get the errors of a class raised by a task state based on its resource"""
+
+    for resource_prefix, task_errors in errors.items():
+        if resource.startswith(resource_prefix): return list(task_errors)
+
+    return []
+
+
+def get_task_timeout(resource):
+    """ Complementary function to get default timeout of a task state based on its resource, None if not applicable"""
+
+    for resource_prefix, task_timeout in DEFAULT_TASK_TIMEOUTS_IN_SECONDS.items():
+        if resource.startswith(resource_prefix): return task_timeout
+
+    return None
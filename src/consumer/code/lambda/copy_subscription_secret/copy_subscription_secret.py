@@ -3,17 +3,19 @@ import json
 import uuid
 from datetime import datetime
 
-import boto3
 from boto3.dynamodb.types import TypeSerializer
 
-# Constant: Represents the governance account id
-G_ACCOUNT_ID = os.getenv('G_ACCOUNT_ID')
+from dz_conn_common.priming import prime, on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.idempotency import idempotent
+from dz_conn_common.projection import project
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_SECRET_CREATION, PHASE_DYNAMODB_WRITE, PHASE_KMS
 
-# Constant: Represents the governance cross account role name to be used when updating metadata in DynamoDB
-G_CROSS_ACCOUNT_ASSUME_ROLE_NAME = os.getenv('G_CROSS_ACCOUNT_ASSUME_ROLE_NAME')
+# Constant: Represents the region of the governance DynamoDB tables to be used when updating metadata
+G_DYNAMODB_REGION = os.getenv('G_DYNAMODB_REGION')
 
-# Constant: Represents the governance DynamoDB table to map producer and consumer secrets
-G_C_SECRETS_MAPPING_TABLE_NAME = os.getenv('G_C_SECRETS_MAPPING_TABLE_NAME')
+# Constant: Represents the ARN of the governance DynamoDB table to map producer and consumer secrets
+G_C_SECRETS_MAPPING_TABLE_ARN = os.getenv('G_C_SECRETS_MAPPING_TABLE_ARN')
 
 # Constant: Represents the alias of the account common kms key
 A_COMMON_KEY_ALIAS = os.getenv('A_COMMON_KEY_ALIAS')
@@ -24,20 +26,30 @@ ACCOUNT_ID = os.getenv('ACCOUNT_ID')
 # Constant: Represents the region
 REGION = os.getenv('REGION')
 
-g_cross_account_role_arn = f'arn:aws:iam::{G_ACCOUNT_ID}:role/{G_CROSS_ACCOUNT_ASSUME_ROLE_NAME}'
+# Constant: Represents the fields of secrets manager CreateSecret responses used by the function
+SECRETS_MANAGER_CREATE_SECRET_FIELDS = ['ARN', 'Name']
 
-kms = boto3.client('kms')
-secrets_manager = boto3.client('secretsmanager')
-sts = boto3.client('sts')
-sts_session = sts.assume_role(RoleArn=g_cross_account_role_arn, RoleSessionName='c-dynamodb-session')
+kms = None
+secrets_manager = None
+dynamodb = None
+dynamodb_serializer = TypeSerializer()
 
-session_key_id = sts_session['Credentials']['AccessKeyId']
-session_access_key = sts_session['Credentials']['SecretAccessKey']
-session_token = sts_session['Credentials']['SessionToken']
+kms_key_arn = None
 
-dynamodb = boto3.client('dynamodb', aws_access_key_id=session_key_id, aws_secret_access_key=session_access_key, aws_session_token=session_token)
-dynamodb_serializer = TypeSerializer()
 
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
+
+    global kms, secrets_manager, dynamodb
+    kms = get_client('kms')
+    secrets_manager = get_client('secretsmanager')
+    dynamodb = get_client('dynamodb', region_name=G_DYNAMODB_REGION)
+
+
+create_clients()
+
+@idempotent(key_paths=['SubscriptionDetails.ConsumerProjectDetails.EnvironmentId', 'ProducerGrantDetails.SecretArn'])
 def handler(event, context):
     """ Function handler: Function that will copy a subscription secret by 1/ Retrieving producer shared secret and copying its content into a new one local to the consumer account and 
     2/ Updating metadata in governance DynamoDB table that maps producer and consumer secrets.
@@ -75,6 +87,9 @@ def handler(event, context):
     )
 
     shared_subscription_secret_value = json.loads(secrets_manager_response['SecretString'])
+
+    # Producer account is the owner of the shared secret (account id field of its ARN)
+    set_metric_dimensions(engine=shared_subscription_secret_value.get('engine'), producer_account_id=shared_subscription_secret_arn.split(':')[4])
     
     project_secret_name_suffix = str(uuid.uuid4()).replace('-', '')
     project_secret_name = f'dz-conn-c-{consumer_project_id}-{consumer_environment_id}-{project_secret_name_suffix}'
@@ -93,18 +108,13 @@ def handler(event, context):
     return response
 
 
+@measure_phase(PHASE_SECRET_CREATION)
 def create_secret(secret_name, secret_value, environment_id, project_id, domain_id ):
     """ Complementary function to create a new secret local to the consumer account and associated to subscribing project"""
 
-    kms_response = kms.describe_key(
-        KeyId= f'alias/{A_COMMON_KEY_ALIAS}'
-    )
-    
-    kms_key_arn = kms_response['KeyMetadata']['Arn']
-    
     secrets_manager_response = secrets_manager.create_secret(
         Name=secret_name,
-        KmsKeyId=kms_key_arn,
+        KmsKeyId=get_kms_key_arn(),
         SecretString=json.dumps(secret_value),
         Tags=[
             {
@@ -122,11 +132,27 @@ def create_secret(secret_name, secret_value, environment_id, project_id, domain_
         ]
     )
     
-    secrets_manager_response = json.loads(json.dumps(secrets_manager_response, default=json_datetime_encoder))
+    secrets_manager_response = project(secrets_manager_response, SECRETS_MANAGER_CREATE_SECRET_FIELDS)
     
     return secrets_manager_response
 
 
+def get_kms_key_arn():
+    """ Complementary function to get the ARN of the account common kms key from its alias. Looked up once per execution environment"""
+
+    global kms_key_arn
+    if kms_key_arn is None:
+        with measure_phase(PHASE_KMS):
+            kms_response = kms.describe_key(
+                KeyId= f'alias/{A_COMMON_KEY_ALIAS}'
+            )
+
+        kms_key_arn = kms_response['KeyMetadata']['Arn']
+
+    return kms_key_arn
+
+
+@measure_phase(PHASE_DYNAMODB_WRITE)
 def update_secret_association_item(shared_secret_arn, secret_arn, secret_name, environment_id, project_id, domain_id):
     """ Complementary function to update item with secret mapping details in respective governance DynamoDB table"""
 
@@ -143,13 +169,12 @@ def update_secret_association_item(shared_secret_arn, secret_arn, secret_name, e
     }
     
     dynamodb_response = dynamodb.put_item(
-        TableName=G_C_SECRETS_MAPPING_TABLE_NAME,
+        TableName=G_C_SECRETS_MAPPING_TABLE_ARN,
         Item={key: dynamodb_serializer.serialize(value) for key, value in secret_association_item.items()}
     )
     
     return secret_association_item
 
 
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
+# Priming: run expensive initialization on init phase of SnapStart / provisioned concurrency execution environments
+prime(get_kms_key_arn)
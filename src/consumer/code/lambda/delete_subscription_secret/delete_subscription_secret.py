@@ -1,36 +1,43 @@
 import os
-import json
-from datetime import datetime
 
-import boto3
 from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
 
-# Constant: Represents the governance account id
-G_ACCOUNT_ID = os.getenv('G_ACCOUNT_ID')
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.idempotency import idempotent
+from dz_conn_common.projection import project
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_DYNAMODB_WRITE
 
-# Constant: Represents the governance cross account role name to be used when updating metadata in DynamoDB
-G_CROSS_ACCOUNT_ASSUME_ROLE_NAME = os.getenv('G_CROSS_ACCOUNT_ASSUME_ROLE_NAME')
+# Constant: Represents the region of the governance DynamoDB tables to be used when updating metadata
+G_DYNAMODB_REGION = os.getenv('G_DYNAMODB_REGION')
 
-# Constant: Represents the governance DynamoDB table to map producer and consumer secrets
-G_C_SECRETS_MAPPING_TABLE_NAME = os.getenv('G_C_SECRETS_MAPPING_TABLE_NAME')
+# Constant: Represents the ARN of the governance DynamoDB table to map producer and consumer secrets
+G_C_SECRETS_MAPPING_TABLE_ARN = os.getenv('G_C_SECRETS_MAPPING_TABLE_ARN')
 
 # Constant: Represents the recovery window in days that will be assigned when scheduling secret deletion
 RECOVERY_WINDOW_IN_DAYS = os.getenv('RECOVERY_WINDOW_IN_DAYS')
 
-g_cross_account_role_arn = f'arn:aws:iam::{G_ACCOUNT_ID}:role/{G_CROSS_ACCOUNT_ASSUME_ROLE_NAME}'
+# Constant: Represents the fields of secrets manager DeleteSecret responses used by the function
+SECRETS_MANAGER_DELETE_SECRET_FIELDS = ['ARN', 'Name', 'DeletionDate']
 
-secrets_manager = boto3.client('secretsmanager')
-sts = boto3.client('sts')
-sts_session = sts.assume_role(RoleArn=g_cross_account_role_arn, RoleSessionName='p-dynamodb-session')
-
-session_key_id = sts_session['Credentials']['AccessKeyId']
-session_access_key = sts_session['Credentials']['SecretAccessKey']
-session_token = sts_session['Credentials']['SessionToken']
-
-dynamodb = boto3.client('dynamodb', aws_access_key_id=session_key_id, aws_secret_access_key=session_access_key, aws_session_token=session_token)
+secrets_manager = None
+dynamodb = None
 dynamodb_serializer = TypeSerializer()
 dynamodb_deserializer = TypeDeserializer()
 
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
+
+    global secrets_manager, dynamodb
+    secrets_manager = get_client('secretsmanager')
+    dynamodb = get_client('dynamodb', region_name=G_DYNAMODB_REGION)
+
+
+create_clients()
+
+@idempotent(key_paths=['ProducerRevokeDetails.SecretArn'])
 def handler(event, context):
     """ Function handler: Function that will delete a subscription secret by 1/ Scheduling its deletion and 
     2/ Deleting metadata item in the governance DynamoDB table that maps associated producer and consumer secrets.
@@ -55,6 +62,10 @@ def handler(event, context):
     producer_revoke_details = event['ProducerRevokeDetails']
 
     shared_secret_arn = producer_revoke_details['SecretArn']
+
+    # Producer account is the owner of the shared secret (account id field of its ARN)
+    set_metric_dimensions(producer_account_id=shared_secret_arn.split(':')[4])
+
     secret_association_item = get_secret_association_item(shared_secret_arn)
 
     secret_name = secret_association_item['secret_name']
@@ -77,7 +88,8 @@ def get_secret_association_item(shared_secret_arn):
     """ Complementary function to get item with secret mapping details in respective governance DynamoDB table"""
 
     dynamodb_response = dynamodb.get_item(
-        TableName=G_C_SECRETS_MAPPING_TABLE_NAME,
+        TableName=G_C_SECRETS_MAPPING_TABLE_ARN,
+        ConsistentRead= True,
         Key={ 'shared_secret_arn': dynamodb_serializer.serialize(shared_secret_arn) }
     )
 
@@ -86,11 +98,12 @@ def get_secret_association_item(shared_secret_arn):
     return secret_association_item
 
 
+@measure_phase(PHASE_DYNAMODB_WRITE)
 def delete_secret_association_item(shared_secret_arn):
     """ Complementary function to delete item with secret mapping details in respective governance DynamoDB table"""
 
     dynamodb_response = dynamodb.delete_item(
-        TableName=G_C_SECRETS_MAPPING_TABLE_NAME,
+        TableName=G_C_SECRETS_MAPPING_TABLE_ARN,
         Key={ 'shared_secret_arn': dynamodb_serializer.serialize(shared_secret_arn) }
     )
 
@@ -103,11 +116,6 @@ def delete_secret(secret_name):
         RecoveryWindowInDays= int(RECOVERY_WINDOW_IN_DAYS)
     )
     
-    secrets_manager_response = json.loads(json.dumps(secrets_manager_response, default=json_datetime_encoder))
+    secrets_manager_response = project(secrets_manager_response, SECRETS_MANAGER_DELETE_SECRET_FIELDS)
     
     return secrets_manager_response 
-
-
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
\ No newline at end of file
@@ -1,37 +1,48 @@
 import os
-from datetime import datetime
 
-import boto3
 from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 
-# Constant: Represents the governance account id
-G_ACCOUNT_ID = os.getenv('G_ACCOUNT_ID')
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.idempotency import idempotent
+from dz_conn_common.metrics import measure_phase, PHASE_DYNAMODB_WRITE
 
-# Constant: Represents the governance cross account role name to be used when updating metadata in DynamoDB
-G_CROSS_ACCOUNT_ASSUME_ROLE_NAME = os.getenv('G_CROSS_ACCOUNT_ASSUME_ROLE_NAME')
+# Constant: Represents the region of the governance DynamoDB tables to be used when updating metadata
+G_DYNAMODB_REGION = os.getenv('G_DYNAMODB_REGION')
 
-# Constant: Represents the governance DynamoDB table to track consumer subscriptions (assets)
-G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME = os.getenv('G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME')
+# Constant: Represents the ARN of the governance DynamoDB table to track consumer subscriptions (assets)
+G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN = os.getenv('G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN')
 
-g_cross_account_role_arn = f'arn:aws:iam::{G_ACCOUNT_ID}:role/{G_CROSS_ACCOUNT_ASSUME_ROLE_NAME}'
+# Constant: Represents the attributes of asset subscription items returned by the function. Set to None when the item does not exist
+ASSET_SUBSCRIPTION_ITEM_ATTRIBUTES = [
+    'datazone_consumer_environment_id', 'datazone_consumer_project_id', 'datazone_domain_id', 'datazone_asset_id', 'datazone_asset_revision', 'datazone_asset_type',
+    'datazone_listing_id', 'datazone_listing_revision', 'datazone_listing_name', 'secret_arn', 'secret_name', 'owner_account', 'owner_region', 'last_updated'
+]
 
-sts = boto3.client('sts')
-sts_session = sts.assume_role(RoleArn=g_cross_account_role_arn, RoleSessionName='p-dynamodb-session')
-
-session_key_id = sts_session['Credentials']['AccessKeyId']
-session_access_key = sts_session['Credentials']['SecretAccessKey']
-session_token = sts_session['Credentials']['SessionToken']
-
-dynamodb = boto3.client('dynamodb', aws_access_key_id=session_key_id, aws_secret_access_key=session_access_key, aws_session_token=session_token)
+dynamodb = None
 dynamodb_deserializer = TypeDeserializer()
 dynamodb_serializer = TypeSerializer()
 
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
+
+    global dynamodb
+    dynamodb = get_client('dynamodb', region_name=G_DYNAMODB_REGION)
+
+
+create_clients()
+
+@idempotent(key_paths=['SubscriptionDetails.ConsumerProjectDetails.EnvironmentId', 'SubscriptionDetails.AssetDetails.Id'])
 def handler(event, context):
-    """ Function handler: Function that will delete subscription asset metadata in governance DynamoDB table
+    """ Function handler: Function that will delete subscription asset metadata in governance DynamoDB table (replica in account region when available).
+    Item is read before being deleted, so that a subscription with no metadata (i.e. already removed) is reported with empty details instead of failing the revoke.
 
     Parameters
     ----------
     event: dict - Input event dict containing:
+        IdempotencyToken: str - Token identifying the workflow execution. Retries of the same execution return the details of the first (deleted) item
         SubscriptionDetails: dict - Dict containing subscription details including:
             ConsumerProjectDetails: dict - Dict containing consumer details including:
                 EnvironmentId: str - Id of the DataZone consumer environment
@@ -42,7 +53,7 @@ def handler(event, context):
 
     Returns
     -------
-    response: dict - Dict with response details:
+    response: dict - Dict with response details (None values when there was no item):
         datazone_consumer_environment_id: str - Id of DataZone environment that subscribed to the asset
         datazone_consumer_project_id: str - Id of DataZone project that subscribed to the asset
         datazone_domain_id: str - Id of DataZone domain
@@ -58,48 +69,52 @@ def handler(event, context):
         owner_region: str - Region that owns the item
         last_updated: str - Datetime of last update performed on the item
     """
+
     subscription_details = event['SubscriptionDetails']
-    
-    consumer_project_details = subscription_details['ConsumerProjectDetails']
-    consumer_asset_details = subscription_details['AssetDetails']
-    
-    environment_id = consumer_project_details['EnvironmentId']
-    asset_id = consumer_asset_details['Id']
-    
+
+    environment_id = subscription_details['ConsumerProjectDetails']['EnvironmentId']
+    asset_id = subscription_details['AssetDetails']['Id']
+
     asset_subscription_item = get_asset_subscription_item(environment_id, asset_id)
-    delete_asset_subscription_item(environment_id, asset_id)
 
-    return asset_subscription_item
+    if asset_subscription_item is None:
+        print(f'No subscription records for environment {environment_id} and asset {asset_id}')
+        asset_subscription_item = {}
+    else:
+        delete_asset_subscription_item(environment_id, asset_id)
+
+    response = {attribute: asset_subscription_item.get(attribute) for attribute in ASSET_SUBSCRIPTION_ITEM_ATTRIBUTES}
+
+    return response
 
 
 def get_asset_subscription_item(environment_id, asset_id):
-    """ Complementary function to get item with asset subscription details from respective governance DynamoDB table """
+    """ Complementary function to get item with asset subscription details from respective governance DynamoDB table, None if it does not exist"""
 
     dynamodb_response = dynamodb.get_item(
-        TableName=G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME,
-        Key={ 
+        TableName= G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN,
+        ConsistentRead= True,
+        Key= {
             'datazone_consumer_environment_id': dynamodb_serializer.serialize(environment_id),
             'datazone_asset_id': dynamodb_serializer.serialize(asset_id)
         }
     )
 
-    asset_subscription_item = {key: dynamodb_deserializer.deserialize(value) for key, value in dynamodb_response['Item'].items()}
-    
+    asset_subscription_item = None
+    if 'Item' in dynamodb_response:
+        asset_subscription_item = {key: dynamodb_deserializer.deserialize(value) for key, value in dynamodb_response['Item'].items()}
+
     return asset_subscription_item
 
 
+@measure_phase(PHASE_DYNAMODB_WRITE)
 def delete_asset_subscription_item(environment_id, asset_id):
     """ Complementary function to delete item with asset subscription details in respective governance DynamoDB table"""
 
-    dynamodb_response = dynamodb.delete_item(
-        TableName=G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME,
-        Key={
+    dynamodb.delete_item(
+        TableName= G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN,
+        Key= {
             'datazone_consumer_environment_id': dynamodb_serializer.serialize(environment_id),
             'datazone_asset_id': dynamodb_serializer.serialize(asset_id)
         }
     )
-
-
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
\ No newline at end of file
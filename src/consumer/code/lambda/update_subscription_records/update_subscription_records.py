@@ -1,20 +1,20 @@
 import os
 from datetime import datetime
 
-import boto3
 from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 
-# Constant: Represents the governance account id
-G_ACCOUNT_ID = os.getenv('G_ACCOUNT_ID')
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_DYNAMODB_WRITE
 
-# Constant: Represents the governance cross account role name to be used when updating metadata in DynamoDB
-G_CROSS_ACCOUNT_ASSUME_ROLE_NAME = os.getenv('G_CROSS_ACCOUNT_ASSUME_ROLE_NAME')
+# Constant: Represents the region of the governance DynamoDB tables to be used when updating metadata
+G_DYNAMODB_REGION = os.getenv('G_DYNAMODB_REGION')
 
-# Constant: Represents the governance DynamoDB table to map producer and consumer secrets
-G_C_SECRETS_MAPPING_TABLE_NAME = os.getenv('G_C_SECRETS_MAPPING_TABLE_NAME')
+# Constant: Represents the ARN of the governance DynamoDB table to map producer and consumer secrets
+G_C_SECRETS_MAPPING_TABLE_ARN = os.getenv('G_C_SECRETS_MAPPING_TABLE_ARN')
 
-# Constant: Represents the governance DynamoDB table to track consumer subscriptions (assets)
-G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME = os.getenv('G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME')
+# Constant: Represents the ARN of the governance DynamoDB table to track consumer subscriptions (assets)
+G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN = os.getenv('G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN')
 
 # Constant: Represents the account id
 ACCOUNT_ID = os.getenv('ACCOUNT_ID')
@@ -22,18 +22,20 @@ ACCOUNT_ID = os.getenv('ACCOUNT_ID')
 # Constant: Represents the region
 REGION = os.getenv('REGION')
 
-g_cross_account_role_arn = f'arn:aws:iam::{G_ACCOUNT_ID}:role/{G_CROSS_ACCOUNT_ASSUME_ROLE_NAME}'
+dynamodb = None
+dynamodb_deserializer = TypeDeserializer()
+dynamodb_serializer = TypeSerializer()
 
-sts = boto3.client('sts')
-sts_session = sts.assume_role(RoleArn=g_cross_account_role_arn, RoleSessionName='p-dynamodb-session')
 
-session_key_id = sts_session['Credentials']['AccessKeyId']
-session_access_key = sts_session['Credentials']['SecretAccessKey']
-session_token = sts_session['Credentials']['SessionToken']
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
+
+    global dynamodb
+    dynamodb = get_client('dynamodb', region_name=G_DYNAMODB_REGION)
 
-dynamodb = boto3.client('dynamodb', aws_access_key_id=session_key_id, aws_secret_access_key=session_access_key, aws_session_token=session_token)
-dynamodb_deserializer = TypeDeserializer()
-dynamodb_serializer = TypeSerializer()
+
+create_clients()
 
 def handler(event, context):
     """ Function handler: Function that will update subscription asset metadata in governance DynamoDB table
@@ -94,6 +96,9 @@ def handler(event, context):
     listing_revision = listing_details['Revision']
     listing_name = listing_details['Name']
 
+    glue_table_details = asset_details.get('GlueTableDetails', {})
+    set_metric_dimensions(engine=glue_table_details.get('SourceClassification'), producer_account_id=glue_table_details.get('AccountId'))
+
     shared_secret_arn = producer_grant_details['SecretArn']
     secret_association_item = get_secret_association_item(shared_secret_arn)
     secret_arn = secret_association_item['secret_arn']
@@ -111,7 +116,8 @@ def get_secret_association_item(shared_secret_arn):
     """ Complementary function to get item with secret mapping details in respective governance DynamoDB table"""
 
     dynamodb_response = dynamodb.get_item(
-        TableName= G_C_SECRETS_MAPPING_TABLE_NAME,
+        TableName= G_C_SECRETS_MAPPING_TABLE_ARN,
+        ConsistentRead= True,
         Key= { 'shared_secret_arn': dynamodb_serializer.serialize(shared_secret_arn) }
     )
     
@@ -122,6 +128,7 @@ def get_secret_association_item(shared_secret_arn):
     return secret_association_item
 
 
+@measure_phase(PHASE_DYNAMODB_WRITE)
 def update_asset_subscription_item(environment_id, project_id, domain_id, asset_id, asset_revision, asset_type, listing_id, listing_revision, listing_name, secret_arn, secret_name):
     """ Complementary function to update item with asset subscription details in respective governance DynamoDB table"""
 
@@ -144,13 +151,8 @@ def update_asset_subscription_item(environment_id, project_id, domain_id, asset_
     }
     
     dynamodb_response = dynamodb.put_item(
-        TableName=G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME,
+        TableName=G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN,
         Item={key: dynamodb_serializer.serialize(value) for key, value in asset_subscription_item.items()}
     )
     
     return asset_subscription_item
-
-
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
@@ -1,7 +1,11 @@
 from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.stepfunctions_definition import get_definition_body
+from src.common.utils.lambda_warm_start import get_snap_start_conf, add_live_alias
+from src.common.utils.lambda_sizing import get_architecture
 
 from aws_cdk import (
     Environment,
+    Duration,
     RemovalPolicy,
     aws_lambda as lambda_,
     aws_stepfunctions as stepfunctions,
@@ -41,43 +45,85 @@ class ConsumerManageSubscriptionGrantWorkflowConstruct(Construct):
         super().__init__(scope, construct_id, **kwargs)
         account_id, region = account_props['account_id'], account_props['region']
         
-        # ---------------- Lambda ------------------------
-        c_copy_subscription_secret_lambda = lambda_.Function(
-            scope= self,
-            id= 'c_copy_subscription_secret_lambda',
-            function_name= 'dz_conn_c_copy_subscription_secret',
-            runtime= lambda_.Runtime.PYTHON_3_11,
-            code=lambda_.Code.from_asset(path.join('src/consumer/code/lambda', "copy_subscription_secret")),
-            handler= "copy_subscription_secret.handler",
-            role= common_constructs['a_common_lambda_role'],
-            environment= {
-                'G_ACCOUNT_ID': GLOBAL_VARIABLES['governance']['g_account_number'],
-                'G_CROSS_ACCOUNT_ASSUME_ROLE_NAME': GLOBAL_VARIABLES['governance']['g_cross_account_assume_role_name'],
-                'G_C_SECRETS_MAPPING_TABLE_NAME': GLOBAL_VARIABLES['governance']['g_c_secrets_mapping_table_name'],
-                'A_COMMON_KEY_ALIAS': common_constructs['a_common_key_alias'],
-                'ACCOUNT_ID': account_id,
-                'REGION': region
-            }
-        )
+        a_connector_runtime_props = account_props['connector_runtime']
+
+        if a_connector_runtime_props['enabled']:
+            # ---------------- Connector Runtime ------------------------
+            # Tasks are served by the account connector runtime function (through its live alias), created in account connector runtime stack
+            a_connector_runtime_lambda_alias = common_constructs['a_connector_runtime_lambda_alias']
+
+            c_copy_subscription_secret_lambda_arn = a_connector_runtime_lambda_alias.function_arn
+            c_update_subscription_records_lambda_arn = a_connector_runtime_lambda_alias.function_arn
+        else:
+            # ---------------- Lambda ------------------------
+            c_copy_subscription_secret_lambda_sizing = account_props['lambda_functions']['c_copy_subscription_secret']
+            c_copy_subscription_secret_lambda = lambda_.Function(
+                scope= self,
+                id= 'c_copy_subscription_secret_lambda',
+                function_name= 'dz_conn_c_copy_subscription_secret',
+                runtime= lambda_.Runtime.PYTHON_3_12,
+                code=lambda_.Code.from_asset(path.join('src/consumer/code/lambda', "copy_subscription_secret")),
+                handler= "copy_subscription_secret.handler",
+                memory_size= c_copy_subscription_secret_lambda_sizing['memory_size'],
+                architecture= get_architecture(c_copy_subscription_secret_lambda_sizing),
+                timeout= Duration.seconds(c_copy_subscription_secret_lambda_sizing['timeout_in_seconds']),
+                snap_start= get_snap_start_conf(workflow_props, c_copy_subscription_secret_lambda_sizing),
+                layers= [
+                    common_constructs['a_common_layer']
+                ],
+                role= common_constructs['a_common_lambda_role'],
+                environment= {
+                    'A_IDEMPOTENCY_TABLE_NAME': common_constructs['a_idempotency_table_name'],
+                    'G_DYNAMODB_REGION': common_constructs['g_dynamodb_region'],
+                    'G_C_SECRETS_MAPPING_TABLE_ARN': common_constructs['g_c_secrets_mapping_table_arn'],
+                    'A_COMMON_KEY_ALIAS': common_constructs['a_common_key_alias'],
+                    'ACCOUNT_ID': account_id,
+                    'REGION': region
+                }
+            )
+
+            c_copy_subscription_secret_lambda_alias = add_live_alias(
+                scope= self,
+                id= 'c_copy_subscription_secret_lambda_alias',
+                function= c_copy_subscription_secret_lambda,
+                lambda_sizing= c_copy_subscription_secret_lambda_sizing
+            )
+
+            c_update_subscription_records_lambda_sizing = account_props['lambda_functions']['c_update_subscription_records']
+            c_update_subscription_records_lambda = lambda_.Function(
+                scope= self,
+                id= 'c_update_subscription_records_lambda',
+                function_name= 'dz_conn_c_update_subscription_records',
+                runtime= lambda_.Runtime.PYTHON_3_12,
+                code=lambda_.Code.from_asset(path.join('src/consumer/code/lambda', "update_subscription_records")),
+                handler= "update_subscription_records.handler",
+                memory_size= c_update_subscription_records_lambda_sizing['memory_size'],
+                architecture= get_architecture(c_update_subscription_records_lambda_sizing),
+                timeout= Duration.seconds(c_update_subscription_records_lambda_sizing['timeout_in_seconds']),
+                snap_start= get_snap_start_conf(workflow_props, c_update_subscription_records_lambda_sizing),
+                layers= [
+                    common_constructs['a_common_layer']
+                ],
+                role= common_constructs['a_common_lambda_role'],
+                environment= {
+                    'G_DYNAMODB_REGION': common_constructs['g_dynamodb_region'],
+                    'G_C_SECRETS_MAPPING_TABLE_ARN': common_constructs['g_c_secrets_mapping_table_arn'],
+                    'G_C_ASSET_SUBSCRIPTIONS_TABLE_ARN': common_constructs['g_c_asset_subscriptions_table_arn'],
+                    'ACCOUNT_ID': account_id,
+                    'REGION': region
+                }
+            )
+
+            c_update_subscription_records_lambda_alias = add_live_alias(
+                scope= self,
+                id= 'c_update_subscription_records_lambda_alias',
+                function= c_update_subscription_records_lambda,
+                lambda_sizing= c_update_subscription_records_lambda_sizing
+            )
+
+            c_copy_subscription_secret_lambda_arn = c_copy_subscription_secret_lambda_alias.function_arn
+            c_update_subscription_records_lambda_arn = c_update_subscription_records_lambda_alias.function_arn
 
-        c_update_subscription_records_lambda = lambda_.Function(
-            scope= self,
-            id= 'c_update_subscription_records_lambda',
-            function_name= 'dz_conn_c_update_subscription_records',
-            runtime= lambda_.Runtime.PYTHON_3_11,
-            code=lambda_.Code.from_asset(path.join('src/consumer/code/lambda', "update_subscription_records")),
-            handler= "update_subscription_records.handler",
-            role= common_constructs['a_common_lambda_role'],
-            environment= {
-                'G_ACCOUNT_ID': GLOBAL_VARIABLES['governance']['g_account_number'],
-                'G_CROSS_ACCOUNT_ASSUME_ROLE_NAME': GLOBAL_VARIABLES['governance']['g_cross_account_assume_role_name'],
-                'G_C_SECRETS_MAPPING_TABLE_NAME': GLOBAL_VARIABLES['governance']['g_c_secrets_mapping_table_name'],
-                'G_C_ASSET_SUBSCRIPTIONS_TABLE_NAME': GLOBAL_VARIABLES['governance']['g_c_asset_subscriptions_table_name'],
-                'ACCOUNT_ID': account_id,
-                'REGION': region
-            }
-        )
-        
         # ---------------- Step Functions ------------------------    
         c_manage_subscription_grant_state_machine_name = GLOBAL_VARIABLES['consumer']['c_manage_subscription_grant_state_machine_name']
 
@@ -92,15 +138,25 @@ class ConsumerManageSubscriptionGrantWorkflowConstruct(Construct):
             scope= self,
             id= 'c_manage_subscription_grant_state_machine',
             state_machine_name= GLOBAL_VARIABLES['consumer']['c_manage_subscription_grant_state_machine_name'],
-            definition_body=stepfunctions.DefinitionBody.from_file('src/consumer/code/stepfunctions/consumer_manage_subscription_grant_workflow.asl.json'),
+            definition_body=get_definition_body(
+                'src/consumer/code/stepfunctions/consumer_manage_subscription_grant_workflow.asl.json',
+                lambda_tasks= {
+                    'Copy subscription secret': 'copy_subscription_secret',
+                    'Update subscription records': 'update_subscription_records'
+                } if a_connector_runtime_props['enabled'] else None
+            ),
             definition_substitutions= {
-                'c_copy_subscription_secret_lambda_arn': c_copy_subscription_secret_lambda.function_arn,
-                'c_update_subscription_records_lambda_arn': c_update_subscription_records_lambda.function_arn
+                'c_copy_subscription_secret_lambda_arn': c_copy_subscription_secret_lambda_arn,
+                'c_update_subscription_records_lambda_arn': c_update_subscription_records_lambda_arn,
+                'a_send_workflow_callback_lambda_arn': common_constructs['a_send_workflow_callback_lambda'].function_arn
             },
+            state_machine_type= stepfunctions.StateMachineType.EXPRESS if workflow_props['express_workflow'] else stepfunctions.StateMachineType.STANDARD,
             role= common_constructs['a_common_sf_role'],
             logs= stepfunctions.LogOptions(
                 destination=c_manage_subscription_grant_state_machine_logs,
-                level=stepfunctions.LogLevel.ALL
+                level=stepfunctions.LogLevel.ERROR if workflow_props['express_workflow'] else stepfunctions.LogLevel.ALL,
+                # Express workflows have no execution history, so input / output is only logged for them (on errors). Standard ones keep it in their history
+                include_execution_data=workflow_props['express_workflow']
             ),
             tracing_enabled=True
         )
@@ -0,0 +1,33 @@
+from dz_conn_common.producer_account_permits import acquire_producer_account_permit
+
+def handler(event, context):
+    """ Function handler: Function that will try to take a permit of the producer account of a subscription grant workflow, so that a single producer account cannot take all grant capacity.
+    It does not wait for a permit: subscription grant workflow waits (Wait state) and calls it again while all permits of the producer account are held, so that waiting grants
+    are running executions and their queued message is held until they finish instead of being delivered again. Permit is released by run_subscription_workflow once the execution finishes.
+
+    Parameters
+    ----------
+    event: dict - Input event dict containing:
+        ProducerAccountId: str - Id of the producer account of the subscribed asset
+        LeaseId: str - Id of the lease holding the permit, i.e. name of the grant execution
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    response: dict - Dict with response details including:
+        Acquired: bool - If a permit of the producer account is held by the grant execution or not (all permits held by other executions)
+    """
+
+    producer_account_id = event['ProducerAccountId']
+    lease_id = event['LeaseId']
+
+    acquired = acquire_producer_account_permit(producer_account_id, lease_id)
+    if not acquired:
+        print(f'Execution {lease_id} waiting for a permit of producer account {producer_account_id}')
+
+    response = {
+        'Acquired': acquired
+    }
+
+    return response
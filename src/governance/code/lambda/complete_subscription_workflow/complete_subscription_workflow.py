@@ -0,0 +1,63 @@
+import os
+from botocore.exceptions import ClientError
+
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the errors returned by SQS when a message can no longer be released (already deleted, delivered again or receipt handle expired)
+RELEASED_MESSAGE_ERROR_CODES = ['ReceiptHandleIsInvalid', 'InvalidParameterValue', 'MessageNotInflight', 'AWS.SimpleQueueService.MessageNotInflight']
+
+# Constant: Represents the governance DynamoDB table that will store the queued message of each running subscription workflow execution
+G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME = os.getenv('G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME')
+
+dynamodb = get_client('dynamodb')
+
+sqs = get_client('sqs')
+
+def handler(event, context):
+    """ Function handler: Function that will release the queued message of a subscription workflow (grant or revoke) once its execution finishes.
+    Message is made visible right away, so that it is delivered again to run_subscription_workflow, which will complete the workflow (delete the message from its lane)
+    and unblock the following workflows of the same (consumer environment, asset). Triggered by Step Functions execution status change events of subscription workflows.
+
+    Parameters
+    ----------
+    event: dict - EventBridge event including:
+        detail: dict - Details of the event including:
+            executionArn: str - Arn of the finished execution
+            status: str - Status of the finished execution
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    response: dict - Dict with response details including:
+        execution_arn: str - Arn of the finished execution
+        released: bool - If the queued message of the execution was released or not (not held, already released or delivered again)
+    """
+
+    execution_arn = event['detail']['executionArn']
+
+    dynamodb_response = dynamodb.get_item(
+        TableName= G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME,
+        Key= {'execution_arn': {'S': execution_arn}}
+    )
+
+    message_item = dynamodb_response.get('Item')
+    released = False
+
+    if message_item is None:
+        print(f'No queued message held for execution {execution_arn}')
+
+    else:
+        try:
+            sqs.change_message_visibility(QueueUrl=message_item['queue_url']['S'], ReceiptHandle=message_item['receipt_handle']['S'], VisibilityTimeout=0)
+            released = True
+        except ClientError as error:
+            if error.response['Error']['Code'] not in RELEASED_MESSAGE_ERROR_CODES: raise
+            print(f'Queued message of execution {execution_arn} already released: {error}')
+
+    response = {
+        'execution_arn': execution_arn,
+        'released': released
+    }
+
+    return response
@@ -1,9 +1,10 @@
 import os
 import json
-import boto3
-from datetime import datetime
 
-datazone = boto3.client('datazone') 
+from dz_conn_common.clients import get_client
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_DATAZONE_LOOKUP
+
+datazone = get_client('datazone') 
 
 def handler(event, context):
     """ Function handler: Function that will retrieve environment's details. 1/ Will retrieve environment metadata from Amazon DataZone, then
@@ -38,7 +39,11 @@ def handler(event, context):
     environment_id = event_details['data']['environmentId']
     delete_status_overwrite = True if 'delete' in event_details['data'] else False
 
-    datazone_response = datazone.get_environment(domainIdentifier=domain_id, identifier=environment_id)
+    set_metric_dimensions()
+
+    with measure_phase(PHASE_DATAZONE_LOOKUP):
+        datazone_response = datazone.get_environment(domainIdentifier=domain_id, identifier=environment_id)
+
     account_id = datazone_response['awsAccountId']
     region = datazone_response['awsAccountRegion']
     project_id = datazone_response['projectId']
@@ -52,7 +57,9 @@ def handler(event, context):
             resource['name']: resource['value'] for resource in datazone_response['provisionedResources']
         }
 
-    datazone_response = datazone.get_environment_blueprint(domainIdentifier=domain_id, identifier=environment_blueprint_id)
+    with measure_phase(PHASE_DATAZONE_LOOKUP):
+        datazone_response = datazone.get_environment_blueprint(domainIdentifier=domain_id, identifier=environment_blueprint_id)
+
     environment_blueprint_name = datazone_response['name']
 
     environment_details = {
@@ -69,7 +76,3 @@ def handler(event, context):
     }
 
     return environment_details
-
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
@@ -1,17 +1,13 @@
-import os
-import json
-import boto3
-from datetime import datetime
+from dz_conn_common.clients import get_client
+from dz_conn_common.listing_details_cache import get_listing_details
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_DATAZONE_LOOKUP
 
-datazone = boto3.client('datazone') 
+datazone = get_client('datazone') 
 
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
 
 def handler(event, context):
-    """ Function handler: Function that will retrieve subscription's details. 1/ Will retrieve listing metadata from Amazon DataZone
-    2/ Will retrieve producer project details from Amazon DataZone 3/ Will retrieve consumer project and environment details from Amazon DataZone
+    """ Function handler: Function that will retrieve subscription's details. 1/ Will retrieve listing metadata from Amazon DataZone (served from the listing details cache
+    when prefetched on publish or resolved by an earlier subscription) 2/ Will retrieve producer project details from Amazon DataZone 3/ Will retrieve consumer project and environment details from Amazon DataZone
     4/ Will build response base on producer, consumer, listing and asset details.
 
     Parameters
@@ -66,48 +62,27 @@ def handler(event, context):
     consumer_project_id = event_details['data']['projectId']
     consumer_environment_id = event_details['data']['subscriptionTarget']['environmentId']
 
-    datazone_response = datazone.get_listing(domainIdentifier=domain_id, identifier=listing_id, listingRevision=listing_revision)
-    listing_details = datazone_response
+    set_metric_dimensions()
+    listing_details = get_listing_details(domain_id, listing_id, listing_revision)
 
-    data_asset_details = listing_details['item']['assetListing']
-    data_asset_type = data_asset_details['assetType']
-    data_asset_forms = json.loads(data_asset_details['forms'])
-    producer_project_id = data_asset_details['owningProjectId']
+    glue_table_details = listing_details['AssetDetails'].get('GlueTableDetails', {})
+    set_metric_dimensions(engine=glue_table_details.get('SourceClassification'), producer_account_id=glue_table_details.get('AccountId'))
 
     subscription_details = {
         'DomainId': domain_id,
-        'ProducerProjectDetails': get_project_details(domain_id, producer_project_id),
+        'ProducerProjectDetails': get_project_details(domain_id, listing_details['ProducerProjectId']),
         'ConsumerProjectDetails': {
             **get_project_details(domain_id, consumer_project_id),
             **get_environments_details(domain_id, consumer_environment_id)
         },
-        'ListingDetails': {
-            'Id': listing_details['id'],
-            'Name': listing_details['name'],
-            'Revision': listing_details['listingRevision'],
-        },
-        'AssetDetails': {
-            'Type': data_asset_type,
-            'Id': data_asset_details['assetId'],
-            'Revision': data_asset_details['assetRevision']
-        }
+        'ListingDetails': listing_details['ListingDetails'],
+        'AssetDetails': listing_details['AssetDetails']
     }
 
-    if data_asset_type == 'GlueTableAssetType':
-        glue_table_form = data_asset_forms['GlueTableForm']
-
-        subscription_details['AssetDetails']['GlueTableDetails'] = {
-            'AccountId': glue_table_form['catalogId'],
-            'Region': glue_table_form['region'],
-            'DatabaseName': glue_table_form['tableArn'].split('/')[1],
-            'TableName': glue_table_form['tableName'],
-            'TableArn': glue_table_form['tableArn'],
-            'SourceClassification': glue_table_form['sourceClassification']
-        }
-
     return subscription_details
 
 
+@measure_phase(PHASE_DATAZONE_LOOKUP)
 def get_project_details(domain_id, project_id):
     """ Complementary function to get Amazon DataZone project details """
     datazone_response = datazone.get_project(domainIdentifier=domain_id, identifier=project_id)
@@ -118,6 +93,7 @@ def get_project_details(domain_id, project_id):
     return project_details
 
 
+@measure_phase(PHASE_DATAZONE_LOOKUP)
 def get_environments_details(domain_id, environment_id):
     """ Complementary function to get Amazon DataZone environment details """
     environment_full_details = datazone.get_environment(domainIdentifier=domain_id, identifier=environment_id)
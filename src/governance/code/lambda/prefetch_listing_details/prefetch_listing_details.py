@@ -0,0 +1,44 @@
+from dz_conn_common.listing_details_cache import get_listing_details
+
+
+def handler(event, context):
+    """ Function handler: Function that will prefetch the details of a DataZone listing once it is published, so that subscriptions to it find them cached.
+    1/ Will resolve listing metadata from Amazon DataZone (parsing the glue table form of glue table assets), then 2/ will cache them in governance listing details cache.
+
+    Parameters
+    ----------
+    event: dict - Input event dict containing:
+        EventDetails: dict - Dict containing details including:
+            metadata.domain: str - Id of DataZone domain
+            data.listingId: str - Id of the DataZone listing published
+            data.listingVersion: str - Revision of the DataZone listing published
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    listing_details: dict - Dict with listing details including:
+        DomainId: str - Id of the Amazon DataZone domain.
+        ListingDetails: dict - Dict with listing details (Id, Name and Revision of the Amazon DataZone listing). Empty if event does not refer to a listing
+        AssetDetails: dict - Dict with data asset details. Same structure as get subscription details function response, including GlueTableDetails for glue table assets.
+            Empty if event does not refer to a listing
+    """
+
+    event_details = event['EventDetails']
+    domain_id = event_details['metadata']['domain']
+    listing_id = event_details['data'].get('listingId')
+    listing_revision = event_details['data'].get('listingVersion')
+
+    if listing_id is None or listing_revision is None:
+        print(f'Skipping event with no listing details in domain {domain_id}')
+        return {'DomainId': domain_id, 'ListingDetails': {}, 'AssetDetails': {}}
+
+    listing_details = get_listing_details(domain_id, listing_id, listing_revision)
+
+    response = {
+        'DomainId': domain_id,
+        'ListingDetails': listing_details['ListingDetails'],
+        'AssetDetails': listing_details['AssetDetails']
+    }
+
+    return response
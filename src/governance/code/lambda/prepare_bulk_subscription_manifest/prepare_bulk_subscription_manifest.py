@@ -0,0 +1,199 @@
+import os
+import json
+import hashlib
+
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the default data lake datazone blueprint name
+DATA_LAKE_BLUEPRINT_NAME = 'DefaultDataLake'
+
+# Constant: Represents the supported actions of a bulk subscription manifest item
+SUBSCRIPTION_ACTIONS = ['GRANT', 'REVOKE']
+
+# Constant: Represents the group key assigned to items whose asset is not hosted in a Glue table
+UNKNOWN_GROUP_KEY_VALUE = 'UNKNOWN'
+
+# Constant: Name of the governance bucket storing bulk subscription manifests and results
+G_BUCKET_NAME = os.getenv('G_BUCKET_NAME')
+
+# Constant: Arn of the grant subscription workflow state machine
+G_SUBSCRIPTION_GRANT_WORKFLOW_ARN = os.getenv('G_SUBSCRIPTION_GRANT_WORKFLOW_ARN')
+
+# Constant: Arn of the revoke subscription workflow state machine
+G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN = os.getenv('G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN')
+
+# Constant: Url of the SQS FIFO queue (grant lane) that will run subscription grant workflows
+G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL = os.getenv('G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL')
+
+# Constant: Url of the SQS FIFO queue (revoke lane) that will run subscription revoke workflows
+G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL = os.getenv('G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL')
+
+datazone = get_client('datazone')
+
+s3 = get_client('s3')
+
+def handler(event, context):
+    """ Function handler: Function that will prepare a bulk subscription manifest to be run by the bulk subscription workflow.
+    1/ Will read the manifest (list of subscriptions to be granted or revoked) from the governance bucket. 2/ Will expand each manifest item
+    to the consumer environments it applies to (all data lake environments of the consumer project if no environment is specified).
+    3/ Will retrieve listing metadata from Amazon DataZone and group items by (producer account, Glue database) so that all items of the same
+    producer source are run together. 4/ Will write groups to the governance bucket to be read by the bulk subscription workflow.
+    Each item includes the details to queue its workflow in the lane (grant / revoke) of its (consumer environment, asset), so that bulk items are run in order
+    with subscription events and go through the same checks and producer account permits.
+
+    Parameters
+    ----------
+    event: dict - Input event dict containing:
+        ManifestKey: str - Key of the manifest object in the governance bucket. Manifest is a JSON list of items, each with:
+            Action: str - Action to be performed on the subscription. Either 'GRANT' or 'REVOKE'.
+            DomainId: str - Id of the Amazon DataZone domain
+            ListingId: str - Id of the Amazon DataZone listing
+            ListingRevision: str - Revision of the Amazon DataZone listing
+            ProjectId: str - Id of the Amazon DataZone consumer project
+            EnvironmentId: str - Optional. Id of the Amazon DataZone consumer environment.
+        ExecutionName: str - Name of the bulk subscription workflow execution. Used as prefix of objects written to the governance bucket.
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    bulk_manifest_details: dict - Dict with bulk manifest details including:
+        Bucket: str - Name of the governance bucket
+        GroupsKey: str - Key of the object with the list of groups. Each group is a dict with GroupId, ProducerAccountId, DatabaseName and Items.
+            Each item is a dict with ItemId, Action, Request, StateMachineArn, ExecutionName, QueueUrl, MessageGroupId, MessageDeduplicationId, ProducerAccountId and Input.
+        ResultsPrefix: str - Prefix where bulk subscription workflow results will be written
+        GroupCount: int - Number of groups
+        ItemCount: int - Number of items (one per subscription and consumer environment)
+    """
+
+    manifest_key = event['ManifestKey']
+    execution_name = event['ExecutionName']
+
+    s3_response = s3.get_object(Bucket=G_BUCKET_NAME, Key=manifest_key)
+    manifest_items = json.loads(s3_response['Body'].read())
+
+    listings_cache, environments_cache = {}, {}
+    subscription_groups = {}
+    item_count = 0
+
+    for manifest_index, manifest_item in enumerate(manifest_items):
+        subscription_action = manifest_item['Action'].upper()
+        if subscription_action not in SUBSCRIPTION_ACTIONS:
+            raise Exception(f'Unsupported action {manifest_item["Action"]} in manifest item {manifest_index}')
+
+        domain_id = manifest_item['DomainId']
+        listing_key = (domain_id, manifest_item['ListingId'], manifest_item['ListingRevision'])
+        if listing_key not in listings_cache: listings_cache[listing_key] = get_listing_group_details(*listing_key)
+        listing_group_details = listings_cache[listing_key]
+
+        environment_ids = [manifest_item['EnvironmentId']] if manifest_item.get('EnvironmentId') else None
+        if environment_ids is None:
+            project_key = (domain_id, manifest_item['ProjectId'])
+            if project_key not in environments_cache: environments_cache[project_key] = get_data_lake_environment_ids(*project_key)
+            environment_ids = environments_cache[project_key]
+
+        group_id = f"{listing_group_details['ProducerAccountId']}/{listing_group_details['DatabaseName']}"
+        subscription_group = subscription_groups.setdefault(group_id, {
+            'GroupId': group_id,
+            'ProducerAccountId': listing_group_details['ProducerAccountId'],
+            'DatabaseName': listing_group_details['DatabaseName'],
+            'Items': []
+        })
+
+        producer_account_id = listing_group_details['ProducerAccountId'] if listing_group_details['ProducerAccountId'] != UNKNOWN_GROUP_KEY_VALUE else None
+        state_machine_arn = G_SUBSCRIPTION_GRANT_WORKFLOW_ARN if subscription_action == 'GRANT' else G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN
+
+        for environment_id in environment_ids:
+            item_id = f'{manifest_index:05d}-{environment_id}'
+            item_execution_name = get_item_execution_name(execution_name, item_id)
+
+            subscription_group['Items'].append({
+                'ItemId': item_id,
+                'Action': subscription_action,
+                'StateMachineArn': state_machine_arn,
+                'ExecutionName': item_execution_name,
+                'QueueUrl': G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL if subscription_action == 'GRANT' else G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL,
+                'MessageGroupId': f"{environment_id}-{listing_group_details['AssetId']}",
+                'MessageDeduplicationId': hashlib.sha256(f'{state_machine_arn}:{item_execution_name}'.encode('utf-8')).hexdigest(),
+                'ProducerAccountId': producer_account_id,
+                'Request': manifest_item,
+                'Input': {
+                    'EventDetails': {
+                        "metadata": {
+                            "typeName": "SubscriptionGrantEntityType",
+                            "domain": domain_id
+                        },
+                        "data": {
+                            "asset": {
+                                "listingId": manifest_item['ListingId'],
+                                "listingVersion": manifest_item['ListingRevision'],
+                                "typeName": listing_group_details['AssetType']
+                            },
+                            "projectId": manifest_item['ProjectId'],
+                            "subscriptionTarget": {
+                                "environmentId": environment_id,
+                                "typeName": "GlueSubscriptionTargetType"
+                            }
+                        }
+                    }
+                }
+            })
+            item_count += 1
+
+    groups_key = f'bulk/{execution_name}/groups.json'
+    s3.put_object(Bucket=G_BUCKET_NAME, Key=groups_key, Body=json.dumps(list(subscription_groups.values())).encode('utf-8'))
+
+    bulk_manifest_details = {
+        'Bucket': G_BUCKET_NAME,
+        'GroupsKey': groups_key,
+        'ResultsPrefix': f'bulk/{execution_name}/results',
+        'GroupCount': len(subscription_groups),
+        'ItemCount': item_count
+    }
+
+    return bulk_manifest_details
+
+
+def get_listing_group_details(domain_id, listing_id, listing_revision):
+    """ Complementary function to get the asset id and type and the group key values (producer account, Glue database) of an Amazon DataZone listing"""
+
+    listing_details = datazone.get_listing(domainIdentifier=domain_id, identifier=listing_id, listingRevision=listing_revision)
+    data_asset_details = listing_details['item']['assetListing']
+    data_asset_type = data_asset_details['assetType']
+
+    listing_group_details = {
+        'AssetId': data_asset_details['assetId'],
+        'AssetType': data_asset_type,
+        'ProducerAccountId': UNKNOWN_GROUP_KEY_VALUE,
+        'DatabaseName': UNKNOWN_GROUP_KEY_VALUE
+    }
+
+    if data_asset_type == 'GlueTableAssetType':
+        glue_table_form = json.loads(data_asset_details['forms'])['GlueTableForm']
+        listing_group_details['ProducerAccountId'] = glue_table_form['catalogId']
+        listing_group_details['DatabaseName'] = glue_table_form['tableArn'].split('/')[1]
+
+    return listing_group_details
+
+
+def get_item_execution_name(execution_name, item_id):
+    """ Complementary function to get the name of the subscription workflow execution of a bulk manifest item, unique per bulk execution and within the 80 characters limit"""
+
+    execution_name_hash = hashlib.sha256(execution_name.encode('utf-8')).hexdigest()[:16]
+    return f'bulk-{execution_name_hash}-{item_id}'[:80]
+
+
+def get_data_lake_environment_ids(domain_id, project_id):
+    """ Complementary function to get ids of all environments of an Amazon DataZone project associated to the default data lake blueprint"""
+
+    environment_ids = []
+    paginator = datazone.get_paginator('list_environments')
+    for datazone_response in paginator.paginate(domainIdentifier=domain_id, projectIdentifier=project_id):
+        for environment in datazone_response['items']:
+            environment_details = datazone.get_environment(domainIdentifier=domain_id, identifier=environment['id'])
+            environment_blueprint_details = datazone.get_environment_blueprint(domainIdentifier=domain_id, identifier=environment_details['environmentBlueprintId'])
+
+            if environment_blueprint_details['name'] == DATA_LAKE_BLUEPRINT_NAME:
+                environment_ids.append(environment['id'])
+
+    return environment_ids
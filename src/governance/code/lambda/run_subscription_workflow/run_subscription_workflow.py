@@ -0,0 +1,374 @@
+import os
+import json
+import time
+from botocore.exceptions import ClientError
+
+from dz_conn_common.clients import get_client
+from dz_conn_common.producer_account_permits import release_producer_account_permit
+
+# Constant: Represents the status of a running step functions execution
+RUNNING_STATUS = 'RUNNING'
+
+# Constant: Represents the status of a succeeded step functions execution
+SUCCEEDED_STATUS = 'SUCCEEDED'
+
+# Constant: Represents the status of a workflow that was not run because its subscription changed while queued (grant no longer approved or revoke approved again)
+SKIPPED_STATUS = 'SKIPPED'
+
+# Constant: Represents the status of a workflow waiting for a workflow of the same (consumer environment, asset) running in the other lane
+WAITING_STATUS = 'WAITING'
+
+# Constant: Represents the prefix of the key of in-flight markers in the workflow messages table. Each marker is held by the running workflow of a (consumer environment, asset)
+IN_FLIGHT_MARKER_KEY_PREFIX = 'in_flight#'
+
+# Constant: Represents the errors returned by SQS when a message can no longer be released (already deleted, delivered again or receipt handle expired)
+RELEASED_MESSAGE_ERROR_CODES = ['ReceiptHandleIsInvalid', 'InvalidParameterValue', 'MessageNotInflight', 'AWS.SimpleQueueService.MessageNotInflight']
+
+# Constant: Represents the approved status for a datazone subscription
+APPROVED_STATUS = 'APPROVED'
+
+# Constant: Url of the SQS FIFO queue (grant lane) that will run subscription grant workflows
+G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL = os.getenv('G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL')
+
+# Constant: Url of the SQS FIFO queue (revoke lane) that will run subscription revoke workflows
+G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL = os.getenv('G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL')
+
+# Constant: Represents the governance DynamoDB table that will store the queued message of each running subscription workflow execution and the in-flight marker of each (consumer environment, asset)
+G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME = os.getenv('G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME')
+
+# Constant: Represents the number of deliveries of a queued subscription workflow before being sent to the dead letter queue
+G_MAX_WORKFLOW_RECEIVE_COUNT = int(os.getenv('G_MAX_WORKFLOW_RECEIVE_COUNT', '100'))
+
+# Constant: Represents the seconds a message of a running execution is kept invisible. Messages are released as soon as their execution finishes, so this only applies if release is missed
+G_RUNNING_WORKFLOW_CHECK_INTERVAL_IN_SECONDS = int(os.getenv('G_RUNNING_WORKFLOW_CHECK_INTERVAL_IN_SECONDS', '900'))
+
+step_functions = get_client('stepfunctions')
+
+datazone = get_client('datazone')
+
+dynamodb = get_client('dynamodb')
+
+sqs = get_client('sqs')
+
+def handler(event, context):
+    """ Function handler: Function that will run subscription workflows (grant or revoke) strictly in order per (consumer environment, asset).
+    Workflows are received as messages in SQS FIFO queues grouped by (consumer environment, asset), one queue (lane) for revokes and one for grants so that
+    revokes are never queued behind grants. For each message it will 1/ Start the workflow execution (if not started already on a previous delivery of the same message)
+    and 2/ Hold the message (invisible, blocking its group but not the others) while the execution is running. Held messages are released by complete_subscription_workflow
+    as soon as their execution finishes, so that they are delivered again and completed (deleted from the queue) without waiting for the execution.
+    Since SQS only orders messages within a queue, a workflow is only started (and kept running) while holding the in-flight marker of its (consumer environment, asset),
+    so that a grant and a revoke of the same asset never run at the same time. A message whose marker is held by a workflow running in the other lane is held as well,
+    and released as soon as that workflow is completed.
+    Workflows not started yet are skipped if their subscription changed while queued, i.e. grants no longer approved (revoked) and revokes approved again (granted).
+    Grants are additionally limited in number per producer account, through a permit taken by the grant workflow itself (waiting in a Wait state while none is free)
+    and released here once the execution finishes.
+    Messages whose execution is running (or waiting for the other lane), as well as all following messages of the same group, are reported as failed so that they are delivered again later.
+    Workflows queued by the bulk subscription workflow report their status to it (task token callback) once finished or skipped, or report a failure
+    when their message is delivered for the last time before being sent to the dead letter queue.
+
+    Parameters
+    ----------
+    event: dict - Input event dict containing:
+        Records: list - List of SQS records, each with a body including:
+            Action: str - Subscription workflow action. Either 'GRANT' or 'REVOKE'.
+            StateMachineArn: str - Arn of the subscription workflow state machine to be executed
+            ExecutionName: str - Name of the execution to be started. If empty, SQS message id will be used.
+            ProducerAccountId: str - Id of the producer account of the subscribed asset. Used to release the producer account permit of grant workflows.
+            Input: dict - Input of the execution
+            TaskToken: str - Optional. Task token of the bulk subscription workflow waiting for the execution
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    response: dict - Dict with SQS partial batch response including:
+        batchItemFailures: list - List of dicts with itemIdentifier of the SQS messages that need to be delivered again.
+    """
+
+    batch_item_failures = []
+    blocked_message_groups = set()
+
+    for record in event['Records']:
+        message_id = record['messageId']
+        message_group_id = record['attributes']['MessageGroupId']
+
+        if message_group_id in blocked_message_groups:
+            batch_item_failures.append({'itemIdentifier': message_id})
+            send_abandoned_workflow_callback(record, None)
+            continue
+
+        try:
+            workflow_details = json.loads(record['body'])
+            if workflow_details.get('Action') == 'GRANT':
+                execution_status = run_grant_execution(workflow_details, record)
+            else:
+                execution_status = run_revoke_execution(workflow_details, record)
+
+            if execution_status not in [RUNNING_STATUS, WAITING_STATUS] and 'TaskToken' in workflow_details:
+                send_workflow_callback(workflow_details, record, execution_status)
+        except Exception as error:
+            print(f'Error running subscription workflow for message {message_id}: {error}')
+            execution_status = None
+
+        if execution_status in [None, RUNNING_STATUS, WAITING_STATUS]:
+            blocked_message_groups.add(message_group_id)
+            batch_item_failures.append({'itemIdentifier': message_id})
+            send_abandoned_workflow_callback(record, execution_status)
+
+    return {'batchItemFailures': batch_item_failures}
+
+
+def run_execution(workflow_details, record):
+    """ Complementary function to start a subscription workflow execution (if not already started) and hold its message while it is running.
+    Execution is only started (and kept running) while holding the in-flight marker of its (consumer environment, asset), which is released once it finishes. Returns the execution status"""
+
+    state_machine_arn = workflow_details['StateMachineArn']
+    execution_name = workflow_details.get('ExecutionName') or record['messageId']
+    execution_arn = get_execution_arn(state_machine_arn, execution_name)
+    message_group_id = record['attributes']['MessageGroupId']
+    queue_url = get_workflows_queue_url(workflow_details)
+
+    execution_status = get_execution_status(execution_arn)
+    if execution_status in [None, RUNNING_STATUS] and not acquire_in_flight_marker(message_group_id, execution_arn, queue_url, record['receiptHandle']):
+        print(f'Execution {execution_name} waiting for a workflow of group {message_group_id} running in the other lane')
+        return WAITING_STATUS
+
+    if execution_status is None:
+        try:
+            step_functions.start_execution(stateMachineArn=state_machine_arn, name=execution_name, input=json.dumps(workflow_details['Input']))
+        except step_functions.exceptions.ExecutionAlreadyExists:
+            print(f'Execution {execution_name} already started')
+
+        execution_status = RUNNING_STATUS
+
+    if execution_status == RUNNING_STATUS:
+        execution_status = hold_execution_message(execution_arn, queue_url, record['receiptHandle'])
+
+    if execution_status != RUNNING_STATUS:
+        print(f'Execution {execution_name} finished with status {execution_status}')
+        delete_execution_message(execution_arn)
+        release_in_flight_marker(message_group_id, execution_arn)
+
+    return execution_status
+
+
+def run_grant_execution(workflow_details, record):
+    """ Complementary function to run a subscription grant workflow execution. Grants not started yet are skipped if their subscription is no longer approved.
+    Once the execution finishes, the producer account permit it took is released. If completing it fails, it is released on the next delivery of its message"""
+
+    execution_name = workflow_details.get('ExecutionName') or record['messageId']
+    execution_arn = get_execution_arn(workflow_details['StateMachineArn'], execution_name)
+
+    if get_execution_status(execution_arn) is None and not is_subscription_approved(workflow_details['Input']['EventDetails']):
+        print(f'Skipping execution {execution_name} since subscription is no longer approved')
+        return SKIPPED_STATUS
+
+    execution_status = run_execution(workflow_details, record)
+    if execution_status not in [RUNNING_STATUS, WAITING_STATUS]:
+        release_producer_account_permit(workflow_details.get('ProducerAccountId'), execution_name)
+
+    return execution_status
+
+
+def run_revoke_execution(workflow_details, record):
+    """ Complementary function to run a subscription revoke workflow execution. Revokes not started yet are skipped if their subscription is approved again (i.e. granted while queued)"""
+
+    execution_name = workflow_details.get('ExecutionName') or record['messageId']
+    execution_arn = get_execution_arn(workflow_details['StateMachineArn'], execution_name)
+
+    if get_execution_status(execution_arn) is None and is_subscription_approved(workflow_details['Input']['EventDetails']):
+        print(f'Skipping execution {execution_name} since subscription is approved again')
+        return SKIPPED_STATUS
+
+    return run_execution(workflow_details, record)
+
+
+def get_execution_arn(state_machine_arn, execution_name):
+    """ Complementary function to get the arn of an execution based on its state machine arn and name"""
+
+    return f"{state_machine_arn.replace(':stateMachine:', ':execution:')}:{execution_name}"
+
+
+def get_execution_status(execution_arn):
+    """ Complementary function to get the status of an execution, None if it was not started yet"""
+
+    try:
+        return step_functions.describe_execution(executionArn=execution_arn)['status']
+    except step_functions.exceptions.ExecutionDoesNotExist:
+        return None
+
+
+def get_workflows_queue_url(workflow_details):
+    """ Complementary function to get the url of the FIFO queue (lane) of a subscription workflow"""
+
+    return G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL if workflow_details.get('Action') == 'GRANT' else G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL
+
+
+def hold_execution_message(execution_arn, queue_url, receipt_handle):
+    """ Complementary function to keep the message of a running execution invisible and store its receipt handle, so that complete_subscription_workflow can release it
+    when the execution finishes. Execution status is checked again once stored, so that executions finishing meanwhile are not missed. Returns the execution status"""
+
+    sqs.change_message_visibility(QueueUrl=queue_url, ReceiptHandle=receipt_handle, VisibilityTimeout=G_RUNNING_WORKFLOW_CHECK_INTERVAL_IN_SECONDS)
+
+    dynamodb.put_item(
+        TableName= G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME,
+        Item= {
+            'execution_arn': {'S': execution_arn},
+            'queue_url': {'S': queue_url},
+            'receipt_handle': {'S': receipt_handle},
+            'expiration': {'N': str(int(time.time()) + 2 * G_RUNNING_WORKFLOW_CHECK_INTERVAL_IN_SECONDS)}
+        }
+    )
+
+    return get_execution_status(execution_arn)
+
+
+def delete_execution_message(execution_arn):
+    """ Complementary function to delete the stored message of a finished execution"""
+
+    dynamodb.delete_item(
+        TableName= G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME,
+        Key= {'execution_arn': {'S': execution_arn}}
+    )
+
+
+def acquire_in_flight_marker(message_group_id, execution_arn, queue_url, receipt_handle):
+    """ Complementary function to take (or keep) the in-flight marker of a (consumer environment, asset) for an execution. Returns True if held by the execution.
+    Marker held by a finished execution (i.e. its message was not completed) is taken over. Marker held by a running execution is kept, and the message is held
+    and stored in the marker so that it is released when that execution is completed. Holder status is checked again once stored, so that executions finishing meanwhile are not missed"""
+
+    marker_key = {'execution_arn': {'S': f'{IN_FLIGHT_MARKER_KEY_PREFIX}{message_group_id}'}}
+
+    while True:
+        dynamodb_response = dynamodb.get_item(TableName=G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME, Key=marker_key, ConsistentRead=True)
+        holder_execution_arn = dynamodb_response.get('Item', {}).get('holder_execution_arn', {}).get('S')
+
+        if holder_execution_arn in [None, execution_arn] or get_execution_status(holder_execution_arn) != RUNNING_STATUS:
+            if put_in_flight_marker(marker_key, execution_arn, holder_execution_arn): return True
+            continue
+
+        sqs.change_message_visibility(QueueUrl=queue_url, ReceiptHandle=receipt_handle, VisibilityTimeout=G_RUNNING_WORKFLOW_CHECK_INTERVAL_IN_SECONDS)
+
+        try:
+            dynamodb.update_item(
+                TableName= G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME,
+                Key= marker_key,
+                UpdateExpression= 'SET waiting_queue_url = :queue_url, waiting_receipt_handle = :receipt_handle',
+                ConditionExpression= 'holder_execution_arn = :holder_execution_arn',
+                ExpressionAttributeValues= {
+                    ':queue_url': {'S': queue_url},
+                    ':receipt_handle': {'S': receipt_handle},
+                    ':holder_execution_arn': {'S': holder_execution_arn}
+                }
+            )
+        except ClientError as error:
+            if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+            continue
+
+        if get_execution_status(holder_execution_arn) == RUNNING_STATUS: return False
+
+
+def put_in_flight_marker(marker_key, execution_arn, holder_execution_arn):
+    """ Complementary function to write the in-flight marker of a (consumer environment, asset) for an execution, only if still held by the given holder (or missing).
+    Its expiration is renewed on each delivery of the execution message, so that it outlives the execution. Message waiting for a previous holder is dropped
+    when taking the marker over, it is delivered again once its visibility timeout expires. Returns True if written"""
+
+    update_expression = 'SET holder_execution_arn = :execution_arn, expiration = :expiration'
+    if holder_execution_arn != execution_arn: update_expression += ' REMOVE waiting_queue_url, waiting_receipt_handle'
+
+    try:
+        dynamodb.update_item(
+            TableName= G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME,
+            Key= marker_key,
+            UpdateExpression= update_expression,
+            ConditionExpression= 'attribute_not_exists(holder_execution_arn) OR holder_execution_arn = :holder_execution_arn',
+            ExpressionAttributeValues= {
+                ':execution_arn': {'S': execution_arn},
+                ':expiration': {'N': str(int(time.time()) + 4 * G_RUNNING_WORKFLOW_CHECK_INTERVAL_IN_SECONDS)},
+                ':holder_execution_arn': {'S': holder_execution_arn or execution_arn}
+            }
+        )
+        return True
+
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+
+    return False
+
+
+def release_in_flight_marker(message_group_id, execution_arn):
+    """ Complementary function to delete the in-flight marker of a (consumer environment, asset) held by a finished execution, releasing the message waiting for it (if any)"""
+
+    try:
+        dynamodb_response = dynamodb.delete_item(
+            TableName= G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME,
+            Key= {'execution_arn': {'S': f'{IN_FLIGHT_MARKER_KEY_PREFIX}{message_group_id}'}},
+            ConditionExpression= 'holder_execution_arn = :holder_execution_arn',
+            ExpressionAttributeValues= {
+                ':holder_execution_arn': {'S': execution_arn}
+            },
+            ReturnValues= 'ALL_OLD'
+        )
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+        return
+
+    marker_item = dynamodb_response.get('Attributes', {})
+    if 'waiting_receipt_handle' not in marker_item: return
+
+    try:
+        sqs.change_message_visibility(QueueUrl=marker_item['waiting_queue_url']['S'], ReceiptHandle=marker_item['waiting_receipt_handle']['S'], VisibilityTimeout=0)
+    except ClientError as error:
+        if error.response['Error']['Code'] not in RELEASED_MESSAGE_ERROR_CODES: raise
+        print(f'Message waiting for group {message_group_id} already released: {error}')
+
+
+def is_subscription_approved(event_details):
+    """ Complementary function to check if the Amazon DataZone consumer project still has an approved subscription to the listing of a subscription workflow"""
+
+    datazone_response = datazone.list_subscriptions(
+        domainIdentifier= event_details['metadata']['domain'],
+        subscribedListingId= event_details['data']['asset']['listingId'],
+        owningProjectId= event_details['data']['projectId'],
+        status= APPROVED_STATUS
+    )
+
+    return len(datazone_response['items']) > 0
+
+
+def send_workflow_callback(workflow_details, record, execution_status):
+    """ Complementary function to report the status of a finished (or skipped) execution to the bulk subscription workflow waiting for it (task token callback).
+    Callbacks no longer awaited (i.e. bulk workflow stopped or timed out) are ignored, so that they do not block the lane"""
+
+    execution_name = workflow_details.get('ExecutionName') or record['messageId']
+    execution_arn = get_execution_arn(workflow_details['StateMachineArn'], execution_name) if execution_status != SKIPPED_STATUS else None
+
+    try:
+        if execution_status in [SUCCEEDED_STATUS, SKIPPED_STATUS]:
+            step_functions.send_task_success(taskToken=workflow_details['TaskToken'], output=json.dumps({'ExecutionArn': execution_arn, 'Status': execution_status}))
+        else:
+            step_functions.send_task_failure(taskToken=workflow_details['TaskToken'], error='SubscriptionWorkflowFailed', cause=f'Execution {execution_arn} finished with status {execution_status}')
+
+    except (step_functions.exceptions.TaskDoesNotExist, step_functions.exceptions.TaskTimedOut, step_functions.exceptions.InvalidToken):
+        print(f'Bulk subscription workflow is no longer waiting for execution {execution_name}')
+
+
+def send_abandoned_workflow_callback(record, execution_status):
+    """ Complementary function to report a failure to the bulk subscription workflow waiting for a workflow whose message is delivered for the last time
+    (next failure sends it to the dead letter queue), so that the bulk workflow does not wait for a callback that will never be sent. Errors are only logged"""
+
+    receive_count = int(record['attributes'].get('ApproximateReceiveCount', '1'))
+    if receive_count < G_MAX_WORKFLOW_RECEIVE_COUNT: return
+
+    try:
+        workflow_details = json.loads(record['body'])
+        if 'TaskToken' not in workflow_details: return
+
+        step_functions.send_task_failure(
+            taskToken= workflow_details['TaskToken'],
+            error= 'SubscriptionWorkflowAbandoned',
+            cause= f"Message {record['messageId']} sent to dead letter queue after {receive_count} deliveries, last execution status {execution_status}"
+        )
+
+    except Exception as error:
+        print(f"Error reporting abandoned subscription workflow for message {record['messageId']}: {error}")
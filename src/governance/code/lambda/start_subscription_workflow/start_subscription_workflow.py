@@ -1,7 +1,9 @@
 import os
 import json
-import boto3
-from datetime import datetime
+import hashlib
+
+from dz_conn_common.clients import get_client
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_DATAZONE_LOOKUP
 
 # Constant: Represents the default data lake datazone blueprint name
 DATA_LAKE_BLUEPRINT_NAME = 'DefaultDataLake'
@@ -21,20 +23,34 @@ G_SUBSCRIPTION_GRANT_WORKFLOW_ARN = os.getenv('G_SUBSCRIPTION_GRANT_WORKFLOW_ARN
 # Constant: Arn of the revoke subscription workflow state machine
 G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN = os.getenv('G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN')
 
-datazone = boto3.client('datazone')
+# Constant: Url of the SQS FIFO queue (grant lane) that will run subscription grant workflows in order per (consumer environment, asset)
+G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL = os.getenv('G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL')
+
+# Constant: Url of the SQS FIFO queue (revoke lane) that will run subscription revoke workflows in order per (consumer environment, asset)
+G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL = os.getenv('G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL')
+
+datazone = get_client('datazone')
 
-step_functions = boto3.client('stepfunctions')
+sqs = get_client('sqs')
 
 def handler(event, context):
     """ Function handler: Function that will start either the subscription grant workflow or the subscription revoke workflow with corresponding
-    metadata, depending to triggering event sent to to EventBridge by DataZone.
+    metadata, depending to triggering event sent to to EventBridge by DataZone. Events can be received either directly or buffered in an SQS FIFO queue,
+    consumed one batch at a time in the order they were received so that workflows are queued in that order. When buffered, events in the same batch are coalesced per (domain, listing, listing revision, project): duplicates are dropped and opposing events
+    (grant and revoke) cancel each other out, so only the net effect of the batch starts a workflow.
     1/ Will retrieve listing metadata from Amazon DataZone. 2/ Will retrieve consumer environment list from Amazon DataZone 
     3/ For each environment will retrieve its details as well as its bluebrint details.
-    4/ For each environment will start a grant or revoke workflow (with proper event structure and metadata) if the environment is associated to the default data lake blueprint.
+    4/ For each environment will queue a grant or revoke workflow (with proper event structure and metadata) if the environment is associated to the default data lake blueprint.
+    Workflows are queued in an SQS FIFO queue grouped by (consumer environment, asset) so that they run strictly in order for the same key and in parallel for different keys.
+    Grants and revokes are queued in separate queues (lanes) so that revokes run with their own reserved capacity and never wait behind grants.
 
     Parameters
     ----------
-    event: dict - Input event dict containing:
+    event: dict - Input event dict containing either:
+        Records: list - List of SQS records (when buffered), each with a body with the same structure as the direct event plus:
+            EventId: str - Id of the EventBridge event. Used to name started executions so that duplicate deliveries start a single workflow.
+            EventTime: str - Time of the EventBridge event. Used to order events of the same subscription.
+        or
         EventDetails: dict - Dict containing details including:
             metadata.domain: str - Id of DataZone domain
             data.subscribedListing.id: str - Id of the DataZone listing associated to subscription
@@ -46,7 +62,10 @@ def handler(event, context):
 
     Returns
     -------
-    start_events: list - List of dicts, one for each event that was sent to start a subscription workflow (grant or revoke). Each dict with structure:
+    response: dict - When buffered, dict with SQS partial batch response including:
+        batchItemFailures: list - List of dicts with itemIdentifier of the SQS messages that failed to be processed.
+    or
+    start_events: list - When direct, list of dicts, one for each event that was queued to start a subscription workflow (grant or revoke). Each dict with structure:
         EventDetails: str - Dict with event details.
             metadata: dict - Dict with event metadata details.
                 typeName: str - Name of the DataZone event type associated to a subscription grant / revoke event.
@@ -63,27 +82,117 @@ def handler(event, context):
     """
     print(event)
 
-    event_details = event['EventDetails']
+    if 'Records' in event:
+        return start_buffered_subscription_workflows(event['Records'])
+
+    return start_subscription_workflows(event['EventDetails'])
+
+
+def start_buffered_subscription_workflows(records):
+    """ Complementary function to coalesce a batch of buffered subscription events and start workflows for their net effect, returning failed records"""
+
+    subscription_records = {}
+    for record in records:
+        record_body = json.loads(record['body'])
+        event_details = record_body['EventDetails']
+        
+        subscription_key = (
+            event_details['metadata']['domain'],
+            event_details['data']['subscribedListing']['id'],
+            event_details['data']['subscribedListing']['version'],
+            event_details['data']['subscribedPrincipal']['id']
+        )
+
+        subscription_records.setdefault(subscription_key, []).append({
+            'MessageId': record['messageId'],
+            'SentTimestamp': int(record['attributes']['SentTimestamp']),
+            'EventId': record_body.get('EventId'),
+            'EventTime': record_body.get('EventTime', ''),
+            'EventDetails': event_details
+        })
+
+    for key_records in subscription_records.values():
+        key_records.sort(key=lambda key_record: (key_record['EventTime'], key_record['SentTimestamp']))
+
+    batch_item_failures = []
+    for subscription_key, key_records in sorted(subscription_records.items(), key=lambda item: (item[1][0]['EventTime'], item[1][0]['SentTimestamp'])):
+        effective_record = coalesce_subscription_records(key_records)
+
+        if not effective_record:
+            print(f'Dropping {len(key_records)} subscription event(s) with no net effect for {subscription_key}')
+            continue
+
+        try:
+            start_subscription_workflows(effective_record['EventDetails'], effective_record['EventId'])
+        except Exception as error:
+            print(f'Error starting subscription workflows for {subscription_key}: {error}')
+            batch_item_failures.extend({'itemIdentifier': key_record['MessageId']} for key_record in key_records)
+
+    return {'batchItemFailures': batch_item_failures}
+
+
+def coalesce_subscription_records(key_records):
+    """ Complementary function to get the record with the net effect of a time-ordered list of records of the same subscription, None if no net effect"""
+
+    effective_records = []
+    for key_record in key_records:
+        subscription_action = get_subscription_action(key_record['EventDetails']['data']['status'])
+        if not subscription_action: continue
+
+        if effective_records and effective_records[-1]['Action'] == subscription_action:
+            effective_records[-1] = {'Action': subscription_action, 'Record': key_record}
+        else:
+            effective_records.append({'Action': subscription_action, 'Record': key_record})
+
+    # Actions alternate once duplicates are collapsed: an even number of them goes back to the initial state
+    if len(effective_records) % 2 == 0: return None
+
+    return effective_records[-1]['Record']
+
+
+def get_subscription_action(subscription_status):
+    """ Complementary function to map a DataZone subscription status to the subscription workflow to be started (GRANT or REVOKE), None if not applicable"""
+
+    if subscription_status == APPROVED_STATUS: return 'GRANT'
+    if subscription_status in [CANCELLED_STATUS, REVOKED_STATUS]: return 'REVOKE'
+    return None
+
+
+def start_subscription_workflows(event_details, event_id=None):
+    """ Complementary function to start a subscription grant or revoke workflow for each consumer environment associated to a DataZone subscription event"""
+
     domain_id = event_details['metadata']['domain']
     listing_id = event_details['data']['subscribedListing']['id']
     listing_revision = event_details['data']['subscribedListing']['version']
     consumer_project_id = event_details['data']['subscribedPrincipal']['id']
     subscription_status = event_details['data']['status']
 
-    listing_details = datazone.get_listing(domainIdentifier=domain_id, identifier=listing_id, listingRevision=listing_revision)
+    set_metric_dimensions()
+
+    with measure_phase(PHASE_DATAZONE_LOOKUP):
+        listing_details = datazone.get_listing(domainIdentifier=domain_id, identifier=listing_id, listingRevision=listing_revision)
+
+    asset_id = listing_details['item']['assetListing']['assetId']
     asset_type = listing_details['item']['assetListing']['assetType']
+    producer_account_id = get_producer_account_id(listing_details)
+
+    set_metric_dimensions(producer_account_id=producer_account_id)
+
+    with measure_phase(PHASE_DATAZONE_LOOKUP):
+        datazone_response = datazone.list_environments(domainIdentifier=domain_id, projectIdentifier=consumer_project_id)
 
-    datazone_response = datazone.list_environments(domainIdentifier=domain_id, projectIdentifier=consumer_project_id)
     consumer_environments = datazone_response['items']
 
     start_events = []
     for environment in consumer_environments:
         consumer_environment_id = environment['id']
 
-        environment_details = datazone.get_environment(domainIdentifier=domain_id, identifier=consumer_environment_id)
-        environment_blueprint_id = environment_details['environmentBlueprintId']
-        
-        environment_blueprint_details = datazone.get_environment_blueprint(domainIdentifier=domain_id, identifier=environment_blueprint_id)
+        with measure_phase(PHASE_DATAZONE_LOOKUP):
+            environment_details = datazone.get_environment(domainIdentifier=domain_id, identifier=consumer_environment_id)
+            environment_blueprint_id = environment_details['environmentBlueprintId']
+
+            environment_blueprint_details = datazone.get_environment_blueprint(domainIdentifier=domain_id, identifier=environment_blueprint_id)
+
         environment_blueprint_name = environment_blueprint_details['name']
 
         if environment_blueprint_name == DATA_LAKE_BLUEPRINT_NAME:
@@ -109,18 +218,46 @@ def handler(event, context):
                 }
             }
 
-            if subscription_status == APPROVED_STATUS:
-                step_functions.start_execution(stateMachineArn=G_SUBSCRIPTION_GRANT_WORKFLOW_ARN, input=json.dumps(start_subscription_event))
+            subscription_action = get_subscription_action(subscription_status)
             
-            elif subscription_status in [CANCELLED_STATUS, REVOKED_STATUS]:
-                step_functions.start_execution(stateMachineArn=G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN, input=json.dumps(start_subscription_event))
+            if subscription_action == 'GRANT':
+                queue_execution(subscription_action, G_SUBSCRIPTION_GRANT_WORKFLOW_ARN, G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL, start_subscription_event, event_id, consumer_environment_id, asset_id, producer_account_id)
+            
+            elif subscription_action == 'REVOKE':
+                queue_execution(subscription_action, G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN, G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL, start_subscription_event, event_id, consumer_environment_id, asset_id, producer_account_id)
 
             start_events.append(start_subscription_event)
 
     return start_events
 
 
+def get_producer_account_id(listing_details):
+    """ Complementary function to get the producer account id of the asset of an Amazon DataZone listing, None if asset is not hosted in a Glue table"""
+
+    data_asset_details = listing_details['item']['assetListing']
+    if data_asset_details['assetType'] != 'GlueTableAssetType': return None
+
+    return json.loads(data_asset_details['forms'])['GlueTableForm']['catalogId']
+
 
+def queue_execution(subscription_action, state_machine_arn, queue_url, start_subscription_event, event_id, consumer_environment_id, asset_id, producer_account_id):
+    """ Complementary function to queue a subscription workflow execution in the FIFO queue of its lane (grant / revoke) grouped by (consumer environment, asset). 
+    Execution is named after the triggering event (if available) so that duplicate deliveries are ignored"""
 
+    execution_name = f'{event_id}-{consumer_environment_id}' if event_id else None
+    workflow_details = {
+        'Action': subscription_action,
+        'StateMachineArn': state_machine_arn,
+        'ExecutionName': execution_name,
+        'ProducerAccountId': producer_account_id,
+        'Input': start_subscription_event
+    }
 
+    send_message_args = {
+        'QueueUrl': queue_url,
+        'MessageBody': json.dumps(workflow_details),
+        'MessageGroupId': f'{consumer_environment_id}-{asset_id}'
+    }
+    if execution_name: send_message_args['MessageDeduplicationId'] = hashlib.sha256(f'{state_machine_arn}:{execution_name}'.encode('utf-8')).hexdigest()
 
+    sqs.send_message(**send_message_args)
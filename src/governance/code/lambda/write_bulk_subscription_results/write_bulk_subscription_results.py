@@ -0,0 +1,130 @@
+import json
+
+from dz_conn_common.clients import get_client
+
+# Constant: Represents the name of the manifest object written by a distributed map run with the list of its result files
+MAP_RUN_MANIFEST_FILE_NAME = 'manifest.json'
+
+# Constant: Represents the status of items in bulk subscription results
+SUCCEEDED_STATUS = 'SUCCEEDED'
+SKIPPED_STATUS = 'SKIPPED'
+FAILED_STATUS = 'FAILED'
+NOT_RUN_STATUS = 'NOT_RUN'
+
+s3 = get_client('s3')
+
+def handler(event, context):
+    """ Function handler: Function that will write the per-item results file of a bulk subscription workflow execution.
+    1/ Will read groups prepared for the execution from the governance bucket. 2/ Will read result files exported by the distributed map run
+    (one entry per group, with its item results when the group succeeded or with error details when it failed).
+    3/ Will write a single file with one result per item, marking items of groups that were never run as NOT_RUN.
+
+    Parameters
+    ----------
+    event: dict - Input event dict containing:
+        BulkManifestDetails: dict - Dict with bulk manifest details as returned by prepare bulk subscription manifest function including:
+            Bucket: str - Name of the governance bucket
+            GroupsKey: str - Key of the object with the list of groups
+            ResultsPrefix: str - Prefix where distributed map run results were written
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    bulk_results_details: dict - Dict with bulk results details including:
+        Bucket: str - Name of the governance bucket
+        ResultsKey: str - Key of the object with the list of item results. Each with ItemId, Action, Request, Status and either ExecutionArn or Error and Cause.
+        ItemCount: int - Number of items
+        SucceededCount: int - Number of items whose subscription workflow succeeded
+        SkippedCount: int - Number of items whose subscription workflow was skipped, since their subscription changed while queued (grant no longer approved or revoke approved again)
+        FailedCount: int - Number of items whose subscription workflow failed
+        NotRunCount: int - Number of items whose subscription workflow was never run
+    """
+
+    bulk_manifest_details = event['BulkManifestDetails']
+    bucket_name = bulk_manifest_details['Bucket']
+    results_prefix = bulk_manifest_details['ResultsPrefix']
+
+    subscription_groups = read_json_object(bucket_name, bulk_manifest_details['GroupsKey'])
+
+    item_results = {}
+    for map_run_result in get_map_run_results(bucket_name, results_prefix):
+        item_results.update({item_result['ItemId']: item_result for item_result in get_group_item_results(map_run_result)})
+
+    bulk_item_results = []
+    for subscription_group in subscription_groups:
+        for item in subscription_group['Items']:
+            bulk_item_results.append(item_results.get(item['ItemId'], {
+                'ItemId': item['ItemId'],
+                'Action': item['Action'],
+                'Request': item['Request'],
+                'Status': NOT_RUN_STATUS
+            }))
+
+    results_key = f'{results_prefix}/item_results.json'
+    s3.put_object(Bucket=bucket_name, Key=results_key, Body=json.dumps(bulk_item_results).encode('utf-8'))
+
+    item_statuses = [item_result['Status'] for item_result in bulk_item_results]
+    bulk_results_details = {
+        'Bucket': bucket_name,
+        'ResultsKey': results_key,
+        'ItemCount': len(bulk_item_results),
+        'SucceededCount': item_statuses.count(SUCCEEDED_STATUS),
+        'SkippedCount': item_statuses.count(SKIPPED_STATUS),
+        'FailedCount': item_statuses.count(FAILED_STATUS),
+        'NotRunCount': item_statuses.count(NOT_RUN_STATUS)
+    }
+
+    return bulk_results_details
+
+
+def read_json_object(bucket_name, key):
+    """ Complementary function to read and parse a JSON object from S3"""
+
+    s3_response = s3.get_object(Bucket=bucket_name, Key=key)
+    return json.loads(s3_response['Body'].read())
+
+
+def get_map_run_results(bucket_name, results_prefix):
+    """ Complementary function to get all group results exported by distributed map runs under a prefix, located through their manifest file"""
+
+    map_run_results = []
+    paginator = s3.get_paginator('list_objects_v2')
+    for s3_response in paginator.paginate(Bucket=bucket_name, Prefix=f'{results_prefix}/'):
+        for s3_object in s3_response.get('Contents', []):
+            if not s3_object['Key'].endswith(f'/{MAP_RUN_MANIFEST_FILE_NAME}'): continue
+
+            map_run_manifest = read_json_object(bucket_name, s3_object['Key'])
+            for result_files in map_run_manifest['ResultFiles'].values():
+                for result_file in result_files:
+                    map_run_results.extend(read_json_object(bucket_name, result_file['Key']))
+
+    return map_run_results
+
+
+def get_group_item_results(map_run_result):
+    """ Complementary function to get item results of a group from its distributed map run result. Groups that failed report their item results
+    as failure cause, or if not available (i.e. group failed before running its items), all of their items are reported as failed with group error"""
+
+    if map_run_result['Status'] == SUCCEEDED_STATUS:
+        return json.loads(map_run_result['Output'])['ItemResults']
+
+    try:
+        group_item_results = json.loads(map_run_result['Cause'])
+    except (KeyError, TypeError, ValueError):
+        group_item_results = None
+
+    if isinstance(group_item_results, list): return group_item_results
+
+    subscription_group = json.loads(map_run_result['Input'])['Group']
+    return [
+        {
+            'ItemId': item['ItemId'],
+            'Action': item['Action'],
+            'Request': item['Request'],
+            'Status': FAILED_STATUS,
+            'Error': map_run_result.get('Error'),
+            'Cause': map_run_result.get('Cause')
+        }
+        for item in subscription_group['Items']
+    ]
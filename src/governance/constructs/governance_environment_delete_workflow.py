@@ -1,4 +1,5 @@
 from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.stepfunctions_definition import get_definition_body
 
 from aws_cdk import (
     Environment,
@@ -56,7 +57,7 @@ class GovernanceManageEnvironmentDeleteWorkflowConstruct(Construct):
             scope= self,
             id= 'g_manage_environment_delete_state_machine',
             state_machine_name= g_manage_environment_delete_state_machine_name,
-            definition_body=stepfunctions.DefinitionBody.from_file('src/governance/code/stepfunctions/governance_manage_environment_delete_workflow.asl.json'),
+            definition_body=get_definition_body('src/governance/code/stepfunctions/governance_manage_environment_delete_workflow.asl.json'),
             definition_substitutions= {
                 'g_get_environment_details_lambda_arn': common_constructs['g_get_environment_details_lambda'].function_arn,
                 'a_clean_environment_roles_lambda_name': GLOBAL_VARIABLES['account']['a_clean_environment_roles_lambda_name'],
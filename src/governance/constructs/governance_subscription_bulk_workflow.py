@@ -0,0 +1,77 @@
+from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.stepfunctions_definition import get_definition_body
+
+from aws_cdk import (
+    Environment,
+    RemovalPolicy,
+    aws_stepfunctions as stepfunctions,
+    aws_logs as logs
+)
+
+from constructs import Construct
+
+class GovernanceManageSubscriptionBulkWorkflowConstruct(Construct):
+    """ Class to represent the workflow that will execute to grant / revoke subscriptions listed in a bulk manifest (i.e. when onboarding or offboarding a project).
+    The workflow will read the manifest from governance bucket, group its items by (producer account, Glue database) and run the subscription grant / revoke
+    workflow of each item through a distributed map, writing a file with per-item results to governance bucket at the end.
+    Workflow is started on demand, with an input including the key of the manifest in governance bucket.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, governance_props: dict, workflow_props: dict, common_constructs: dict, env: Environment, **kwargs) -> None:
+        """ Class Constructor. Will create a workflow (state machine) based on properties specified as parameter
+        State machines (subscription grant / revoke workflows) to be invoked by the workflow are provisioned in governance workflows stack.
+        
+        Parameters
+        ----------
+        governance_props : dict
+            dict with common properties for governance account.
+            For more details check config/governance/g_config.py documentation and examples.
+
+        workflow_props : dict
+            dict with required properties for workflow creation.
+            For more details check config/governance/g_config.py documentation and examples.
+
+        common_constructs: dic
+            dict with constructs common to the governance account. Created in and output of governance common stack.
+        
+        env: Environment
+            Environment object with region and account details
+        """
+        
+        super().__init__(scope, construct_id, **kwargs)
+        account_id, region = governance_props['account_id'], governance_props['region']
+        
+        # ---------------- Step Functions ------------------------    
+        g_manage_subscription_bulk_state_machine_name = GLOBAL_VARIABLES['governance']['g_manage_subscription_bulk_state_machine_name']
+        
+        g_manage_subscription_bulk_state_machine_logs = logs.LogGroup(
+            scope= self,
+            id= 'g_manage_subscription_bulk_state_machine_logs',
+            log_group_name=f'/aws/step-functions/{g_manage_subscription_bulk_state_machine_name}',
+            removal_policy=RemovalPolicy.DESTROY
+        )
+        
+        g_manage_subscription_bulk_state_machine = stepfunctions.StateMachine(
+            scope= self,
+            id= 'g_manage_subscription_bulk_state_machine',
+            state_machine_name= g_manage_subscription_bulk_state_machine_name,
+            definition_body=get_definition_body(
+                'src/governance/code/stepfunctions/governance_manage_subscription_bulk_workflow.asl.json',
+                state_policies= {
+                    'Run subscription workflow': {'TimeoutSeconds': workflow_props['g_item_timeout_in_seconds']}
+                }
+            ),
+            definition_substitutions= {
+                'g_prepare_bulk_subscription_manifest_lambda_arn': common_constructs['g_prepare_bulk_subscription_manifest_lambda'].function_arn,
+                'g_write_bulk_subscription_results_lambda_arn': common_constructs['g_write_bulk_subscription_results_lambda'].function_arn,
+                'g_max_concurrency': str(workflow_props['g_max_concurrency']),
+                'g_tolerated_failure_percentage': str(workflow_props['g_tolerated_failure_percentage']),
+                'g_group_max_concurrency': str(workflow_props['g_group_max_concurrency'])
+            },
+            role=common_constructs['g_common_sf_role'],
+            logs= stepfunctions.LogOptions(
+                destination=g_manage_subscription_bulk_state_machine_logs,
+                level=stepfunctions.LogLevel.ALL
+            ),
+            tracing_enabled=True
+        )
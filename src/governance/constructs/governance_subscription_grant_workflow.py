@@ -1,4 +1,5 @@
 from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.stepfunctions_definition import get_definition_body
 
 from aws_cdk import (
     Environment,
@@ -7,6 +8,7 @@ from aws_cdk import (
     aws_events as events,
     aws_events_targets as event_targets,
     aws_iam as iam,
+    aws_sqs as sqs,
     aws_logs as logs
 )
 
@@ -58,12 +60,18 @@ class GovernanceManageSubscriptionGrantWorkflowConstruct(Construct):
             scope= self,
             id= 'g_manage_subscription_grant_state_machine',
             state_machine_name= g_manage_subscription_grant_state_machine_name,
-            definition_body=stepfunctions.DefinitionBody.from_file('src/governance/code/stepfunctions/governance_manage_subscription_grant_workflow.asl.json'),
+            definition_body=get_definition_body('src/governance/code/stepfunctions/governance_manage_subscription_grant_workflow.asl.json'),
             definition_substitutions= {
-                'g_get_subscription_details_lambda_arn': common_constructs['g_get_subscription_details_lambda'].function_arn,
+                'g_get_subscription_details_lambda_arn': common_constructs['g_get_subscription_details_lambda_alias'].function_arn,
+                'g_acquire_producer_account_permit_lambda_arn': common_constructs['g_acquire_producer_account_permit_lambda'].function_arn,
                 'p_manage_subscription_grant_state_machine_name': GLOBAL_VARIABLES['producer']['p_manage_subscription_grant_state_machine_name'],
                 'c_manage_subscription_grant_state_machine_name': GLOBAL_VARIABLES['consumer']['c_manage_subscription_grant_state_machine_name'],
                 'a_cross_account_assume_role_name': GLOBAL_VARIABLES['account']['a_cross_account_assume_role_name'],
+                'g_account_id': account_id,
+                'g_cross_account_callback_role_name': GLOBAL_VARIABLES['governance']['g_cross_account_callback_role_name'],
+                'g_callback_timeout_in_seconds': str(workflow_props['g_callback_timeout_in_seconds']),
+                'g_express_sub_workflows': str(workflow_props['g_express_sub_workflows']).lower(),
+                'g_grant_permit_retry_delay_in_seconds': str(governance_props['subscription_events']['grant_permit_retry_delay_in_seconds'])
             },
             role=common_constructs['g_common_sf_role'],
             logs= stepfunctions.LogOptions(
@@ -85,10 +93,22 @@ class GovernanceManageSubscriptionGrantWorkflowConstruct(Construct):
             )
         )
 
-        g_manage_subscription_grant_rule_target = event_targets.LambdaFunction(
-            handler= common_constructs['g_start_subscription_workflow_lambda'],
-            event=events.RuleTargetInput.from_object(
-                { 'EventDetails': events.EventField.from_path('$.detail') }
+        # Queue is imported so that target does not add rule ARN to queue policy. Rule is allowed by name in governance common stack.
+        # Grant and revoke rules send events to the same message group, so that they are consumed in the order they were received
+        g_manage_subscription_grant_rule_target = event_targets.SqsQueue(
+            queue= sqs.Queue.from_queue_attributes(
+                scope= self,
+                id= 'g_subscription_events_queue',
+                queue_arn= common_constructs['g_subscription_events_queue'].queue_arn,
+                fifo= True
+            ),
+            message_group_id= GLOBAL_VARIABLES['governance']['g_subscription_events_message_group_id'],
+            message=events.RuleTargetInput.from_object(
+                { 
+                    'EventDetails': events.EventField.from_path('$.detail'),
+                    'EventId': events.EventField.from_path('$.id'),
+                    'EventTime': events.EventField.from_path('$.time')
+                }
             )
         )
 
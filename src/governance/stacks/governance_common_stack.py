@@ -1,12 +1,21 @@
 from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.lambda_sizing import get_architecture
+from src.common.utils.lambda_warm_start import add_live_alias
 
 from aws_cdk import (
     Stack,
     Environment,
+    Duration,
     RemovalPolicy,
+    aws_cloudwatch as cloudwatch,
     aws_dynamodb as dynamodb,
+    aws_events as events,
+    aws_events_targets as event_targets,
     aws_iam as iam,
-    aws_lambda as lambda_
+    aws_lambda as lambda_,
+    aws_lambda_event_sources as lambda_event_sources,
+    aws_s3 as s3,
+    aws_sqs as sqs
 )
 
 from os import path
@@ -35,100 +44,162 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
         super().__init__(scope, construct_id, **kwargs)
         account_id, region = governance_props['account_id'], governance_props['region']
 
+        # ------------------ S3 ------------------------------
+        g_bucket= s3.Bucket(
+            scope= self,
+            id= 'g_bucket',
+            bucket_name= governance_props['s3']['bucket_name'],
+            encryption= s3.BucketEncryption.S3_MANAGED,
+            enforce_ssl= True,
+            auto_delete_objects= True,
+            removal_policy= RemovalPolicy.DESTROY
+        )
+
         # ----------------------- DynamoDB ---------------------------
-        g_dynamodb_tables = []
+        a_account_ids = governance_props['a_account_numbers']
+        g_dynamodb_table_regions = GLOBAL_VARIABLES['governance']['g_dynamodb_table_regions']
+        g_dynamodb_global_tables_enabled = governance_props['dynamodb']['global_tables_enabled']
         
-        g_p_source_subscriptions_table = dynamodb.Table(
+        g_dynamodb_table_definitions = {
+            'g_p_source_subscriptions_table': {
+                'table_name': GLOBAL_VARIABLES['governance']['g_p_source_subscriptions_table_name'],
+                'partition_key_name': 'glue_connection_arn',
+                'sort_key_name': 'datazone_consumer_environment_id'
+            },
+            'g_c_asset_subscriptions_table': {
+                'table_name': GLOBAL_VARIABLES['governance']['g_c_asset_subscriptions_table_name'],
+                'partition_key_name': 'datazone_consumer_environment_id',
+                'sort_key_name': 'datazone_asset_id'
+            },
+            'g_c_secrets_mapping_table': {
+                'table_name': GLOBAL_VARIABLES['governance']['g_c_secrets_mapping_table_name'],
+                'partition_key_name': 'shared_secret_arn',
+                'sort_key_name': None
+            }
+        }
+
+        g_dynamodb_tables = {}
+
+        for table_id, table_definition in g_dynamodb_table_definitions.items():
+            table_name = table_definition['table_name']
+            partition_key_name, sort_key_name = table_definition['partition_key_name'], table_definition['sort_key_name']
+
+            if g_dynamodb_global_tables_enabled:
+                key_schema = [dynamodb.CfnGlobalTable.KeySchemaProperty(attribute_name= partition_key_name, key_type= 'HASH')]
+                attribute_definitions = [dynamodb.CfnGlobalTable.AttributeDefinitionProperty(attribute_name= partition_key_name, attribute_type= 'S')]
+
+                if sort_key_name:
+                    key_schema.append(dynamodb.CfnGlobalTable.KeySchemaProperty(attribute_name= sort_key_name, key_type= 'RANGE'))
+                    attribute_definitions.append(dynamodb.CfnGlobalTable.AttributeDefinitionProperty(attribute_name= sort_key_name, attribute_type= 'S'))
+
+                dynamodb_table = dynamodb.CfnGlobalTable(
+                    scope= self,
+                    id= table_id,
+                    table_name= table_name,
+                    key_schema= key_schema,
+                    attribute_definitions= attribute_definitions,
+                    billing_mode= 'PAY_PER_REQUEST',
+                    stream_specification= dynamodb.CfnGlobalTable.StreamSpecificationProperty(
+                        stream_view_type= 'NEW_AND_OLD_IMAGES'
+                    ),
+                    replicas= [
+                        dynamodb.CfnGlobalTable.ReplicaSpecificationProperty(region= table_region) for table_region in g_dynamodb_table_regions
+                    ]
+                )
+
+                dynamodb_table.apply_removal_policy(RemovalPolicy.DESTROY)
+
+            else:
+                dynamodb_table = dynamodb.Table(
+                    scope= self, 
+                    id= table_id,
+                    table_name= table_name,
+                    partition_key= dynamodb.Attribute(
+                        name= partition_key_name, 
+                        type= dynamodb.AttributeType.STRING
+                    ),
+                    sort_key= dynamodb.Attribute(
+                        name= sort_key_name,
+                        type= dynamodb.AttributeType.STRING
+                    ) if sort_key_name else None,
+                    billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
+                    removal_policy= RemovalPolicy.DESTROY
+                )
+
+            g_dynamodb_tables[table_id] = dynamodb_table
+
+            # ----------------------- DynamoDB Resource Policies for Account Cross-Account Access ---------------------------
+            if a_account_ids:
+                a_common_lambda_role_name = GLOBAL_VARIABLES['account']['a_common_lambda_role_name']
+
+                # Table ARN is built from its name since referencing the table's own ARN attribute inside its policy would be circular
+                for table_region_index, table_region in enumerate(g_dynamodb_table_regions):
+                    g_cross_account_table_policy = iam.PolicyDocument(
+                        statements= [
+                            iam.PolicyStatement(
+                                actions=['dynamodb:Query', 'dynamodb:GetItem', 'dynamodb:PutItem', 'dynamodb:UpdateItem', 'dynamodb:BatchWriteItem', 'dynamodb:DeleteItem'],
+                                principals=[iam.AnyPrincipal()],
+                                resources=[f'arn:aws:dynamodb:{table_region}:{account_id}:table/{table_name}'],
+                                conditions={
+                                    "StringEquals": {
+                                        "aws:PrincipalAccount": a_account_ids,
+                                    },
+                                    "ArnLike": {
+                                        "aws:PrincipalArn": f"arn:aws:iam::*:role/{a_common_lambda_role_name}"
+                                    }
+                                }
+                            )
+                        ]
+                    )
+
+                    if g_dynamodb_global_tables_enabled:
+                        dynamodb_table.add_property_override(f'Replicas.{table_region_index}.ResourcePolicy', {'PolicyDocument': g_cross_account_table_policy.to_json()})
+                    elif table_region == region:
+                        dynamodb_table.node.default_child.add_property_override('ResourcePolicy', {'PolicyDocument': g_cross_account_table_policy.to_json()})
+
+        # Each item is either the queued message of a running subscription workflow execution, released (made visible) when the execution finishes,
+        # or the in-flight marker of a (consumer environment, asset), held by its running workflow so that grant and revoke lanes never run the same asset at the same time
+        g_subscription_workflow_messages_table = dynamodb.Table(
             scope= self, 
-            id= 'g_p_source_subscriptions_table',
-            table_name= GLOBAL_VARIABLES['governance']['g_p_source_subscriptions_table_name'],
+            id= 'g_subscription_workflow_messages_table',
+            table_name= GLOBAL_VARIABLES['governance']['g_subscription_workflow_messages_table_name'],
             partition_key= dynamodb.Attribute(
-                name= 'glue_connection_arn', 
-                type= dynamodb.AttributeType.STRING
-            ),
-            sort_key= dynamodb.Attribute(
-                name= 'datazone_consumer_environment_id',
+                name= 'execution_arn', 
                 type= dynamodb.AttributeType.STRING
             ),
+            time_to_live_attribute= 'expiration',
             billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy= RemovalPolicy.DESTROY
         )
 
-        g_dynamodb_tables.append(g_p_source_subscriptions_table)
-        
-        g_c_asset_subscriptions_table = dynamodb.Table(
+        # Each item is a permit (slot) of a producer account, held by a running grant workflow so that grants are limited per producer account
+        g_producer_account_permits_table = dynamodb.Table(
             scope= self, 
-            id= 'g_c_asset_subscriptions_table',
-            table_name= GLOBAL_VARIABLES['governance']['g_c_asset_subscriptions_table_name'],
+            id= 'g_producer_account_permits_table',
+            table_name= GLOBAL_VARIABLES['governance']['g_producer_account_permits_table_name'],
             partition_key= dynamodb.Attribute(
-                name= 'datazone_consumer_environment_id', 
-                type= dynamodb.AttributeType.STRING
-            ),
-            sort_key= dynamodb.Attribute(
-                name= 'datazone_asset_id',
+                name= 'permit_key', 
                 type= dynamodb.AttributeType.STRING
             ),
+            time_to_live_attribute= 'expiration',
             billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy= RemovalPolicy.DESTROY
         )
 
-        g_dynamodb_tables.append(g_c_asset_subscriptions_table)
-
-        g_c_secrets_mapping_table = dynamodb.Table(
+        # Listing revisions are immutable, so entries are only removed when expired
+        g_listing_details_cache_table = dynamodb.Table(
             scope= self, 
-            id= 'g_c_secrets_mapping_table',
-            table_name= GLOBAL_VARIABLES['governance']['g_c_secrets_mapping_table_name'],
+            id= 'g_listing_details_cache_table',
+            table_name= GLOBAL_VARIABLES['governance']['g_listing_details_cache_table_name'],
             partition_key= dynamodb.Attribute(
-                name= 'shared_secret_arn', 
+                name= 'cache_key', 
                 type= dynamodb.AttributeType.STRING
             ),
+            time_to_live_attribute= 'expiration',
             billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy= RemovalPolicy.DESTROY
         )
 
-        g_dynamodb_tables.append(g_c_secrets_mapping_table)
-
-        # ----------------------- IAM for Account Cross-Account Access ---------------------------
-        a_account_ids = governance_props['a_account_numbers']
-        
-        g_cross_account_assume_role = iam.Role(
-            scope= self,
-            id= 'g_cross_account_assume_role',
-            role_name= GLOBAL_VARIABLES['governance']['g_cross_account_assume_role_name'],
-            assumed_by= iam.ServicePrincipal('lambda.amazonaws.com')
-        )
-
-        if a_account_ids:
-            a_common_lambda_role_name = GLOBAL_VARIABLES['account']['a_common_lambda_role_name']
-            g_cross_account_assume_trust_policy = iam.PolicyStatement(
-                actions=["sts:AssumeRole"],
-                principals=[iam.AnyPrincipal()],
-                conditions={
-                    "StringEquals": {
-                        "aws:PrincipalAccount": a_account_ids,
-                    },
-                    "ArnLike": {
-                        "aws:PrincipalArn": f"arn:aws:iam::*:role/{a_common_lambda_role_name}"
-                    }
-                }
-            )
-
-            g_cross_account_assume_role.assume_role_policy.add_statements(g_cross_account_assume_trust_policy)
-
-        g_cross_account_assume_role_policy = iam.ManagedPolicy(
-            scope= self,
-            id= 'g_cross_account_assume_role_policy',
-            managed_policy_name= 'g_cross_account_assume_role_policy',
-            statements= [
-                iam.PolicyStatement(
-                    actions=['dynamodb:Query', 'dynamodb:GetItem', 'dynamodb:putItem', 'dynamodb:UpdateItem', 'dynamodb:BatchWriteItem', 'dynamodb:DeleteItem'],
-                    resources=[dynamodb_table.table_arn for dynamodb_table in g_dynamodb_tables]
-                )
-            ]
-        )
-
-        g_cross_account_assume_role.add_managed_policy(g_cross_account_assume_role_policy)
-
         # ----------------------- IAM for Lambda & Step Functions ---------------------------
         g_common_lambda_role = iam.Role(
             scope= self,
@@ -143,13 +214,21 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
             managed_policy_name= 'g_common_lambda_policy',
             statements= [
                 iam.PolicyStatement(
-                    actions=['datazone:GetEnvironment', 'datazone:GetEnvironmentBlueprint', 'datazone:GetListing', 'datazone:GetProject', 'datazone:GetEnvironment', 'datazone:GetEnvironmentProfile', 'datazone:ListEnvironments'],
+                    actions=['datazone:GetEnvironment', 'datazone:GetEnvironmentBlueprint', 'datazone:GetListing', 'datazone:GetProject', 'datazone:GetEnvironment', 'datazone:GetEnvironmentProfile', 'datazone:ListEnvironments', 'datazone:ListSubscriptions'],
                     resources=[f'arn:aws:datazone:{region}:{account_id}:domain/*']
                 ),
                 iam.PolicyStatement(
                     actions=['states:StartExecution'],
                     resources=[f'arn:aws:states:{region}:{account_id}:stateMachine:dz_conn_g_*']
                 ),
+                iam.PolicyStatement(
+                    actions=['states:DescribeExecution'],
+                    resources=[f'arn:aws:states:{region}:{account_id}:execution:dz_conn_g_*']
+                ),
+                iam.PolicyStatement(
+                    actions=['states:SendTaskSuccess', 'states:SendTaskFailure'],
+                    resources=[f'arn:aws:states:{region}:{account_id}:stateMachine:dz_conn_g_*']
+                ),
                 iam.PolicyStatement(
                     actions=['logs:CreateLogGroup'],
                     resources=[f'arn:aws:logs:{region}:{account_id}:*']
@@ -190,10 +269,25 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
                 iam.PolicyStatement(
                     actions=['xray:PutTraceSegments', 'xray:PutTelemetryRecords', 'xray:GetSamplingRules', 'xray:GetSamplingTargets'],
                     resources=[f'arn:aws:xray:{region}:{account_id}:*']
+                ),
+                iam.PolicyStatement(
+                    actions=['states:StartExecution'],
+                    resources=[f'arn:aws:states:{region}:{account_id}:stateMachine:dz_conn_g_*']
+                ),
+                iam.PolicyStatement(
+                    actions=['states:DescribeExecution', 'states:StopExecution'],
+                    resources=[f'arn:aws:states:{region}:{account_id}:execution:dz_conn_g_*']
+                ),
+                iam.PolicyStatement(
+                    actions=['events:PutTargets', 'events:PutRule', 'events:DescribeRule'],
+                    resources=[f'arn:aws:events:{region}:{account_id}:rule/StepFunctionsGetEventsForStepFunctionsExecutionRule']
                 )
             ]
         )
 
+        # Bulk subscription workflow reads its manifest and writes its results in governance bucket
+        g_bucket.grant_read_write(g_common_sf_role)
+
         if a_account_ids:
             a_cross_account_assume_role_name = GLOBAL_VARIABLES['account']['a_cross_account_assume_role_name']
             g_common_sf_assume_role_policy_statement = iam.PolicyStatement(
@@ -205,6 +299,38 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
 
         g_common_sf_role.add_managed_policy(g_common_sf_policy)
 
+        # ----------------------- IAM for Cross-Account Callbacks ---------------------------
+        if a_account_ids:
+            a_common_lambda_role_name = GLOBAL_VARIABLES['account']['a_common_lambda_role_name']
+
+            # Trust is scoped by account and role name since account roles are created after governance account resources
+            g_cross_account_callback_role = iam.Role(
+                scope= self,
+                id= 'g_cross_account_callback_role',
+                role_name= GLOBAL_VARIABLES['governance']['g_cross_account_callback_role_name'],
+                assumed_by= iam.CompositePrincipal(
+                    *[iam.AccountPrincipal(a_account_id) for a_account_id in a_account_ids]
+                ).with_conditions({
+                    "ArnLike": {
+                        "aws:PrincipalArn": f"arn:aws:iam::*:role/{a_common_lambda_role_name}"
+                    }
+                })
+            )
+
+            g_cross_account_callback_policy = iam.ManagedPolicy(
+                scope= self,
+                id= 'g_cross_account_callback_policy',
+                managed_policy_name= 'dz_conn_g_cross_account_callback_policy',
+                statements= [
+                    iam.PolicyStatement(
+                        actions=['states:SendTaskSuccess', 'states:SendTaskFailure', 'states:SendTaskHeartbeat'],
+                        resources=[f'arn:aws:states:{region}:{account_id}:stateMachine:dz_conn_g_*']
+                    )
+                ]
+            )
+
+            g_cross_account_callback_role.add_managed_policy(g_cross_account_callback_policy)
+
         # ----------------------- IAM for EventBridge ---------------------------
         g_common_eventbridge_role = iam.Role(
             scope= self,
@@ -231,16 +357,121 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
 
         g_common_eventbridge_role.add_managed_policy(g_common_eventbridge_policy)
 
+        # ---------------- SQS ------------------------
+        g_subscription_events_props = governance_props['subscription_events']
+        g_lambda_functions_props = governance_props['lambda_functions']
+
+        g_subscription_events_dlq = sqs.Queue(
+            scope= self,
+            id= 'g_subscription_events_dlq',
+            queue_name= 'dz_conn_g_subscription_events_dlq.fifo',
+            fifo= True,
+            encryption= sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl= True,
+            retention_period= Duration.days(14)
+        )
+
+        # FIFO queue so that subscription events are started (queued in their lane) in the order they were received. All events share a single message group,
+        # since EventBridge only sets a static group id, so start_subscription_workflow consumes them one batch at a time
+        g_subscription_events_queue = sqs.Queue(
+            scope= self,
+            id= 'g_subscription_events_queue',
+            queue_name= GLOBAL_VARIABLES['governance']['g_subscription_events_queue_name'],
+            fifo= True,
+            content_based_deduplication= True,
+            encryption= sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl= True,
+            visibility_timeout= Duration.seconds(6 * g_lambda_functions_props['g_start_subscription_workflow']['timeout_in_seconds']),
+            dead_letter_queue= sqs.DeadLetterQueue(
+                queue= g_subscription_events_dlq,
+                max_receive_count= g_subscription_events_props['max_receive_count']
+            )
+        )
+
+        # Subscription event rules (deployed in workflows stack) are allowed by name, so that queue policy does not reference rule ARNs (cyclic reference between stacks)
+        g_subscription_events_queue.add_to_resource_policy(
+            iam.PolicyStatement(
+                principals= [iam.ServicePrincipal('events.amazonaws.com')],
+                actions= ['sqs:SendMessage', 'sqs:GetQueueAttributes', 'sqs:GetQueueUrl'],
+                resources= [g_subscription_events_queue.queue_arn],
+                conditions= {
+                    'ArnLike': {
+                        'aws:SourceArn': f'arn:aws:events:{region}:{account_id}:rule/dz_conn_g_manage_subscription_*_rule'
+                    }
+                }
+            )
+        )
+
+        g_subscription_workflows_dlq = sqs.Queue(
+            scope= self,
+            id= 'g_subscription_workflows_dlq',
+            queue_name= 'dz_conn_g_subscription_workflows_dlq.fifo',
+            fifo= True,
+            encryption= sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl= True,
+            retention_period= Duration.days(14)
+        )
+
+        # FIFO queues (one per lane) grouped by (consumer environment, asset) so that workflows for the same key run strictly in order.
+        # Revokes have their own lane so that they are never queued behind grants
+        g_subscription_grant_workflows_queue = sqs.Queue(
+            scope= self,
+            id= 'g_subscription_grant_workflows_queue',
+            queue_name= GLOBAL_VARIABLES['governance']['g_subscription_grant_workflows_queue_name'],
+            fifo= True,
+            content_based_deduplication= True,
+            encryption= sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl= True,
+            visibility_timeout= Duration.seconds(g_lambda_functions_props['g_run_subscription_grant_workflow']['timeout_in_seconds'] + 30),
+            dead_letter_queue= sqs.DeadLetterQueue(
+                queue= g_subscription_workflows_dlq,
+                max_receive_count= g_subscription_events_props['max_workflow_receive_count']
+            )
+        )
+
+        g_subscription_revoke_workflows_queue = sqs.Queue(
+            scope= self,
+            id= 'g_subscription_revoke_workflows_queue',
+            queue_name= GLOBAL_VARIABLES['governance']['g_subscription_revoke_workflows_queue_name'],
+            fifo= True,
+            content_based_deduplication= True,
+            encryption= sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl= True,
+            visibility_timeout= Duration.seconds(g_lambda_functions_props['g_run_subscription_revoke_workflow']['timeout_in_seconds'] + 30),
+            dead_letter_queue= sqs.DeadLetterQueue(
+                queue= g_subscription_workflows_dlq,
+                max_receive_count= g_subscription_events_props['max_workflow_receive_count']
+            )
+        )
+
         # ---------------- Lambda Layer ------------------------
         g_boto3_layer = lambda_.LayerVersion(
             scope=self, 
             id='g_boto3_layer',
             layer_version_name='dz_conn_g_boto3_layer',
             code=lambda_.AssetCode('libs/python311/boto3-layer.zip'),
-            compatible_runtimes=[lambda_.Runtime.PYTHON_3_11]
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_11],
+            compatible_architectures=[lambda_.Architecture.ARM_64, lambda_.Architecture.X86_64]
+        )
+
+        g_common_layer = lambda_.LayerVersion(
+            scope=self, 
+            id='g_common_layer',
+            layer_version_name='dz_conn_g_common_layer',
+            code=lambda_.Code.from_asset('src/common/code/layer'),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_11, lambda_.Runtime.PYTHON_3_12],
+            compatible_architectures=[lambda_.Architecture.ARM_64, lambda_.Architecture.X86_64]
         )
 
         # ---------------- Lambda ------------------------        
+        g_listing_details_cache_props = governance_props['listing_details_cache']
+
+        g_listing_details_cache_environment = {
+            'G_LISTING_DETAILS_CACHE_TABLE_NAME': g_listing_details_cache_table.table_name,
+            'G_LISTING_DETAILS_CACHE_EXPIRATION_IN_SECONDS': str(g_listing_details_cache_props['expiration_in_seconds'])
+        }
+
+        g_get_environment_details_lambda_sizing = g_lambda_functions_props['g_get_environment_details']
         g_get_environment_details_lambda = lambda_.Function(
             scope= self,
             id= 'g_get_environment_details_lambda',
@@ -248,12 +479,17 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
             runtime= lambda_.Runtime.PYTHON_3_11,
             code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "get_environment_details")),
             handler= "get_environment_details.handler",
+            memory_size= g_get_environment_details_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_get_environment_details_lambda_sizing),
+            timeout= Duration.seconds(g_get_environment_details_lambda_sizing['timeout_in_seconds']),
             layers= [
-                g_boto3_layer
+                g_boto3_layer,
+                g_common_layer
             ],
             role= g_common_lambda_role
         )
 
+        g_get_subscription_details_lambda_sizing = g_lambda_functions_props['g_get_subscription_details']
         g_get_subscription_details_lambda = lambda_.Function(
             scope= self,
             id= 'g_get_subscription_details_lambda',
@@ -261,15 +497,50 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
             runtime= lambda_.Runtime.PYTHON_3_11,
             code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "get_subscription_details")),
             handler= "get_subscription_details.handler",
+            memory_size= g_get_subscription_details_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_get_subscription_details_lambda_sizing),
+            timeout= Duration.seconds(g_get_subscription_details_lambda_sizing['timeout_in_seconds']),
             layers= [
-                g_boto3_layer
+                g_boto3_layer,
+                g_common_layer
             ],
-            role= g_common_lambda_role
+            role= g_common_lambda_role,
+            environment= g_listing_details_cache_environment
+        )
+
+        g_prefetch_listing_details_lambda_sizing = g_lambda_functions_props['g_prefetch_listing_details']
+        g_prefetch_listing_details_lambda = lambda_.Function(
+            scope= self,
+            id= 'g_prefetch_listing_details_lambda',
+            function_name= 'dz_conn_g_prefetch_listing_details',
+            runtime= lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "prefetch_listing_details")),
+            handler= "prefetch_listing_details.handler",
+            memory_size= g_prefetch_listing_details_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_prefetch_listing_details_lambda_sizing),
+            timeout= Duration.seconds(g_prefetch_listing_details_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                g_boto3_layer,
+                g_common_layer
+            ],
+            role= g_common_lambda_role,
+            environment= g_listing_details_cache_environment
+        )
+
+        g_listing_details_cache_table.grant_read_write_data(g_common_lambda_role)
+
+        # Functions run on every subscription event are invoked through their live alias, the one holding provisioned concurrency
+        g_get_subscription_details_lambda_alias = add_live_alias(
+            scope= self,
+            id= 'g_get_subscription_details_lambda_alias',
+            function= g_get_subscription_details_lambda,
+            lambda_sizing= g_get_subscription_details_lambda_sizing
         )
 
         g_manage_subscription_grant_state_machine_name = GLOBAL_VARIABLES['governance']['g_manage_subscription_grant_state_machine_name']
         g_manage_subscription_revoke_state_machine_name = GLOBAL_VARIABLES['governance']['g_manage_subscription_revoke_state_machine_name']
         
+        g_start_subscription_workflow_lambda_sizing = g_lambda_functions_props['g_start_subscription_workflow']
         g_start_subscription_workflow_lambda = lambda_.Function(
             scope= self,
             id= 'g_start_subscription_workflow_lambda',
@@ -277,25 +548,349 @@ class DataZoneConnectorsGovernanceCommonStack(Stack):
             runtime= lambda_.Runtime.PYTHON_3_11,
             code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "start_subscription_workflow")),
             handler= "start_subscription_workflow.handler",
+            memory_size= g_start_subscription_workflow_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_start_subscription_workflow_lambda_sizing),
+            timeout= Duration.seconds(g_start_subscription_workflow_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                g_boto3_layer,
+                g_common_layer
+            ],
+            role= g_common_lambda_role,
+            environment= {
+                'G_SUBSCRIPTION_GRANT_WORKFLOW_ARN': f'arn:aws:states:{region}:{account_id}:stateMachine:{g_manage_subscription_grant_state_machine_name}',
+                'G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN': f'arn:aws:states:{region}:{account_id}:stateMachine:{g_manage_subscription_revoke_state_machine_name}',
+                'G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL': g_subscription_grant_workflows_queue.queue_url,
+                'G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL': g_subscription_revoke_workflows_queue.queue_url
+            }
+        )
+
+        g_start_subscription_workflow_lambda_alias = add_live_alias(
+            scope= self,
+            id= 'g_start_subscription_workflow_lambda_alias',
+            function= g_start_subscription_workflow_lambda,
+            lambda_sizing= g_start_subscription_workflow_lambda_sizing
+        )
+
+        g_subscription_grant_workflows_queue.grant_send_messages(g_start_subscription_workflow_lambda)
+        g_subscription_revoke_workflows_queue.grant_send_messages(g_start_subscription_workflow_lambda)
+
+        g_producer_account_permits_environment = {
+            'G_PRODUCER_ACCOUNT_PERMITS_TABLE_NAME': g_producer_account_permits_table.table_name,
+            'G_GRANT_MAX_CONCURRENCY_PER_PRODUCER_ACCOUNT': str(g_subscription_events_props['grant_max_concurrency_per_producer_account']),
+            'G_GRANT_PERMIT_EXPIRATION_IN_SECONDS': str(g_subscription_events_props['grant_permit_expiration_in_seconds'])
+        }
+
+        g_run_subscription_workflow_environment = {
+            'G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL': g_subscription_grant_workflows_queue.queue_url,
+            'G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL': g_subscription_revoke_workflows_queue.queue_url,
+            'G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME': g_subscription_workflow_messages_table.table_name,
+            'G_RUNNING_WORKFLOW_CHECK_INTERVAL_IN_SECONDS': str(g_subscription_events_props['running_workflow_check_interval_in_seconds']),
+            'G_MAX_WORKFLOW_RECEIVE_COUNT': str(g_subscription_events_props['max_workflow_receive_count']),
+            **g_producer_account_permits_environment
+        }
+
+        g_run_subscription_grant_workflow_lambda_sizing = g_lambda_functions_props['g_run_subscription_grant_workflow']
+        g_run_subscription_grant_workflow_lambda = lambda_.Function(
+            scope= self,
+            id= 'g_run_subscription_grant_workflow_lambda',
+            function_name= 'dz_conn_g_run_subscription_grant_workflow',
+            runtime= lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "run_subscription_workflow")),
+            handler= "run_subscription_workflow.handler",
+            memory_size= g_run_subscription_grant_workflow_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_run_subscription_grant_workflow_lambda_sizing),
+            timeout= Duration.seconds(g_run_subscription_grant_workflow_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                g_boto3_layer,
+                g_common_layer
+            ],
+            role= g_common_lambda_role,
+            environment= g_run_subscription_workflow_environment
+        )
+
+        g_run_subscription_grant_workflow_lambda_alias = add_live_alias(
+            scope= self,
+            id= 'g_run_subscription_grant_workflow_lambda_alias',
+            function= g_run_subscription_grant_workflow_lambda,
+            lambda_sizing= g_run_subscription_grant_workflow_lambda_sizing
+        )
+
+        # Revoke lane runs on its own reserved concurrency, so that revokes keep a bounded latency whatever the grant load
+        g_run_subscription_revoke_workflow_lambda_sizing = g_lambda_functions_props['g_run_subscription_revoke_workflow']
+        g_run_subscription_revoke_workflow_lambda = lambda_.Function(
+            scope= self,
+            id= 'g_run_subscription_revoke_workflow_lambda',
+            function_name= 'dz_conn_g_run_subscription_revoke_workflow',
+            runtime= lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "run_subscription_workflow")),
+            handler= "run_subscription_workflow.handler",
+            memory_size= g_run_subscription_revoke_workflow_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_run_subscription_revoke_workflow_lambda_sizing),
+            timeout= Duration.seconds(g_run_subscription_revoke_workflow_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                g_boto3_layer,
+                g_common_layer
+            ],
+            role= g_common_lambda_role,
+            reserved_concurrent_executions= g_subscription_events_props['revoke_reserved_concurrency'],
+            environment= g_run_subscription_workflow_environment
+        )
+
+        g_run_subscription_revoke_workflow_lambda_alias = add_live_alias(
+            scope= self,
+            id= 'g_run_subscription_revoke_workflow_lambda_alias',
+            function= g_run_subscription_revoke_workflow_lambda,
+            lambda_sizing= g_run_subscription_revoke_workflow_lambda_sizing
+        )
+
+        # Grant workflows take a producer account permit before running their sub-workflows (waiting while none is free), grant lane releases it once they finish
+        g_acquire_producer_account_permit_lambda_sizing = g_lambda_functions_props['g_acquire_producer_account_permit']
+        g_acquire_producer_account_permit_lambda = lambda_.Function(
+            scope= self,
+            id= 'g_acquire_producer_account_permit_lambda',
+            function_name= 'dz_conn_g_acquire_producer_account_permit',
+            runtime= lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "acquire_producer_account_permit")),
+            handler= "acquire_producer_account_permit.handler",
+            memory_size= g_acquire_producer_account_permit_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_acquire_producer_account_permit_lambda_sizing),
+            timeout= Duration.seconds(g_acquire_producer_account_permit_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                g_boto3_layer,
+                g_common_layer
+            ],
+            role= g_common_lambda_role,
+            environment= g_producer_account_permits_environment
+        )
+
+        g_producer_account_permits_table.grant_read_write_data(g_common_lambda_role)
+
+        g_complete_subscription_workflow_lambda_sizing = g_lambda_functions_props['g_complete_subscription_workflow']
+        g_complete_subscription_workflow_lambda = lambda_.Function(
+            scope= self,
+            id= 'g_complete_subscription_workflow_lambda',
+            function_name= 'dz_conn_g_complete_subscription_workflow',
+            runtime= lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "complete_subscription_workflow")),
+            handler= "complete_subscription_workflow.handler",
+            memory_size= g_complete_subscription_workflow_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_complete_subscription_workflow_lambda_sizing),
+            timeout= Duration.seconds(g_complete_subscription_workflow_lambda_sizing['timeout_in_seconds']),
             layers= [
-                g_boto3_layer
+                g_boto3_layer,
+                g_common_layer
             ],
             role= g_common_lambda_role,
             environment= {
+                'G_SUBSCRIPTION_WORKFLOW_MESSAGES_TABLE_NAME': g_subscription_workflow_messages_table.table_name
+            }
+        )
+
+        g_subscription_workflow_messages_table.grant_read_write_data(g_common_lambda_role)
+
+        for g_subscription_workflows_queue in [g_subscription_grant_workflows_queue, g_subscription_revoke_workflows_queue]:
+            g_subscription_workflows_queue.grant(g_common_lambda_role, 'sqs:ChangeMessageVisibility')
+
+        # Subscription workflows (deployed in workflows stack) are matched by ARN built from their name, so that rule does not reference workflows stack
+        g_complete_subscription_workflow_rule = events.Rule(
+            scope= self,
+            id= 'g_complete_subscription_workflow_rule',
+            rule_name= 'dz_conn_g_complete_subscription_workflow_rule',
+            event_pattern=events.EventPattern(
+                source=['aws.states'],
+                detail_type=['Step Functions Execution Status Change'],
+                detail={
+                    'status': ['SUCCEEDED', 'FAILED', 'TIMED_OUT', 'ABORTED'],
+                    'stateMachineArn': [
+                        f'arn:aws:states:{region}:{account_id}:stateMachine:{g_manage_subscription_grant_state_machine_name}',
+                        f'arn:aws:states:{region}:{account_id}:stateMachine:{g_manage_subscription_revoke_state_machine_name}'
+                    ]
+                }
+            )
+        )
+
+        g_complete_subscription_workflow_rule.add_target(event_targets.LambdaFunction(g_complete_subscription_workflow_lambda))
+
+        # One message per invocation so that different (consumer environment, asset) groups are never serialized within the same batch.
+        # Grant lane concurrency is capped so that grants cannot take all lambda concurrency and API quotas from revokes
+        g_run_subscription_grant_workflow_lambda_alias.add_event_source(
+            lambda_event_sources.SqsEventSource(
+                queue= g_subscription_grant_workflows_queue,
+                batch_size= 1,
+                max_concurrency= g_subscription_events_props['grant_max_concurrency'],
+                report_batch_item_failures= True
+            )
+        )
+
+        g_run_subscription_revoke_workflow_lambda_alias.add_event_source(
+            lambda_event_sources.SqsEventSource(
+                queue= g_subscription_revoke_workflows_queue,
+                batch_size= 1,
+                max_concurrency= g_subscription_events_props['revoke_reserved_concurrency'],
+                report_batch_item_failures= True
+            )
+        )
+
+        # Batching window is not supported on FIFO queues. Events received while a batch is being processed are coalesced in the next one
+        g_start_subscription_workflow_lambda_alias.add_event_source(
+            lambda_event_sources.SqsEventSource(
+                queue= g_subscription_events_queue,
+                batch_size= g_subscription_events_props['batch_size'],
+                report_batch_item_failures= True
+            )
+        )
+
+        g_prepare_bulk_subscription_manifest_lambda_sizing = g_lambda_functions_props['g_prepare_bulk_subscription_manifest']
+        g_prepare_bulk_subscription_manifest_lambda = lambda_.Function(
+            scope= self,
+            id= 'g_prepare_bulk_subscription_manifest_lambda',
+            function_name= 'dz_conn_g_prepare_bulk_subscription_manifest',
+            runtime= lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "prepare_bulk_subscription_manifest")),
+            handler= "prepare_bulk_subscription_manifest.handler",
+            memory_size= g_prepare_bulk_subscription_manifest_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_prepare_bulk_subscription_manifest_lambda_sizing),
+            timeout= Duration.seconds(g_prepare_bulk_subscription_manifest_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                g_boto3_layer,
+                g_common_layer
+            ],
+            role= g_common_lambda_role,
+            environment= {
+                'G_BUCKET_NAME': g_bucket.bucket_name,
                 'G_SUBSCRIPTION_GRANT_WORKFLOW_ARN': f'arn:aws:states:{region}:{account_id}:stateMachine:{g_manage_subscription_grant_state_machine_name}',
-                'G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN': f'arn:aws:states:{region}:{account_id}:stateMachine:{g_manage_subscription_revoke_state_machine_name}'
+                'G_SUBSCRIPTION_REVOKE_WORKFLOW_ARN': f'arn:aws:states:{region}:{account_id}:stateMachine:{g_manage_subscription_revoke_state_machine_name}',
+                'G_SUBSCRIPTION_GRANT_WORKFLOWS_QUEUE_URL': g_subscription_grant_workflows_queue.queue_url,
+                'G_SUBSCRIPTION_REVOKE_WORKFLOWS_QUEUE_URL': g_subscription_revoke_workflows_queue.queue_url
             }
         )
 
+        g_write_bulk_subscription_results_lambda_sizing = g_lambda_functions_props['g_write_bulk_subscription_results']
+        g_write_bulk_subscription_results_lambda = lambda_.Function(
+            scope= self,
+            id= 'g_write_bulk_subscription_results_lambda',
+            function_name= 'dz_conn_g_write_bulk_subscription_results',
+            runtime= lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset(path.join('src/governance/code/lambda', "write_bulk_subscription_results")),
+            handler= "write_bulk_subscription_results.handler",
+            memory_size= g_write_bulk_subscription_results_lambda_sizing['memory_size'],
+            architecture= get_architecture(g_write_bulk_subscription_results_lambda_sizing),
+            timeout= Duration.seconds(g_write_bulk_subscription_results_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                g_boto3_layer,
+                g_common_layer
+            ],
+            role= g_common_lambda_role
+        )
+
+        g_bucket.grant_read_write(g_common_lambda_role)
+
+        # Bulk subscription workflow queues each item in its lane and waits for the lane to report the status of its execution (task token callback)
+        for g_subscription_workflows_queue in [g_subscription_grant_workflows_queue, g_subscription_revoke_workflows_queue]:
+            g_subscription_workflows_queue.grant_send_messages(g_common_sf_role)
+
+        # ---------------- CloudWatch ------------------------
+        g_dashboard_props = governance_props['dashboard']
+
+        if g_dashboard_props['enabled']:
+            a_metrics_namespace = GLOBAL_VARIABLES['account']['a_metrics_namespace']
+            g_dashboard_period = Duration.seconds(g_dashboard_props['period_in_seconds'])
+
+            g_subscription_workflow_metrics = {
+                statistic: [
+                    cloudwatch.Metric(
+                        namespace= 'AWS/States',
+                        metric_name= 'ExecutionTime',
+                        dimensions_map= {'StateMachineArn': f'arn:aws:states:{region}:{account_id}:stateMachine:{state_machine_name}'},
+                        statistic= statistic,
+                        period= g_dashboard_period,
+                        label= f'{state_machine_name} ({statistic})'
+                    )
+                    for state_machine_name in [g_manage_subscription_grant_state_machine_name, g_manage_subscription_revoke_state_machine_name]
+                ]
+                for statistic in ['Average', 'p90']
+            }
+
+            # Phase metrics are emitted (in Embedded Metric Format) by lambda functions of all accounts. Search expressions include metrics of governed accounts
+            # once they are linked to governance account as source accounts of CloudWatch cross-account observability
+            g_dashboard = cloudwatch.Dashboard(
+                scope= self,
+                id= 'g_dashboard',
+                dashboard_name= 'dz_conn_g_dashboard',
+                default_interval= Duration.hours(3),
+                widgets= [
+                    [
+                        cloudwatch.TextWidget(
+                            markdown= f'# DataZone Connectors\nSubscription workflows execution time and time spent per phase of their steps (namespace *{a_metrics_namespace}*).',
+                            width= 24,
+                            height= 2
+                        )
+                    ],
+                    [
+                        cloudwatch.GraphWidget(
+                            title= 'Subscription workflows execution time (ms)',
+                            left= g_subscription_workflow_metrics['Average'] + g_subscription_workflow_metrics['p90'],
+                            width= 24
+                        )
+                    ],
+                    [
+                        get_phase_metrics_widget('Phase duration - average (ms)', a_metrics_namespace, ['Phase'], 'PhaseDuration', 'Average', g_dashboard_period),
+                        get_phase_metrics_widget('Phase duration - p90 (ms)', a_metrics_namespace, ['Phase'], 'PhaseDuration', 'p90', g_dashboard_period)
+                    ],
+                    [
+                        get_phase_metrics_widget('Phase duration by step - average (ms)', a_metrics_namespace, ['Phase', 'Step'], 'PhaseDuration', 'Average', g_dashboard_period),
+                        get_phase_metrics_widget('Phase failures', a_metrics_namespace, ['Phase'], 'PhaseFailures', 'Sum', g_dashboard_period)
+                    ],
+                    [
+                        get_phase_metrics_widget('Phase duration by engine - average (ms)', a_metrics_namespace, ['Phase', 'Engine'], 'PhaseDuration', 'Average', g_dashboard_period),
+                        get_phase_metrics_widget('Phase duration by producer account - average (ms)', a_metrics_namespace, ['Phase', 'ProducerAccountId'], 'PhaseDuration', 'Average', g_dashboard_period)
+                    ]
+                ]
+            )
+
+        # Export of the unqualified function ARN (imported by workflows stack before it moved to the live alias) kept so that stacks can be updated in order
+        self.export_value(g_get_subscription_details_lambda.function_arn)
+
         # -------------- Outputs --------------------
         self.outputs = {
-            'g_p_source_subscriptions_table': g_p_source_subscriptions_table,
-            'g_c_asset_subscriptions_table': g_c_asset_subscriptions_table,
-            'g_c_secrets_mapping_table': g_c_secrets_mapping_table,
+            'g_bucket': g_bucket,
+            'g_p_source_subscriptions_table': g_dynamodb_tables['g_p_source_subscriptions_table'],
+            'g_c_asset_subscriptions_table': g_dynamodb_tables['g_c_asset_subscriptions_table'],
+            'g_c_secrets_mapping_table': g_dynamodb_tables['g_c_secrets_mapping_table'],
+            'g_listing_details_cache_table': g_listing_details_cache_table,
             'g_common_lambda_role': g_common_lambda_role,
             'g_common_sf_role': g_common_sf_role,
             'g_common_eventbridge_role_name': g_common_eventbridge_role.role_name,
             'g_get_environment_details_lambda': g_get_environment_details_lambda,
             'g_get_subscription_details_lambda': g_get_subscription_details_lambda,
-            'g_start_subscription_workflow_lambda': g_start_subscription_workflow_lambda
+            'g_get_subscription_details_lambda_alias': g_get_subscription_details_lambda_alias,
+            'g_prefetch_listing_details_lambda': g_prefetch_listing_details_lambda,
+            'g_start_subscription_workflow_lambda': g_start_subscription_workflow_lambda,
+            'g_subscription_events_queue': g_subscription_events_queue,
+            'g_run_subscription_grant_workflow_lambda': g_run_subscription_grant_workflow_lambda,
+            'g_run_subscription_revoke_workflow_lambda': g_run_subscription_revoke_workflow_lambda,
+            'g_acquire_producer_account_permit_lambda': g_acquire_producer_account_permit_lambda,
+            'g_complete_subscription_workflow_lambda': g_complete_subscription_workflow_lambda,
+            'g_subscription_grant_workflows_queue': g_subscription_grant_workflows_queue,
+            'g_subscription_revoke_workflows_queue': g_subscription_revoke_workflows_queue,
+            'g_prepare_bulk_subscription_manifest_lambda': g_prepare_bulk_subscription_manifest_lambda,
+            'g_write_bulk_subscription_results_lambda': g_write_bulk_subscription_results_lambda
         }
+
+
+def get_phase_metrics_widget(title, namespace, dimension_names, metric_name, statistic, period):
+    """ Complementary function to get a dashboard graph of a phase metric (emitted by dz_conn_common.metrics), with one line per combination of the given dimensions.
+    Expression label is left empty, so that lines are labelled with their dimension values"""
+
+    return cloudwatch.GraphWidget(
+        title= title,
+        left= [
+            cloudwatch.MathExpression(
+                expression= f"SEARCH('{{{namespace},{','.join(dimension_names)}}} MetricName=\"{metric_name}\"', '{statistic}', {int(period.to_seconds())})",
+                using_metrics= {},
+                label= '',
+                period= period
+            )
+        ],
+        width= 12
+    )
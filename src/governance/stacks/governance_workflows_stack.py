@@ -8,6 +8,8 @@ from src.governance.constructs.governance_environment_active_workflow import Gov
 from src.governance.constructs.governance_environment_delete_workflow import GovernanceManageEnvironmentDeleteWorkflowConstruct
 from src.governance.constructs.governance_subscription_grant_workflow import GovernanceManageSubscriptionGrantWorkflowConstruct
 from src.governance.constructs.governance_subscription_revoke_workflow import GovernanceManageSubscriptionRevokeWorkflowConstruct
+from src.governance.constructs.governance_subscription_bulk_workflow import GovernanceManageSubscriptionBulkWorkflowConstruct
+from src.governance.constructs.governance_listing_published_workflow import GovernanceManageListingPublishedWorkflowConstruct
 
 class GovernanceWorkflowsStack(Stack):
     """ Class to represents the stack containing all workflows in governance account."""
@@ -78,3 +80,25 @@ class GovernanceWorkflowsStack(Stack):
             common_constructs = common_constructs,
             env = env
         )
+
+        g_manage_subscription_bulk_workflow_props = workflows_props['g_manage_subscription_bulk']
+
+        GovernanceManageSubscriptionBulkWorkflowConstruct(
+            scope = self, 
+            construct_id = 'dz-conn-g-manage-subscription-bulk-workflow-construct',
+            governance_props = governance_props,
+            workflow_props = g_manage_subscription_bulk_workflow_props,
+            common_constructs = common_constructs,
+            env = env
+        )
+
+        g_manage_listing_published_workflow_props = workflows_props['g_manage_listing_published']
+
+        GovernanceManageListingPublishedWorkflowConstruct(
+            scope = self, 
+            construct_id = 'dz-conn-g-manage-listing-published-workflow-construct',
+            governance_props = governance_props,
+            workflow_props = g_manage_listing_published_workflow_props,
+            common_constructs = common_constructs,
+            env = env
+        )
@@ -1,7 +1,8 @@
 import os
-import json
-from datetime import datetime
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+
+from dz_conn_common.clients import get_client, CLIENT_CONCURRENT_MAX_POOL_CONNECTIONS
+from dz_conn_common.projection import project
 
 # Constant: Lake Formation tag key to add to environment databases in glue catalog
 P_LAKEFORMATION_TAG_KEY = os.getenv('P_LAKEFORMATION_TAG_KEY')
@@ -12,7 +13,10 @@ P_LAKEFORMATION_TAG_VALUE = os.getenv('P_LAKEFORMATION_TAG_VALUE')
 # Constant: List of keys pointing to glue databases inside environment resource details
 P_ENVIRONMENT_DBS_KEYS = ['glueProducerDBName', 'glueConsumerDBName']
 
-lakeformation = boto3.client('lakeformation')
+# Constant: Represents the fields of lake formation AddLFTagsToResource responses used by the function
+LAKEFORMATION_ADD_LF_TAGS_FIELDS = ['Failures']
+
+lakeformation = get_client('lakeformation', max_pool_connections=CLIENT_CONCURRENT_MAX_POOL_CONNECTIONS)
 
 def handler(event, context):
     """ Function handler: Function that will add custom lake formation tag to all environment databases in glue catalog
@@ -36,28 +40,10 @@ def handler(event, context):
     environment_details = event['EnvironmentDetails']
     environment_resources = environment_details['EnvironmentResources']
 
-    environment_db_names = []
-    for glue_db_key in P_ENVIRONMENT_DBS_KEYS:
-        
-        if glue_db_key in environment_resources:
-            
-            glue_db_name = environment_resources[glue_db_key]
-            lakeformation_response = lakeformation.add_lf_tags_to_resource(
-                Resource= {
-                    'Database': {
-                        'Name': glue_db_name
-                    }
-                },
-                LFTags= [
-                    {
-                        'TagKey': P_LAKEFORMATION_TAG_KEY,
-                        'TagValues': [P_LAKEFORMATION_TAG_VALUE]
-                    },
-                ]
-            )
-        
-            lakeformation_response = json.loads(json.dumps(lakeformation_response, default=json_datetime_encoder))
-            environment_db_names.append(glue_db_name)
+    environment_db_names = [environment_resources[glue_db_key] for glue_db_key in P_ENVIRONMENT_DBS_KEYS if glue_db_key in environment_resources]
+
+    with ThreadPoolExecutor(max_workers=max(len(environment_db_names), 1)) as executor:
+        list(executor.map(add_lf_tag_to_database, environment_db_names))
 
     response = {
         'environment_db_names': environment_db_names,
@@ -68,6 +54,23 @@ def handler(event, context):
     return response
 
 
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
\ No newline at end of file
+def add_lf_tag_to_database(glue_db_name):
+    """ Complementary function to add solution's lake formation tag to a glue database. Invoked concurrently for all environment databases"""
+
+    lakeformation_response = lakeformation.add_lf_tags_to_resource(
+        Resource= {
+            'Database': {
+                'Name': glue_db_name
+            }
+        },
+        LFTags= [
+            {
+                'TagKey': P_LAKEFORMATION_TAG_KEY,
+                'TagValues': [P_LAKEFORMATION_TAG_VALUE]
+            },
+        ]
+    )
+
+    lakeformation_response = project(lakeformation_response, LAKEFORMATION_ADD_LF_TAGS_FIELDS)
+
+    return lakeformation_response
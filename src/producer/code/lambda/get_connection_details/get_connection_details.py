@@ -1,7 +1,11 @@
 import os
-import json
-import boto3
-from datetime import datetime
+import time
+
+from dz_conn_common.priming import on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.projection import project
+from dz_conn_common.connection_details_cache import get_table_cache_key, get_connection_cache_key, get_cached_value, put_cached_value
+from dz_conn_common.connection_index import get_glue_table_arn, get_indexed_connection_details
 
 # Constant: Represents the account id
 ACCOUNT_ID = os.getenv('ACCOUNT_ID')
@@ -9,11 +13,30 @@ ACCOUNT_ID = os.getenv('ACCOUNT_ID')
 # Constant: Represents the region
 REGION = os.getenv('REGION')
 
-glue = boto3.client('glue') 
+# Constant: Represents the fields of glue GetTable and GetConnection responses used by the function (and cached along with the version they were resolved from)
+GLUE_TABLE_FIELDS = ['Table.StorageDescriptor.Location', 'Table.Parameters.UPDATED_BY_CRAWLER', 'Table.Parameters.connectionName', 'Table.VersionId', 'Table.UpdateTime']
+GLUE_CONNECTION_FIELDS = ['Connection.ConnectionType', 'Connection.ConnectionProperties', 'Connection.LastUpdatedTime']
+
+# Constant: Represents the glue connection property holding a password, for connections not using a secret
+GLUE_CONNECTION_PASSWORD_PROPERTY = 'PASSWORD'
+
+glue = None
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
+
+    global glue
+    glue = get_client('glue')
+
+
+create_clients()
 
 def handler(event, context):
     """ Function handler: Function that will retrieve subscription's data asset source glue connection details. 1/ Will retrieve data asset metadata from glue data catalog, then
-    2/ will retrieve connection details, including credentials secret name/arn and source data asset name
+    2/ will retrieve connection details, including credentials secret name/arn and source data asset name. Tables indexed when crawled are served from the connection index
+    in a single lookup. Otherwise, both are served from the connection details cache when cached (in memory or in producer DynamoDB table), cache is invalidated by glue data catalog change events.
 
     Parameters
     ----------
@@ -35,32 +58,25 @@ def handler(event, context):
              JDBC_CONNECTION_URL: str - Connection URL to connect to source
              SECRET_ID: str - ARN of the secret with credential used by glue connection to connect to source database
         ConnectionAssetName: str - Name of the asset on source database mapped to subscribed table in Glue catalog
-        ConnectionCrawlerName: str - Name of the crawler the retrieved subscribed asset
+        ConnectionCrawlerName: str - Name of the crawler the retrieved subscribed asset. None if table was not written by a crawler
     """    
     subscription_details = event['SubscriptionDetails']
     
     glue_database_name = subscription_details['AssetDetails']['GlueTableDetails']['DatabaseName']
     glue_table_name = subscription_details['AssetDetails']['GlueTableDetails']['TableName']
 
-    glue_response = glue.get_table(
-        DatabaseName=glue_database_name,
-        Name=glue_table_name
-    )
+    glue_connection_details = get_indexed_connection_details(get_glue_table_arn(REGION, ACCOUNT_ID, glue_database_name, glue_table_name))
+    if glue_connection_details is not None: return glue_connection_details
 
-    glue_response = json.loads(json.dumps(glue_response, default=json_datetime_encoder))
-    glue_table_details = glue_response['Table']
+    glue_table_details = get_glue_table_details(glue_database_name, glue_table_name)
     glue_table_database_asset_name = glue_table_details['StorageDescriptor']['Location']
-    glue_crawler_name = glue_table_details['Parameters']['UPDATED_BY_CRAWLER']
+    glue_crawler_name = glue_table_details['Parameters'].get('UPDATED_BY_CRAWLER')
     glue_connection_name = glue_table_details['Parameters']['connectionName']
     glue_connection_arn = f'arn:aws:glue:{REGION}:{ACCOUNT_ID}:connection/{glue_connection_name}'
 
-    glue_response = glue.get_connection(
-        Name=glue_connection_name
-    )
-
-    glue_response = json.loads(json.dumps(glue_response, default=json_datetime_encoder))
-    glue_connection_type = glue_response['Connection']['ConnectionType']
-    glue_connection_properties = glue_response['Connection']['ConnectionProperties']
+    glue_connection = get_glue_connection(glue_connection_name)
+    glue_connection_type = glue_connection['ConnectionType']
+    glue_connection_properties = glue_connection['ConnectionProperties']
 
     glue_connection_details = {
         'ConnectionType': glue_connection_type,
@@ -74,6 +90,41 @@ def handler(event, context):
     return glue_connection_details
 
 
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
\ No newline at end of file
+def get_glue_table_details(glue_database_name, glue_table_name):
+    """ Complementary function to get the details of a glue table, from connection details cache or from glue data catalog (caching them) if not cached"""
+
+    table_cache_key = get_table_cache_key(glue_database_name, glue_table_name)
+    glue_table_details = get_cached_value(table_cache_key)
+    if glue_table_details is not None: return glue_table_details
+
+    resolved_at = time.time()
+    glue_response = glue.get_table(
+        DatabaseName=glue_database_name,
+        Name=glue_table_name
+    )
+
+    glue_response = project(glue_response, GLUE_TABLE_FIELDS)
+    glue_table_details = glue_response['Table']
+    put_cached_value(table_cache_key, glue_table_details, glue_table_details.get('VersionId', glue_table_details.get('UpdateTime')), resolved_at)
+
+    return glue_table_details
+
+
+def get_glue_connection(glue_connection_name):
+    """ Complementary function to get a glue connection, from connection details cache or from glue data catalog (caching it) if not cached.
+    Connections holding credentials in their properties (instead of a secret) are only cached in memory"""
+
+    connection_cache_key = get_connection_cache_key(glue_connection_name)
+    glue_connection = get_cached_value(connection_cache_key)
+    if glue_connection is not None: return glue_connection
+
+    resolved_at = time.time()
+    glue_response = glue.get_connection(
+        Name=glue_connection_name
+    )
+
+    glue_response = project(glue_response, GLUE_CONNECTION_FIELDS)
+    glue_connection = glue_response['Connection']
+    put_cached_value(connection_cache_key, glue_connection, glue_connection.get('LastUpdatedTime'), resolved_at, persist= GLUE_CONNECTION_PASSWORD_PROPERTY not in glue_connection['ConnectionProperties'])
+
+    return glue_connection
@@ -1,23 +1,27 @@
 import os
 import json
+import time
 import uuid
 import string
 import random
-import boto3
+from botocore.exceptions import ClientError
 from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 from datetime import datetime
 from urllib.parse import urlparse
 
-import awswrangler as wr
+from dz_conn_common.priming import prime, on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.idempotency import idempotent
+from dz_conn_common.projection import project
+from dz_conn_common.source_connector import get_connection, import_drivers
+from dz_conn_common.semaphore import source_semaphore
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_DDL_EXECUTION, PHASE_DYNAMODB_WRITE, PHASE_SECRET_CREATION, PHASE_KMS
 
-# Constant: Represents the governance account id
-G_ACCOUNT_ID = os.getenv('G_ACCOUNT_ID')
+# Constant: Represents the region of the governance DynamoDB tables to be used when updating metadata
+G_DYNAMODB_REGION = os.getenv('G_DYNAMODB_REGION')
 
-# Constant: Represents the governance cross account role name to be used when updating metadata in DynamoDB
-G_CROSS_ACCOUNT_ASSUME_ROLE_NAME = os.getenv('G_CROSS_ACCOUNT_ASSUME_ROLE_NAME')
-
-# Constant: Represents the governance DynamoDB table to map producer source connection subscriptions
-G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME = os.getenv('G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME')
+# Constant: Represents the ARN of the governance DynamoDB table to map producer source connection subscriptions
+G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN = os.getenv('G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN')
 
 # Constant: Represents the alias of the account common kms key
 A_COMMON_KEY_ALIAS = os.getenv('A_COMMON_KEY_ALIAS')
@@ -31,26 +35,71 @@ REGION = os.getenv('REGION')
 # Constant: Represents the length of the passwords to be generated
 PASSWORD_LENGTH = 17
 
-g_cross_account_role_arn = f'arn:aws:iam::{G_ACCOUNT_ID}:role/{G_CROSS_ACCOUNT_ASSUME_ROLE_NAME}'
+# Constant: Represents the statements (per source database engine) run to create the subscription user (if non existent) and grant it access to the subscribed asset.
+# Templates are formatted with user, password, asset_name, asset_schema and asset_table
+GRANT_STATEMENT_TEMPLATES = {
+    'mysql': [
+        'CREATE USER IF NOT EXISTS {user} IDENTIFIED BY "{password}";',
+        'GRANT SELECT ON {asset_name} TO {user};'
+    ],
+    'postgresql': [
+        "DO $$ BEGIN IF NOT EXISTS (SELECT FROM pg_user WHERE usename='{user}') THEN CREATE ROLE {user} LOGIN PASSWORD '{password}';END IF;END $$;",
+        'GRANT USAGE ON SCHEMA {asset_schema} TO {user};',
+        'GRANT SELECT ON {asset_schema}.{asset_table} TO {user};'
+    ],
+    'sqlserver': [
+        "IF NOT EXISTS (SELECT * FROM master.dbo.syslogins WHERE loginname = '{user}') BEGIN CREATE LOGIN {user} WITH PASSWORD = '{password}'; CREATE USER {user} FOR LOGIN {user}; GRANT VIEW DATABASE STATE TO {user}; GRANT VIEW DEFINITION TO {user}; END;",
+        'GRANT SELECT ON {asset_schema}.{asset_table} TO {user};'
+    ],
+    'oracle': [
+        "DECLARE userexist INTEGER; BEGIN SELECT COUNT(*) into userexist FROM dba_users WHERE username=UPPER('{user}'); IF (userexist = 0) THEN EXECUTE IMMEDIATE 'CREATE USER {user} IDENTIFIED BY \"{password}\"'; EXECUTE IMMEDIATE 'GRANT CONNECT, CREATE SESSION TO {user}'; END IF; END;",
+        'GRANT SELECT ON {asset_schema}.{asset_table} TO {user}'
+    ]
+}
+
+# Constant: Represents the fields of secrets manager CreateSecret responses used by the function
+SECRETS_MANAGER_CREATE_SECRET_FIELDS = ['ARN', 'Name']
+
+# Constant: Represents the maximum number of attempts to write the subscription item when it is written concurrently by other grants / revokes of the same glue connection and environment
+SUBSCRIPTION_ITEM_MAX_ATTEMPTS = 10
+
+# Constant: Represents the base and maximum delays (exponential backoff with full jitter) before writing again a subscription item written concurrently
+SUBSCRIPTION_ITEM_BASE_DELAY_IN_SECONDS = 0.1
+SUBSCRIPTION_ITEM_MAX_DELAY_IN_SECONDS = 2
+
+secrets_manager = None
+kms = None
+dynamodb = None
+dynamodb_deserializer = TypeDeserializer()
+dynamodb_serializer = TypeSerializer()
 
-secrets_manager = boto3.client('secretsmanager')
-kms = boto3.client('kms')
+kms_key_arn = None
 
-sts = boto3.client('sts')
-sts_session = sts.assume_role(RoleArn=g_cross_account_role_arn, RoleSessionName='p-dynamodb-session')
 
-session_key_id = sts_session['Credentials']['AccessKeyId']
-session_access_key = sts_session['Credentials']['SecretAccessKey']
-session_token = sts_session['Credentials']['SessionToken']
+class SubscriptionItemConflictError(Exception):
+    """ Exception raised when the subscription item could not be written because it was written concurrently on all attempts. Caller is expected to retry later."""
+
+
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
+
+    global secrets_manager, kms, dynamodb
+    secrets_manager = get_client('secretsmanager')
+    kms = get_client('kms')
+    dynamodb = get_client('dynamodb', region_name=G_DYNAMODB_REGION)
 
-dynamodb = boto3.client('dynamodb', aws_access_key_id=session_key_id, aws_secret_access_key=session_access_key, aws_session_token=session_token)
-dynamodb_deserializer = TypeDeserializer()
-dynamodb_serializer = TypeSerializer()
 
+create_clients()
+
+
+@idempotent(key_paths=['SubscriptionDetails.DomainId', 'SubscriptionDetails.ConsumerProjectDetails.EnvironmentId', 'ConnectionDetails.ConnectionArn', 'ConnectionDetails.ConnectionAssetName'])
 def handler(event, context):
     """ Function handler: Function that will grant the subscription in source database by 1/ Connecting to source database using glue connection secret and details,
-    2/ Create a new user for subscribing project (if non existent) and add grants to specific subscribed asset, then 3/ create a secret with new credentials (if new user was created)
-    or point to the already shared secret associated to the same source connection and 4/ Updating metadata in governance DynamoDB table that maps subscriptions to producer source connections. 
+    2/ Create a new user for subscribing project (if non existent) and add grants to specific subscribed asset, with the credentials of a new secret (if no subscription item exists)
+    or of the already shared secret associated to the same source connection and 3/ Updating metadata in governance DynamoDB table that maps subscriptions to producer source connections. 
+    Subscription item is shared by all assets of the same source connection and environment, so it is written conditionally on its version and read again if written concurrently.
+    Access to source database is limited by a semaphore per glue connection, raising SemaphoreAcquireTimeoutError (to be retried by the workflow) if no permit is available in time.
 
     Parameters
     ----------
@@ -66,7 +115,7 @@ def handler(event, context):
                 SECRET_ID: str - ARN of the secret with credential used by glue connection to connect to source database
                 JDBC_CONNECTION_URL: str - Connection URL to connect to source
 
-    context: dict - Input context. Not used on function
+    context: dict - Input context. Used to stop waiting for a source semaphore permit before lambda is about to time out
 
     Returns
     -------
@@ -81,6 +130,7 @@ def handler(event, context):
         owner_account: str - Id of the account that owns the item
         owner_region: str - Region that owns the item
         last_updated: str - Datetime of last update performed on the item
+        version: int - Version of the item, incremented on each write
         new_subscription_secret: str - 'true' or 'false' depending on if subscription secret was newly created or not. 
     """
 
@@ -107,56 +157,87 @@ def handler(event, context):
     glue_connection_host, glue_connection_port  = glue_connection_url_path.netloc.split(':')
     glue_connection_database_name = glue_connection_url_path.path.replace('/', '')
 
+    set_metric_dimensions(engine=glue_connection_engine, producer_account_id=ACCOUNT_ID)
+
     # Get data asset name associated to glue connection and subscription
     glue_connection_asset_name = glue_connection_details['ConnectionAssetName']
 
-    # Stablish connection to source, create user and grant access to data asset
-    source_connection = get_connection(glue_connection_engine, glue_connection_secret_arn, glue_connection_database_name)
-    create_grant_user_asset(glue_connection_engine, source_connection, subscription_user, subscription_password, glue_connection_asset_name)
-    
-    # Retrieve if existing subscription record in DynamoDB
-    new_subscription_secret= 'false'
-    subscription_item = get_subscription_item(glue_connection_arn, consumer_environment_id)
-    
-    if not subscription_item:
-        
-        # Create secret with connection details for project subscription
-        subscription_secret_name_suffix = str(uuid.uuid4()).replace('-', '')
-        subscription_secret_name = f'dz-conn-p-{consumer_project_id}-{consumer_environment_id}-{subscription_secret_name_suffix}'
-        subscription_secret_value = {
-            'engine': glue_connection_engine,
-            'host': glue_connection_host,
-            'port': glue_connection_port,
-            'db_name': glue_connection_database_name,
-            'username': subscription_user,
-            'password': subscription_password
-        }
+    # Get subscription record (secret and accessible data assets) or create it with a new secret if non existent. Created before the user, so that concurrent grants of the same
+    # source connection and environment share the same secret and create the user with its password
+    subscription_secret_value = {
+        'engine': glue_connection_engine,
+        'host': glue_connection_host,
+        'port': glue_connection_port,
+        'db_name': glue_connection_database_name,
+        'username': subscription_user,
+        'password': subscription_password
+    }
 
-        secrets_manager_response = create_secret(subscription_secret_name, subscription_secret_value)
-        subscription_secret_arn = secrets_manager_response['ARN']
-        subscription_secret_name = secrets_manager_response['Name']
-        new_subscription_secret = 'true'
-        subscription_data_assets = []
+    subscription_item, new_subscription_secret = get_or_create_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, subscription_secret_value)
+    if not new_subscription_secret: subscription_secret_value['password'] = get_secret_password(subscription_item['secret_arn'])
 
-    else:
-        subscription_secret_arn = subscription_item['secret_arn']
-        subscription_secret_name = subscription_item['secret_name']
-        subscription_data_assets = subscription_item['data_assets']
+    # Stablish connection to source, create user and grant access to data asset (holding a permit of the source semaphore to limit concurrent sessions)
+    with source_semaphore(glue_connection_arn, context):
+        source_connection = get_connection(glue_connection_engine, glue_connection_secret_arn, glue_connection_database_name, glue_connection_host, glue_connection_port)
+        create_grant_user_asset(glue_connection_engine, source_connection, subscription_user, subscription_secret_value['password'], glue_connection_asset_name)
 
-    if glue_connection_asset_name not in subscription_data_assets: subscription_data_assets.append(glue_connection_asset_name)
+    # Add data asset to DynamoDB record, reading it again if written concurrently by another grant / revoke
+    for attempt in range(SUBSCRIPTION_ITEM_MAX_ATTEMPTS):
+        if glue_connection_asset_name in subscription_item['data_assets']: break
 
-    # Create or update DynamoDB record with subscription details (connection secret and accessible dat assets)
-    subscription_item = update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, subscription_secret_arn, subscription_secret_name, subscription_data_assets)
-    subscription_item['new_subscription_secret'] = new_subscription_secret
+        subscription_data_assets = subscription_item['data_assets'] + [glue_connection_asset_name]
+        updated_subscription_item = update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, subscription_item['secret_arn'], subscription_item['secret_name'], subscription_data_assets, subscription_item['version'])
+        if updated_subscription_item:
+            subscription_item = updated_subscription_item
+            break
+
+        wait_subscription_item_attempt(attempt)
+        subscription_item, created_subscription_secret = get_or_create_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, subscription_secret_value)
+        new_subscription_secret = new_subscription_secret or created_subscription_secret
+
+    else:
+        raise SubscriptionItemConflictError(f'Subscription item of connection {glue_connection_arn} and environment {consumer_environment_id} written concurrently on {SUBSCRIPTION_ITEM_MAX_ATTEMPTS} attempts')
+
+    subscription_item['new_subscription_secret'] = 'true' if new_subscription_secret else 'false'
 
     return subscription_item
 
 
+def get_or_create_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, secret_value):
+    """ Complementary function to get item with source connection subscription details in respective governance DynamoDB table or, if non existent, create it with no data assets
+    and a new secret with the given value. If item is created concurrently by another grant, the new secret is deleted and the item of the other grant is returned.
+    Returns the item and if its secret was created or not"""
+
+    subscription_secret = None
+    for attempt in range(SUBSCRIPTION_ITEM_MAX_ATTEMPTS):
+        subscription_item = get_subscription_item(glue_connection_arn, consumer_environment_id)
+        if subscription_item: break
+
+        if not subscription_secret:
+            subscription_secret_name_suffix = str(uuid.uuid4()).replace('-', '')
+            subscription_secret = create_secret(f'dz-conn-p-{consumer_project_id}-{consumer_environment_id}-{subscription_secret_name_suffix}', secret_value)
+
+        subscription_item = update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, subscription_secret['ARN'], subscription_secret['Name'], [], None)
+        if subscription_item: break
+
+        wait_subscription_item_attempt(attempt)
+
+    else:
+        raise SubscriptionItemConflictError(f'Subscription item of connection {glue_connection_arn} and environment {consumer_environment_id} written concurrently on {SUBSCRIPTION_ITEM_MAX_ATTEMPTS} attempts')
+
+    new_subscription_secret = subscription_secret is not None and subscription_item['secret_arn'] == subscription_secret['ARN']
+    if subscription_secret and not new_subscription_secret: delete_secret(subscription_secret['ARN'])
+
+    return subscription_item, new_subscription_secret
+
+
 def get_subscription_item(glue_connection_arn, consumer_environment_id):
-    """ Complementary function to get item with source connection subscription details in respective governance DynamoDB table if existent, else None"""
+    """ Complementary function to get item with source connection subscription details in respective governance DynamoDB table if existent, else None.
+    Items written before versioning was introduced are returned with version 0"""
 
     dynamodb_response = dynamodb.get_item(
-        TableName= G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME,
+        TableName= G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN,
+        ConsistentRead= True,
         Key= {
             'glue_connection_arn': dynamodb_serializer.serialize(glue_connection_arn),
             'datazone_consumer_environment_id': dynamodb_serializer.serialize(consumer_environment_id)
@@ -164,14 +245,17 @@ def get_subscription_item(glue_connection_arn, consumer_environment_id):
     )
     
     subscription_item = None
-    if 'Item' in dynamodb_response:
+    if dynamodb_response.get('Item'):
         subscription_item = {key: dynamodb_deserializer.deserialize(value) for key, value in dynamodb_response['Item'].items()}
+        subscription_item['version'] = int(subscription_item.get('version', 0))
     
     return subscription_item
 
 
-def update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, secret_arn, secret_name, data_assets):
-    """ Complementary function to update item with source connection subscription details in respective governance DynamoDB table"""
+@measure_phase(PHASE_DYNAMODB_WRITE)
+def update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, secret_arn, secret_name, data_assets, version):
+    """ Complementary function to update item with source connection subscription details in respective governance DynamoDB table, conditionally on the version read (None if item
+    must not exist). Returns the item written, or None if item was written concurrently"""
 
     subscription_item = {
         'glue_connection_arn': glue_connection_arn,
@@ -183,120 +267,115 @@ def update_subscription_item(glue_connection_arn, consumer_environment_id, consu
         'data_assets': data_assets,
         'owner_account': ACCOUNT_ID,
         'owner_region': REGION,
-        'last_updated': datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        'last_updated': datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        'version': (version or 0) + 1
     }
-    
-    dynamodb_response = dynamodb.put_item(
-        TableName=G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME,
-        Item={key: dynamodb_serializer.serialize(value) for key, value in subscription_item.items()}
-    )
+
+    try:
+        dynamodb_response = dynamodb.put_item(
+            TableName=G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN,
+            Item={key: dynamodb_serializer.serialize(value) for key, value in subscription_item.items()},
+            **get_subscription_item_condition(version)
+        )
+
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+        return None
     
     return subscription_item
 
 
+def get_subscription_item_condition(version):
+    """ Complementary function to get the condition of a subscription item write based on the version read (None if item must not exist, 0 if item has no version)"""
+
+    if version is None:
+        return {'ConditionExpression': 'attribute_not_exists(glue_connection_arn)'}
+
+    if version == 0:
+        return {'ConditionExpression': 'attribute_exists(glue_connection_arn) AND attribute_not_exists(version)'}
+
+    return {'ConditionExpression': 'version = :version', 'ExpressionAttributeValues': {':version': dynamodb_serializer.serialize(version)}}
+
+
+def wait_subscription_item_attempt(attempt):
+    """ Complementary function to wait (exponential backoff with full jitter) before reading again a subscription item written concurrently"""
+
+    time.sleep(random.uniform(0, min(SUBSCRIPTION_ITEM_MAX_DELAY_IN_SECONDS, SUBSCRIPTION_ITEM_BASE_DELAY_IN_SECONDS * (2 ** attempt))))
+
+
+@measure_phase(PHASE_SECRET_CREATION)
 def create_secret(secret_name, secret_value):
     """ Complementary function to create a new secret local to the producer account"""
 
-    kms_response = kms.describe_key(
-        KeyId= f'alias/{A_COMMON_KEY_ALIAS}'
-    )
-    
-    kms_key_arn = kms_response['KeyMetadata']['Arn']
-    
     secrets_manager_response = secrets_manager.create_secret(
         Name=secret_name,
-        KmsKeyId=kms_key_arn,
+        KmsKeyId=get_kms_key_arn(),
         SecretString=json.dumps(secret_value)
     )
     
-    secrets_manager_response = json.loads(json.dumps(secrets_manager_response, default=json_datetime_encoder))
+    secrets_manager_response = project(secrets_manager_response, SECRETS_MANAGER_CREATE_SECRET_FIELDS)
     
     return secrets_manager_response
 
 
-def get_connection(engine, secret_arn, database_name):
-    """ Complementary function to get a new connection to source database"""
+@measure_phase(PHASE_SECRET_CREATION)
+def delete_secret(secret_arn):
+    """ Complementary function to delete (with no recovery window) a secret created by a grant that was not used because another grant created the subscription item concurrently"""
 
-    connection = None
-    if engine == 'mysql':
-        connection = wr.mysql.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    elif engine == 'postgresql':
-        connection = wr.postgresql.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    elif engine == 'sqlserver':
-        connection = wr.sqlserver.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    elif engine == 'oracle':
-        connection = wr.oracle.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    
-    else: raise Exception("Unsupported Database Engine") 
+    secrets_manager.delete_secret(
+        SecretId=secret_arn,
+        ForceDeleteWithoutRecovery=True
+    )
+
+
+def get_secret_password(secret_arn):
+    """ Complementary function to get the password of an existing subscription secret, so that the user is created with it if non existent yet"""
+
+    secrets_manager_response = secrets_manager.get_secret_value(
+        SecretId=secret_arn
+    )
 
-    return connection
+    return json.loads(secrets_manager_response['SecretString'])['password']
 
 
+@measure_phase(PHASE_DDL_EXECUTION)
 def create_grant_user_asset(engine, connection, user, password, asset_name):
     """ Complementary function to create a new user for subscribing project in source database (if non existent) and add grant permissions on subscribing data asset in source database"""
 
+    asset_name_parts = asset_name.split('.')
+    statement_parameters = {'user': user, 'password': password, 'asset_name': asset_name, 'asset_schema': asset_name_parts[-2], 'asset_table': asset_name_parts[-1]}
+
     with connection.cursor() as cursor:
-        
-        if engine == 'mysql':
-            create_user_query = f'CREATE USER IF NOT EXISTS {user} IDENTIFIED BY "{password}";'
-            cursor.execute(create_user_query)
-            
-            grant_query = f'GRANT SELECT ON {asset_name} TO {user};'
-            cursor.execute(grant_query)     
-        
-        elif engine == 'postgresql':            
-            create_user_query = f"DO $$ BEGIN IF NOT EXISTS (SELECT FROM pg_user WHERE usename='{user}') THEN CREATE ROLE {user} LOGIN PASSWORD '{password}';END IF;END $$;"
-            cursor.execute(create_user_query)
-            
-            asset_db, asset_schema, asset_table = asset_name.split('.')
-            grant_schema_query = f'GRANT USAGE ON SCHEMA {asset_schema} TO {user};'
-            cursor.execute(grant_schema_query)
-            
-            grant_asset_query = f'GRANT SELECT ON {asset_schema}.{asset_table} TO {user};'
-            cursor.execute(grant_asset_query)
-        
-        elif engine == 'sqlserver':            
-            create_user_query = f"IF NOT EXISTS (SELECT * FROM master.dbo.syslogins WHERE loginname = '{user}') BEGIN CREATE LOGIN {user} WITH PASSWORD = '{password}'; CREATE USER {user} FOR LOGIN {user}; GRANT VIEW DATABASE STATE TO {user}; GRANT VIEW DEFINITION TO {user}; END;"
-            cursor.execute(create_user_query)
-            
-            asset_db, asset_schema, asset_table = asset_name.split('.')
-            grant_asset_query = f'GRANT SELECT ON {asset_schema}.{asset_table} TO {user};'
-            cursor.execute(grant_asset_query)
-
-        elif engine == 'oracle':            
-            create_user_query = f"DECLARE userexist INTEGER; BEGIN SELECT COUNT(*) into userexist FROM dba_users WHERE username=UPPER('{user}'); IF (userexist = 0) THEN EXECUTE IMMEDIATE 'CREATE USER {user} IDENTIFIED BY \"{password}\"'; EXECUTE IMMEDIATE 'GRANT CONNECT, CREATE SESSION TO {user}'; END IF; END;"
-            print(create_user_query)
-            cursor.execute(create_user_query)
-            
-            asset_db, asset_schema, asset_table = asset_name.split('.')
-            grant_asset_query = f'GRANT SELECT ON {asset_schema}.{asset_table} TO {user}'
-            print(grant_asset_query)
-            cursor.execute(grant_asset_query)
+        for statement_template in GRANT_STATEMENT_TEMPLATES[engine]:
+            cursor.execute(statement_template.format(**statement_parameters))
 
     connection.commit()
     connection.close()
 
 
+def get_kms_key_arn():
+    """ Complementary function to get the ARN of the account common kms key from its alias. Looked up once per execution environment"""
+
+    global kms_key_arn
+    if kms_key_arn is None:
+        with measure_phase(PHASE_KMS):
+            kms_response = kms.describe_key(
+                KeyId= f'alias/{A_COMMON_KEY_ALIAS}'
+            )
+
+        kms_key_arn = kms_response['KeyMetadata']['Arn']
+
+    return kms_key_arn
+
+
 def generate_password():
-    ''' Complementary function to generate a random password'''
+    ''' Complementary function to generate a random password. Random module is re-seeded after a SnapStart restore (dz_conn_common.priming), so that restored environments do not generate the same passwords'''
     special_characters = '#$%&*!'
     characters = string.ascii_lowercase + string.ascii_uppercase + string.digits + special_characters
     password = ''.join(random.sample(characters, PASSWORD_LENGTH - 2))
     return f'p_{password}'
     
 
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
\ No newline at end of file
+
+# Priming: run expensive initialization on init phase of SnapStart / provisioned concurrency execution environments
+prime(get_kms_key_arn, import_drivers)
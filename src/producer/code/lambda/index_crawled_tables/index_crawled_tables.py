@@ -0,0 +1,170 @@
+import os
+import json
+import time
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+from dz_conn_common.clients import get_client, CLIENT_CONCURRENT_MAX_POOL_CONNECTIONS
+from dz_conn_common.projection import project
+from dz_conn_common.connection_index import (
+    P_CONNECTION_INDEX_TABLE_NAME, P_CONNECTION_INDEX_CRAWLER_INDEX_NAME, get_glue_table_arn, get_indexed_glue_table_arns, delete_indexed_connection_details
+)
+
+# Constant: Represents the account id
+ACCOUNT_ID = os.getenv('ACCOUNT_ID')
+
+# Constant: Represents the region
+REGION = os.getenv('REGION')
+
+# Constant: Represents the tag (key and value) identifying crawlers whose tables are indexed, added by solution's glue connection with crawlers products
+P_CONNECTION_INDEX_CRAWLER_TAG_KEY = os.getenv('P_CONNECTION_INDEX_CRAWLER_TAG_KEY')
+P_CONNECTION_INDEX_CRAWLER_TAG_VALUE = 'True'
+
+# Constant: Represents the fields of glue GetCrawler, GetTables (each table) and GetConnection responses used by the function
+GLUE_CRAWLER_FIELDS = ['Crawler.DatabaseName', 'Crawler.Targets.JdbcTargets']
+GLUE_TABLE_FIELDS = ['Name', 'StorageDescriptor.Location', 'Parameters.UPDATED_BY_CRAWLER', 'Parameters.connectionName']
+GLUE_CONNECTION_FIELDS = ['Connection.ConnectionType', 'Connection.ConnectionProperties']
+
+# Constant: Represents the glue connection property holding a password, for connections not using a secret. Tables of those connections are not indexed
+GLUE_CONNECTION_PASSWORD_PROPERTY = 'PASSWORD'
+
+glue = get_client('glue')
+dynamodb = get_client('dynamodb', max_pool_connections=CLIENT_CONCURRENT_MAX_POOL_CONNECTIONS)
+
+def handler(event, context):
+    """ Function handler: Function that will index the connection details of the glue tables written by a crawler of a solution's glue connection, once the crawler completes.
+    1/ Will check that the crawler is tagged as a solution's crawler, then 2/ will retrieve the tables the crawler updated in its glue database along with their connections and
+    3/ will write the connection details of each table in the connection index (keyed by glue table ARN), removing tables of the crawler that were not updated by the run.
+
+    Parameters
+    ----------
+    event: dict - EventBridge 'Glue Crawler State Change' event including:
+        detail: dict - Details of the event including:
+            crawlerName: str - Name of the crawler that completed
+            state: str - State of the crawler. Expected to be 'Succeeded'
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    response: dict - Dict with response details including:
+        crawler_name: str - Name of the crawler
+        indexed_glue_table_arns: list - ARNs of the glue tables indexed
+        removed_glue_table_arns: list - ARNs of the glue tables removed from the index
+    """
+
+    crawler_name = event['detail']['crawlerName']
+    indexed_at = time.time()
+
+    glue_response = glue.get_tags(ResourceArn=f'arn:aws:glue:{REGION}:{ACCOUNT_ID}:crawler/{crawler_name}')
+    if glue_response['Tags'].get(P_CONNECTION_INDEX_CRAWLER_TAG_KEY) != P_CONNECTION_INDEX_CRAWLER_TAG_VALUE:
+        print(f'Skipping crawler {crawler_name}, not tagged with {P_CONNECTION_INDEX_CRAWLER_TAG_KEY}')
+        return {'crawler_name': crawler_name, 'indexed_glue_table_arns': [], 'removed_glue_table_arns': []}
+
+    glue_response = project(glue.get_crawler(Name=crawler_name), GLUE_CRAWLER_FIELDS)
+    glue_crawler = glue_response['Crawler']
+    glue_database_name = glue_crawler['DatabaseName']
+    glue_connection_names = {jdbc_target['ConnectionName'] for jdbc_target in glue_crawler.get('Targets', {}).get('JdbcTargets', [])}
+
+    glue_connections = {glue_connection_name: get_glue_connection(glue_connection_name) for glue_connection_name in glue_connection_names}
+
+    index_items = [
+        get_index_item(glue_database_name, glue_table, glue_connections[glue_table['Parameters']['connectionName']], indexed_at)
+        for glue_table in get_crawler_glue_tables(glue_database_name, crawler_name)
+        if glue_table['Parameters'].get('connectionName') in glue_connections
+    ]
+
+    index_items = [index_item for index_item in index_items if index_item is not None]
+
+    with ThreadPoolExecutor(max_workers=CLIENT_CONCURRENT_MAX_POOL_CONNECTIONS) as executor:
+        list(executor.map(put_index_item, index_items))
+
+    indexed_glue_table_arns = [index_item['glue_table_arn']['S'] for index_item in index_items]
+
+    removed_glue_table_arns = [
+        glue_table_arn for glue_table_arn in get_indexed_glue_table_arns(P_CONNECTION_INDEX_CRAWLER_INDEX_NAME, crawler_name)
+        if glue_table_arn not in indexed_glue_table_arns
+    ]
+
+    delete_indexed_connection_details(removed_glue_table_arns, indexed_at)
+
+    response = {
+        'crawler_name': crawler_name,
+        'indexed_glue_table_arns': indexed_glue_table_arns,
+        'removed_glue_table_arns': removed_glue_table_arns
+    }
+
+    return response
+
+
+def get_glue_connection(glue_connection_name):
+    """ Complementary function to get a glue connection along with the source engine, host, port and database parsed from its JDBC URL (same parsing as grant / revoke functions)"""
+
+    glue_response = project(glue.get_connection(Name=glue_connection_name), GLUE_CONNECTION_FIELDS)
+    glue_connection = glue_response['Connection']
+    glue_connection['ConnectionName'] = glue_connection_name
+
+    glue_connection_url = urlparse(glue_connection['ConnectionProperties'].get('JDBC_CONNECTION_URL', ''))
+    glue_connection_url_path = urlparse(glue_connection_url.path)
+    glue_connection['Engine'] = glue_connection_url_path.scheme
+    glue_connection['Host'], _, glue_connection['Port'] = glue_connection_url_path.netloc.partition(':')
+    glue_connection['DatabaseName'] = glue_connection_url_path.path.replace('/', '')
+
+    return glue_connection
+
+
+def get_crawler_glue_tables(glue_database_name, crawler_name):
+    """ Complementary function to get the tables of a glue database last updated by a crawler. Only the fields used by the function are kept from each table"""
+
+    paginator = glue.get_paginator('get_tables')
+    page_iterator = paginator.paginate(DatabaseName=glue_database_name)
+
+    glue_tables = (project(glue_table, GLUE_TABLE_FIELDS) for page in page_iterator for glue_table in page['TableList'])
+
+    return [glue_table for glue_table in glue_tables if glue_table.get('Parameters', {}).get('UPDATED_BY_CRAWLER') == crawler_name]
+
+
+def get_index_item(glue_database_name, glue_table, glue_connection, indexed_at):
+    """ Complementary function to get the connection index item of a glue table. Connection details have the same structure as get connection details function response.
+    Tables of connections holding credentials in their properties (instead of a secret) are not indexed, returning None"""
+
+    if GLUE_CONNECTION_PASSWORD_PROPERTY in glue_connection['ConnectionProperties']:
+        print(f"Skipping table {glue_table['Name']}, connection {glue_connection['ConnectionName']} holds credentials in its properties")
+        return None
+
+    glue_connection_name = glue_connection['ConnectionName']
+    glue_connection_arn = f'arn:aws:glue:{REGION}:{ACCOUNT_ID}:connection/{glue_connection_name}'
+
+    connection_details = {
+        'ConnectionType': glue_connection['ConnectionType'],
+        'ConnectionArn': glue_connection_arn,
+        'ConnectionName': glue_connection_name,
+        'ConnectionProperties': glue_connection['ConnectionProperties'],
+        'ConnectionAssetName': glue_table['StorageDescriptor']['Location'],
+        'ConnectionCrawlerName': glue_table['Parameters']['UPDATED_BY_CRAWLER']
+    }
+
+    index_item = {
+        'glue_table_arn': {'S': get_glue_table_arn(REGION, ACCOUNT_ID, glue_database_name, glue_table['Name'])},
+        'connection_arn': {'S': glue_connection_arn},
+        'connection_name': {'S': glue_connection_name},
+        'engine': {'S': glue_connection['Engine']},
+        'host': {'S': glue_connection['Host']},
+        'port': {'S': glue_connection['Port']},
+        'database_name': {'S': glue_connection['DatabaseName']},
+        'asset_name': {'S': connection_details['ConnectionAssetName']},
+        'crawler_name': {'S': connection_details['ConnectionCrawlerName']},
+        'connection_details': {'S': json.dumps(connection_details)},
+        'indexed_at': {'N': str(indexed_at)}
+    }
+
+    return index_item
+
+
+def put_index_item(index_item):
+    """ Complementary function to write an item in the connection index. Invoked concurrently for all tables of the crawler"""
+
+    dynamodb.put_item(
+        TableName= P_CONNECTION_INDEX_TABLE_NAME,
+        Item= index_item
+    )
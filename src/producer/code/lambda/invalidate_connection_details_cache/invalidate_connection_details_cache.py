@@ -0,0 +1,100 @@
+import os
+from datetime import datetime
+
+from dz_conn_common.connection_details_cache import get_table_cache_key, get_connection_cache_key, invalidate_cached_values
+from dz_conn_common.connection_index import (
+    P_CONNECTION_INDEX_TABLE_NAME, P_CONNECTION_INDEX_CONNECTION_INDEX_NAME, get_glue_table_arn, get_indexed_glue_table_arns, delete_indexed_connection_details
+)
+
+# Constant: Represents the account id
+ACCOUNT_ID = os.getenv('ACCOUNT_ID')
+
+# Constant: Represents the region
+REGION = os.getenv('REGION')
+
+# Constant: Represents the format of EventBridge event times
+EVENT_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+
+# Constant: Represents the detail types of glue data catalog change events
+GLUE_TABLE_STATE_CHANGE_DETAIL_TYPE = 'Glue Data Catalog Table State Change'
+GLUE_DATABASE_STATE_CHANGE_DETAIL_TYPE = 'Glue Data Catalog Database State Change'
+
+# Constant: Represents the detail type of glue API calls recorded by CloudTrail (connection changes have no glue data catalog event)
+GLUE_API_CALL_DETAIL_TYPE = 'AWS API Call via CloudTrail'
+
+# Constant: Represents the request parameters holding the names of changed connections on each glue connection API call. Values are a name or a list of names
+GLUE_CONNECTION_API_CALL_NAME_PARAMETERS = {
+    'UpdateConnection': 'name',
+    'DeleteConnection': 'connectionName',
+    'BatchDeleteConnection': 'connectionNameList'
+}
+
+
+def handler(event, context):
+    """ Function handler: Function that will invalidate connection details cache entries of glue tables and connections changed in the account. Changed tables
+    (and tables of changed connections) indexed before the change are also removed from the connection index, so that they are resolved from glue until crawled again.
+    Triggered by glue data catalog table / database state change events and by glue connection API calls recorded by CloudTrail.
+
+    Parameters
+    ----------
+    event: dict - EventBridge event including:
+        detail-type: str - Type of the event, one of GLUE_TABLE_STATE_CHANGE_DETAIL_TYPE, GLUE_DATABASE_STATE_CHANGE_DETAIL_TYPE or GLUE_API_CALL_DETAIL_TYPE
+        time: str - Time of the event
+        detail: dict - Details of the event including:
+            databaseName: str - Name of the glue database of changed tables (glue data catalog events)
+            tableName: str - Name of the changed table (table state change events)
+            changedTables: list - Names of the changed tables (database state change events)
+            eventName: str - Name of the glue API call (CloudTrail events)
+            requestParameters: dict - Parameters of the glue API call (CloudTrail events)
+
+    context: dict - Input context. Not used on function
+
+    Returns
+    -------
+    response: dict - Dict with response details including:
+        invalidated_cache_keys: list - Keys of the invalidated cache entries
+        unindexed_glue_table_arns: list - ARNs of the glue tables removed from the connection index (if indexed before the change)
+    """
+
+    detail_type = event['detail-type']
+    event_details = event['detail']
+    event_time = datetime.strptime(event['time'].replace('Z', '+0000'), EVENT_TIME_FORMAT).timestamp()
+
+    if detail_type == GLUE_TABLE_STATE_CHANGE_DETAIL_TYPE:
+        glue_table_names = [(event_details['databaseName'], event_details['tableName'])]
+        glue_connection_names = []
+
+    elif detail_type == GLUE_DATABASE_STATE_CHANGE_DETAIL_TYPE:
+        glue_table_names = [(event_details['databaseName'], table_name) for table_name in event_details.get('changedTables', [])]
+        glue_connection_names = []
+
+    elif detail_type == GLUE_API_CALL_DETAIL_TYPE and event_details.get('eventName') in GLUE_CONNECTION_API_CALL_NAME_PARAMETERS:
+        glue_table_names = []
+        glue_connection_names = (event_details.get('requestParameters') or {}).get(GLUE_CONNECTION_API_CALL_NAME_PARAMETERS[event_details['eventName']], [])
+        glue_connection_names = [glue_connection_names] if isinstance(glue_connection_names, str) else glue_connection_names
+
+    else:
+        print(f'Skipping unsupported event {detail_type}')
+        glue_table_names, glue_connection_names = [], []
+
+    cache_keys = [get_table_cache_key(glue_database_name, glue_table_name) for glue_database_name, glue_table_name in glue_table_names]
+    cache_keys += [get_connection_cache_key(glue_connection_name) for glue_connection_name in glue_connection_names]
+
+    invalidate_cached_values(cache_keys)
+
+    glue_table_arns = []
+    if P_CONNECTION_INDEX_TABLE_NAME:
+        glue_table_arns = [get_glue_table_arn(REGION, ACCOUNT_ID, glue_database_name, glue_table_name) for glue_database_name, glue_table_name in glue_table_names]
+        glue_table_arns += [
+            glue_table_arn for glue_connection_name in glue_connection_names
+            for glue_table_arn in get_indexed_glue_table_arns(P_CONNECTION_INDEX_CONNECTION_INDEX_NAME, glue_connection_name)
+        ]
+
+        delete_indexed_connection_details(glue_table_arns, event_time)
+
+    response = {
+        'invalidated_cache_keys': cache_keys,
+        'unindexed_glue_table_arns': glue_table_arns
+    }
+
+    return response
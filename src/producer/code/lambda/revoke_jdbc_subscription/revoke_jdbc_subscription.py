@@ -1,42 +1,78 @@
 import os
-import json
-import boto3
+import time
+import random
+from botocore.exceptions import ClientError
 from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 from datetime import datetime
 from urllib.parse import urlparse
-import awswrangler as wr
 
-# Constant: Represents the governance account id
-G_ACCOUNT_ID = os.getenv('G_ACCOUNT_ID')
+from dz_conn_common.priming import prime, on_restore
+from dz_conn_common.clients import get_client
+from dz_conn_common.idempotency import idempotent
+from dz_conn_common.source_connector import get_connection, import_drivers
+from dz_conn_common.semaphore import source_semaphore
+from dz_conn_common.metrics import set_metric_dimensions, measure_phase, PHASE_DDL_EXECUTION, PHASE_DYNAMODB_WRITE
 
-# Constant: Represents the governance cross account role name to be used when updating metadata in DynamoDB
-G_CROSS_ACCOUNT_ASSUME_ROLE_NAME = os.getenv('G_CROSS_ACCOUNT_ASSUME_ROLE_NAME')
+# Constant: Represents the region of the governance DynamoDB tables to be used when updating metadata
+G_DYNAMODB_REGION = os.getenv('G_DYNAMODB_REGION')
 
-# Constant: Represents the governance DynamoDB table to map producer source connection subscriptions
-G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME = os.getenv('G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME')
+# Constant: Represents the ARN of the governance DynamoDB table to map producer source connection subscriptions
+G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN = os.getenv('G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN')
 
 # Constant: Represents the account id
 ACCOUNT_ID = os.getenv('ACCOUNT_ID')
 
-g_cross_account_role_arn = f'arn:aws:iam::{G_ACCOUNT_ID}:role/{G_CROSS_ACCOUNT_ASSUME_ROLE_NAME}'
+# Constant: Represents the statements (per source database engine) run to revoke subscription user access to the unsubscribed asset.
+# Templates are formatted with user, asset_name, asset_schema and asset_table
+REVOKE_STATEMENT_TEMPLATES = {
+    'mysql': ['REVOKE SELECT ON {asset_name} FROM {user};'],
+    'postgresql': ['REVOKE SELECT ON {asset_schema}.{asset_table} FROM {user};'],
+    'sqlserver': ['REVOKE SELECT ON {asset_schema}.{asset_table} TO {user};'],
+    'oracle': ['REVOKE SELECT ON {asset_schema}.{asset_table} FROM {user}']
+}
+
+# Constant: Represents the statements (per source database engine) run to delete subscription user when no subscribed assets are left. Templates are formatted with user
+DELETE_USER_STATEMENT_TEMPLATES = {
+    'mysql': ['DROP USER {user};'],
+    'postgresql': ['DROP OWNED BY {user};', 'DROP USER {user};'],
+    'sqlserver': ['DROP USER IF EXISTS {user};', 'DROP LOGIN {user};'],
+    'oracle': ["DECLARE userexist INTEGER; BEGIN SELECT COUNT(*) into userexist FROM dba_users WHERE username=UPPER('{user}'); IF (userexist = 1) THEN EXECUTE IMMEDIATE 'DROP USER {user} CASCADE'; END IF; END;"]
+}
+
+# Constant: Represents the maximum number of attempts to write the subscription item when it is written concurrently by other grants / revokes of the same glue connection and environment
+SUBSCRIPTION_ITEM_MAX_ATTEMPTS = 10
+
+# Constant: Represents the base and maximum delays (exponential backoff with full jitter) before writing again a subscription item written concurrently
+SUBSCRIPTION_ITEM_BASE_DELAY_IN_SECONDS = 0.1
+SUBSCRIPTION_ITEM_MAX_DELAY_IN_SECONDS = 2
+
+dynamodb = None
+dynamodb_deserializer = TypeDeserializer()
+dynamodb_serializer = TypeSerializer()
 
-secrets_manager = boto3.client('secretsmanager')
 
-sts = boto3.client('sts')
-sts_session = sts.assume_role(RoleArn=g_cross_account_role_arn, RoleSessionName='p-dynamodb-session')
+@on_restore
+def create_clients():
+    """ Complementary function to create the AWS clients used by the function"""
 
-session_key_id = sts_session['Credentials']['AccessKeyId']
-session_access_key = sts_session['Credentials']['SecretAccessKey']
-session_token = sts_session['Credentials']['SessionToken']
+    global dynamodb
+    dynamodb = get_client('dynamodb', region_name=G_DYNAMODB_REGION)
+
+
+create_clients()
 
-dynamodb = boto3.client('dynamodb', aws_access_key_id=session_key_id, aws_secret_access_key=session_access_key, aws_session_token=session_token)
-dynamodb_deserializer = TypeDeserializer()
-dynamodb_serializer = TypeSerializer()
 
+class SubscriptionItemConflictError(Exception):
+    """ Exception raised when the subscription item could not be written because it was written concurrently on all attempts. Caller is expected to retry later."""
+
+
+@idempotent(key_paths=['SubscriptionDetails.DomainId', 'SubscriptionDetails.ConsumerProjectDetails.EnvironmentId', 'ConnectionDetails.ConnectionArn', 'ConnectionDetails.ConnectionAssetName'])
 def handler(event, context):
     """ Function handler: Function that will revoke the subscription in source database by 1/ Connecting to source database using glue connection secret and details,
     2/ Revoke permissions to specific subscribed asset, also if no subscribed assets for project user left will delete user and 
     3/ Updating metadata in governance DynamoDB table that maps subscriptions to producer source connections. 
+    Subscription item is shared by all assets of the same source connection and environment, so it is written conditionally on its version and read again if written concurrently.
+    Access to source database is limited by a semaphore per glue connection, raising SemaphoreAcquireTimeoutError (to be retried by the workflow) if no permit is available in time.
 
     Parameters
     ----------
@@ -52,7 +88,7 @@ def handler(event, context):
                 SECRET_ID: str - ARN of the secret with credential used by glue connection to connect to source database
                 JDBC_CONNECTION_URL: str - Connection URL to connect to source
 
-    context: dict - Input context. Not used on function
+    context: dict - Input context. Used to stop waiting for a source semaphore permit before lambda is about to time out
 
     Returns
     -------
@@ -67,6 +103,7 @@ def handler(event, context):
         owner_account: str - Id of the account that owns the item
         owner_region: str - Region that owns the item
         last_updated: str - Datetime of last update performed on the item
+        version: int - Version of the item, incremented on each write
         delete_secret: bool - If subscription user was deleted so that associated secret is deleted as well on following steps. 
     """
 
@@ -89,27 +126,57 @@ def handler(event, context):
 
     glue_connection_url_path = urlparse(glue_connection_url.path)
     glue_connection_engine = glue_connection_url_path.scheme
+    glue_connection_host, glue_connection_port  = glue_connection_url_path.netloc.split(':')
     glue_connection_database_name = glue_connection_url_path.path.replace('/', '')
 
+    set_metric_dimensions(engine=glue_connection_engine, producer_account_id=ACCOUNT_ID)
+
     # Get data asset name associated to glue connection and subscription
     glue_connection_asset_name = glue_connection_details['ConnectionAssetName']
 
     # Get subscription record and remove unsubscribed data asset
     subscription_item = get_subscription_item(glue_connection_arn, consumer_environment_id)
-    subscription_item['data_assets'].remove(glue_connection_asset_name)
+    subscription_data_assets = [data_asset for data_asset in subscription_item['data_assets'] if data_asset != glue_connection_asset_name]
     
-    # Stablish connection to source, revoke access to data asset and delete user if no subscribed assets left
-    delete_subscription_user_and_secret = False if subscription_item['data_assets'] else True
-    source_connection = get_connection(glue_connection_engine, glue_connection_secret_arn, glue_connection_database_name)
-    revoke_asset_delete_user(glue_connection_engine, source_connection, subscription_user, glue_connection_asset_name, delete_subscription_user_and_secret)
+    # Stablish connection to source, revoke access to data asset and delete user if no subscribed assets left (holding a permit of the source semaphore to limit concurrent sessions)
+    delete_subscription_user_and_secret = False if subscription_data_assets else True
+    with source_semaphore(glue_connection_arn, context):
+        source_connection = get_connection(glue_connection_engine, glue_connection_secret_arn, glue_connection_database_name, glue_connection_host, glue_connection_port)
+        revoke_asset_delete_user(glue_connection_engine, source_connection, subscription_user, glue_connection_asset_name, delete_subscription_user_and_secret)
+    subscription_user_deleted = delete_subscription_user_and_secret
     
-    # Delete or update subscription record in DynamoDB
-    if delete_subscription_user_and_secret: delete_subscription_item(glue_connection_arn, consumer_environment_id)
+    # Delete or update subscription record in DynamoDB, reading it again if written concurrently by another grant / revoke. Secret is only deleted if the record is deleted,
+    # so that it is kept for data assets granted concurrently
+    for attempt in range(SUBSCRIPTION_ITEM_MAX_ATTEMPTS):
+        if subscription_data_assets: updated_subscription_item = update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, subscription_item['secret_arn'], subscription_item['secret_name'], subscription_data_assets, subscription_item['version'])
+        else: updated_subscription_item = delete_subscription_item(glue_connection_arn, consumer_environment_id, subscription_item['version'])
+        
+        if updated_subscription_item: break
+
+        wait_subscription_item_attempt(attempt)
+        current_subscription_item = get_subscription_item(glue_connection_arn, consumer_environment_id)
+        
+        # Subscription record deleted concurrently by another revoke, together with its user and secret
+        if not current_subscription_item:
+            subscription_data_assets = []
+            delete_subscription_user_and_secret = False
+            break
+        
+        subscription_item = current_subscription_item
+        subscription_data_assets = [data_asset for data_asset in subscription_item['data_assets'] if data_asset != glue_connection_asset_name]
+        delete_subscription_user_and_secret = False if subscription_data_assets else True
+
     else:
-        subscription_secret_arn = subscription_item['secret_arn']
-        subscription_secret_name = subscription_item['secret_name']
-        subscription_data_assets = subscription_item['data_assets']
-        subscription_item = update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, subscription_secret_arn, subscription_secret_name, subscription_data_assets)
+        raise SubscriptionItemConflictError(f'Subscription item of connection {glue_connection_arn} and environment {consumer_environment_id} written concurrently on {SUBSCRIPTION_ITEM_MAX_ATTEMPTS} attempts')
+
+    # Delete user if no subscribed assets are left once other data assets were revoked concurrently
+    if delete_subscription_user_and_secret and not subscription_user_deleted:
+        with source_semaphore(glue_connection_arn, context):
+            source_connection = get_connection(glue_connection_engine, glue_connection_secret_arn, glue_connection_database_name, glue_connection_host, glue_connection_port)
+            delete_user(glue_connection_engine, source_connection, subscription_user)
+
+    if updated_subscription_item and subscription_data_assets: subscription_item = updated_subscription_item
+    else: subscription_item['data_assets'] = subscription_data_assets
     
     subscription_item['delete_secret'] = delete_subscription_user_and_secret
     
@@ -117,10 +184,12 @@ def handler(event, context):
 
 
 def get_subscription_item(glue_connection_arn, consumer_environment_id):
-    """ Complementary function to get item with source connection subscription details in respective governance DynamoDB table if existent, else None"""
+    """ Complementary function to get item with source connection subscription details in respective governance DynamoDB table if existent, else None.
+    Items written before versioning was introduced are returned with version 0"""
 
     dynamodb_response = dynamodb.get_item(
-        TableName= G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME,
+        TableName= G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN,
+        ConsistentRead= True,
         Key= {
             'glue_connection_arn': dynamodb_serializer.serialize(glue_connection_arn),
             'datazone_consumer_environment_id': dynamodb_serializer.serialize(consumer_environment_id)
@@ -128,26 +197,39 @@ def get_subscription_item(glue_connection_arn, consumer_environment_id):
     )
     
     subscription_item = None
-    if 'Item' in dynamodb_response:
+    if dynamodb_response.get('Item'):
         subscription_item = {key: dynamodb_deserializer.deserialize(value) for key, value in dynamodb_response['Item'].items()}
+        subscription_item['version'] = int(subscription_item.get('version', 0))
     
     return subscription_item
 
 
-def delete_subscription_item(glue_connection_arn, consumer_environment_id):
-    """ Complementary function to delete item with source connection subscription details in respective governance DynamoDB table"""
+@measure_phase(PHASE_DYNAMODB_WRITE)
+def delete_subscription_item(glue_connection_arn, consumer_environment_id, version):
+    """ Complementary function to delete item with source connection subscription details in respective governance DynamoDB table, conditionally on the version read.
+    Returns True if item was deleted, False if item was written concurrently"""
     
-    dynamodb_response = dynamodb.delete_item(
-        TableName=G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME,
-        Key= {
-            'glue_connection_arn': dynamodb_serializer.serialize(glue_connection_arn),
-            'datazone_consumer_environment_id': dynamodb_serializer.serialize(consumer_environment_id),
-        }
-    )
+    try:
+        dynamodb_response = dynamodb.delete_item(
+            TableName=G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN,
+            Key= {
+                'glue_connection_arn': dynamodb_serializer.serialize(glue_connection_arn),
+                'datazone_consumer_environment_id': dynamodb_serializer.serialize(consumer_environment_id),
+            },
+            **get_subscription_item_condition(version)
+        )
 
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+        return False
 
-def update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, secret_arn, secret_name, data_assets):
-    """ Complementary function to update item with source connection subscription details in respective governance DynamoDB table"""
+    return True
+
+
+@measure_phase(PHASE_DYNAMODB_WRITE)
+def update_subscription_item(glue_connection_arn, consumer_environment_id, consumer_project_id, domain_id, secret_arn, secret_name, data_assets, version):
+    """ Complementary function to update item with source connection subscription details in respective governance DynamoDB table, conditionally on the version read.
+    Returns the item written, or None if item was written concurrently"""
 
     subscription_item = {
         'glue_connection_arn': glue_connection_arn,
@@ -158,95 +240,68 @@ def update_subscription_item(glue_connection_arn, consumer_environment_id, consu
         'secret_name': secret_name,
         'data_assets': data_assets,
         'owner_account': ACCOUNT_ID,
-        'last_updated': datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        'last_updated': datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        'version': version + 1
     }
     
-    dynamodb_response = dynamodb.put_item(
-        TableName=G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME,
-        Item={key: dynamodb_serializer.serialize(value) for key, value in subscription_item.items()}
-    )
+    try:
+        dynamodb_response = dynamodb.put_item(
+            TableName=G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN,
+            Item={key: dynamodb_serializer.serialize(value) for key, value in subscription_item.items()},
+            **get_subscription_item_condition(version)
+        )
+
+    except ClientError as error:
+        if error.response['Error']['Code'] != 'ConditionalCheckFailedException': raise
+        return None
     
     return subscription_item
 
 
-def get_connection(engine, secret_arn, database_name):
-    """ Complementary function to get a new connection to source database"""
-    connection = None
-    if engine == 'mysql':
-        connection = wr.mysql.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    elif engine == 'postgresql':
-        connection = wr.postgresql.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    elif engine == 'sqlserver':
-        connection = wr.sqlserver.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    elif engine == 'oracle':
-        connection = wr.oracle.connect(
-            secret_id= secret_arn,
-            dbname= database_name
-        )
-    
-    else: raise Exception("Unsupported Database Engine") 
+def get_subscription_item_condition(version):
+    """ Complementary function to get the condition of a subscription item write based on the version read (0 if item has no version)"""
+
+    if version == 0:
+        return {'ConditionExpression': 'attribute_exists(glue_connection_arn) AND attribute_not_exists(version)'}
+
+    return {'ConditionExpression': 'version = :version', 'ExpressionAttributeValues': {':version': dynamodb_serializer.serialize(version)}}
 
-    return connection
 
+def wait_subscription_item_attempt(attempt):
+    """ Complementary function to wait (exponential backoff with full jitter) before reading again a subscription item written concurrently"""
 
+    time.sleep(random.uniform(0, min(SUBSCRIPTION_ITEM_MAX_DELAY_IN_SECONDS, SUBSCRIPTION_ITEM_BASE_DELAY_IN_SECONDS * (2 ** attempt))))
+
+
+@measure_phase(PHASE_DDL_EXECUTION)
 def revoke_asset_delete_user(engine, connection, user, asset_name, delete_user):
     """ Complementary function to revoke permission on subscribing data asset in source database from project user and deleted if not remaining subscription assets under same project user"""
     
+    asset_name_parts = asset_name.split('.')
+    statement_parameters = {'user': user, 'asset_name': asset_name, 'asset_schema': asset_name_parts[-2], 'asset_table': asset_name_parts[-1]}
+
+    statement_templates = REVOKE_STATEMENT_TEMPLATES[engine]
+    if delete_user: statement_templates = statement_templates + DELETE_USER_STATEMENT_TEMPLATES[engine]
+
     with connection.cursor() as cursor:
-        if engine == 'mysql':
-            revoke_query = f'REVOKE SELECT ON {asset_name} FROM {user};'
-            cursor.execute(revoke_query)
-            
-            if delete_user:
-                delete_user_query = f'DROP USER {user};'
-                cursor.execute(delete_user_query)   
-        
-        elif engine == 'postgresql':
-            asset_db, asset_schema, asset_table = asset_name.split('.')
-            revoke_query = f'REVOKE SELECT ON {asset_schema}.{asset_table} FROM {user};'
-            cursor.execute(revoke_query)
-            
-            if delete_user:
-                revoke_owned_query = f'DROP OWNED BY {user};'
-                cursor.execute(revoke_owned_query)
-                
-                delete_user_query = f'DROP USER {user};'
-                cursor.execute(delete_user_query)
-        
-        elif engine == 'sqlserver':                        
-            asset_db, asset_schema, asset_table = asset_name.split('.')
-            revoke_query = f'REVOKE SELECT ON {asset_schema}.{asset_table} TO {user};'
-            cursor.execute(revoke_query)
-            
-            if delete_user:                
-                delete_user_query = f'DROP USER IF EXISTS {user};'
-                cursor.execute(delete_user_query)
-
-                delete_login_query = f'DROP LOGIN {user};'
-                cursor.execute(delete_login_query)
-        
-        elif engine == 'oracle':                        
-            asset_db, asset_schema, asset_table = asset_name.split('.')
-            revoke_query = f'REVOKE SELECT ON {asset_schema}.{asset_table} FROM {user}'
-            cursor.execute(revoke_query)
-            
-            if delete_user:                
-                delete_user_query = f"DECLARE userexist INTEGER; BEGIN SELECT COUNT(*) into userexist FROM dba_users WHERE username=UPPER('{user}'); IF (userexist = 1) THEN EXECUTE IMMEDIATE 'DROP USER {user} CASCADE'; END IF; END;"
-                cursor.execute(delete_user_query)
+        for statement_template in statement_templates:
+            cursor.execute(statement_template.format(**statement_parameters))
+
+    connection.commit()
+    connection.close()
+
+
+@measure_phase(PHASE_DDL_EXECUTION)
+def delete_user(engine, connection, user):
+    """ Complementary function to delete project user in source database when its last subscribed data assets were revoked concurrently"""
+
+    with connection.cursor() as cursor:
+        for statement_template in DELETE_USER_STATEMENT_TEMPLATES[engine]:
+            cursor.execute(statement_template.format(user=user))
 
     connection.commit()
     connection.close()
 
 
-def json_datetime_encoder(obj):
-    """ Complementary function to transform dict objects delivered by AWS API into JSONs """
-    if isinstance(obj, (datetime)): return obj.strftime("%Y-%m-%dT%H:%M:%S")
\ No newline at end of file
+# Priming: run expensive initialization on init phase of SnapStart / provisioned concurrency execution environments
+prime(import_drivers)
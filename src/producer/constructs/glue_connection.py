@@ -148,7 +148,8 @@ class GlueJDBCConnectorWithCrawlersConstruct(GlueJDBCConnectorConstruct):
                     tags= {
                         'AmazonDataZoneDomain': datazone_domain_id,
                         'AmazonDataZoneProject': datazone_project_id,
-                        'AmazonDataZoneEnvironment': datazone_environment_id
+                        'AmazonDataZoneEnvironment': datazone_environment_id,
+                        GLOBAL_VARIABLES['producer']['p_connection_index_crawler_tag_key']: 'True'
                     }
                 )
 
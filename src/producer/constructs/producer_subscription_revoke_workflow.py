@@ -1,7 +1,11 @@
 from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.stepfunctions_definition import get_definition_body
+from src.common.utils.lambda_warm_start import LAMBDA_LIVE_ALIAS_NAME, get_snap_start_conf, add_live_alias
+from src.common.utils.lambda_sizing import get_architecture
 
 from aws_cdk import (
     Environment,
+    Duration,
     Fn,
     RemovalPolicy,
     aws_lambda as lambda_,
@@ -10,10 +14,14 @@ from aws_cdk import (
     aws_logs as logs
 )
 
+import json
 from os import path;
 
 from constructs import Construct
 
+# Constant: Represents the seconds added to lambda timeout when bounding the workflow task invoking it, so that a hung database connection fails the task with States.Timeout
+P_JDBC_SUBSCRIPTION_TASK_TIMEOUT_MARGIN_IN_SECONDS = 10
+
 class ProducerManageSubscriptionRevokeWorkflowConstruct(Construct):
     """ Class to represent the workflow that will execute in the producer account after a Amazon DataZone subscription is revoked.
     The workflow will remove access to specified dataset in JDBC source to a existing user associated to the subscribing project. Then it will delete the shared secret if no additional assets are associated to it. 
@@ -44,70 +52,94 @@ class ProducerManageSubscriptionRevokeWorkflowConstruct(Construct):
         super().__init__(scope, construct_id, **kwargs)
         account_id, region = account_props['account_id'], account_props['region']
         
-        # ---------------- VPC ------------------------
-        p_lambda_vpc = ec2.Vpc.from_vpc_attributes( 
-            scope= self, 
-            id= 'p_lambda_vpc',
-            vpc_id= workflow_props['vpc_id'],
-            availability_zones = Fn.get_azs(),
-            private_subnet_ids = workflow_props['vpc_private_subnet_ids']
-        )
+        a_connector_runtime_props = account_props['connector_runtime']
 
-        p_lambda_security_group_ids = workflow_props['vpc_security_group_ids']
-        p_lambda_security_groups = []
-        
-        for index, p_lambda_security_group_id in enumerate(p_lambda_security_group_ids):
-            p_lambda_security_group = ec2.SecurityGroup.from_security_group_id(
+        if a_connector_runtime_props['enabled']:
+            # ---------------- Connector Runtime ------------------------
+            # Tasks are served by the account connector runtime function (through its live alias), created in account connector runtime stack
+            a_connector_runtime_lambda_alias = common_constructs['a_connector_runtime_lambda_alias']
+
+            p_get_connection_details_lambda_arn = a_connector_runtime_lambda_alias.function_arn
+            p_revoke_jdbc_subscription_lambda_arn = a_connector_runtime_lambda_alias.function_arn
+            p_revoke_jdbc_subscription_timeout_in_seconds = account_props['lambda_functions']['a_connector_runtime']['timeout_in_seconds']
+        else:
+            # ---------------- VPC ------------------------
+            p_lambda_vpc = ec2.Vpc.from_vpc_attributes( 
                 scope= self, 
-                id= f'p_lambda_security_group_{(index + 1):02d}',
-                security_group_id= p_lambda_security_group_id,
+                id= 'p_lambda_vpc',
+                vpc_id= workflow_props['vpc_id'],
+                availability_zones = Fn.get_azs(),
+                private_subnet_ids = workflow_props['vpc_private_subnet_ids']
             )
-            
-            p_lambda_security_groups.append(p_lambda_security_group)
+
+            p_lambda_security_group_ids = workflow_props['vpc_security_group_ids']
+            p_lambda_security_groups = []
         
-        # ---------------- Lambda ------------------------
-        p_get_connection_details_lambda = lambda_.Function.from_function_name(
-            scope= self,
-            id= 'p_get_connection_details_lambda',
-            function_name= 'dz_conn_p_get_connection_details'
-        )
+            for index, p_lambda_security_group_id in enumerate(p_lambda_security_group_ids):
+                p_lambda_security_group = ec2.SecurityGroup.from_security_group_id(
+                    scope= self, 
+                    id= f'p_lambda_security_group_{(index + 1):02d}',
+                    security_group_id= p_lambda_security_group_id,
+                )
+            
+                p_lambda_security_groups.append(p_lambda_security_group)
         
-        p_revoke_jdbc_subscription_lambda = lambda_.Function(
-            scope= self,
-            id= 'p_revoke_jdbc_subscription_lambda',
-            function_name= 'dz_conn_p_revoke_jdbc_subscription',
-            runtime= lambda_.Runtime.PYTHON_3_8,
-            code=lambda_.Code.from_asset(path.join('src/producer/code/lambda', "revoke_jdbc_subscription")),
-            handler= "revoke_jdbc_subscription.handler",
-            layers= [
-                common_constructs['p_aws_sdk_pandas_layer'], 
-                common_constructs['p_pyodbc_layer'],
-                common_constructs['p_oracledb_layer']
-            ],
-            role= common_constructs['a_common_lambda_role'],
-            vpc= p_lambda_vpc,
-            security_groups= p_lambda_security_groups,
-            environment= {
-                'G_ACCOUNT_ID': GLOBAL_VARIABLES['governance']['g_account_number'],
-                'G_CROSS_ACCOUNT_ASSUME_ROLE_NAME': GLOBAL_VARIABLES['governance']['g_cross_account_assume_role_name'],
-                'G_P_SOURCE_SUBSCRIPTIONS_TABLE_NAME': GLOBAL_VARIABLES['governance']['g_p_source_subscriptions_table_name'],
-                'ACCOUNT_ID': account_id
-            }
-        )
+            # ---------------- Lambda ------------------------
+            p_source_semaphore_props = common_constructs['p_source_semaphore_props']
 
-        p_delete_keep_subscription_secret_lambda = lambda_.Function(
-            scope= self,
-            id= 'p_delete_keep_subscription_secret_lambda',
-            function_name= 'dz_conn_p_delete_keep_subscription_secret',
-            runtime= lambda_.Runtime.PYTHON_3_11,
-            code=lambda_.Code.from_asset(path.join('src/producer/code/lambda', "delete_keep_subscription_secret")),
-            handler= "delete_keep_subscription_secret.handler",
-            environment= {
-                'RECOVERY_WINDOW_IN_DAYS': workflow_props['secret_recovery_window_in_days']
-            },
-            role= common_constructs['a_common_lambda_role']
-        )
+            # Function (and its live alias) created by producer subscription grant workflow construct
+            p_get_connection_details_lambda_alias = lambda_.Function.from_function_arn(
+                scope= self,
+                id= 'p_get_connection_details_lambda_alias',
+                function_arn= f'arn:aws:lambda:{region}:{account_id}:function:dz_conn_p_get_connection_details:{LAMBDA_LIVE_ALIAS_NAME}'
+            )
         
+            p_revoke_jdbc_subscription_lambda_sizing = account_props['lambda_functions']['p_revoke_jdbc_subscription']
+            p_revoke_jdbc_subscription_lambda = lambda_.Function(
+                scope= self,
+                id= 'p_revoke_jdbc_subscription_lambda',
+                function_name= 'dz_conn_p_revoke_jdbc_subscription',
+                runtime= lambda_.Runtime.PYTHON_3_12,
+                code=lambda_.Code.from_asset(path.join('src/producer/code/lambda', "revoke_jdbc_subscription")),
+                handler= "revoke_jdbc_subscription.handler",
+                memory_size= p_revoke_jdbc_subscription_lambda_sizing['memory_size'],
+                architecture= get_architecture(p_revoke_jdbc_subscription_lambda_sizing),
+                timeout= Duration.seconds(p_revoke_jdbc_subscription_lambda_sizing['timeout_in_seconds']),
+                snap_start= get_snap_start_conf(workflow_props, p_revoke_jdbc_subscription_lambda_sizing),
+                layers= [
+                    common_constructs['p_pg8000_layer'],
+                    common_constructs['p_pymysql_layer'],
+                    common_constructs['p_pyodbc_layer'],
+                    common_constructs['p_oracledb_layer'],
+                    common_constructs['a_common_layer']
+                ],
+                role= common_constructs['a_common_lambda_role'],
+                vpc= p_lambda_vpc,
+                security_groups= p_lambda_security_groups,
+                environment= {
+                    'A_IDEMPOTENCY_TABLE_NAME': common_constructs['a_idempotency_table_name'],
+                    'G_DYNAMODB_REGION': common_constructs['g_dynamodb_region'],
+                    'G_P_SOURCE_SUBSCRIPTIONS_TABLE_ARN': common_constructs['g_p_source_subscriptions_table_arn'],
+                    'ACCOUNT_ID': account_id,
+                    'P_SOURCE_SEMAPHORE_TABLE_NAME': common_constructs['p_source_semaphore_table_name'],
+                    'P_SOURCE_SEMAPHORE_PERMITS': str(p_source_semaphore_props['permits']),
+                    'P_SOURCE_SEMAPHORE_CONNECTION_PERMITS': json.dumps(p_source_semaphore_props['connection_permits']),
+                    'P_SOURCE_SEMAPHORE_LEASE_EXPIRATION_IN_SECONDS': str(p_source_semaphore_props['lease_expiration_in_seconds']),
+                    'P_SOURCE_SEMAPHORE_ACQUIRE_TIMEOUT_IN_SECONDS': str(p_source_semaphore_props['acquire_timeout_in_seconds'])
+                }
+            )
+
+            p_revoke_jdbc_subscription_lambda_alias = add_live_alias(
+                scope= self,
+                id= 'p_revoke_jdbc_subscription_lambda_alias',
+                function= p_revoke_jdbc_subscription_lambda,
+                lambda_sizing= p_revoke_jdbc_subscription_lambda_sizing
+            )
+
+            p_get_connection_details_lambda_arn = p_get_connection_details_lambda_alias.function_arn
+            p_revoke_jdbc_subscription_lambda_arn = p_revoke_jdbc_subscription_lambda_alias.function_arn
+            p_revoke_jdbc_subscription_timeout_in_seconds = p_revoke_jdbc_subscription_lambda_sizing['timeout_in_seconds']
+
         # ---------------- Step Functions ------------------------
         p_manage_subscription_revoke_state_machine_name = GLOBAL_VARIABLES['producer']['p_manage_subscription_revoke_state_machine_name']
 
@@ -122,16 +154,29 @@ class ProducerManageSubscriptionRevokeWorkflowConstruct(Construct):
             scope= self,
             id= 'p_manage_subscription_revoke_state_machine',
             state_machine_name= GLOBAL_VARIABLES['producer']['p_manage_subscription_revoke_state_machine_name'],
-            definition_body=stepfunctions.DefinitionBody.from_file('src/producer/code/stepfunctions/producer_manage_subscription_revoke_workflow.asl.json'),
+            definition_body=get_definition_body(
+                'src/producer/code/stepfunctions/producer_manage_subscription_revoke_workflow.asl.json',
+                state_policies= {
+                    'Revoke JDBC subscription': {'TimeoutSeconds': p_revoke_jdbc_subscription_timeout_in_seconds + P_JDBC_SUBSCRIPTION_TASK_TIMEOUT_MARGIN_IN_SECONDS}
+                },
+                lambda_tasks= {
+                    'Get connection details': 'get_connection_details',
+                    'Revoke JDBC subscription': 'revoke_jdbc_subscription'
+                } if a_connector_runtime_props['enabled'] else None
+            ),
             definition_substitutions= {
-                'p_get_connection_details_lambda_arn': p_get_connection_details_lambda.function_arn,
-                'p_revoke_jdbc_subscription_lambda_arn': p_revoke_jdbc_subscription_lambda.function_arn,
-                'p_delete_keep_subscription_secret_lambda_arn': p_delete_keep_subscription_secret_lambda.function_arn
+                'p_get_connection_details_lambda_arn': p_get_connection_details_lambda_arn,
+                'p_revoke_jdbc_subscription_lambda_arn': p_revoke_jdbc_subscription_lambda_arn,
+                'p_secret_recovery_window_in_days': workflow_props['secret_recovery_window_in_days'],
+                'a_send_workflow_callback_lambda_arn': common_constructs['a_send_workflow_callback_lambda'].function_arn
             },
+            state_machine_type= stepfunctions.StateMachineType.EXPRESS if workflow_props['express_workflow'] else stepfunctions.StateMachineType.STANDARD,
             role= common_constructs['a_common_sf_role'],
             logs= stepfunctions.LogOptions(
                 destination=p_manage_subscription_revoke_state_machine_logs,
-                level=stepfunctions.LogLevel.ALL
+                level=stepfunctions.LogLevel.ERROR if workflow_props['express_workflow'] else stepfunctions.LogLevel.ALL,
+                # Express workflows have no execution history, so input / output is only logged for them (on errors). Standard ones keep it in their history
+                include_execution_data=workflow_props['express_workflow']
             ),
             tracing_enabled=True
         )
@@ -1,51 +1,22 @@
 from config.common.global_vars import GLOBAL_VARIABLES
+from src.common.utils.lambda_sizing import get_architecture
 
 from os import path;
 
 from aws_cdk import (
     Environment,
     Stack,
-    aws_iam as iam,
-    aws_sam as sam,
+    Duration,
+    RemovalPolicy,
+    aws_dynamodb as dynamodb,
     aws_lambda as lambda_,
     aws_lakeformation as lakeformation,
+    aws_events as events,
+    aws_events_targets as event_targets
 )
 
 from constructs import Construct
 
-AWSSDKPANDAS_LAYER_ARNS = {
-    'af-south-1': 'arn:aws:lambda:af-south-1:336392948345:layer:AWSSDKPandas-Python38:16',
-    'ap-northeast-1': 'arn:aws:lambda:ap-northeast-1:336392948345:layer:AWSSDKPandas-Python38:16',
-    'ap-northeast-2': 'arn:aws:lambda:ap-northeast-2:336392948345:layer:AWSSDKPandas-Python38:18',
-    'ap-northeast-3': 'arn:aws:lambda:ap-northeast-3:336392948345:layer:AWSSDKPandas-Python38:18',
-    'ap-south-1': 'arn:aws:lambda:ap-south-1:336392948345:layer:AWSSDKPandas-Python38:16',
-    'ap-southeast-1': 'arn:aws:lambda:ap-southeast-1:336392948345:layer:AWSSDKPandas-Python38:16',
-    'ap-southeast-2': 'arn:aws:lambda:ap-southeast-2:336392948345:layer:AWSSDKPandas-Python38:16',
-    'ca-central-1': 'arn:aws:lambda:ca-central-1:336392948345:layer:AWSSDKPandas-Python38:18',
-    'eu-central-1': 'arn:aws:lambda:eu-central-1:336392948345:layer:AWSSDKPandas-Python38:16',
-    'eu-north-1': 'arn:aws:lambda:eu-north-1:336392948345:layer:AWSSDKPandas-Python38:18',
-    'eu-west-1': 'arn:aws:lambda:eu-west-1:336392948345:layer:AWSSDKPandas-Python38:16',
-    'eu-west-2': 'arn:aws:lambda:eu-west-2:336392948345:layer:AWSSDKPandas-Python38:16',
-    'eu-west-3': 'arn:aws:lambda:eu-west-3:336392948345:layer:AWSSDKPandas-Python38:18',
-    'sa-east-1': 'arn:aws:lambda:sa-east-1:336392948345:layer:AWSSDKPandas-Python38:18',
-    'us-east-1': 'arn:aws:lambda:us-east-1:336392948345:layer:AWSSDKPandas-Python38:16',
-    'us-east-2': 'arn:aws:lambda:us-east-2:336392948345:layer:AWSSDKPandas-Python38:16',
-    'us-west-1': 'arn:aws:lambda:us-west-1:336392948345:layer:AWSSDKPandas-Python38:19',
-    'us-west-2': 'arn:aws:lambda:us-west-2:336392948345:layer:AWSSDKPandas-Python38:17',
-    'ap-east-1': 'arn:aws:lambda:ap-east-1:839552336658:layer:AWSSDKPandas-Python38:11',
-    'ap-south-2': 'arn:aws:lambda:ap-south-2:246107603503:layer:AWSSDKPandas-Python38:14',
-    'ap-southeast-3': 'arn:aws:lambda:ap-southeast-3:258944054355:layer:AWSSDKPandas-Python38:11',
-    'ap-southeast-4': 'arn:aws:lambda:ap-southeast-4:945386623051:layer:AWSSDKPandas-Python38:10',
-    'eu-central-2': 'arn:aws:lambda:eu-central-2:956415814219:layer:AWSSDKPandas-Python38:10',
-    'eu-south-1': 'arn:aws:lambda:eu-south-1:774444163449:layer:AWSSDKPandas-Python38:11',
-    'eu-south-2': 'arn:aws:lambda:eu-south-2:982086096842:layer:AWSSDKPandas-Python38:10',
-    'il-central-1': 'arn:aws:lambda:il-central-1:263840725265:layer:AWSSDKPandas-Python38:8',
-    'me-central-1': 'arn:aws:lambda:me-central-1:593833071574:layer:AWSSDKPandas-Python38:10',
-    'me-south-1': 'arn:aws:lambda:me-south-1:938046470361:layer:AWSSDKPandas-Python38:11',
-    'cn-north-1': 'arn:aws-cn:lambda:cn-north-1:406640652441:layer:AWSSDKPandas-Python38:9',
-    'cn-northwest-1': 'arn:aws-cn:lambda:cn-northwest-1:406640652441:layer:AWSSDKPandas-Python38:7'
-}
-
 class DataZoneConnectorsProducerCommonStack(Stack):
     """ Class to represents the stack containing all producer-specific common resources in account."""
     
@@ -72,28 +43,98 @@ class DataZoneConnectorsProducerCommonStack(Stack):
         super().__init__(scope, construct_id, **kwargs)
         account_id, region = account_props['account_id'], account_props['region']
 
+        # ----------------------- DynamoDB ---------------------------
+        # Each item is a permit (slot) of a source connection semaphore, held by a lease until released or expired
+        p_source_semaphore_table = dynamodb.Table(
+            scope= self, 
+            id= 'p_source_semaphore_table',
+            table_name= GLOBAL_VARIABLES['producer']['p_source_semaphore_table_name'],
+            partition_key= dynamodb.Attribute(
+                name= 'semaphore_key', 
+                type= dynamodb.AttributeType.STRING
+            ),
+            time_to_live_attribute= 'expiration',
+            billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy= RemovalPolicy.DESTROY
+        )
+
+        # Each item is the cached details of a glue table or connection (or the epoch it was invalidated at), resolved when getting subscription connection details
+        p_connection_details_cache_table = dynamodb.Table(
+            scope= self, 
+            id= 'p_connection_details_cache_table',
+            table_name= GLOBAL_VARIABLES['producer']['p_connection_details_cache_table_name'],
+            partition_key= dynamodb.Attribute(
+                name= 'cache_key', 
+                type= dynamodb.AttributeType.STRING
+            ),
+            time_to_live_attribute= 'expiration',
+            billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy= RemovalPolicy.DESTROY
+        )
+
+        # Each item is the connection details of a glue table written by a solution's crawler, keyed by glue table ARN. Indexed by crawler and by connection to remove outdated tables
+        p_connection_index_table = dynamodb.Table(
+            scope= self, 
+            id= 'p_connection_index_table',
+            table_name= GLOBAL_VARIABLES['producer']['p_connection_index_table_name'],
+            partition_key= dynamodb.Attribute(
+                name= 'glue_table_arn', 
+                type= dynamodb.AttributeType.STRING
+            ),
+            billing_mode= dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy= RemovalPolicy.DESTROY
+        )
+
+        p_connection_index_table.add_global_secondary_index(
+            index_name= 'crawler_name_index',
+            partition_key= dynamodb.Attribute(
+                name= 'crawler_name',
+                type= dynamodb.AttributeType.STRING
+            ),
+            projection_type= dynamodb.ProjectionType.KEYS_ONLY
+        )
+
+        p_connection_index_table.add_global_secondary_index(
+            index_name= 'connection_name_index',
+            partition_key= dynamodb.Attribute(
+                name= 'connection_name',
+                type= dynamodb.AttributeType.STRING
+            ),
+            projection_type= dynamodb.ProjectionType.KEYS_ONLY
+        )
+
         # ---------------- Lambda Layer ------------------------
-        p_aws_sdk_pandas_layer_arn = AWSSDKPANDAS_LAYER_ARNS[region]
-        p_aws_sdk_pandas_layer = lambda_.LayerVersion.from_layer_version_arn(
+        # One layer per source database engine driver. Drivers are imported lazily by source connector so only the one needed is loaded (all of them on primed execution environments)
+        p_pg8000_layer = lambda_.LayerVersion(
+            scope=self, 
+            id='p_pg8000_layer',
+            layer_version_name='dz_conn_p_pg8000_layer',
+            code=lambda_.AssetCode('libs/python312/pg8000-layer.zip'),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_12]
+        )
+
+        p_pymysql_layer = lambda_.LayerVersion(
             scope=self, 
-            id='p_aws_sdk_pandas_layer',
-            layer_version_arn=p_aws_sdk_pandas_layer_arn
+            id='p_pymysql_layer',
+            layer_version_name='dz_conn_p_pymysql_layer',
+            code=lambda_.AssetCode('libs/python312/pymysql-layer.zip'),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_12]
         )
 
         p_pyodbc_layer = lambda_.LayerVersion(
             scope=self, 
             id='p_pyodbc_layer',
             layer_version_name='dz_conn_p_pyodbc_layer',
-            code=lambda_.AssetCode('libs/python38/pyodbc-layer.zip'),
-            compatible_runtimes=[lambda_.Runtime.PYTHON_3_8]
+            code=lambda_.AssetCode('libs/python312/pyodbc-layer.zip'),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_12]
         )
 
         p_oracledb_layer = lambda_.LayerVersion(
             scope=self, 
             id='p_oracledb_layer',
             layer_version_name='dz_conn_p_oracledb_layer',
-            code=lambda_.AssetCode('libs/python38/oracledb-layer.zip'),
-            compatible_runtimes=[lambda_.Runtime.PYTHON_3_8]
+            code=lambda_.AssetCode('libs/python312/oracledb-layer.zip'),
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_12]
         )
 
         # ----------------------- Lake Formation ---------------------------
@@ -215,6 +256,7 @@ class DataZoneConnectorsProducerCommonStack(Stack):
                 p_lf_principal_tag_table_permissions.append(p_lf_principal_tag_table_permission)
 
         # ---------------- Lambda ------------------------        
+        p_add_lf_tag_environment_dbs_lambda_sizing = account_props['lambda_functions']['p_add_lf_tag_environment_dbs']
         p_add_lf_tag_environment_dbs_lambda = lambda_.Function(
             scope= self,
             id= 'p_add_lf_tag_environment_dbs_lambda',
@@ -222,16 +264,124 @@ class DataZoneConnectorsProducerCommonStack(Stack):
             runtime= lambda_.Runtime.PYTHON_3_11,
             code=lambda_.Code.from_asset(path.join('src/producer/code/lambda', "add_lf_tag_environment_dbs")),
             handler= "add_lf_tag_environment_dbs.handler",
+            memory_size= p_add_lf_tag_environment_dbs_lambda_sizing['memory_size'],
+            architecture= get_architecture(p_add_lf_tag_environment_dbs_lambda_sizing),
+            timeout= Duration.seconds(p_add_lf_tag_environment_dbs_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                common_constructs['a_common_layer']
+            ],
             role= common_constructs['a_common_lambda_role'],
             environment= {
                 'P_LAKEFORMATION_TAG_KEY': p_lf_tag_key,
                 'P_LAKEFORMATION_TAG_VALUE': p_lf_tag_value
             }
         )
+
+        p_connection_details_cache_props = producer_props['p_connection_details_cache']
+
+        p_invalidate_connection_details_cache_lambda_sizing = account_props['lambda_functions']['p_invalidate_connection_details_cache']
+        p_invalidate_connection_details_cache_lambda = lambda_.Function(
+            scope= self,
+            id= 'p_invalidate_connection_details_cache_lambda',
+            function_name= GLOBAL_VARIABLES['producer']['p_invalidate_connection_details_cache_lambda_name'],
+            runtime= lambda_.Runtime.PYTHON_3_12,
+            code=lambda_.Code.from_asset(path.join('src/producer/code/lambda', "invalidate_connection_details_cache")),
+            handler= "invalidate_connection_details_cache.handler",
+            memory_size= p_invalidate_connection_details_cache_lambda_sizing['memory_size'],
+            architecture= get_architecture(p_invalidate_connection_details_cache_lambda_sizing),
+            timeout= Duration.seconds(p_invalidate_connection_details_cache_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                common_constructs['a_common_layer']
+            ],
+            role= common_constructs['a_common_lambda_role'],
+            environment= {
+                'P_CONNECTION_DETAILS_CACHE_TABLE_NAME': p_connection_details_cache_table.table_name,
+                'P_CONNECTION_DETAILS_CACHE_EXPIRATION_IN_SECONDS': str(p_connection_details_cache_props['expiration_in_seconds']),
+                'P_CONNECTION_INDEX_TABLE_NAME': p_connection_index_table.table_name,
+                'ACCOUNT_ID': account_id,
+                'REGION': region
+            }
+        )
+
+        p_index_crawled_tables_lambda_sizing = account_props['lambda_functions']['p_index_crawled_tables']
+        p_index_crawled_tables_lambda = lambda_.Function(
+            scope= self,
+            id= 'p_index_crawled_tables_lambda',
+            function_name= GLOBAL_VARIABLES['producer']['p_index_crawled_tables_lambda_name'],
+            runtime= lambda_.Runtime.PYTHON_3_12,
+            code=lambda_.Code.from_asset(path.join('src/producer/code/lambda', "index_crawled_tables")),
+            handler= "index_crawled_tables.handler",
+            memory_size= p_index_crawled_tables_lambda_sizing['memory_size'],
+            architecture= get_architecture(p_index_crawled_tables_lambda_sizing),
+            timeout= Duration.seconds(p_index_crawled_tables_lambda_sizing['timeout_in_seconds']),
+            layers= [
+                common_constructs['a_common_layer']
+            ],
+            role= common_constructs['a_common_lambda_role'],
+            environment= {
+                'P_CONNECTION_INDEX_TABLE_NAME': p_connection_index_table.table_name,
+                'P_CONNECTION_INDEX_CRAWLER_TAG_KEY': GLOBAL_VARIABLES['producer']['p_connection_index_crawler_tag_key'],
+                'ACCOUNT_ID': account_id,
+                'REGION': region
+            }
+        )
+
+        # --------------- EventBridge ---------------------------
+        # Glue data catalog changes of tables (updates) and databases (table creations / deletions)
+        p_glue_catalog_change_rule = events.Rule(
+            scope= self,
+            id= 'p_glue_catalog_change_rule',
+            rule_name= 'dz_conn_p_glue_catalog_change_rule',
+            event_pattern=events.EventPattern(
+                source=['aws.glue'],
+                detail_type=['Glue Data Catalog Table State Change', 'Glue Data Catalog Database State Change']
+            )
+        )
+
+        p_glue_catalog_change_rule.add_target(event_targets.LambdaFunction(p_invalidate_connection_details_cache_lambda))
+
+        # Glue connection changes have no glue data catalog event, they are notified as API calls recorded by CloudTrail
+        p_glue_connection_change_rule = events.Rule(
+            scope= self,
+            id= 'p_glue_connection_change_rule',
+            rule_name= 'dz_conn_p_glue_connection_change_rule',
+            event_pattern=events.EventPattern(
+                source=['aws.glue'],
+                detail_type=['AWS API Call via CloudTrail'],
+                detail={
+                    'eventSource': ['glue.amazonaws.com'],
+                    'eventName': ['UpdateConnection', 'DeleteConnection', 'BatchDeleteConnection']
+                }
+            )
+        )
+
+        p_glue_connection_change_rule.add_target(event_targets.LambdaFunction(p_invalidate_connection_details_cache_lambda))
+
+        # Completed crawls. Crawlers not created by solution's glue connection with crawlers products (not tagged) are skipped by the function
+        p_glue_crawler_succeeded_rule = events.Rule(
+            scope= self,
+            id= 'p_glue_crawler_succeeded_rule',
+            rule_name= 'dz_conn_p_glue_crawler_succeeded_rule',
+            event_pattern=events.EventPattern(
+                source=['aws.glue'],
+                detail_type=['Glue Crawler State Change'],
+                detail={
+                    'state': ['Succeeded']
+                }
+            )
+        )
+
+        p_glue_crawler_succeeded_rule.add_target(event_targets.LambdaFunction(p_index_crawled_tables_lambda))
         
         # -------------- Outputs --------------------
         self.outputs = {
-            'p_aws_sdk_pandas_layer': p_aws_sdk_pandas_layer,
+            'p_source_semaphore_table_name': p_source_semaphore_table.table_name,
+            'p_source_semaphore_props': producer_props['p_source_semaphore'],
+            'p_connection_details_cache_table_name': p_connection_details_cache_table.table_name,
+            'p_connection_details_cache_props': p_connection_details_cache_props,
+            'p_connection_index_table_name': p_connection_index_table.table_name,
+            'p_pg8000_layer': p_pg8000_layer,
+            'p_pymysql_layer': p_pymysql_layer,
             'p_pyodbc_layer': p_pyodbc_layer,
             'p_oracledb_layer': p_oracledb_layer,
             'p_add_lf_tag_environment_dbs_lambda': p_add_lf_tag_environment_dbs_lambda